@@ -9,6 +9,8 @@ from logging_config import setup_logging
 from error_handlers import register_error_handlers
 from middleware.security import setup_security_headers
 from middleware.rate_limit import setup_rate_limiting
+from middleware.access_log import setup_access_logging
+from middleware.metrics import setup_metrics
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -24,7 +26,8 @@ setup_logging(app)
 CORS(app, 
      origins=app.config['CORS_ORIGINS'],
      supports_credentials=True,
-     allow_headers=['Content-Type', 'Authorization', 'X-CSRF-Token'],
+     allow_headers=['Content-Type', 'Authorization', 'X-CSRF-Token', 'Idempotency-Key'],
+     expose_headers=['Idempotent-Replayed'],
      methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
 
 # Initialize JWT
@@ -37,6 +40,10 @@ setup_security_headers(app)
 if app.config.get('RATELIMIT_ENABLED', True):
     setup_rate_limiting(app)
 
+# Setup request metrics and the /metrics endpoint
+if app.config.get('METRICS_ENABLED', True):
+    setup_metrics(app)
+
 # Register error handlers
 register_error_handlers(app)
 
@@ -57,35 +64,8 @@ SessionLocal = scoped_session(sessionmaker(
 ))
 
 
-# Request logging middleware
-@app.before_request
-def log_request():
-    """Log incoming requests"""
-    from flask import request
-    app.logger.info(
-        f"Incoming request: {request.method} {request.path}",
-        extra={
-            'request_method': request.method,
-            'request_path': request.path,
-            'ip_address': request.remote_addr,
-            'user_agent': request.headers.get('User-Agent')
-        }
-    )
-
-
-@app.after_request
-def log_response(response):
-    """Log outgoing responses"""
-    from flask import request
-    app.logger.info(
-        f"Response: {response.status_code}",
-        extra={
-            'request_method': request.method,
-            'request_path': request.path,
-            'status_code': response.status_code
-        }
-    )
-    return response
+# Access logging (one line per request)
+setup_access_logging(app, engine)
 
 
 # Database session management
@@ -238,6 +218,10 @@ app.register_blueprint(referral_blueprint, url_prefix='/api/v1/referral')
 from routes.escrow import escrow_blueprint
 app.register_blueprint(escrow_blueprint, url_prefix='/api/v1/escrow')
 
+# Register analytics blueprint
+from routes.analytics import analytics_blueprint
+app.register_blueprint(analytics_blueprint, url_prefix='/api/v1/analytics')
+
 # Register batch transfer blueprint
 from routes.batch_transfer import batch_transfer_bp
 app.register_blueprint(batch_transfer_bp, url_prefix='/api/v1')
@@ -0,0 +1,54 @@
+"""
+Latency metrics for calls to external services (XRPL, Stripe, Xaman).
+"""
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable
+from prometheus_client import Histogram
+
+
+EXTERNAL_CALL_SECONDS = Histogram(
+    'airzone_external_call_duration_seconds',
+    'Duration of calls to external services by service, operation and outcome',
+    ['service', 'operation', 'outcome'],
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+
+@contextmanager
+def timed_call(service: str, operation: str):
+    """
+    Record the duration of the enclosed call; outcome is 'error' if it raises.
+    
+    Args:
+        service: External service (e.g. 'stripe')
+        operation: Operation name
+    """
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'success'
+    finally:
+        EXTERNAL_CALL_SECONDS.labels(service, operation, outcome).observe(time.perf_counter() - started)
+
+
+def observe_call(service: str, operation: str) -> Callable:
+    """
+    Decorator recording the duration of each call of a client method.
+    
+    Args:
+        service: External service (e.g. 'stripe')
+        operation: Operation name
+    
+    Returns:
+        Callable: Decorator
+    """
+    def decorator(f: Callable) -> Callable:
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            with timed_call(service, operation):
+                return f(*args, **kwargs)
+        return decorated_function
+    return decorator
@@ -16,6 +16,7 @@ Note: All amounts are in the smallest currency unit (e.g., cents for USD, yen fo
 from typing import Dict, Optional
 import stripe
 import logging
+from clients.instrumentation import observe_call
 
 
 logger = logging.getLogger(__name__)
@@ -45,6 +46,7 @@ class StripeClient:
         
         logger.info("Initialized Stripe client")
     
+    @observe_call('stripe', 'create_payment_intent')
     def create_payment_intent(
         self,
         amount: int,
@@ -143,6 +145,7 @@ class StripeClient:
             logger.error(f"Unexpected error creating payment intent: {str(e)}")
             raise Exception(f"Failed to create payment intent: {str(e)}")
     
+    @observe_call('stripe', 'retrieve_payment_intent')
     def retrieve_payment_intent(self, payment_intent_id: str) -> Dict:
         """
         Retrieve a payment intent by ID.
@@ -178,6 +181,7 @@ class StripeClient:
             logger.error(f"Error retrieving payment intent: {str(e)}")
             raise Exception(f"Failed to retrieve payment intent: {str(e)}")
     
+    @observe_call('stripe', 'confirm_payment_intent')
     def confirm_payment_intent(self, payment_intent_id: str) -> Dict:
         """
         Confirm a payment intent.
@@ -207,6 +211,7 @@ class StripeClient:
             logger.error(f"Error confirming payment intent: {str(e)}")
             raise Exception(f"Failed to confirm payment: {str(e)}")
     
+    @observe_call('stripe', 'cancel_payment_intent')
     def cancel_payment_intent(self, payment_intent_id: str) -> Dict:
         """
         Cancel a payment intent.
@@ -234,6 +239,7 @@ class StripeClient:
             logger.error(f"Error cancelling payment intent: {str(e)}")
             raise Exception(f"Failed to cancel payment: {str(e)}")
     
+    @observe_call('stripe', 'create_refund')
     def create_refund(
         self,
         payment_intent_id: str,
@@ -392,6 +398,7 @@ class StripeClient:
         
         return result
     
+    @observe_call('stripe', 'list_payment_methods')
     def list_payment_methods(self, customer_id: str) -> list:
         """
         List payment methods for a customer.
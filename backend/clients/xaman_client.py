@@ -5,6 +5,7 @@ Xaman Walletとの連携を提供
 import requests
 import logging
 from typing import Dict, Optional
+from clients.instrumentation import observe_call
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,7 @@ class XamanClient:
             'Content-Type': 'application/json',
         }
     
+    @observe_call('xaman', 'create_signin_payload')
     def create_signin_payload(self) -> Dict:
         """
         サインインペイロードを作成
@@ -66,6 +68,7 @@ class XamanClient:
             logger.error(f"Failed to create signin payload: {str(e)}")
             raise Exception(f"Xaman API error: {str(e)}")
     
+    @observe_call('xaman', 'create_payment_payload')
     def create_payment_payload(
         self,
         destination: str,
@@ -125,6 +128,7 @@ class XamanClient:
             logger.error(f"Failed to create payment payload: {str(e)}")
             raise Exception(f"Xaman API error: {str(e)}")
     
+    @observe_call('xaman', 'get_payload_status')
     def get_payload_status(self, uuid: str) -> Dict:
         """
         ペイロードのステータスを取得
@@ -0,0 +1,129 @@
+"""
+Ledger-aware XRP balance cache shared by all XRPLClient instances of a process.
+Balances are read from the validated ledger and tagged with its index. An
+entry is exact until a newer validated ledger is observed; after that it is
+only served to callers whose staleness bound still covers its age. Our own
+submissions drop the balances of the accounts they touch immediately.
+"""
+import threading
+import time
+from typing import Dict, Optional
+from utils.ttl_cache import TTLCache
+
+
+class LedgerBalanceCache:
+    """
+    Cache of validated XRP balances keyed by address.
+    """
+    
+    def __init__(self, maxsize: int = 10000, ledger_interval: float = 4.0, max_ttl: float = 300.0):
+        """
+        Initialize LedgerBalanceCache.
+        
+        Args:
+            maxsize: Maximum number of cached addresses
+            ledger_interval: Seconds an entry counts as exact when no newer ledger
+                             has been observed (about one ledger close)
+            max_ttl: Hard upper bound on the age of any entry
+        """
+        self.ledger_interval = ledger_interval
+        self.max_ttl = max_ttl
+        self._entries = TTLCache(maxsize=maxsize)
+        self._invalidated_at = TTLCache(maxsize=maxsize)
+        self._latest_ledger_index = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def latest_ledger_index(self) -> int:
+        """Newest validated ledger index observed by this process."""
+        return self._latest_ledger_index
+    
+    def get(self, address: str, max_age: float = 0.0) -> Optional[int]:
+        """
+        Get a cached balance if it satisfies the caller's staleness bound.
+        
+        Args:
+            address: XRPL address
+            max_age: Seconds of staleness the caller accepts; entries from the
+                     latest observed ledger are served regardless
+            
+        Returns:
+            Optional[int]: Balance in drops, or None if it must be fetched
+        """
+        entry = self._entries.get(address)
+        if entry is None:
+            return None
+        
+        balance, ledger_index, fetched_at = entry
+        age = time.monotonic() - fetched_at
+        if age <= max_age:
+            return balance
+        if ledger_index >= self._latest_ledger_index and age <= self.ledger_interval:
+            return balance
+        return None
+    
+    def put(self, address: str, balance: int, ledger_index: int, fetch_started: float) -> None:
+        """
+        Store a balance read from a validated ledger.
+        Ignored if the address was invalidated while the read was in flight.
+        
+        Args:
+            address: XRPL address
+            balance: Balance in drops
+            ledger_index: Validated ledger the balance was read from
+            fetch_started: time.monotonic() taken before the request was sent
+        """
+        self.observe_ledger(ledger_index)
+        
+        invalidated_at = self._invalidated_at.get(address)
+        if invalidated_at is not None and invalidated_at >= fetch_started:
+            return
+        
+        self._entries.set(address, (balance, ledger_index or 0, fetch_started), ttl=self.max_ttl)
+    
+    def observe_ledger(self, ledger_index: Optional[int]) -> None:
+        """
+        Record a validated ledger index seen in any response or stream.
+        
+        Args:
+            ledger_index: Validated ledger index
+        """
+        if not ledger_index:
+            return
+        with self._lock:
+            if ledger_index > self._latest_ledger_index:
+                self._latest_ledger_index = ledger_index
+    
+    def invalidate(self, *addresses: str) -> None:
+        """
+        Drop the balances of accounts touched by one of our transactions.
+        
+        Args:
+            *addresses: XRPL addresses
+        """
+        now = time.monotonic()
+        for address in addresses:
+            if not address:
+                continue
+            self._entries.delete(address)
+            self._invalidated_at.set(address, now, ttl=self.max_ttl)
+
+
+_caches: Dict[str, LedgerBalanceCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_balance_cache(network: str) -> LedgerBalanceCache:
+    """
+    Get the process-wide balance cache of a network.
+    
+    Args:
+        network: XRPL network name
+        
+    Returns:
+        LedgerBalanceCache: Cache shared by all clients of the network
+    """
+    with _caches_lock:
+        if network not in _caches:
+            _caches[network] = LedgerBalanceCache()
+        return _caches[network]
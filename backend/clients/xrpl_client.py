@@ -8,30 +8,74 @@ Requirements:
 - 3.2: NFT minting on XRPL
 - 3.3: Transaction management
 """
-from typing import Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import logging
-from xrpl.clients import JsonRpcClient
+import re
 from xrpl.wallet import Wallet
-from xrpl.models.transactions import NFTokenMint, Payment
-from xrpl.transaction import submit_and_wait
+from xrpl.models.response import Response
+from xrpl.models.transactions import (
+    EscrowFinish,
+    NFTokenCreateOffer,
+    NFTokenCreateOfferFlag,
+    NFTokenMint,
+    Payment,
+    TicketCreate,
+    Transaction
+)
+from xrpl.transaction import sign, submit_and_wait
 from xrpl.models.requests import AccountNFTs, AccountInfo
 from xrpl.utils import xrp_to_drops
+from clients.xrpl_balance_cache import get_balance_cache
+from clients.xrpl_fee_oracle import get_fee_oracle
+from clients.xrpl_rpc_transport import get_rpc_client
+from clients.xrpl_sequence_allocator import get_sequence_allocator
+from clients.xrpl_signing_pool import get_signing_pool
 import xrpl
 import time
 
 logger = logging.getLogger(__name__)
 
 
+# Submission failures after which the sequence is known to be consumed (tec*)
+# or was taken by another submitter / left behind a gap / underpaid a fee
+# spike (retry on a fresh sequence)
+_SEQUENCE_CONSUMED = re.compile(r'\btec[A-Z_]+')
+_SEQUENCE_CONFLICT = re.compile(r'tefPAST_SEQ|terPRE_SEQ|telINSUF_FEE_P')
+
+
 class XRPLClient:
     """
     Client for XRPL blockchain operations.
     Handles wallet generation, NFT minting, and transaction management.
     """
     
+    # Public JSON-RPC endpoints, hedged and circuit-broken by the transport
+    RPC_URLS = {
+        'testnet': ["https://s.altnet.rippletest.net:51234", "https://testnet.xrpl-labs.com"],
+        'devnet': ["https://s.devnet.rippletest.net:51234"],
+        'mainnet': ["https://xrplcluster.com", "https://s1.ripple.com:51234", "https://s2.ripple.com:51234"],
+    }
+    
+    # Public WebSocket endpoints for subscriptions (ledger / account streams)
+    WEBSOCKET_URLS = {
+        'testnet': "wss://s.altnet.rippletest.net:51233",
+        'devnet': "wss://s.devnet.rippletest.net:51233",
+        'mainnet': "wss://xrplcluster.com",
+    }
+    
+    # Staleness bounds (seconds) accepted by get_wallet_balance callers
+    BALANCE_MAX_AGE_EXACT = 0.0  # Only balances from the latest known validated ledger
+    BALANCE_MAX_AGE_DISPLAY = 15.0  # Balances shown to users or used for pre-checks
+    
+    # Attempts per submission when its allocated sequence conflicts
+    SEQUENCE_RETRY_ATTEMPTS = 3
+    
     def __init__(
         self,
         network: str = 'testnet',
-        sponsor_seed: Optional[str] = None
+        sponsor_seed: Optional[str] = None,
+        rpc_urls: Optional[List[str]] = None
     ):
         """
         Initialize XRPLClient with network configuration.
@@ -39,22 +83,23 @@ class XRPLClient:
         Args:
             network: XRPL network to connect to ('testnet', 'devnet', 'mainnet')
             sponsor_seed: Seed for sponsoring transactions (optional)
+            rpc_urls: JSON-RPC endpoints (default: public endpoints of the network)
             
         Requirements: 1.3, 3.2, 3.3
         """
         self.network = network
         self.sponsor_seed = sponsor_seed
         
-        # Initialize XRPL client based on network
-        if network == 'testnet':
-            self.client = JsonRpcClient("https://s.altnet.rippletest.net:51234")
-        elif network == 'devnet':
-            self.client = JsonRpcClient("https://s.devnet.rippletest.net:51234")
-        elif network == 'mainnet':
-            self.client = JsonRpcClient("https://xrplcluster.com")
-        else:
+        if network not in self.RPC_URLS:
             raise ValueError(f"Invalid network: {network}. Must be 'testnet', 'devnet', or 'mainnet'")
         
+        self.balance_cache = get_balance_cache(network)
+        # Transport shared by all clients of the network, so latency and
+        # circuit state survive the per-request XRPLClient instances
+        self.client = get_rpc_client(network, rpc_urls or self.RPC_URLS[network])
+        self.fee_oracle = get_fee_oracle(network, self.client)
+        self.signing_pool = get_signing_pool()
+        
         # Initialize sponsor wallet if provided
         self.sponsor_wallet = None
         if sponsor_seed:
@@ -67,6 +112,29 @@ class XRPLClient:
         else:
             logger.info(f"Initialized XRPL client on {network} without sponsor wallet")
     
+    @staticmethod
+    def decode_memos(memos: List[Dict]) -> List[str]:
+        """
+        Decode the hex-encoded MemoData of a transaction's ``Memos`` field.
+        Memos that are not valid UTF-8 are skipped.
+        
+        Args:
+            memos: ``Memos`` field as returned by rippled
+            
+        Returns:
+            List[str]: Decoded memo strings in order
+        """
+        decoded = []
+        for entry in memos or []:
+            memo_data = (entry.get('Memo') or {}).get('MemoData')
+            if not memo_data:
+                continue
+            try:
+                decoded.append(bytes.fromhex(memo_data).decode('utf-8'))
+            except (ValueError, UnicodeDecodeError):
+                continue
+        return decoded
+    
     def generate_wallet(self) -> Tuple[str, str]:
         """
         Generate a new XRPL wallet with address and seed.
@@ -90,22 +158,31 @@ class XRPLClient:
             logger.error(f"Failed to generate wallet: {str(e)}")
             raise Exception(f"Wallet generation failed: {str(e)}")
     
-    def get_wallet_balance(self, address: str) -> int:
+    def get_wallet_balance(self, address: str, max_age: float = BALANCE_MAX_AGE_EXACT) -> int:
         """
         Get the XRP balance for a wallet address.
+        Reads the validated ledger through the process-wide balance cache; the
+        network is only asked when no cached balance meets max_age.
         
         Args:
             address: XRPL wallet address
+            max_age: Seconds of staleness the caller accepts (see BALANCE_MAX_AGE_*)
             
         Returns:
             int: Balance in drops (1 XRP = 1,000,000 drops)
         """
+        cached = self.balance_cache.get(address, max_age)
+        if cached is not None:
+            return cached
+        
         try:
-            account_info = AccountInfo(account=address)
+            fetch_started = time.monotonic()
+            account_info = AccountInfo(account=address, ledger_index='validated')
             response = self.client.request(account_info)
             
             if response.is_successful():
                 balance = int(response.result['account_data']['Balance'])
+                self.balance_cache.put(address, balance, response.result.get('ledger_index'), fetch_started)
                 logger.info(f"Retrieved balance for {address}: {balance} drops ({balance / 1_000_000} XRP)")
                 return balance
             else:
@@ -152,17 +229,20 @@ class XRPLClient:
             logger.info(f"Minting NFT for {recipient_address} from issuer: {issuer_wallet.classic_address}")
             logger.info(f"NFT URI: {nft_uri}")
             
-            # Create NFT mint transaction
-            mint_tx = NFTokenMint(
-                account=issuer_wallet.classic_address,
-                uri=xrpl.utils.str_to_hex(nft_uri),
-                flags=flags,
-                transfer_fee=transfer_fee,
-                nftoken_taxon=0
+            # Create NFT mint transaction with a sequence from the issuer's allocator
+            uri = xrpl.utils.str_to_hex(nft_uri)
+            response, _ = self._submit_with_sequence(
+                lambda sequence: NFTokenMint(
+                    account=issuer_wallet.classic_address,
+                    uri=uri,
+                    flags=flags,
+                    transfer_fee=transfer_fee,
+                    nftoken_taxon=0,
+                    sequence=sequence
+                ),
+                issuer_wallet
             )
-            
-            # Submit and wait for transaction
-            response = submit_and_wait(mint_tx, self.client, issuer_wallet)
+            self._record_submission(response, issuer_wallet.classic_address)
             
             if response.is_successful():
                 # Extract NFT token ID from metadata
@@ -177,16 +257,21 @@ class XRPLClient:
                 logger.info(f"  Transaction Hash: {tx_hash}")
                 logger.info(f"  Issuer: {issuer_wallet.classic_address}")
                 
-                # If recipient is different from issuer, transfer the NFT
+                # If recipient is different from issuer, offer the NFT to the
+                # recipient for free; the transfer completes when they accept it
+                offer_id = None
                 if recipient_address != issuer_wallet.classic_address and nft_token_id:
                     logger.info(f"Transferring NFT to recipient: {recipient_address}")
-                    # Note: NFT transfer on XRPL requires creating an offer and accepting it
-                    # This is a simplified version - full implementation would need offer creation
+                    try:
+                        offer_id = self.create_transfer_offer(issuer_wallet, nft_token_id, recipient_address)
+                    except Exception as e:
+                        logger.error(f"Failed to create transfer offer for {nft_token_id}: {str(e)}")
                 
                 return {
                     'success': True,
                     'nft_token_id': nft_token_id,
                     'transaction_hash': tx_hash,
+                    'offer_id': offer_id,
                     'issuer': issuer_wallet.classic_address,
                     'recipient': recipient_address,
                     'uri': nft_uri,
@@ -201,6 +286,371 @@ class XRPLClient:
             logger.error(f"Failed to mint NFT: {str(e)}")
             raise Exception(f"NFT minting failed: {str(e)}")
     
+    def mint_nfts_with_tickets(
+        self,
+        issuer_wallet: Wallet,
+        mints: List[Dict],
+        nft_uri: str,
+        transfer_fee: int = 0,
+        flags: int = 8,  # tfTransferable
+        max_workers: int = 10
+    ) -> List[Dict]:
+        """
+        Mint NFTs for many recipients and offer each one to its recipient,
+        using two reserved Tickets per mint. All mints are signed in bulk and
+        submitted in parallel, then the transfer offers of the minted NFTs.
+        
+        Args:
+            issuer_wallet: Issuer wallet owning the tickets
+            mints: Dicts with recipient, mint_ticket and offer_ticket
+            nft_uri: URI pointing to NFT metadata
+            transfer_fee: Transfer fee in basis points
+            flags: NFT flags
+            max_workers: Parallel submissions
+            
+        Returns:
+            List[Dict]: Per mint, in order: nft_token_id, transaction_hash and
+                        offer_id (None with offer_error if only the offer
+                        failed), or error if the mint failed; always with
+                        mint_ticket_used and offer_ticket_used telling whether
+                        each ticket was consumed on the ledger (tec* failures
+                        consume it, other failures and skipped offers do not)
+        """
+        issuer = issuer_wallet.classic_address
+        uri = xrpl.utils.str_to_hex(nft_uri)
+        
+        mint_responses = self.submit_many(
+            [
+                NFTokenMint(
+                    account=issuer,
+                    uri=uri,
+                    flags=flags,
+                    transfer_fee=transfer_fee,
+                    nftoken_taxon=0,
+                    sequence=0,
+                    ticket_sequence=mint['mint_ticket']
+                )
+                for mint in mints
+            ],
+            issuer_wallet,
+            max_workers
+        )
+        
+        results = []
+        offers = []
+        for index, (mint, response) in enumerate(zip(mints, mint_responses)):
+            if isinstance(response, Exception) or not response.is_successful():
+                error = str(response) if isinstance(response, Exception) else response.result.get('error', 'Unknown error')
+                results.append({
+                    'error': error,
+                    'mint_ticket_used': bool(_SEQUENCE_CONSUMED.search(error)),
+                    'offer_ticket_used': False,
+                })
+                continue
+            
+            nft_token_id = (response.result.get('meta') or {}).get('nftoken_id')
+            results.append({
+                'nft_token_id': nft_token_id,
+                'transaction_hash': response.result['hash'],
+                'offer_id': None,
+                'mint_ticket_used': True,
+                'offer_ticket_used': False,
+            })
+            if mint['recipient'] != issuer and nft_token_id:
+                offers.append((index, self._build_transfer_offer(
+                    issuer, nft_token_id, mint['recipient'], 0, mint['offer_ticket']
+                )))
+        
+        offer_responses = self.submit_many([offer for _, offer in offers], issuer_wallet, max_workers)
+        for (index, _), response in zip(offers, offer_responses):
+            if isinstance(response, Exception) or not response.is_successful():
+                error = str(response) if isinstance(response, Exception) else response.result.get('error', 'Unknown error')
+                logger.error(f"Failed to create transfer offer for {results[index]['nft_token_id']}: {error}")
+                results[index]['offer_error'] = error
+                results[index]['offer_ticket_used'] = bool(_SEQUENCE_CONSUMED.search(error))
+            else:
+                results[index]['offer_id'] = (response.result.get('meta') or {}).get('offer_id')
+                results[index]['offer_ticket_used'] = True
+        
+        return results
+    
+    def create_transfer_offer(
+        self,
+        issuer_wallet: Wallet,
+        nft_token_id: str,
+        destination: str
+    ) -> Optional[str]:
+        """
+        Create a free sell offer of an NFT that only the destination can accept.
+        
+        Args:
+            issuer_wallet: Current owner of the NFT
+            nft_token_id: NFTokenID to transfer
+            destination: Address allowed to accept the offer
+            
+        Returns:
+            Optional[str]: Ledger index of the created NFTokenOffer
+            
+        Raises:
+            Exception: If the offer transaction fails
+        """
+        response, _ = self._submit_with_sequence(
+            lambda sequence: self._build_transfer_offer(
+                issuer_wallet.classic_address, nft_token_id, destination, sequence
+            ),
+            issuer_wallet
+        )
+        self._record_submission(response, issuer_wallet.classic_address)
+        
+        if not response.is_successful():
+            raise Exception(f"Offer creation failed: {response.result.get('error', 'Unknown error')}")
+        
+        offer_id = (response.result.get('meta') or {}).get('offer_id')
+        logger.info(f"Created transfer offer {offer_id} of {nft_token_id} to {destination}")
+        return offer_id
+    
+    @staticmethod
+    def _build_transfer_offer(
+        issuer_address: str,
+        nft_token_id: str,
+        destination: str,
+        sequence: int,
+        ticket_sequence: Optional[int] = None
+    ) -> NFTokenCreateOffer:
+        """
+        Build a free NFT sell offer restricted to the destination.
+        
+        Args:
+            issuer_address: Current owner of the NFT
+            nft_token_id: NFTokenID to transfer
+            destination: Address allowed to accept the offer
+            sequence: Sequence (0 when a ticket is used)
+            ticket_sequence: Ticket to use instead of a sequence
+            
+        Returns:
+            NFTokenCreateOffer: Unsigned offer transaction
+        """
+        return NFTokenCreateOffer(
+            account=issuer_address,
+            nftoken_id=nft_token_id,
+            amount='0',
+            destination=destination,
+            flags=NFTokenCreateOfferFlag.TF_SELL_NFTOKEN,
+            sequence=sequence,
+            ticket_sequence=ticket_sequence
+        )
+    
+    def _submit_with_sequence(
+        self,
+        build_tx: Callable[[int], Transaction],
+        wallet: Wallet,
+        sequence_count: int = 1
+    ) -> Tuple[Response, int]:
+        """
+        Submit a transaction using a sequence from the account's process-wide
+        allocator and wait for validation, so concurrent submissions from one
+        account do not race for the same sequence.
+        
+        If the sequences were not all consumed (anything but a single-sequence
+        tec* failure) the allocator is resynced; conflicts (tefPAST_SEQ from
+        another process, terPRE_SEQ behind a gap that never filled) are
+        retried with a fresh sequence.
+        
+        Args:
+            build_tx: Builds the transaction for a given Sequence
+            wallet: Signing wallet (the transaction's Account)
+            sequence_count: Sequences the transaction consumes (N + 1 for TicketCreate)
+            
+        Returns:
+            Tuple[Response, int]: (validated response, sequence used)
+        """
+        allocator = get_sequence_allocator(self.network, wallet.classic_address, self.client)
+        
+        for attempt in range(1, self.SEQUENCE_RETRY_ATTEMPTS + 1):
+            sequence = allocator.reserve(sequence_count)
+            try:
+                response = self._submit(build_tx(sequence), wallet)
+                return response, sequence
+            except Exception as e:
+                # A failed TicketCreate (tec*) consumes its own sequence but
+                # creates no tickets, so the rest of its block is a gap
+                if sequence_count == 1 and _SEQUENCE_CONSUMED.search(str(e)):
+                    raise
+                allocator.resync()
+                if attempt == self.SEQUENCE_RETRY_ATTEMPTS or not _SEQUENCE_CONFLICT.search(str(e)):
+                    raise
+                logger.warning(
+                    f"Sequence {sequence} of {wallet.classic_address} conflicted, "
+                    f"retrying ({attempt}/{self.SEQUENCE_RETRY_ATTEMPTS}): {str(e)}"
+                )
+    
+    def _submit(self, transaction: Transaction, wallet: Wallet) -> Response:
+        """
+        Fill, sign and submit a transaction whose Sequence or TicketSequence
+        is already set, then wait for validation.
+        
+        Args:
+            transaction: Unsigned transaction with sequence/ticket_sequence
+            wallet: Signing wallet
+            
+        Returns:
+            Response: Validated transaction response
+        """
+        signed_tx = sign(Transaction.from_dict(self._fill(transaction)), wallet)
+        return self._submit_signed(signed_tx)
+    
+    def submit_many(
+        self,
+        transactions: List[Transaction],
+        wallet: Wallet,
+        max_workers: int = 10
+    ) -> List[Union[Response, Exception]]:
+        """
+        Fill and sign transactions in bulk on the signing pool, then submit
+        them in parallel and wait for validation. Each transaction must use
+        its own Ticket (or a pre-allocated Sequence).
+        
+        Args:
+            transactions: Unsigned transactions of one account
+            wallet: Signing wallet
+            max_workers: Parallel submissions
+            
+        Returns:
+            List[Union[Response, Exception]]: Per transaction, in order, the
+                validated response or the exception its submission raised
+        """
+        if not transactions:
+            return []
+        
+        key_handle = self.signing_pool.register_key(wallet.seed)
+        blobs = self.signing_pool.sign_many(key_handle, [self._fill(transaction) for transaction in transactions])
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._submit_signed, blob) for blob in blobs]
+        
+        results = []
+        for future in futures:
+            try:
+                response = future.result()
+                self._record_submission(response, wallet.classic_address)
+                results.append(response)
+            except Exception as e:
+                results.append(e)
+        return results
+    
+    def _fill(self, transaction: Transaction) -> Dict:
+        """
+        Fill Fee and LastLedgerSequence from the cached fee oracle instead of
+        autofill's fee/ledger requests. Our networks (IDs below 1025) need no
+        NetworkID, so only the submission itself goes over the network.
+        
+        Args:
+            transaction: Unsigned transaction with sequence/ticket_sequence
+            
+        Returns:
+            Dict: Transaction dict ready for signing
+        """
+        tx_json = transaction.to_dict()
+        tx_json.setdefault('fee', str(self.fee_oracle.fee_drops()))
+        tx_json.setdefault('last_ledger_sequence', self.fee_oracle.last_ledger_sequence())
+        return tx_json
+    
+    def _submit_signed(self, signed_tx: Union[Transaction, str]) -> Response:
+        """
+        Submit a signed transaction (or blob) and wait for validation.
+        
+        Args:
+            signed_tx: Signed transaction or transaction blob
+            
+        Returns:
+            Response: Validated transaction response
+        """
+        try:
+            return submit_and_wait(signed_tx, self.client)
+        except Exception as e:
+            if 'telINSUF_FEE_P' in str(e):
+                self.fee_oracle.invalidate()
+            raise
+    
+    def create_tickets(self, wallet: Wallet, count: int) -> List[int]:
+        """
+        Create Tickets so that many transactions of one account can be
+        submitted in parallel without sequence ordering.
+        
+        Args:
+            wallet: Account wallet
+            count: Number of tickets to create
+            
+        Returns:
+            List[int]: TicketSequence numbers of the new tickets
+            
+        Raises:
+            Exception: If the TicketCreate transaction fails
+        """
+        response, sequence = self._submit_with_sequence(
+            lambda sequence: TicketCreate(
+                account=wallet.classic_address,
+                ticket_count=count,
+                sequence=sequence
+            ),
+            wallet,
+            sequence_count=count + 1
+        )
+        self._record_submission(response, wallet.classic_address)
+        
+        if not response.is_successful():
+            raise Exception(f"Ticket creation failed: {response.result.get('error', 'Unknown error')}")
+        
+        # A TicketCreate with Sequence S creates tickets S+1 .. S+count
+        return list(range(sequence + 1, sequence + count + 1))
+    
+    def reserve_tickets(self, wallet: Wallet, count: int) -> List[int]:
+        """
+        Reserve Tickets for parallel submissions, reusing pooled unused
+        tickets before creating new ones.
+        
+        Args:
+            wallet: Account wallet
+            count: Number of tickets needed
+            
+        Returns:
+            List[int]: TicketSequence numbers
+        """
+        allocator = get_sequence_allocator(self.network, wallet.classic_address, self.client)
+        tickets = allocator.take_tickets(count)
+        if len(tickets) < count:
+            try:
+                tickets += self.create_tickets(wallet, count - len(tickets))
+            except Exception:
+                allocator.release_tickets(tickets)
+                raise
+        return tickets
+    
+    def release_tickets(self, wallet: Wallet, tickets: List[int]) -> None:
+        """
+        Return reserved Tickets that no validated transaction used to the
+        account's pool.
+        
+        Args:
+            wallet: Account wallet
+            tickets: Unused TicketSequence numbers
+        """
+        if tickets:
+            get_sequence_allocator(self.network, wallet.classic_address, self.client).release_tickets(tickets)
+    
+    def _record_submission(self, response, *addresses: str) -> None:
+        """
+        Drop cached balances of accounts touched by a submitted transaction and
+        note the ledger it was validated in.
+        
+        Args:
+            response: Response of the submission
+            *addresses: Accounts whose balance the transaction may have changed
+        """
+        self.balance_cache.invalidate(*addresses)
+        if response is not None and isinstance(response.result, dict):
+            self.balance_cache.observe_ledger(response.result.get('ledger_index'))
+    
     def get_account_nfts(self, address: str) -> list:
         """
         Get all NFTs owned by a wallet address.
@@ -253,10 +703,13 @@ class XRPLClient:
             logger.error(f"Error verifying NFT ownership: {str(e)}")
             return False
     
-    def get_sponsor_balance(self) -> int:
+    def get_sponsor_balance(self, max_age: float = BALANCE_MAX_AGE_EXACT) -> int:
         """
         Get the current balance of the sponsor wallet.
         
+        Args:
+            max_age: Seconds of staleness the caller accepts
+            
         Returns:
             int: Balance in drops (1 XRP = 1,000,000 drops)
         """
@@ -265,7 +718,7 @@ class XRPLClient:
             return 0
         
         try:
-            balance = self.get_wallet_balance(self.sponsor_wallet.classic_address)
+            balance = self.get_wallet_balance(self.sponsor_wallet.classic_address, max_age)
             logger.info(f"Sponsor wallet balance: {balance} drops ({balance / 1_000_000} XRP)")
             return balance
         except Exception as e:
@@ -301,24 +754,23 @@ class XRPLClient:
             
             logger.info(f"Creating escrow: {amount_drops} drops for {finish_after - int(time.time())} seconds")
             
-            # Escrow作成トランザクション
-            escrow_tx = EscrowCreate(
-                account=sender_wallet.classic_address,
-                destination=recipient_address,
-                amount=str(amount_drops),
-                finish_after=finish_after,
-                cancel_after=cancel_after if cancel_after else finish_after + (365 * 24 * 60 * 60)  # 1年後
+            # Escrow作成トランザクション（Sequenceはアカウント単位のアロケータから取得）
+            response, escrow_sequence = self._submit_with_sequence(
+                lambda sequence: EscrowCreate(
+                    account=sender_wallet.classic_address,
+                    destination=recipient_address,
+                    amount=str(amount_drops),
+                    finish_after=finish_after,
+                    cancel_after=cancel_after if cancel_after else finish_after + (365 * 24 * 60 * 60),  # 1年後
+                    sequence=sequence
+                ),
+                sender_wallet
             )
-            
-            # トランザクション送信
-            response = submit_and_wait(escrow_tx, self.client, sender_wallet)
+            self._record_submission(response, sender_wallet.classic_address)
             
             if response.is_successful():
                 tx_hash = response.result['hash']
                 
-                # Escrow Sequence番号を取得
-                escrow_sequence = response.result.get('Sequence', 0)
-                
                 logger.info(f"✓ Escrow created successfully")
                 logger.info(f"  Transaction Hash: {tx_hash}")
                 logger.info(f"  Escrow Sequence: {escrow_sequence}")
@@ -369,14 +821,16 @@ class XRPLClient:
             logger.info(f"Finishing escrow: sequence {escrow_sequence}")
             
             # Escrow完了トランザクション
-            finish_tx = EscrowFinish(
-                account=finisher_wallet.classic_address,
-                owner=owner_address,
-                offer_sequence=escrow_sequence
+            response, _ = self._submit_with_sequence(
+                lambda sequence: EscrowFinish(
+                    account=finisher_wallet.classic_address,
+                    owner=owner_address,
+                    offer_sequence=escrow_sequence,
+                    sequence=sequence
+                ),
+                finisher_wallet
             )
-            
-            # トランザクション送信
-            response = submit_and_wait(finish_tx, self.client, finisher_wallet)
+            self._record_submission(response, finisher_wallet.classic_address, owner_address)
             
             if response.is_successful():
                 tx_hash = response.result['hash']
@@ -398,6 +852,55 @@ class XRPLClient:
             logger.error(f"Failed to finish escrow: {str(e)}")
             raise Exception(f"Escrow finish failed: {str(e)}")
     
+    def finish_escrows_with_tickets(
+        self,
+        finisher_wallet: Wallet,
+        escrows: List[Dict],
+        max_workers: int = 10
+    ) -> List[Dict]:
+        """
+        複数のEscrowを完了（Ticketを使って一括署名・並列送信）
+        
+        Args:
+            finisher_wallet: 完了実行者のウォレット（Ticketの所有者）
+            escrows: owner, offer_sequence, ticket を持つDictのリスト
+            max_workers: 並列送信数
+            
+        Returns:
+            List[Dict]: 入力順の結果（transaction_hash、失敗時は error と、
+                        Ticketがレジャー上で消費されたか（tec*）を示す ticket_used）
+        """
+        finisher = finisher_wallet.classic_address
+        responses = self.submit_many(
+            [
+                EscrowFinish(
+                    account=finisher,
+                    owner=escrow['owner'],
+                    offer_sequence=escrow['offer_sequence'],
+                    sequence=0,
+                    ticket_sequence=escrow['ticket']
+                )
+                for escrow in escrows
+            ],
+            finisher_wallet,
+            max_workers
+        )
+        
+        results = []
+        for escrow, response in zip(escrows, responses):
+            if isinstance(response, Exception) or not response.is_successful():
+                error = str(response) if isinstance(response, Exception) else response.result.get('error', 'Unknown error')
+                # tem/tef/ter や通信エラーではレジャーに取り込まれず、Ticketは未使用のまま残る
+                results.append({'error': error, 'ticket_used': bool(_SEQUENCE_CONSUMED.search(error))})
+                continue
+            # XRPが戻るのはオーナーの残高
+            self._record_submission(response, escrow['owner'])
+            results.append({'transaction_hash': response.result['hash']})
+        
+        finished = sum(1 for result in results if 'error' not in result)
+        logger.info(f"Finished {finished}/{len(escrows)} escrows")
+        return results
+    
     def send_xrp(
         self,
         sender_wallet_seed: str,
@@ -427,21 +930,21 @@ class XRPLClient:
             
             logger.info(f"Sending {amount_xrp} XRP from {sender_wallet.classic_address} to {recipient_address}")
             
-            # Payment トランザクション作成
-            payment_tx = Payment(
-                account=sender_wallet.classic_address,
-                destination=recipient_address,
-                amount=str(amount_drops)
-            )
-            
-            # メモを追加
-            if memo:
-                payment_tx.memos = [Memo(
-                    memo_data=str_to_hex(memo)
-                )]
+            # メモ（トランザクションモデルは不変のため作成時に指定）
+            memos = [Memo(memo_data=str_to_hex(memo))] if memo else None
             
-            # トランザクション送信
-            response = submit_and_wait(payment_tx, self.client, sender_wallet)
+            # Payment トランザクション作成・送信
+            response, _ = self._submit_with_sequence(
+                lambda sequence: Payment(
+                    account=sender_wallet.classic_address,
+                    destination=recipient_address,
+                    amount=str(amount_drops),
+                    memos=memos,
+                    sequence=sequence
+                ),
+                sender_wallet
+            )
+            self._record_submission(response, sender_wallet.classic_address, recipient_address)
             
             if response.is_successful():
                 tx_hash = response.result['hash']
@@ -491,8 +994,7 @@ class XRPLClient:
         """
         try:
             from xrpl.wallet import Wallet
-            from xrpl.models.transactions import Payment, TicketCreate, Memo
-            from xrpl.transaction import submit_and_wait, autofill_and_sign, send_reliable_submission
+            from xrpl.models.transactions import Payment, Memo
             from xrpl.utils import str_to_hex
             
             sender_wallet = Wallet.from_seed(sender_wallet_seed)
@@ -501,10 +1003,10 @@ class XRPLClient:
             logger.info(f"Starting XRPL Batch Transaction to {num_recipients} recipients")
             logger.info(f"Sender: {sender_wallet.classic_address}")
             
-            # 送信前に残高確認
-            sender_balance = self.get_wallet_balance(sender_wallet.classic_address)
+            # 送信前に残高確認（最新の検証済みレジャーの残高のみ使用）
+            sender_balance = self.get_wallet_balance(sender_wallet.classic_address, self.BALANCE_MAX_AGE_EXACT)
             total_amount_drops = sum([int(r['amount_xrp'] * 1_000_000) for r in recipients])
-            estimated_fees = (num_recipients + 1) * 12  # Ticket作成 + Payment × N
+            estimated_fees = (num_recipients + 1) * self.fee_oracle.fee_drops()  # Ticket作成 + Payment × N
             
             if sender_balance < (total_amount_drops + estimated_fees):
                 raise Exception(
@@ -515,20 +1017,8 @@ class XRPLClient:
             # Step 1: Ticketを作成（受取人数分）
             logger.info(f"Step 1: Creating {num_recipients} tickets...")
             
-            ticket_create_tx = TicketCreate(
-                account=sender_wallet.classic_address,
-                ticket_count=num_recipients
-            )
-            
-            ticket_response = submit_and_wait(ticket_create_tx, self.client, sender_wallet)
-            
-            if not ticket_response.is_successful():
-                error_msg = ticket_response.result.get('error', 'Unknown error')
-                raise Exception(f"Ticket creation failed: {error_msg}")
-            
-            # Ticketシーケンス番号を取得
-            ticket_sequence_start = ticket_response.result.get('Sequence', 0)
-            ticket_sequences = list(range(ticket_sequence_start, ticket_sequence_start + num_recipients))
+            ticket_sequences = self.create_tickets(sender_wallet, num_recipients)
+            ticket_sequence_start = ticket_sequences[0]
             
             logger.info(f"✓ Created tickets: {ticket_sequences[0]} to {ticket_sequences[-1]}")
             
@@ -544,31 +1034,31 @@ class XRPLClient:
                 'ticket_sequence_start': ticket_sequence_start
             }
             
-            # 各受取人に対してTicketを使ったPaymentを送信
-            for idx, (recipient, ticket_seq) in enumerate(zip(recipients, ticket_sequences), 1):
+            memos = [Memo(memo_data=str_to_hex(memo))] if memo else None
+            
+            # 各受取人に対してTicketを使ったPaymentを作成（一括署名・並列送信）
+            payments = [
+                Payment(
+                    account=sender_wallet.classic_address,
+                    destination=recipient['address'],
+                    amount=str(int(recipient['amount_xrp'] * 1_000_000)),
+                    ticket_sequence=ticket_seq,
+                    sequence=0,  # Ticket使用時はSequenceを0に設定
+                    memos=memos
+                )
+                for recipient, ticket_seq in zip(recipients, ticket_sequences)
+            ]
+            responses = self.submit_many(payments, sender_wallet)
+            
+            for idx, (recipient, ticket_seq, tx_response) in enumerate(
+                    zip(recipients, ticket_sequences, responses), 1):
                 try:
                     address = recipient['address']
                     amount_xrp = recipient['amount_xrp']
-                    amount_drops = int(amount_xrp * 1_000_000)
-                    
-                    logger.info(f"[{idx}/{num_recipients}] Sending {amount_xrp} XRP to {address} (Ticket: {ticket_seq})")
-                    
-                    # TicketSequenceを使ったPayment作成
-                    payment_tx = Payment(
-                        account=sender_wallet.classic_address,
-                        destination=address,
-                        amount=str(amount_drops),
-                        ticket_sequence=ticket_seq,
-                        sequence=0  # Ticket使用時はSequenceを0に設定
-                    )
-                    
-                    # メモを追加
-                    if memo:
-                        payment_tx.memos = [Memo(memo_data=str_to_hex(memo))]
                     
-                    # トランザクションに署名して送信
-                    signed_tx = autofill_and_sign(payment_tx, self.client, sender_wallet)
-                    tx_response = send_reliable_submission(signed_tx, self.client)
+                    if isinstance(tx_response, Exception):
+                        raise tx_response
+                    self._record_submission(tx_response, address)
                     
                     if tx_response.is_successful():
                         tx_hash = tx_response.result['hash']
@@ -582,7 +1072,7 @@ class XRPLClient:
                             'status': 'success'
                         })
                         
-                        logger.info(f"✓ [{idx}/{num_recipients}] Success: {tx_hash}")
+                        logger.info(f"✓ [{idx}/{num_recipients}] Sent {amount_xrp} XRP to {address} (Ticket: {ticket_seq}): {tx_hash}")
                     else:
                         error_msg = tx_response.result.get('error', 'Unknown error')
                         raise Exception(error_msg)
@@ -635,7 +1125,7 @@ class XRPLClient:
                 }
             
             sponsor_address = self.sponsor_wallet.classic_address
-            balance = self.get_sponsor_balance()
+            balance = self.get_sponsor_balance(self.BALANCE_MAX_AGE_DISPLAY)
             
             # Define balance thresholds (in drops)
             CRITICAL_THRESHOLD = 10_000_000  # 10 XRP
@@ -0,0 +1,146 @@
+"""
+Network fee oracle shared by all XRPLClient instances of a process.
+Caches the result of one ``fee`` request for a short TTL: the load-scaled
+open-ledger fee and the current ledger index. Together with a locally
+allocated Sequence (or Ticket) this fills everything autofill would ask the
+server for, so transactions are signed locally and only the submission
+itself goes over the network.
+"""
+import logging
+import threading
+import time
+from typing import Dict
+from xrpl.clients import JsonRpcClient
+from xrpl.models.requests import Fee
+
+logger = logging.getLogger(__name__)
+
+
+class FeeOracle:
+    """
+    Short-lived cache of the network fee and ledger position.
+    """
+    
+    def __init__(self, client: JsonRpcClient, ttl: float = 2.0, max_fee_drops: int = 100_000):
+        """
+        Initialize FeeOracle.
+        
+        Args:
+            client: XRPL JSON-RPC client used for ``fee`` requests
+            ttl: Seconds a fee reading is reused (about half a ledger close)
+            max_fee_drops: Ceiling of the fee we pay per transaction; above it
+                           transactions wait in the server queue instead
+        """
+        self.client = client
+        self.ttl = ttl
+        self.max_fee_drops = max_fee_drops
+        self._reading: Dict = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+    
+    def fee_drops(self) -> int:
+        """
+        Fee to pay for a reference transaction right now.
+        
+        Returns:
+            int: Open-ledger fee in drops, never below the base fee and
+                 capped at max_fee_drops
+        """
+        return self._current()['fee_drops']
+    
+    def load_factor(self) -> float:
+        """
+        Open-ledger load relative to the reference level (1.0 = unloaded).
+        
+        Returns:
+            float: Current load factor
+        """
+        return self._current()['load_factor']
+    
+    def last_ledger_sequence(self, offset: int = 20) -> int:
+        """
+        LastLedgerSequence for a transaction signed now.
+        
+        Args:
+            offset: Ledgers the transaction may take to validate
+        
+        Returns:
+            int: Current ledger index plus offset
+        """
+        return self._current()['ledger_current_index'] + offset
+    
+    def invalidate(self) -> None:
+        """Force the next call to read the fee again (e.g. after telINSUF_FEE_P)."""
+        with self._lock:
+            self._fetched_at = 0.0
+    
+    def _current(self) -> Dict:
+        """
+        Get the cached reading, refreshing it when older than the TTL.
+        
+        Returns:
+            Dict: fee_drops, load_factor and ledger_current_index
+        
+        Raises:
+            Exception: If the fee request fails
+        """
+        with self._lock:
+            if time.monotonic() - self._fetched_at >= self.ttl:
+                self._reading = self._fetch()
+                self._fetched_at = time.monotonic()
+            return self._reading
+    
+    def _fetch(self) -> Dict:
+        """
+        Read the fee and load levels from the server.
+        
+        Returns:
+            Dict: fee_drops, load_factor and ledger_current_index
+        
+        Raises:
+            Exception: If the fee request fails
+        """
+        response = self.client.request(Fee())
+        if not response.is_successful():
+            raise Exception(f"fee request failed: {response.result.get('error', response.result)}")
+        
+        result = response.result
+        drops = result['drops']
+        levels = result.get('levels') or {}
+        
+        fee = max(int(drops['base_fee']), int(drops['open_ledger_fee']))
+        reference_level = int(levels.get('reference_level') or 0)
+        load_factor = (
+            int(levels['open_ledger_level']) / reference_level
+            if reference_level and levels.get('open_ledger_level') else 1.0
+        )
+        
+        if fee > self.max_fee_drops:
+            logger.warning(f"XRPL open ledger fee {fee} drops exceeds cap, paying {self.max_fee_drops}")
+        
+        return {
+            'fee_drops': min(fee, self.max_fee_drops),
+            'load_factor': load_factor,
+            'ledger_current_index': int(result['ledger_current_index']),
+        }
+
+
+_oracles: Dict[str, FeeOracle] = {}
+_oracles_lock = threading.Lock()
+
+
+def get_fee_oracle(network: str, client: JsonRpcClient) -> FeeOracle:
+    """
+    Get the process-wide fee oracle of a network.
+    
+    Args:
+        network: XRPL network name
+        client: Client used if the oracle has to be created
+    
+    Returns:
+        FeeOracle: Oracle shared by all clients of the network
+    """
+    with _oracles_lock:
+        if network not in _oracles:
+            _oracles[network] = FeeOracle(client)
+        return _oracles[network]
@@ -0,0 +1,360 @@
+"""
+Multi-endpoint JSON-RPC transport shared by all XRPLClient instances of a process.
+A drop-in JsonRpcClient that spreads requests over several rippled endpoints
+instead of inheriting the tail latency of one public server:
+
+- Endpoints are tried in order of their latency EWMA.
+- Reads are hedged: if the fastest endpoint has not answered within its p95
+  latency, the same request goes to the next endpoint and the first answer wins.
+- Endpoints that fail repeatedly are circuit-broken for a cooldown and then
+  get a single trial request before they are used again.
+
+Submissions are not hedged (a duplicate costs nothing on the ledger but adds
+load for no gain); they only fail over to the next endpoint on a transport
+error, which is safe because resubmitting the same signed blob is idempotent.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from json import JSONDecodeError
+from typing import Deque, Dict, List, Optional, Sequence
+from httpx import AsyncClient
+from xrpl.asyncio.clients.client import REQUEST_TIMEOUT
+from xrpl.asyncio.clients.exceptions import XRPLRequestFailureException
+from xrpl.asyncio.clients.utils import json_to_response, request_to_json_rpc
+from xrpl.clients import JsonRpcClient
+from xrpl.models.requests.request import Request
+from xrpl.models.response import Response
+from prometheus_client import Gauge
+from clients.instrumentation import timed_call
+
+logger = logging.getLogger(__name__)
+
+
+# Methods that change ledger state; never hedged
+_WRITE_METHODS = {'submit', 'submit_multisigned'}
+
+# rippled errors that say "this server cannot answer right now", not "bad request"
+_ENDPOINT_ERRORS = {'tooBusy', 'slowDown', 'noNetwork', 'noCurrent', 'noClosed', 'amendmentBlocked'}
+
+# Updated as samples are recorded; with several workers the worst live one is reported
+ENDPOINT_LATENCY_SECONDS = Gauge(
+    'airzone_xrpl_endpoint_latency_seconds',
+    'Latency EWMA and p95 of each XRPL JSON-RPC endpoint (worst worker)',
+    ['url', 'stat'],
+    multiprocess_mode='livemax'
+)
+ENDPOINT_CIRCUIT_OPEN = Gauge(
+    'airzone_xrpl_endpoint_circuit_open',
+    'Whether an XRPL JSON-RPC endpoint is circuit-broken until a request succeeds again (in any worker)',
+    ['url'],
+    multiprocess_mode='livemax'
+)
+
+
+class _Endpoint:
+    """Latency and failure statistics of one endpoint."""
+    
+    def __init__(self, url: str, window: int):
+        self.url = url
+        self.ewma: Optional[float] = None
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probing = False  # a trial request after the cooldown is in flight
+
+
+class HedgedJsonRpcClient(JsonRpcClient):
+    """
+    JsonRpcClient over several endpoints with hedged reads and circuit breaking.
+    """
+    
+    def __init__(
+        self,
+        urls: Sequence[str],
+        ewma_alpha: float = 0.2,
+        hedge_quantile: float = 0.95,
+        initial_hedge_delay: float = 0.5,
+        min_hedge_delay: float = 0.02,
+        min_samples: int = 20,
+        window: int = 200,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0
+    ):
+        """
+        Initialize HedgedJsonRpcClient.
+        
+        Args:
+            urls: JSON-RPC endpoints (the first one is preferred until latencies are known)
+            ewma_alpha: Weight of the newest latency sample in the EWMA
+            hedge_quantile: Latency quantile after which a read is hedged
+            initial_hedge_delay: Hedge delay (seconds) while an endpoint has fewer than min_samples
+            min_hedge_delay: Lower bound of the hedge delay (seconds)
+            min_samples: Samples needed before the quantile is trusted
+            window: Latency samples kept per endpoint
+            failure_threshold: Consecutive failures that open the circuit of an endpoint
+            cooldown: Seconds an open circuit stays open
+        
+        Raises:
+            ValueError: If no URL is given
+        """
+        if not urls:
+            raise ValueError("At least one XRPL RPC endpoint is required")
+        super().__init__(urls[0])
+        self.ewma_alpha = ewma_alpha
+        self.hedge_quantile = hedge_quantile
+        self.initial_hedge_delay = initial_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._endpoints = [_Endpoint(url, window) for url in urls]
+        self._lock = threading.Lock()
+    
+    def endpoint_stats(self) -> List[Dict]:
+        """
+        Snapshot of the per-endpoint statistics.
+        
+        Returns:
+            List[Dict]: url, ewma_ms, p95_ms, consecutive_failures and circuit_open per endpoint
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    'url': endpoint.url,
+                    'ewma_ms': round(endpoint.ewma * 1000, 1) if endpoint.ewma is not None else None,
+                    'p95_ms': round(self._quantile(endpoint) * 1000, 1) if endpoint.samples else None,
+                    'consecutive_failures': endpoint.consecutive_failures,
+                    'circuit_open': endpoint.open_until > now,
+                }
+                for endpoint in self._endpoints
+            ]
+    
+    async def _request_impl(self, request: Request, *, timeout: float = REQUEST_TIMEOUT) -> Response:
+        """Send a request, recording its latency per rippled method."""
+        with timed_call('xrpl', request.method.value):
+            return await self._send(request, timeout=timeout)
+    
+    async def _send(self, request: Request, *, timeout: float = REQUEST_TIMEOUT) -> Response:
+        """
+        Send a request to the best endpoint, hedging reads and failing over on errors.
+        
+        Args:
+            request: rippled request
+            timeout: Per-attempt timeout in seconds
+        
+        Returns:
+            Response: First response received
+        
+        Raises:
+            Exception: Error of the last attempt if every endpoint failed
+        """
+        candidates = self._candidates()
+        hedge = request.method.value not in _WRITE_METHODS
+        attempts: Dict[asyncio.Future, _Endpoint] = {}
+        errors = []
+        
+        async with AsyncClient(timeout=timeout) as http_client:
+            def launch() -> None:
+                endpoint = candidates.pop(0)
+                attempts[asyncio.ensure_future(self._attempt(http_client, endpoint, request))] = endpoint
+            
+            launch()
+            pending = set(attempts)
+            try:
+                while pending:
+                    # Hedge at most one duplicate per request in flight
+                    hedge_delay = (
+                        self._hedge_delay(attempts[next(iter(pending))])
+                        if hedge and candidates and len(pending) == 1 else None
+                    )
+                    done, pending = await asyncio.wait(
+                        pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if not done:
+                        logger.debug(f"Hedging XRPL {request.method.value} to {candidates[0].url}")
+                        launch()
+                        pending = {future for future in attempts if not future.done()}
+                        continue
+                    
+                    for future in done:
+                        if future.exception() is None:
+                            return future.result()
+                        errors.append(future.exception())
+                    
+                    if not pending and candidates:
+                        launch()
+                        pending = {future for future in attempts if not future.done()}
+            finally:
+                for future in pending:
+                    future.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+        
+        raise errors[-1]
+    
+    async def _attempt(self, http_client: AsyncClient, endpoint: _Endpoint, request: Request) -> Response:
+        """
+        Send a request to one endpoint and record its latency or failure.
+        
+        Args:
+            http_client: HTTP client of the current request
+            endpoint: Target endpoint
+            request: rippled request
+        
+        Returns:
+            Response: Parsed response
+        
+        Raises:
+            XRPLRequestFailureException: On a non-JSON reply or an endpoint-level rippled error
+        """
+        started = time.monotonic()
+        try:
+            http_response = await http_client.post(endpoint.url, json=request_to_json_rpc(request))
+            try:
+                response = json_to_response(http_response.json())
+            except JSONDecodeError:
+                raise XRPLRequestFailureException({
+                    'error': http_response.status_code,
+                    'error_message': http_response.text,
+                })
+            if not response.is_successful() and response.result.get('error') in _ENDPOINT_ERRORS:
+                raise XRPLRequestFailureException(response.result)
+        except asyncio.CancelledError:
+            # A hedge loser took at least this long
+            self._record_latency(endpoint, time.monotonic() - started)
+            raise
+        except Exception as e:
+            self._record_failure(endpoint, e)
+            raise
+        
+        self._record_latency(endpoint, time.monotonic() - started, success=True)
+        return response
+    
+    def _candidates(self) -> List[_Endpoint]:
+        """
+        Endpoints to try, fastest first. Endpoints with an open circuit are
+        skipped. Once the cooldown has passed, one request claims the endpoint
+        as its trial and tries it first; other requests keep skipping it until
+        the trial finishes. If no endpoint is usable, all endpoints are tried
+        in the order their circuits close.
+        
+        Returns:
+            List[_Endpoint]: Endpoints in try order
+        """
+        now = time.monotonic()
+        with self._lock:
+            available = []
+            trial = None
+            for endpoint in self._endpoints:
+                if endpoint.open_until > now:
+                    continue
+                if endpoint.consecutive_failures >= self.failure_threshold:
+                    # Half-open: admit a single trial request
+                    if trial is None and not endpoint.probing:
+                        endpoint.probing = True
+                        trial = endpoint
+                    continue
+                available.append(endpoint)
+            if trial is None and not available:
+                return sorted(self._endpoints, key=lambda endpoint: endpoint.open_until)
+            # Endpoints without samples keep their configured order ahead of measured ones
+            available.sort(key=lambda endpoint: endpoint.ewma if endpoint.ewma is not None else 0.0)
+            return [trial] + available if trial is not None else available
+    
+    def _hedge_delay(self, endpoint: _Endpoint) -> float:
+        """
+        Seconds to wait on an endpoint before hedging.
+        
+        Args:
+            endpoint: Endpoint of the attempt in flight
+        
+        Returns:
+            float: Delay in seconds
+        """
+        with self._lock:
+            if len(endpoint.samples) < self.min_samples:
+                return self.initial_hedge_delay
+            return max(self._quantile(endpoint), self.min_hedge_delay)
+    
+    def _quantile(self, endpoint: _Endpoint) -> float:
+        """Latency quantile of an endpoint (caller holds the lock)."""
+        ordered = sorted(endpoint.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.hedge_quantile))]
+    
+    def _record_latency(self, endpoint: _Endpoint, latency: float, success: bool = False) -> None:
+        """
+        Record a latency sample; a success also closes the circuit. Either
+        way a trial request has finished, so the next one may be admitted.
+        
+        Args:
+            endpoint: Endpoint the sample belongs to
+            latency: Seconds until the answer (or until the attempt was cancelled)
+            success: Whether the endpoint answered
+        """
+        with self._lock:
+            endpoint.probing = False
+            endpoint.samples.append(latency)
+            endpoint.ewma = (
+                latency if endpoint.ewma is None
+                else self.ewma_alpha * latency + (1 - self.ewma_alpha) * endpoint.ewma
+            )
+            if success:
+                if endpoint.consecutive_failures >= self.failure_threshold:
+                    logger.info(f"XRPL endpoint {endpoint.url} recovered, closing circuit")
+                endpoint.consecutive_failures = 0
+                endpoint.open_until = 0.0
+            ewma, p95 = endpoint.ewma, self._quantile(endpoint)
+        
+        ENDPOINT_LATENCY_SECONDS.labels(endpoint.url, 'ewma').set(ewma)
+        ENDPOINT_LATENCY_SECONDS.labels(endpoint.url, 'p95').set(p95)
+        if success:
+            ENDPOINT_CIRCUIT_OPEN.labels(endpoint.url).set(0)
+    
+    def _record_failure(self, endpoint: _Endpoint, error: Exception) -> None:
+        """
+        Record a failed attempt, opening the circuit after repeated failures.
+        A failed trial request after the cooldown reopens it immediately.
+        
+        Args:
+            endpoint: Endpoint that failed
+            error: Failure
+        """
+        with self._lock:
+            endpoint.probing = False
+            endpoint.consecutive_failures += 1
+            opened = endpoint.consecutive_failures >= self.failure_threshold
+            if opened:
+                endpoint.open_until = time.monotonic() + self.cooldown
+                logger.warning(
+                    f"XRPL endpoint {endpoint.url} failed {endpoint.consecutive_failures} times, "
+                    f"opening circuit for {self.cooldown}s: {str(error)}"
+                )
+
+        if opened:
+            ENDPOINT_CIRCUIT_OPEN.labels(endpoint.url).set(1)
+
+
+_clients: Dict[tuple, HedgedJsonRpcClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_rpc_client(network: str, urls: Sequence[str]) -> HedgedJsonRpcClient:
+    """
+    Get the process-wide RPC transport of a network and endpoint list.
+    
+    Args:
+        network: XRPL network name
+        urls: JSON-RPC endpoints
+    
+    Returns:
+        HedgedJsonRpcClient: Transport shared by all clients with the same endpoints
+    """
+    key = (network, tuple(urls))
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = HedgedJsonRpcClient(list(urls))
+        return _clients[key]
@@ -0,0 +1,160 @@
+"""
+Account sequence allocator shared by all XRPLClient instances of a process.
+Concurrent submitters from one account (e.g. the sponsor wallet minting NFTs
+from several task threads) get distinct Sequence numbers from a local counter
+instead of each asking the ledger and racing for the same number. The counter
+is seeded from the open ledger once and re-read only after a submission that
+may have left a gap (the transaction never consumed its sequence) or that hit
+a sequence already used by another process.
+
+The allocator also pools Tickets of the account that were created but never
+used (e.g. the transfer-offer ticket of a mint that failed), so they are
+handed out before new ones are created.
+"""
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from xrpl.clients import JsonRpcClient
+from xrpl.models.requests import AccountInfo
+
+logger = logging.getLogger(__name__)
+
+
+class SequenceAllocator:
+    """
+    Hands out Sequence numbers of one XRPL account atomically.
+    """
+    
+    def __init__(self, client: JsonRpcClient, address: str):
+        """
+        Initialize SequenceAllocator.
+        
+        Args:
+            client: XRPL JSON-RPC client used to read the account sequence
+            address: XRPL account the sequences belong to
+        """
+        self.client = client
+        self.address = address
+        self._next_sequence: Optional[int] = None
+        self._tickets: List[int] = []
+        self._lock = threading.Lock()
+    
+    def next_sequence(self) -> int:
+        """
+        Allocate the next Sequence number of the account.
+        
+        Returns:
+            int: Sequence not handed out to any other submitter of this process
+        """
+        return self.reserve(1)
+    
+    def reserve(self, count: int) -> int:
+        """
+        Allocate a contiguous block of Sequence numbers.
+        A TicketCreate with ticket_count N needs a block of N + 1: its own
+        sequence plus the N ticket sequences it creates.
+        
+        Args:
+            count: Number of sequences to allocate
+        
+        Returns:
+            int: First sequence of the block
+        
+        Raises:
+            ValueError: If count is not positive
+            Exception: If the account sequence cannot be read from the ledger
+        """
+        if count < 1:
+            raise ValueError("count must be positive")
+        
+        with self._lock:
+            if self._next_sequence is None:
+                self._next_sequence = self._fetch_next_sequence()
+            first = self._next_sequence
+            self._next_sequence += count
+            return first
+    
+    def resync(self) -> None:
+        """
+        Forget the local counter; the next allocation re-reads the ledger.
+        Called after a submission that did not consume its sequence, so the
+        gap it left is handed out again instead of stalling later sequences.
+        """
+        with self._lock:
+            if self._next_sequence is not None:
+                logger.info(f"Resyncing XRPL sequence of {self.address} (local next: {self._next_sequence})")
+            self._next_sequence = None
+    
+    def take_tickets(self, count: int) -> List[int]:
+        """
+        Take up to count pooled Tickets.
+        
+        Args:
+            count: Number of tickets wanted
+        
+        Returns:
+            List[int]: TicketSequence numbers (fewer than count if the pool runs short)
+        """
+        with self._lock:
+            taken, self._tickets = self._tickets[:count], self._tickets[count:]
+            return taken
+    
+    def release_tickets(self, tickets: Iterable[int]) -> None:
+        """
+        Return Tickets that were allocated but never submitted.
+        
+        Args:
+            tickets: TicketSequence numbers still owned by the account
+        """
+        with self._lock:
+            self._tickets = sorted(set(self._tickets).union(tickets))
+    
+    def _fetch_next_sequence(self) -> int:
+        """
+        Read the next usable sequence from the open ledger, after any of the
+        account's transactions waiting in the server's queue.
+        
+        Returns:
+            int: Next usable sequence
+        
+        Raises:
+            Exception: If account_info fails
+        """
+        response = self.client.request(AccountInfo(
+            account=self.address,
+            ledger_index='current',
+            queue=True
+        ))
+        if not response.is_successful():
+            raise Exception(f"account_info failed: {response.result.get('error', response.result)}")
+        
+        sequence = int(response.result['account_data']['Sequence'])
+        queue_data = response.result.get('queue_data') or {}
+        if queue_data.get('highest_sequence') is not None:
+            sequence = max(sequence, int(queue_data['highest_sequence']) + 1)
+        
+        logger.info(f"Synced XRPL sequence of {self.address}: next {sequence}")
+        return sequence
+
+
+_allocators: Dict[Tuple[str, str], SequenceAllocator] = {}
+_allocators_lock = threading.Lock()
+
+
+def get_sequence_allocator(network: str, address: str, client: JsonRpcClient) -> SequenceAllocator:
+    """
+    Get the process-wide sequence allocator of an account.
+    
+    Args:
+        network: XRPL network name
+        address: XRPL account
+        client: Client used if the allocator has to be created
+    
+    Returns:
+        SequenceAllocator: Allocator shared by all clients of the network
+    """
+    key = (network, address)
+    with _allocators_lock:
+        if key not in _allocators:
+            _allocators[key] = SequenceAllocator(client, address)
+        return _allocators[key]
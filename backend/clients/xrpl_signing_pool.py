@@ -0,0 +1,150 @@
+"""
+Process-pool transaction signing for large XRPL batches.
+Signing is CPU-bound and holds the GIL, so batches signed inline stall the
+web/worker thread and use one core. Batches above a threshold are split into
+chunks and signed in worker processes; small ones are signed inline, where a
+process hop would cost more than it saves.
+
+Callers register a seed once and pass the returned key handle afterwards;
+worker processes derive each key once and keep it for later chunks.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from xrpl.models.transactions import Transaction
+from xrpl.transaction import sign
+from xrpl.wallet import Wallet
+
+logger = logging.getLogger(__name__)
+
+
+# Keys derived inside a worker process, by seed
+_worker_wallets: Dict[str, Wallet] = {}
+
+
+def _sign_chunk(seed: str, transactions: List[Dict]) -> List[str]:
+    """
+    Sign a chunk of filled transactions (runs in a worker process).
+    
+    Args:
+        seed: Seed of the signing key
+        transactions: Transaction dicts as produced by Transaction.to_dict()
+    
+    Returns:
+        List[str]: Signed transaction blobs in order
+    """
+    wallet = _worker_wallets.get(seed)
+    if wallet is None:
+        wallet = _worker_wallets[seed] = Wallet.from_seed(seed)
+    return [sign(Transaction.from_dict(transaction), wallet).blob() for transaction in transactions]
+
+
+class XRPLSigningPool:
+    """
+    Signs lists of filled transactions in bulk.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 50, inline_threshold: int = 16):
+        """
+        Initialize XRPLSigningPool. Worker processes start on first use.
+        
+        Args:
+            max_workers: Worker processes (default: number of CPUs)
+            chunk_size: Transactions signed per worker task
+            inline_threshold: Batches smaller than this are signed in the calling thread
+        """
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.inline_threshold = inline_threshold
+        self._seeds: Dict[str, str] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def register_key(self, seed: str) -> str:
+        """
+        Register a signing key.
+        
+        Args:
+            seed: Wallet seed
+        
+        Returns:
+            str: Key handle (the classic address of the key)
+        """
+        handle = Wallet.from_seed(seed).classic_address
+        with self._lock:
+            self._seeds[handle] = seed
+        return handle
+    
+    def sign_many(self, key_handle: str, transactions: List[Dict]) -> List[str]:
+        """
+        Sign filled transactions with a registered key.
+        
+        Args:
+            key_handle: Handle returned by register_key
+            transactions: Transaction dicts with Fee, Sequence/TicketSequence
+                          and LastLedgerSequence already set
+        
+        Returns:
+            List[str]: Signed transaction blobs in the same order
+        
+        Raises:
+            KeyError: If the key handle is unknown
+        """
+        seed = self._seeds[key_handle]
+        if len(transactions) < self.inline_threshold:
+            return _sign_chunk(seed, transactions)
+        
+        chunks = [
+            transactions[start:start + self.chunk_size]
+            for start in range(0, len(transactions), self.chunk_size)
+        ]
+        blobs = []
+        for chunk_blobs in self._get_executor().map(_sign_chunk, [seed] * len(chunks), chunks):
+            blobs.extend(chunk_blobs)
+        
+        logger.info(f"Signed {len(blobs)} transactions for {key_handle} in {len(chunks)} chunks")
+        return blobs
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Get the process pool, starting it on first use.
+        Workers are spawned rather than forked, as forking a threaded web
+        process can copy held locks into the children.
+        
+        Returns:
+            ProcessPoolExecutor: Worker pool
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+
+_pool: Optional[XRPLSigningPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_signing_pool() -> XRPLSigningPool:
+    """
+    Get the process-wide signing pool.
+    
+    Returns:
+        XRPLSigningPool: Pool shared by all XRPLClient instances
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = XRPLSigningPool()
+        return _pool
@@ -56,6 +56,51 @@ class Config:
     # XRPL Blockchain Configuration
     XRPL_NETWORK = os.getenv('XRPL_NETWORK', 'testnet')
     XRPL_SPONSOR_SEED = os.getenv('XRPL_SPONSOR_SEED', '')
+    XRPL_SPONSOR_ADDRESS = os.getenv('XRPL_SPONSOR_ADDRESS', '')
+    XRPL_MERCHANT_ADDRESS = os.getenv('XRPL_MERCHANT_ADDRESS', '')
+    XRPL_WEBSOCKET_URL = os.getenv('XRPL_WEBSOCKET_URL', '')  # empty = public endpoint of XRPL_NETWORK
+    XRP_JPY_RATE = float(os.getenv('XRP_JPY_RATE', 150))  # JPY per XRP used to price XRPL order payments
+    
+    # XRPL payment listener (push-based order payment confirmation)
+    XRPL_LISTENER_BATCH_SIZE = int(os.getenv('XRPL_LISTENER_BATCH_SIZE', 100))
+    XRPL_LISTENER_FLUSH_INTERVAL = float(os.getenv('XRPL_LISTENER_FLUSH_INTERVAL', 1.0))  # seconds
+    
+    # XRPL ledger history indexer
+    XRPL_INDEXER_PAGE_SIZE = int(os.getenv('XRPL_INDEXER_PAGE_SIZE', 200))
+    XRPL_INDEXER_START_LEDGER = int(os.getenv('XRPL_INDEXER_START_LEDGER', 0))  # 0 = earliest available
+    
+    # NFT campaign mints (two tickets per recipient; an account holds at most 250 tickets)
+    NFT_CAMPAIGN_CHUNK_SIZE = int(os.getenv('NFT_CAMPAIGN_CHUNK_SIZE', 100))
+    NFT_CAMPAIGN_MAX_WORKERS = int(os.getenv('NFT_CAMPAIGN_MAX_WORKERS', 10))
+    
+    # Escrow completion sweep (one ticket per escrow, max 200 per page)
+    ESCROW_SWEEP_PAGE_SIZE = int(os.getenv('ESCROW_SWEEP_PAGE_SIZE', 100))
+    ESCROW_SWEEP_MAX_WORKERS = int(os.getenv('ESCROW_SWEEP_MAX_WORKERS', 10))
+    
+    # Activity rollups (DAU/MAU and downloads; rows newer than the lag are left for the next run)
+    ACTIVITY_ROLLUP_BATCH_SIZE = int(os.getenv('ACTIVITY_ROLLUP_BATCH_SIZE', 5000))
+    ACTIVITY_ROLLUP_LAG_SECONDS = int(os.getenv('ACTIVITY_ROLLUP_LAG_SECONDS', 60))
+    
+    # Order Expiry
+    ORDER_PENDING_TTL_MINUTES = int(os.getenv('ORDER_PENDING_TTL_MINUTES', 30))
+    ORDER_REAPER_BATCH_SIZE = int(os.getenv('ORDER_REAPER_BATCH_SIZE', 500))
+    
+    # Referral codes (keyed permutation of a counter; the key must never change once codes are issued)
+    REFERRAL_CODE_KEY = os.getenv('REFERRAL_CODE_KEY', SECRET_KEY)
+    REFERRAL_CODE_BLOCK_SIZE = int(os.getenv('REFERRAL_CODE_BLOCK_SIZE', 1000))
+    
+    # Reverse proxies in front of the app that append to X-Forwarded-For (0 = use the peer address)
+    TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 1))
+    
+    # Referral click ingestion (buffered inserts; repeat clicks per code+IP+UA ignored within the window)
+    REFERRAL_CLICK_FLUSH_SIZE = int(os.getenv('REFERRAL_CLICK_FLUSH_SIZE', 500))
+    REFERRAL_CLICK_FLUSH_INTERVAL = float(os.getenv('REFERRAL_CLICK_FLUSH_INTERVAL', 2.0))  # seconds
+    REFERRAL_CLICK_DEDUP_WINDOW = int(os.getenv('REFERRAL_CLICK_DEDUP_WINDOW', 1800))  # seconds
+    REFERRAL_CLICK_DEDUP_CAPACITY = int(os.getenv('REFERRAL_CLICK_DEDUP_CAPACITY', 1000000))
+    
+    # Idempotency-Key support
+    IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', 86400))  # seconds
+    IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv('IDEMPOTENCY_LOCK_TIMEOUT', 60))  # seconds
     
     # CORS Configuration
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
@@ -67,6 +112,17 @@ class Config:
     RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'true').lower() == 'true'
     RATELIMIT_DEFAULT_LIMIT = int(os.getenv('RATELIMIT_DEFAULT_LIMIT', 10000))  # requests
     RATELIMIT_DEFAULT_WINDOW = int(os.getenv('RATELIMIT_DEFAULT_WINDOW', 3600))  # seconds (1 hour)
+    
+    # Access Logging
+    ACCESS_LOG_SAMPLE_RATE = float(os.getenv('ACCESS_LOG_SAMPLE_RATE', 1.0))  # fraction of requests logged
+    ACCESS_LOG_ROUTE_SAMPLE_RATES = os.getenv('ACCESS_LOG_ROUTE_SAMPLE_RATES', '/health=0,/metrics=0')  # prefix=rate,...
+    ACCESS_LOG_SLOW_MS = float(os.getenv('ACCESS_LOG_SLOW_MS', 1000))  # always log slower requests
+    ACCESS_LOG_ALWAYS_STATUS = int(os.getenv('ACCESS_LOG_ALWAYS_STATUS', 400))  # always log this status and above
+    
+    # Metrics (Prometheus /metrics endpoint)
+    # Worker processes are merged via PROMETHEUS_MULTIPROC_DIR (set in the process environment)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # bearer token for scrapes; required outside debug/testing
 
 
 class DevelopmentConfig(Config):
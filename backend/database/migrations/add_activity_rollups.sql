@@ -0,0 +1,39 @@
+-- user_activities の日次・月次集計テーブル
+-- DAU/MAU は HyperLogLog スケッチ（2^14 レジスタ = 16KB）のマージで求め、
+-- ダウンロード数は商品ごとの正確なカウンタで保持する
+-- scripts/roll_up_activities.py が activity_rollup_state のウォーターマークから増分で更新する
+
+CREATE TABLE IF NOT EXISTS activity_daily_rollups (
+    activity_date DATE NOT NULL,
+    activity_type VARCHAR(100) NOT NULL,
+    event_count BIGINT NOT NULL DEFAULT 0,
+    user_sketch BLOB NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (activity_date, activity_type),
+    INDEX idx_type_date (activity_type, activity_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS activity_monthly_rollups (
+    activity_month DATE NOT NULL,
+    activity_type VARCHAR(100) NOT NULL,
+    event_count BIGINT NOT NULL DEFAULT 0,
+    user_sketch BLOB NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (activity_month, activity_type)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS product_download_daily (
+    activity_date DATE NOT NULL,
+    product_id CHAR(36) NOT NULL,
+    download_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (activity_date, product_id),
+    INDEX idx_product_date (product_id, activity_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS activity_rollup_state (
+    name VARCHAR(50) PRIMARY KEY,
+    last_activity_id BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT IGNORE INTO activity_rollup_state (name, last_activity_id) VALUES ('user_activities', 0);
@@ -0,0 +1,19 @@
+-- VIPユーザーへの一括送金の実行と進捗
+-- ページ（キーセット）ごとに最後に送信したユーザーの位置を保存し、
+-- 途中で失敗した実行を run_id で再開したときに送信済みのユーザーを飛ばす
+
+CREATE TABLE IF NOT EXISTS batch_transfer_runs (
+    id CHAR(36) PRIMARY KEY,
+    min_importance_rank TINYINT NOT NULL,
+    amount_xrp DECIMAL(20, 6) NOT NULL,
+    reason VARCHAR(500),
+    last_rank TINYINT NULL,
+    last_score INT NULL,
+    last_user_id CHAR(36) NULL,
+    sent_count INT NOT NULL DEFAULT 0,
+    status ENUM('running', 'completed', 'failed') NOT NULL DEFAULT 'running',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    
+    INDEX idx_status (status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,20 @@
+-- Escrowキャンペーンの参加者数を分散カウントするスロット
+-- 参加のたびに escrow_campaigns の1行を更新すると人気キャンペーンの開始時にロック待ちが集中するため、
+-- キャンペーンごとに複数のスロット行へ分散して加算し、読み取り時に合計する
+-- 定員（max_participants）は各スロットの capacity として割り振られ、
+-- 条件付きUPDATE（participants < capacity）で合計が定員を超えないようにする
+-- スロットは最初の参加時に作成され、既存の current_participants はスロット0に引き継がれる
+-- スロット作成後の定員変更は EscrowCampaignService.update_max_participants で行い、容量を割り振り直す
+
+CREATE TABLE escrow_campaign_participant_slots (
+    campaign_id CHAR(36) NOT NULL,
+    slot INT NOT NULL,
+    participants INT NOT NULL DEFAULT 0,
+    capacity INT NULL,
+    PRIMARY KEY (campaign_id, slot),
+    FOREIGN KEY (campaign_id) REFERENCES escrow_campaigns(id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- 失敗したステークの参加枠を返却するため、確保したスロットを記録
+ALTER TABLE escrow_stakes
+    ADD COLUMN participant_slot INT NULL AFTER status;
@@ -0,0 +1,6 @@
+-- 完了スイープ用の複合インデックス（status = 'active' AND finish_after <= NOW() を範囲スキャン）
+-- idx_status は新しいインデックスの先頭列と重複するため削除
+
+ALTER TABLE escrow_stakes
+    ADD INDEX idx_status_finish (status, finish_after),
+    DROP INDEX idx_status;
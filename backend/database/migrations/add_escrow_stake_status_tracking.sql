@@ -0,0 +1,9 @@
+-- Escrowステークの非同期作成に伴うステータス管理
+-- ステークは 'submitting' で記録され、EscrowCreate の検証後に 'active'、失敗時は 'failed' になる
+-- 送信前の行にはシーケンスとトランザクションハッシュがまだない
+
+ALTER TABLE escrow_stakes
+    MODIFY COLUMN status ENUM('submitting', 'active', 'completed', 'cancelled', 'failed') DEFAULT 'submitting',
+    MODIFY COLUMN escrow_sequence INT NULL,
+    MODIFY COLUMN transaction_hash VARCHAR(255) NULL,
+    ADD COLUMN error_message TEXT NULL AFTER status;
@@ -0,0 +1,11 @@
+-- 採番用のシーケンステーブル
+-- 紹介コードはカウンタ値を鍵付き置換で8文字コードに変換して発行するため、
+-- アプリケーションはここからブロック単位でカウンタ値を予約する（存在チェック不要）
+
+CREATE TABLE IF NOT EXISTS id_sequences (
+    name VARCHAR(50) PRIMARY KEY,
+    next_value BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT IGNORE INTO id_sequences (name, next_value) VALUES ('referral_code', 0);
@@ -0,0 +1,14 @@
+-- Idempotency-Key 対応（注文作成・決済のリトライ対策）
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    id CHAR(36) PRIMARY KEY,
+    key_hash CHAR(64) NOT NULL UNIQUE,
+    request_fingerprint CHAR(64) NOT NULL,
+    response_status_code INT NULL,
+    response_body MEDIUMTEXT NULL,
+    response_content_type VARCHAR(100) NULL,
+    expires_at DATETIME NOT NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    INDEX idx_idempotency_expires_at (expires_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,16 @@
+-- 重要度レベルの順位（bronze=1 〜 diamond=5、不明なレベルは0）
+-- importance_level から自動計算される生成列のため、どこから更新しても常に一致する
+-- VIPユーザーの抽出（指定レベル以上）を (順位, スコア, ID) のキーセットでインデックスに沿って読み出す
+
+ALTER TABLE users
+ADD COLUMN importance_level_rank TINYINT AS (
+    CASE LOWER(importance_level)
+        WHEN 'bronze' THEN 1
+        WHEN 'silver' THEN 2
+        WHEN 'gold' THEN 3
+        WHEN 'platinum' THEN 4
+        WHEN 'diamond' THEN 5
+        ELSE 0
+    END
+) STORED AFTER importance_level,
+ADD INDEX idx_importance_level_rank (importance_level_rank, importance_score, id);
@@ -0,0 +1,13 @@
+-- ランキング（重要度スコア・紹介数）のスナップショット
+-- 各プロセスはこのテーブルを初回に読み込んでメモリ上のランキングを作り、
+-- 以後は updated_at が新しい行だけを取り込む。score が0の行はランキング外
+-- テーブルが空の場合は users / referrals から自動で再構築される
+
+CREATE TABLE IF NOT EXISTS leaderboard_entries (
+    board VARCHAR(50) NOT NULL,
+    user_id CHAR(36) NOT NULL,
+    score BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME(6) NOT NULL,
+    PRIMARY KEY (board, user_id),
+    INDEX idx_board_updated (board, updated_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,11 @@
+-- ランキングスナップショットの世代
+-- 再構築（leaderboard_entries の削除・再作成）のたびに generation を進める。
+-- 削除された行や古い updated_at の行は差分同期に現れないため、
+-- 各プロセスは同期のたびに世代を確認し、変わっていればスナップショット全体を読み直す
+
+CREATE TABLE IF NOT EXISTS leaderboard_generations (
+    board VARCHAR(50) NOT NULL,
+    generation BIGINT NOT NULL DEFAULT 0,
+    rebuilt_at DATETIME(6) NOT NULL,
+    PRIMARY KEY (board)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,4 @@
+-- NFT受取人への譲渡オファー（NFTokenCreateOffer）のID
+
+ALTER TABLE nft_mints
+ADD COLUMN offer_id VARCHAR(64) NULL AFTER transaction_digest;
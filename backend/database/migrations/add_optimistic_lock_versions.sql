@@ -0,0 +1,11 @@
+-- 楽観的ロック（バージョン付き条件更新）用のバージョン列
+-- UPDATE ... WHERE id = :id AND version = :v でステータス遷移の競合を検出する
+
+ALTER TABLE orders
+ADD COLUMN version INT NOT NULL DEFAULT 0 AFTER status;
+
+ALTER TABLE payments
+ADD COLUMN version INT NOT NULL DEFAULT 0 AFTER status;
+
+ALTER TABLE referrals
+ADD COLUMN version INT NOT NULL DEFAULT 0 AFTER completed_at;
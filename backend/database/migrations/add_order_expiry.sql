@@ -0,0 +1,9 @@
+-- 未決済注文の期限切れ処理（在庫解放リーパー）用
+
+-- 注文ステータスに expired を追加
+ALTER TABLE orders
+MODIFY COLUMN status ENUM('pending', 'processing', 'completed', 'failed', 'cancelled', 'expired')
+NOT NULL DEFAULT 'pending';
+
+-- 期限切れ pending 注文の走査用複合インデックス
+CREATE INDEX idx_status_created_at ON orders(status, created_at);
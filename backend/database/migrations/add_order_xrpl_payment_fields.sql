@@ -0,0 +1,7 @@
+-- XRPL決済のプッシュ型確認（台帳リスナー）用の注文カラム
+
+ALTER TABLE orders
+ADD COLUMN payment_method VARCHAR(20) NULL AFTER version,
+ADD COLUMN payment_status VARCHAR(20) NULL AFTER payment_method,
+ADD COLUMN payment_tx_hash VARCHAR(64) NULL AFTER payment_status,
+ADD INDEX idx_payment_tx_hash (payment_tx_hash);
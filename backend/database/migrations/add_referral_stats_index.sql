@@ -0,0 +1,6 @@
+-- 紹介統計（紹介者ごとのステータス別件数・獲得コイン合計）をインデックスだけで集計するための複合インデックス
+-- idx_referrer は新しいインデックスの先頭列と重複するため削除
+
+ALTER TABLE referrals
+    ADD INDEX idx_referrer_status (referrer_id, status, coins_awarded),
+    DROP INDEX idx_referrer;
@@ -0,0 +1,34 @@
+-- XRPL台帳履歴インデクサー用テーブル
+-- account_tx をマーカーでページングして取り込み、ledger_index のチェックポイントで再開する
+
+CREATE TABLE IF NOT EXISTS xrpl_transactions (
+    id CHAR(36) PRIMARY KEY,
+    tx_hash CHAR(64) NOT NULL UNIQUE,
+    ledger_index INT UNSIGNED NOT NULL,
+    transaction_type VARCHAR(50) NOT NULL,
+    account VARCHAR(35) NOT NULL,
+    destination VARCHAR(35) NULL,
+    amount_drops BIGINT NULL,
+    fee_drops BIGINT NULL,
+    result VARCHAR(32) NOT NULL,
+    validated BOOLEAN NOT NULL DEFAULT TRUE,
+    memo VARCHAR(255) NULL,
+    close_time DATETIME NULL,
+    raw_json MEDIUMTEXT NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_xrpl_tx_account_ledger (account, ledger_index),
+    INDEX idx_xrpl_tx_destination_ledger (destination, ledger_index),
+    INDEX idx_xrpl_tx_memo (memo)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- アカウントごとのインデックス進捗（中断時は marker から再開）
+CREATE TABLE IF NOT EXISTS xrpl_index_checkpoints (
+    id CHAR(36) PRIMARY KEY,
+    account VARCHAR(35) NOT NULL UNIQUE,
+    last_ledger_index INT UNSIGNED NOT NULL DEFAULT 0,
+    scan_ledger_max INT UNSIGNED NULL,
+    marker TEXT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
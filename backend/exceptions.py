@@ -63,6 +63,19 @@ class ResourceConflictError(AirzoneException):
         super().__init__(message, code=409, details=details)
 
 
+class ConcurrentUpdateError(ResourceConflictError):
+    """Exception raised when an optimistic (version-checked) update keeps losing to concurrent writers"""
+    def __init__(self, resource_type: str, resource_id: str, attempts: Optional[int] = None):
+        message = f"{resource_type} '{resource_id}' was modified concurrently"
+        details = {
+            'resource_type': resource_type,
+            'resource_id': resource_id
+        }
+        if attempts:
+            details['attempts'] = attempts
+        super().__init__(message, details=details)
+
+
 class RateLimitExceededError(AirzoneException):
     """Exception raised when rate limit is exceeded"""
     def __init__(self, message: str = "Rate limit exceeded", retry_after: Optional[int] = None):
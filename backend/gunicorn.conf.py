@@ -0,0 +1,24 @@
+"""
+Gunicorn server hooks.
+Worker settings are passed on the command line (deployment/systemd/airzone-backend.service);
+these hooks keep the multiprocess Prometheus metrics in PROMETHEUS_MULTIPROC_DIR consistent.
+"""
+import glob
+import os
+
+from prometheus_client import multiprocess
+
+
+def on_starting(server):
+    """Remove metric files left over from a previous run of the service"""
+    metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(metrics_dir, '*.db')):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    """Drop the live gauges of an exited worker; its counters and histograms are kept"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,20 +1,88 @@
 """Structured logging configuration for the Airzone application"""
 
+import atexit
 import logging
 import logging.handlers
 import json
 import os
-from datetime import datetime
-from typing import Any, Dict
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoding when installed
+    orjson = None
+
+
+# Extra record attributes copied into structured logs
+STRUCTURED_FIELDS = (
+    'request_path',
+    'request_method',
+    'status_code',
+    'duration_ms',
+    'user_id',
+    'db_queries',
+    'user_agent',
+    'ip_address',
+    'error_type',
+    'error_code',
+    'error_details',
+    'traceback',
+)
+
+
+def _json_encoder() -> Callable[[Dict[str, Any]], str]:
+    """JSON encoder for log lines: orjson if installed, else a reusable stdlib encoder"""
+    if orjson is not None:
+        dumps = orjson.dumps
+        return lambda data: dumps(data, default=str).decode()
+    return json.JSONEncoder(ensure_ascii=False, default=str).encode
+
+
+class _UTCTimestamps:
+    """ISO 8601 UTC timestamps with the date/time part cached per second"""
+    
+    def __init__(self, pattern: str = '%Y-%m-%dT%H:%M:%S'):
+        self._pattern = pattern
+        self._cached = (None, '')
+    
+    def seconds(self, created: float) -> str:
+        whole = int(created)
+        second, text = self._cached
+        if second != whole:
+            text = time.strftime(self._pattern, time.gmtime(whole))
+            self._cached = (whole, text)
+        return text
+    
+    def iso(self, created: float) -> str:
+        return f"{self.seconds(created)}.{int(created % 1 * 1000000):06d}Z"
 
 
 class StructuredFormatter(logging.Formatter):
     """Custom formatter that outputs structured JSON logs"""
     
+    def __init__(self, fields: Iterable[str] = STRUCTURED_FIELDS):
+        """
+        Args:
+            fields: Extra record attributes to include when present
+        """
+        super().__init__()
+        self._fields = tuple(fields)
+        self._encode = _json_encoder()
+        self._timestamps = _UTCTimestamps()
+    
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON"""
+        attributes = record.__dict__
+        # Several handlers share one formatter; encode each record once
+        cached = attributes.get('_structured_line')
+        if cached is not None and cached[0] is self:
+            return cached[1]
+        
         log_data: Dict[str, Any] = {
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'timestamp': self._timestamps.iso(record.created),
             'level': record.levelname,
             'logger': record.name,
             'message': record.getMessage(),
@@ -24,36 +92,31 @@ class StructuredFormatter(logging.Formatter):
         }
         
         # Add extra fields if present
-        if hasattr(record, 'request_path'):
-            log_data['request_path'] = record.request_path
-        if hasattr(record, 'request_method'):
-            log_data['request_method'] = record.request_method
-        if hasattr(record, 'user_agent'):
-            log_data['user_agent'] = record.user_agent
-        if hasattr(record, 'ip_address'):
-            log_data['ip_address'] = record.ip_address
-        if hasattr(record, 'error_type'):
-            log_data['error_type'] = record.error_type
-        if hasattr(record, 'error_code'):
-            log_data['error_code'] = record.error_code
-        if hasattr(record, 'error_details'):
-            log_data['error_details'] = record.error_details
-        if hasattr(record, 'traceback'):
-            log_data['traceback'] = record.traceback
+        for field in self._fields:
+            if field in attributes:
+                log_data[field] = attributes[field]
         
         # Add exception info if present
-        if record.exc_info:
-            log_data['exception'] = self.formatException(record.exc_info)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log_data['exception'] = record.exc_text
         
-        return json.dumps(log_data)
+        line = self._encode(log_data)
+        record._structured_line = (self, line)
+        return line
 
 
 class SimpleFormatter(logging.Formatter):
     """Simple human-readable formatter for development"""
     
+    def __init__(self):
+        super().__init__()
+        self._timestamps = _UTCTimestamps('%Y-%m-%d %H:%M:%S')
+    
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as human-readable text"""
-        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        timestamp = self._timestamps.seconds(record.created)
         level = record.levelname
         logger_name = record.name
         message = record.getMessage()
@@ -73,6 +136,71 @@ class SimpleFormatter(logging.Formatter):
         return log_line
 
 
+class _EnqueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the log listener thread.
+    Only the message arguments are merged here (they may be mutated after the
+    call returns); exceptions and the output format are rendered by the listener.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record = logging.makeLogRecord(record.__dict__)
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def start_log_listener(handlers: Iterable[logging.Handler]) -> logging.Handler:
+    """
+    Start a background thread that writes queued records to the given handlers.
+    Any previously started listener is stopped first.
+    
+    Args:
+        handlers: Handlers that format and write records (levels are respected)
+    
+    Returns:
+        logging.Handler: Handler to attach to loggers; emitting is an enqueue
+    """
+    global _listener
+    log_queue = queue.SimpleQueue()
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    return _EnqueueHandler(log_queue)
+
+
+def stop_log_listener() -> None:
+    """Write out the queued records and stop the listener thread"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _restart_listener_after_fork() -> None:
+    """Forked workers do not inherit the listener thread; start a new one on the same queue"""
+    global _listener, _listener_lock
+    _listener_lock = threading.Lock()
+    if _listener is not None:
+        _listener = logging.handlers.QueueListener(
+            _listener.queue, *_listener.handlers, respect_handler_level=True
+        )
+        _listener.start()
+
+
+atexit.register(stop_log_listener)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+
 def setup_logging(app):
     """Configure structured logging for the application"""
     
@@ -101,27 +229,29 @@ def setup_logging(app):
     console_handler = logging.StreamHandler()
     console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
     
     # File handler for all logs
     file_handler = logging.handlers.RotatingFileHandler(
         os.path.join(log_dir, 'airzone.log'),
         maxBytes=10 * 1024 * 1024,  # 10 MB
-        backupCount=5
+        backupCount=5,
+        encoding='utf-8'
     )
     file_handler.setLevel(log_level)
     file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
     
     # File handler for errors only
     error_handler = logging.handlers.RotatingFileHandler(
         os.path.join(log_dir, 'airzone_errors.log'),
         maxBytes=10 * 1024 * 1024,  # 10 MB
-        backupCount=5
+        backupCount=5,
+        encoding='utf-8'
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(formatter)
-    root_logger.addHandler(error_handler)
+    
+    # Formatting and writes happen on the listener thread; loggers only enqueue
+    root_logger.addHandler(start_log_listener([console_handler, file_handler, error_handler]))
     
     # Configure Flask app logger
     app.logger.setLevel(log_level)
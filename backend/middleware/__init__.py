@@ -14,6 +14,9 @@ from .rate_limit import (
     setup_rate_limiting,
     rate_limiter
 )
+from .idempotency import idempotent
+from .access_log import setup_access_logging
+from .metrics import setup_metrics
 
 __all__ = [
     'InputValidator',
@@ -25,5 +28,8 @@ __all__ = [
     'rate_limit',
     'global_rate_limit',
     'setup_rate_limiting',
-    'rate_limiter'
+    'rate_limiter',
+    'idempotent',
+    'setup_access_logging',
+    'setup_metrics'
 ]
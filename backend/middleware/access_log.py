@@ -0,0 +1,184 @@
+"""Access logging middleware: one structured line per request"""
+
+import logging
+import random
+import time
+from typing import Dict, Optional
+from flask import request, g, has_request_context
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('airzone.access')
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """
+    Parse per-route sample rates from "prefix=rate,prefix=rate"
+    
+    Args:
+        value: Comma-separated path prefixes and rates (0.0-1.0)
+    
+    Returns:
+        Dict[str, float]: Path prefix -> sample rate
+    
+    Raises:
+        ValueError: If an entry is malformed or a rate is out of range
+    """
+    rates = {}
+    for entry in filter(None, (part.strip() for part in value.split(','))):
+        prefix, separator, rate = entry.rpartition('=')
+        if not separator or not prefix.strip():
+            raise ValueError(f"Invalid access log sample rate entry: {entry}")
+        rate = float(rate)
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Access log sample rate must be between 0 and 1: {entry}")
+        rates[prefix.strip()] = rate
+    return rates
+
+
+class AccessLogSampler:
+    """Decides which requests are logged"""
+    
+    def __init__(
+        self,
+        default_rate: float = 1.0,
+        route_rates: Optional[Dict[str, float]] = None,
+        slow_ms: float = 1000.0,
+        always_status: int = 400
+    ):
+        """
+        Args:
+            default_rate: Fraction of requests logged when no route rate matches
+            route_rates: Path prefix -> fraction logged (the longest matching prefix wins)
+            slow_ms: Requests at least this slow are always logged
+            always_status: Responses with at least this status are always logged
+        """
+        self.default_rate = default_rate
+        self.route_rates = dict(route_rates or {})
+        self.slow_ms = slow_ms
+        self.always_status = always_status
+        self._prefixes = sorted(self.route_rates, key=len, reverse=True)
+        self._rate_by_route: Dict[str, float] = {}
+    
+    def rate_for(self, route: Optional[str]) -> float:
+        """
+        Sample rate for a route (resolved once per URL rule)
+        
+        Args:
+            route: URL rule, or None when no rule matched
+        
+        Returns:
+            float: Fraction of requests logged
+        """
+        if route is None:
+            return self.default_rate
+        rate = self._rate_by_route.get(route)
+        if rate is None:
+            rate = next(
+                (self.route_rates[prefix] for prefix in self._prefixes if route.startswith(prefix)),
+                self.default_rate
+            )
+            self._rate_by_route[route] = rate
+        return rate
+    
+    def should_log(self, route: Optional[str], status_code: int, duration_ms: float) -> bool:
+        """
+        Whether a finished request is logged
+        
+        Args:
+            route: URL rule, or None when no rule matched
+            status_code: Response status
+            duration_ms: Request duration in milliseconds
+        
+        Returns:
+            bool: True if the request should be logged
+        """
+        if status_code >= self.always_status or duration_ms >= self.slow_ms:
+            return True
+        rate = self.rate_for(route)
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+def _count_query(*args) -> None:
+    """Count statements executed while handling a request"""
+    if has_request_context():
+        g.access_log_queries = g.get('access_log_queries', 0) + 1
+
+
+def _request_user_id() -> Optional[str]:
+    """
+    User of the current request: the one set by middleware.auth, otherwise
+    the identity of a valid flask_jwt_extended token (order, payment, wifi
+    and xrpl_payment routes use that decorator instead)
+    
+    Returns:
+        Optional[str]: User ID, or None for anonymous requests
+    """
+    current_user = g.get('current_user')
+    if current_user:
+        return current_user.get('user_id')
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        # Missing JWTManager, or an invalid or expired token
+        return None
+    return str(identity) if identity is not None else None
+
+
+def setup_access_logging(app, engine: Engine):
+    """
+    Log one line per request with method, path, status, duration, user and
+    DB query count, sampled per route from the app config
+    
+    Args:
+        app: Flask application
+        engine: Engine whose statements are counted
+    """
+    sampler = AccessLogSampler(
+        default_rate=app.config.get('ACCESS_LOG_SAMPLE_RATE', 1.0),
+        route_rates=parse_sample_rates(app.config.get('ACCESS_LOG_ROUTE_SAMPLE_RATES', '')),
+        slow_ms=app.config.get('ACCESS_LOG_SLOW_MS', 1000),
+        always_status=app.config.get('ACCESS_LOG_ALWAYS_STATUS', 400)
+    )
+    event.listen(engine, 'before_cursor_execute', _count_query)
+    
+    def start_access_log():
+        """Record the request start time"""
+        g.access_log_started = time.perf_counter()
+    
+    # Run ahead of the other hooks so requests they reject are timed too
+    app.before_request_funcs.setdefault(None, []).insert(0, start_access_log)
+    
+    @app.after_request
+    def write_access_log(response):
+        """Write the access line if the request is sampled"""
+        started = g.get('access_log_started')
+        if started is None:
+            return response
+        duration_ms = (time.perf_counter() - started) * 1000
+        status_code = response.status_code
+        route = request.url_rule.rule if request.url_rule is not None else None
+        if not sampler.should_log(route, status_code, duration_ms):
+            return response
+        
+        logger.log(
+            logging.WARNING if status_code >= 500 or duration_ms >= sampler.slow_ms else logging.INFO,
+            "%s %s %s %.1fms",
+            request.method,
+            request.path,
+            status_code,
+            duration_ms,
+            extra={
+                'request_method': request.method,
+                'request_path': request.path,
+                'status_code': status_code,
+                'duration_ms': round(duration_ms, 1),
+                'user_id': _request_user_id(),
+                'db_queries': g.get('access_log_queries', 0),
+                'ip_address': request.remote_addr,
+                'user_agent': request.headers.get('User-Agent')
+            }
+        )
+        return response
@@ -177,14 +177,6 @@ def jwt_required(f: Callable) -> Callable:
                 'expires_at': payload.get('exp')
             }
             
-            logger.info(
-                f"Authenticated request: {request.method} {request.path}",
-                extra={
-                    'user_id': payload['user_id'],
-                    'endpoint': request.endpoint
-                }
-            )
-            
             # Call the actual route function
             return f(*args, **kwargs)
             
@@ -0,0 +1,149 @@
+"""Idempotency-Key support for retry-safe POST endpoints"""
+
+import hashlib
+import logging
+from functools import wraps
+from typing import Optional
+from flask import request, g, current_app, make_response
+from exceptions import ValidationError, ResourceConflictError
+from repositories.idempotency_repository import IdempotencyRepository
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+def _get_request_user_id() -> Optional[str]:
+    """Get the authenticated user ID from either JWT implementation"""
+    current_user = g.get('current_user')
+    if isinstance(current_user, dict) and current_user.get('user_id'):
+        return current_user['user_id']
+    
+    try:
+        from flask_jwt_extended import get_jwt_identity
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+
+def _hash(*parts) -> str:
+    """SHA-256 over the given parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def idempotent(ttl_seconds: Optional[int] = None):
+    """
+    Decorator to make a POST route safe to retry with an Idempotency-Key header.
+    
+    The first request with a key runs the route and stores its 2xx response.
+    Retries with the same key and body are answered from the store without
+    re-running the route. Non-2xx responses and exceptions release the key
+    so that the client can retry. Requests without the header are unaffected.
+    
+    Must be applied after the JWT decorator so that keys are scoped per user.
+    
+    Args:
+        ttl_seconds: How long a stored response is replayed
+                     (default: IDEMPOTENCY_KEY_TTL config)
+    
+    Example:
+        @jwt_required()
+        @idempotent()
+        def create_order():
+            pass
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            client_key = request.headers.get(IDEMPOTENCY_HEADER)
+            if client_key is None:
+                return f(*args, **kwargs)
+            
+            client_key = client_key.strip()
+            if not client_key or len(client_key) > MAX_KEY_LENGTH:
+                raise ValidationError(
+                    f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters",
+                    field=IDEMPOTENCY_HEADER
+                )
+            
+            scope = _get_request_user_id() or f"ip:{request.remote_addr}"
+            key_hash = _hash(scope, request.endpoint, client_key)
+            fingerprint = _hash(request.method, request.path, request.get_data())
+            
+            repo = IdempotencyRepository(g.db)
+            acquired, record = repo.try_acquire(
+                key_hash,
+                fingerprint,
+                ttl_seconds or current_app.config.get('IDEMPOTENCY_KEY_TTL', 86400),
+                current_app.config.get('IDEMPOTENCY_LOCK_TIMEOUT', 60)
+            )
+            
+            if not acquired:
+                if record is not None and record.request_fingerprint != fingerprint:
+                    raise ValidationError(
+                        f"{IDEMPOTENCY_HEADER} was already used with a different request",
+                        field=IDEMPOTENCY_HEADER
+                    )
+                
+                if record is None or not record.is_completed:
+                    raise ResourceConflictError(
+                        "A request with this Idempotency-Key is still being processed"
+                    )
+                
+                logger.info(
+                    "Replaying stored response for idempotent request",
+                    extra={
+                        'request_method': request.method,
+                        'request_path': request.path,
+                        'status_code': record.response_status_code
+                    }
+                )
+                response = current_app.response_class(
+                    record.response_body,
+                    status=record.response_status_code,
+                    content_type=record.response_content_type
+                )
+                response.headers[REPLAYED_HEADER] = 'true'
+                return response
+            
+            try:
+                response = make_response(f(*args, **kwargs))
+            except Exception:
+                _release(repo, key_hash)
+                raise
+            
+            if 200 <= response.status_code < 300:
+                try:
+                    repo.save_response(
+                        key_hash,
+                        response.status_code,
+                        response.get_data(as_text=True),
+                        response.content_type
+                    )
+                except Exception as e:
+                    # The route already ran; a lost record only disables replay
+                    logger.error(f"Failed to store idempotent response: {str(e)}")
+                    g.db.rollback()
+            else:
+                _release(repo, key_hash)
+            
+            return response
+        
+        return decorated_function
+    return decorator
+
+
+def _release(repo: IdempotencyRepository, key_hash: str) -> None:
+    """Release a claimed key, logging instead of masking the original error"""
+    try:
+        repo.db_session.rollback()
+        repo.release(key_hash)
+    except Exception as e:
+        logger.error(f"Failed to release idempotency key: {str(e)}")
+        repo.db_session.rollback()
@@ -0,0 +1,98 @@
+"""Request metrics middleware and the Prometheus /metrics endpoint"""
+
+import hmac
+import logging
+import os
+import time
+from flask import Response, request, g, jsonify
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Gauge, Histogram, generate_latest, multiprocess
+)
+
+logger = logging.getLogger(__name__)
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'airzone_http_request_duration_seconds',
+    'HTTP request duration by blueprint, endpoint, method and status',
+    ['blueprint', 'endpoint', 'method', 'status']
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    'airzone_http_requests_in_progress',
+    'HTTP requests being handled',
+    ['blueprint'],
+    multiprocess_mode='livesum'
+)
+
+
+def collect_metrics() -> bytes:
+    """
+    Current metrics of the service in the Prometheus text format: every
+    worker's when PROMETHEUS_MULTIPROC_DIR is set (each process writes its
+    values to memory-mapped files there as they change), otherwise this
+    process's.
+    
+    Returns:
+        bytes: Exposition of all metrics
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def setup_metrics(app):
+    """
+    Record request duration and in-flight requests, and serve /metrics.
+    Outside debug and testing /metrics is only served with METRICS_TOKEN set,
+    since it exposes endpoint names, status mix and latencies.
+    
+    Args:
+        app: Flask application
+    """
+    def start_request_metrics():
+        """Record the start time and count the request as in flight"""
+        g.metrics_started = time.perf_counter()
+        g.metrics_blueprint = request.blueprint or ''
+        HTTP_REQUESTS_IN_PROGRESS.labels(g.metrics_blueprint).inc()
+    
+    # Run ahead of the other hooks so requests they reject are measured too
+    app.before_request_funcs.setdefault(None, []).insert(0, start_request_metrics)
+    
+    @app.after_request
+    def record_request_metrics(response):
+        """Observe the request duration"""
+        started = g.get('metrics_started')
+        if started is not None:
+            HTTP_REQUEST_SECONDS.labels(
+                g.metrics_blueprint,
+                request.endpoint or '',
+                request.method,
+                response.status_code
+            ).observe(time.perf_counter() - started)
+        return response
+    
+    @app.teardown_request
+    def finish_request_metrics(exception=None):
+        """Count the request as finished (also when it failed)"""
+        if g.pop('metrics_started', None) is not None:
+            HTTP_REQUESTS_IN_PROGRESS.labels(g.metrics_blueprint).dec()
+    
+    token = app.config.get('METRICS_TOKEN')
+    if not token and not (app.debug or app.testing):
+        logger.error("METRICS_TOKEN is not set; /metrics is not served")
+        return
+    
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Metrics in the Prometheus text format"""
+        if token:
+            supplied = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(supplied, f"Bearer {token}"):
+                return jsonify({
+                    'status': 'error',
+                    'error': 'Invalid metrics token',
+                    'code': 401
+                }), 401
+        return Response(collect_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -4,13 +4,20 @@ import time
 import logging
 from typing import Dict, Optional
 from functools import wraps
-from flask import request, g
+from flask import current_app, request, g
 from collections import defaultdict
 from threading import Lock
+from prometheus_client import Counter
 from exceptions import RateLimitExceededError
 
 logger = logging.getLogger(__name__)
 
+RATE_LIMIT_REJECTIONS = Counter(
+    'airzone_rate_limit_rejections_total',
+    'Requests rejected by rate limiting',
+    ['scope', 'endpoint']
+)
+
 
 class RateLimiter:
     """Simple in-memory rate limiter using token bucket algorithm"""
@@ -86,6 +93,24 @@ class RateLimiter:
 rate_limiter = RateLimiter()
 
 
+def get_client_ip() -> str:
+    """
+    Get the client IP address of the current request.
+    
+    X-Forwarded-For is read from the right: each of the TRUSTED_PROXY_COUNT
+    proxies in front of the app appends the address it received the request
+    from, so the entry that many hops from the end is the one the client
+    cannot forge. Entries left of it are whatever the client sent.
+    """
+    trusted_proxies = current_app.config.get('TRUSTED_PROXY_COUNT', 1)
+    forwarded_for = request.headers.get('X-Forwarded-For')
+    if forwarded_for and trusted_proxies > 0:
+        hops = [hop.strip() for hop in forwarded_for.split(',') if hop.strip()]
+        if hops:
+            return hops[-min(trusted_proxies, len(hops))]
+    return request.remote_addr
+
+
 def get_client_identifier() -> str:
     """Get unique identifier for the client"""
     # Try to get user ID from JWT if authenticated
@@ -93,15 +118,7 @@ def get_client_identifier() -> str:
         return f"user:{g.current_user.id}"
     
     # Fall back to IP address
-    # Check for X-Forwarded-For header (for proxies)
-    forwarded_for = request.headers.get('X-Forwarded-For')
-    if forwarded_for:
-        # Get the first IP in the chain
-        ip = forwarded_for.split(',')[0].strip()
-    else:
-        ip = request.remote_addr
-    
-    return f"ip:{ip}"
+    return f"ip:{get_client_ip()}"
 
 
 def rate_limit(max_requests: int = 100, window_seconds: int = 3600):
@@ -134,6 +151,7 @@ def rate_limit(max_requests: int = 100, window_seconds: int = 3600):
             )
             
             if not is_allowed:
+                RATE_LIMIT_REJECTIONS.labels('endpoint', request.endpoint or '').inc()
                 logger.warning(
                     f"Rate limit exceeded",
                     extra={
@@ -194,6 +212,7 @@ def global_rate_limit(max_requests: int = 1000, window_seconds: int = 3600):
             )
             
             if not is_allowed:
+                RATE_LIMIT_REJECTIONS.labels('global', request.endpoint or '').inc()
                 logger.warning(
                     f"Global rate limit exceeded",
                     extra={
@@ -220,8 +239,8 @@ def setup_rate_limiting(app):
     @app.before_request
     def check_global_rate_limit():
         """Check global rate limit before processing request"""
-        # Skip rate limiting for health check and static files
-        if request.path in ['/health', '/favicon.ico']:
+        # Skip rate limiting for health check, metrics scrapes and static files
+        if request.path in ['/health', '/metrics', '/favicon.ico']:
             return
         
         # Get client identifier
@@ -241,6 +260,7 @@ def setup_rate_limiting(app):
         )
         
         if not is_allowed:
+            RATE_LIMIT_REJECTIONS.labels('global', request.endpoint or '').inc()
             logger.warning(
                 f"Global rate limit exceeded",
                 extra={
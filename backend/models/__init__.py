@@ -10,6 +10,8 @@ from models.order import Order, OrderItem, OrderStatus
 from models.payment import Payment, PaymentStatus
 from models.wifi_session import WiFiSession
 from models.task_queue import TaskQueue, TaskStatus
+from models.idempotency_key import IdempotencyKey
+from models.xrpl_transaction import XRPLTransaction, XRPLIndexCheckpoint
 
 __all__ = [
     'Base',
@@ -28,4 +30,7 @@ __all__ = [
     'WiFiSession',
     'TaskQueue',
     'TaskStatus',
+    'IdempotencyKey',
+    'XRPLTransaction',
+    'XRPLIndexCheckpoint',
 ]
@@ -0,0 +1,37 @@
+"""
+IdempotencyKey model for replaying responses to retried POST requests.
+"""
+from sqlalchemy import Column, String, Integer, Text, DateTime, Index
+from models.base import BaseModel
+
+
+class IdempotencyKey(BaseModel):
+    """
+    IdempotencyKey model representing one client-supplied Idempotency-Key.
+    Stores the request fingerprint and the serialized response so that
+    retries are answered without re-executing the endpoint.
+    """
+    __tablename__ = 'idempotency_keys'
+    
+    # Hash of user, endpoint and client key (the scope of the key)
+    key_hash = Column(String(64), unique=True, nullable=False)
+    # Hash of method, path and request body
+    request_fingerprint = Column(String(64), nullable=False)
+    # NULL while the original request is still being processed
+    response_status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    response_content_type = Column(String(100), nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+    
+    # Indexes
+    __table_args__ = (
+        Index('idx_idempotency_expires_at', 'expires_at'),
+    )
+    
+    @property
+    def is_completed(self) -> bool:
+        """Whether a response has been stored for this key."""
+        return self.response_status_code is not None
+    
+    def __repr__(self):
+        return f"<IdempotencyKey(id={self.id}, status_code={self.response_status_code})>"
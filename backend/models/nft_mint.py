@@ -27,6 +27,7 @@ class NFTMint(BaseModel):
     wallet_address = Column(String(255), nullable=False)
     nft_object_id = Column(String(255), nullable=True)
     transaction_digest = Column(String(255), nullable=True)
+    offer_id = Column(String(64), nullable=True)  # NFTokenOffer transferring the NFT to wallet_address
     status = Column(
         Enum(NFTMintStatus),
         default=NFTMintStatus.PENDING,
@@ -14,6 +14,7 @@ class OrderStatus(enum.Enum):
     COMPLETED = 'completed'
     FAILED = 'failed'
     CANCELLED = 'cancelled'
+    EXPIRED = 'expired'
 
 
 class Order(BaseModel):
@@ -31,6 +32,10 @@ class Order(BaseModel):
         default=OrderStatus.PENDING,
         nullable=False
     )
+    version = Column(Integer, default=0, server_default='0', nullable=False)  # Optimistic concurrency counter
+    payment_method = Column(String(20), nullable=True)  # 'stripe' or 'xrpl'
+    payment_status = Column(String(20), nullable=True)  # XRPL payment state ('completed' once confirmed on-ledger)
+    payment_tx_hash = Column(String(64), nullable=True)  # XRPL transaction hash that paid the order
     
     # Relationships
     user = relationship('User', back_populates='orders')
@@ -41,6 +46,7 @@ class Order(BaseModel):
     __table_args__ = (
         Index('idx_user_id', 'user_id'),
         Index('idx_status', 'status'),
+        Index('idx_status_created_at', 'status', 'created_at'),
     )
     
     def to_dict(self, exclude_fields=None):
@@ -33,6 +33,7 @@ class Payment(BaseModel):
         default=PaymentStatus.PENDING,
         nullable=False
     )
+    version = Column(Integer, default=0, server_default='0', nullable=False)  # Optimistic concurrency counter
     
     # Relationships
     order = relationship('Order', back_populates='payments')
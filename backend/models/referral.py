@@ -1,7 +1,7 @@
 """
 Referral model for tracking user referrals.
 """
-from sqlalchemy import Column, String, Integer, Enum, ForeignKey, TIMESTAMP
+from sqlalchemy import Column, String, Integer, Enum, ForeignKey, Index, TIMESTAMP
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -28,11 +28,17 @@ class Referral(Base):
     coins_awarded = Column(Integer, default=0)
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
     completed_at = Column(TIMESTAMP, nullable=True)
+    version = Column(Integer, default=0, server_default='0', nullable=False)  # 楽観的ロック用バージョン
     
     # Relationships
     referrer = relationship('User', foreign_keys=[referrer_id], backref='referrals_made')
     referred = relationship('User', foreign_keys=[referred_id], backref='referral_received')
     
+    # 紹介者ごとの件数・コイン集計をインデックスだけで行うための複合インデックス
+    __table_args__ = (
+        Index('idx_referrer_status', 'referrer_id', 'status', 'coins_awarded'),
+    )
+    
     def to_dict(self):
         """Convert referral to dictionary."""
         return {
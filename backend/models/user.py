@@ -1,11 +1,25 @@
 """
 User model for storing user account information.
 """
-from sqlalchemy import Column, String, Integer, Index
+from sqlalchemy import Column, String, Integer, SmallInteger, DateTime, Index, Computed
 from sqlalchemy.orm import relationship
 from models.base import BaseModel
 
 
+# Importance levels in ascending order; rank 0 means an unrecognized level
+IMPORTANCE_LEVEL_RANKS = {
+    'bronze': 1,
+    'silver': 2,
+    'gold': 3,
+    'platinum': 4,
+    'diamond': 5,
+}
+
+_IMPORTANCE_LEVEL_RANK_SQL = 'CASE LOWER(importance_level) {} ELSE 0 END'.format(
+    ' '.join(f"WHEN '{level}' THEN {rank}" for level, rank in IMPORTANCE_LEVEL_RANKS.items())
+)
+
+
 class User(BaseModel):
     """
     User model representing a user account.
@@ -23,6 +37,13 @@ class User(BaseModel):
     referred_by = Column(String(36), nullable=True)
     coins = Column(Integer, default=0)
     
+    # Importance fields
+    importance_score = Column(Integer, default=0)
+    importance_level = Column(String(20), default='bronze')
+    last_score_updated = Column(DateTime, nullable=True)
+    # Derived from importance_level by the database so every writer keeps it in sync
+    importance_level_rank = Column(SmallInteger, Computed(_IMPORTANCE_LEVEL_RANK_SQL, persisted=True))
+    
     # Relationships
     wallets = relationship('Wallet', back_populates='user', cascade='all, delete-orphan')
     nft_mints = relationship('NFTMint', back_populates='user', cascade='all, delete-orphan')
@@ -33,6 +54,9 @@ class User(BaseModel):
     __table_args__ = (
         Index('idx_google_id', 'google_id'),
         Index('idx_email', 'email'),
+        Index('idx_importance_score', 'importance_score'),
+        Index('idx_importance_level', 'importance_level'),
+        Index('idx_importance_level_rank', 'importance_level_rank', 'importance_score', 'id'),
     )
     
     def to_dict(self, exclude_fields=None):
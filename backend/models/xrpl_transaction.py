@@ -0,0 +1,56 @@
+"""
+XRPL ledger history models: locally indexed transactions and per-account
+indexing checkpoints.
+"""
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, Text, DateTime, Index
+from models.base import BaseModel
+
+
+class XRPLTransaction(BaseModel):
+    """
+    XRPLTransaction model representing one validated transaction involving
+    one of our accounts, copied from the ledger by the history indexer.
+    """
+    __tablename__ = 'xrpl_transactions'
+    
+    tx_hash = Column(String(64), unique=True, nullable=False)
+    ledger_index = Column(Integer, nullable=False)
+    transaction_type = Column(String(50), nullable=False)
+    account = Column(String(35), nullable=False)  # Sender
+    destination = Column(String(35), nullable=True)
+    amount_drops = Column(BigInteger, nullable=True)  # Delivered XRP (NULL for issued currencies / non-payments)
+    fee_drops = Column(BigInteger, nullable=True)
+    result = Column(String(32), nullable=False)  # TransactionResult, e.g. tesSUCCESS
+    validated = Column(Boolean, default=True, nullable=False)
+    memo = Column(String(255), nullable=True)  # First memo, decoded
+    close_time = Column(DateTime, nullable=True)
+    raw_json = Column(Text, nullable=False)  # Transaction and metadata as returned by rippled
+    
+    # Indexes
+    __table_args__ = (
+        Index('idx_xrpl_tx_account_ledger', 'account', 'ledger_index'),
+        Index('idx_xrpl_tx_destination_ledger', 'destination', 'ledger_index'),
+        Index('idx_xrpl_tx_memo', 'memo'),
+    )
+    
+    def __repr__(self):
+        return f"<XRPLTransaction(hash={self.tx_hash}, type={self.transaction_type}, ledger={self.ledger_index})>"
+
+
+class XRPLIndexCheckpoint(BaseModel):
+    """
+    XRPLIndexCheckpoint model tracking how far an account's history is indexed.
+    While a scan is in progress the account_tx marker and the upper ledger
+    bound of that scan are stored so an interrupted run resumes mid-scan.
+    """
+    __tablename__ = 'xrpl_index_checkpoints'
+    
+    account = Column(String(35), unique=True, nullable=False)
+    # Highest ledger whose transactions are fully indexed
+    last_ledger_index = Column(Integer, default=0, nullable=False)
+    # In-progress scan state (NULL when idle)
+    scan_ledger_max = Column(Integer, nullable=True)
+    marker = Column(Text, nullable=True)  # JSON-encoded account_tx marker
+    
+    def __repr__(self):
+        return f"<XRPLIndexCheckpoint(account={self.account}, last_ledger_index={self.last_ledger_index})>"
@@ -10,6 +10,12 @@ from repositories.product_repository import ProductRepository
 from repositories.order_repository import OrderRepository, OrderItemRepository
 from repositories.payment_repository import PaymentRepository
 from repositories.task_repository import TaskRepository
+from repositories.idempotency_repository import IdempotencyRepository
+from repositories.referral_repository import ReferralRepository
+from repositories.xrpl_transaction_repository import (
+    XRPLTransactionRepository,
+    XRPLIndexCheckpointRepository
+)
 
 
 __all__ = [
@@ -22,4 +28,8 @@ __all__ = [
     'OrderItemRepository',
     'PaymentRepository',
     'TaskRepository',
+    'IdempotencyRepository',
+    'ReferralRepository',
+    'XRPLTransactionRepository',
+    'XRPLIndexCheckpointRepository',
 ]
@@ -2,13 +2,18 @@
 Base repository class providing common CRUD operations.
 All repositories should inherit from this class.
 """
-from typing import TypeVar, Generic, Optional, List, Dict, Any
+import random
+import time
+from datetime import datetime
+from typing import TypeVar, Generic, Optional, List, Dict, Any, Callable
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from models.base import BaseModel
+from exceptions import ConcurrentUpdateError
 
 
 T = TypeVar('T', bound=BaseModel)
+R = TypeVar('R')
 
 
 class BaseRepository(Generic[T]):
@@ -19,6 +24,10 @@ class BaseRepository(Generic[T]):
     Requirements: 6.4, 8.4, 9.2
     """
     
+    # Attempts made by update_with_retry / run_with_version_retry before
+    # giving up with ConcurrentUpdateError
+    VERSION_RETRY_ATTEMPTS = 5
+    
     def __init__(self, model_class: type[T], db_session: Session):
         """
         Initialize repository with model class and database session.
@@ -188,3 +197,114 @@ class BaseRepository(Generic[T]):
                 self.model_class.id == record_id
             ).exists()
         ).scalar()
+    
+    def update_if_version(self, record_id: str, expected_version: int,
+                          commit: bool = True, **kwargs) -> bool:
+        """
+        Conditionally update a record using its optimistic-concurrency version.
+        Issues a single ``UPDATE ... WHERE id = :id AND version = :v`` that also
+        bumps the version, so no row lock is held between read and write.
+        
+        The model must define an integer ``version`` column. Instances of the
+        record already loaded in the session are not refreshed; callers that
+        keep using them should refresh or expire them.
+        
+        Args:
+            record_id: The ID of the record to update
+            expected_version: Version the caller read before computing kwargs
+            commit: Commit the transaction after the update
+            **kwargs: Field values to update
+            
+        Returns:
+            bool: True if the update was applied, False if the record is missing
+                  or its version no longer matches
+            
+        Raises:
+            SQLAlchemyError: If database operation fails
+        """
+        values = dict(kwargs)
+        values['version'] = self.model_class.version + 1
+        if hasattr(self.model_class, 'updated_at') and 'updated_at' not in values:
+            values['updated_at'] = datetime.utcnow()
+        
+        try:
+            updated = self.db_session.query(self.model_class).filter(
+                self.model_class.id == record_id,
+                self.model_class.version == expected_version
+            ).update(values, synchronize_session=False)
+            
+            if commit:
+                self.db_session.commit()
+            return updated == 1
+        except SQLAlchemyError as e:
+            self.db_session.rollback()
+            raise e
+    
+    def run_with_version_retry(self, operation: Callable[[], R],
+                               max_attempts: Optional[int] = None) -> R:
+        """
+        Run an optimistic read-modify-write operation, retrying on conflicts.
+        The operation raises ConcurrentUpdateError when its version-checked
+        update loses a race; the transaction is then rolled back (discarding the
+        stale snapshot) and the operation is re-run after a short jittered pause.
+        
+        Args:
+            operation: Callable performing one read-modify-write attempt
+            max_attempts: Maximum attempts (defaults to VERSION_RETRY_ATTEMPTS)
+            
+        Returns:
+            R: Return value of the first successful attempt
+            
+        Raises:
+            ConcurrentUpdateError: If every attempt conflicted
+        """
+        attempts = max_attempts or self.VERSION_RETRY_ATTEMPTS
+        for attempt in range(1, attempts + 1):
+            try:
+                return operation()
+            except ConcurrentUpdateError:
+                self.db_session.rollback()
+                if attempt == attempts:
+                    raise
+                time.sleep(random.uniform(0, 0.005 * attempt))
+    
+    def update_with_retry(self, record_id: str,
+                          mutator: Callable[[T], Optional[Dict[str, Any]]],
+                          max_attempts: Optional[int] = None) -> Optional[T]:
+        """
+        Apply a state transition with optimistic concurrency control.
+        Reads the record, asks the mutator for the new field values and writes
+        them with update_if_version; on a version conflict the record is re-read
+        and the mutator re-evaluated against the fresh state.
+        
+        Args:
+            record_id: The ID of the record to update
+            mutator: Receives the current instance and returns the field values
+                     to write, or None to leave the record unchanged
+            max_attempts: Maximum attempts (defaults to VERSION_RETRY_ATTEMPTS)
+            
+        Returns:
+            Optional[T]: Current model instance if found, None otherwise
+            
+        Raises:
+            ConcurrentUpdateError: If every attempt conflicted
+            SQLAlchemyError: If database operation fails
+        """
+        attempts = max_attempts or self.VERSION_RETRY_ATTEMPTS
+        
+        def attempt() -> Optional[T]:
+            instance = self.find_by_id(record_id)
+            if not instance:
+                return None
+            
+            values = mutator(instance)
+            if values is None:
+                return instance
+            
+            if not self.update_if_version(record_id, instance.version, **values):
+                raise ConcurrentUpdateError(self.model_class.__name__, record_id, attempts)
+            
+            self.db_session.refresh(instance)
+            return instance
+        
+        return self.run_with_version_retry(attempt, max_attempts=attempts)
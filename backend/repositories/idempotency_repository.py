@@ -0,0 +1,162 @@
+"""
+IdempotencyRepository for storing Idempotency-Key records.
+Provides atomic acquisition of keys and storage of replayable responses.
+"""
+from typing import Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from repositories.base import BaseRepository
+from models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyRepository(BaseRepository[IdempotencyKey]):
+    """
+    Repository for IdempotencyKey model.
+    Each method commits on its own so that the key state is visible to other
+    workers independently of the request's business transaction.
+    """
+    
+    def __init__(self, db_session: Session):
+        """
+        Initialize IdempotencyRepository.
+        
+        Args:
+            db_session: SQLAlchemy database session
+        """
+        super().__init__(IdempotencyKey, db_session)
+    
+    def find_by_key_hash(self, key_hash: str) -> Optional[IdempotencyKey]:
+        """
+        Find a record by its scoped key hash.
+        
+        Args:
+            key_hash: Hash of user, endpoint and client key
+            
+        Returns:
+            Optional[IdempotencyKey]: Record if found, None otherwise
+        """
+        return self.db_session.query(IdempotencyKey).filter(
+            IdempotencyKey.key_hash == key_hash
+        ).first()
+    
+    def try_acquire(self, key_hash: str, request_fingerprint: str,
+                    ttl_seconds: int, lock_timeout_seconds: int) -> Tuple[bool, Optional[IdempotencyKey]]:
+        """
+        Claim a key for processing.
+        A new key is inserted; an expired key, or one whose original request
+        was abandoned mid-flight, is taken over with a conditional UPDATE.
+        
+        Args:
+            key_hash: Hash of user, endpoint and client key
+            request_fingerprint: Hash of the request
+            ttl_seconds: How long the stored response stays replayable
+            lock_timeout_seconds: Age after which an unfinished claim is abandoned
+            
+        Returns:
+            Tuple[bool, Optional[IdempotencyKey]]: (acquired, existing record
+            when not acquired)
+        """
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        
+        try:
+            self.db_session.add(IdempotencyKey(
+                key_hash=key_hash,
+                request_fingerprint=request_fingerprint,
+                expires_at=expires_at
+            ))
+            self.db_session.commit()
+            return True, None
+        except IntegrityError:
+            self.db_session.rollback()
+        
+        stale_before = now - timedelta(seconds=lock_timeout_seconds)
+        taken_over = self.db_session.query(IdempotencyKey).filter(
+            IdempotencyKey.key_hash == key_hash,
+            or_(
+                IdempotencyKey.expires_at < now,
+                and_(
+                    IdempotencyKey.response_status_code.is_(None),
+                    IdempotencyKey.updated_at < stale_before
+                )
+            )
+        ).update(
+            {
+                IdempotencyKey.request_fingerprint: request_fingerprint,
+                IdempotencyKey.response_status_code: None,
+                IdempotencyKey.response_body: None,
+                IdempotencyKey.response_content_type: None,
+                IdempotencyKey.expires_at: expires_at,
+                IdempotencyKey.updated_at: now
+            },
+            synchronize_session=False
+        )
+        self.db_session.commit()
+        
+        if taken_over:
+            return True, None
+        
+        return False, self.find_by_key_hash(key_hash)
+    
+    def save_response(self, key_hash: str, status_code: int,
+                      body: str, content_type: str) -> None:
+        """
+        Store the response of a completed request.
+        
+        Args:
+            key_hash: Hash of user, endpoint and client key
+            status_code: HTTP status code of the response
+            body: Serialized response body
+            content_type: Response content type
+        """
+        self.db_session.query(IdempotencyKey).filter(
+            IdempotencyKey.key_hash == key_hash
+        ).update(
+            {
+                IdempotencyKey.response_status_code: status_code,
+                IdempotencyKey.response_body: body,
+                IdempotencyKey.response_content_type: content_type,
+                IdempotencyKey.updated_at: datetime.utcnow()
+            },
+            synchronize_session=False
+        )
+        self.db_session.commit()
+    
+    def release(self, key_hash: str) -> None:
+        """
+        Drop an unfinished claim so the client can retry the request.
+        
+        Args:
+            key_hash: Hash of user, endpoint and client key
+        """
+        self.db_session.query(IdempotencyKey).filter(
+            IdempotencyKey.key_hash == key_hash,
+            IdempotencyKey.response_status_code.is_(None)
+        ).delete(synchronize_session=False)
+        self.db_session.commit()
+    
+    def delete_expired(self, limit: int = 1000) -> int:
+        """
+        Delete expired records.
+        
+        Args:
+            limit: Maximum number of records to delete
+            
+        Returns:
+            int: Number of records deleted
+        """
+        expired_ids = [
+            row.id for row in self.db_session.query(IdempotencyKey.id).filter(
+                IdempotencyKey.expires_at < datetime.utcnow()
+            ).limit(limit).all()
+        ]
+        if not expired_ids:
+            return 0
+        
+        deleted = self.db_session.query(IdempotencyKey).filter(
+            IdempotencyKey.id.in_(expired_ids)
+        ).delete(synchronize_session=False)
+        self.db_session.commit()
+        return deleted
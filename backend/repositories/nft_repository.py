@@ -4,7 +4,9 @@ Provides specialized queries for NFT operations.
 
 Requirements: 3.4, 4.2, 4.3
 """
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from models.nft_mint import NFTMint, NFTMintStatus
 from repositories.base import BaseRepository
@@ -148,6 +150,66 @@ class NFTRepository(BaseRepository[NFTMint]):
         kwargs['status'] = status
         return self.update(nft_id, **kwargs)
     
+    def bulk_create(self, records: List[Dict[str, Any]]) -> List[NFTMint]:
+        """
+        Insert several NFT mint records in one batch.
+        Does not commit; the caller owns the transaction.
+        
+        Args:
+            records: Column values of each record
+            
+        Returns:
+            List[NFTMint]: Created records with IDs assigned
+        """
+        nft_mints = [NFTMint(**record) for record in records]
+        self.db_session.add_all(nft_mints)
+        self.db_session.flush()
+        return nft_mints
+    
+    def bulk_update_status(self, nft_ids: List[str], status: NFTMintStatus) -> int:
+        """
+        Set the status of several NFT mint records with a single UPDATE.
+        Does not commit; the caller owns the transaction.
+        
+        Args:
+            nft_ids: IDs of the NFT mint records
+            status: The new status
+            
+        Returns:
+            int: Number of records updated
+        """
+        if not nft_ids:
+            return 0
+        
+        return self.db_session.query(NFTMint).filter(
+            NFTMint.id.in_(nft_ids)
+        ).update(
+            {NFTMint.status: status, NFTMint.updated_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+    
+    def bulk_update_results(self, results: List[Dict[str, Any]]) -> int:
+        """
+        Write per-record mint results in one executemany UPDATE by primary key.
+        Does not commit; the caller owns the transaction.
+        
+        Args:
+            results: Dicts with 'id' and the columns to set (status,
+                     nft_object_id, transaction_digest, offer_id, error_message)
+            
+        Returns:
+            int: Number of records written
+        """
+        if not results:
+            return 0
+        
+        now = datetime.utcnow()
+        self.db_session.execute(
+            update(NFTMint),
+            [dict(result, updated_at=now) for result in results]
+        )
+        return len(results)
+    
     def count_by_status(self, status: NFTMintStatus) -> int:
         """
         Count NFTs with a specific status.
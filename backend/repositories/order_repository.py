@@ -4,9 +4,12 @@ Provides methods for order CRUD operations and status management.
 
 Requirements: 5.3, 5.4, 5.6
 """
-from typing import Optional, List
+from typing import Optional, List, Dict
+from datetime import datetime
+from sqlalchemy import func, case, or_
 from sqlalchemy.orm import Session, joinedload
 from repositories.base import BaseRepository
+from exceptions import ConcurrentUpdateError
 from models.order import Order, OrderItem, OrderStatus
 
 
@@ -83,18 +86,141 @@ class OrderRepository(BaseRepository[Order]):
         
         return query.all()
     
-    def update_status(self, order_id: str, status: OrderStatus) -> Optional[Order]:
+    def update_status(self, order_id: str, status: OrderStatus,
+                      expected_version: Optional[int] = None,
+                      commit: bool = True) -> Optional[Order]:
         """
-        Update the status of an order.
+        Update the status of an order with a version-checked UPDATE.
+        Without expected_version the current version is read and the update is
+        retried on conflicts, so concurrent writers never overwrite each other
+        silently; with expected_version a single attempt is made.
         
         Args:
             order_id: The order ID to update
             status: The new status
+            expected_version: Version the caller based its decision on
+            commit: Commit after a version-checked update (ignored without
+                    expected_version, where every attempt commits)
             
         Returns:
             Optional[Order]: Updated order if found, None otherwise
+            
+        Raises:
+            ConcurrentUpdateError: If the order was modified concurrently
+        """
+        if expected_version is None:
+            return self.update_with_retry(
+                order_id,
+                lambda order: None if order.status == status else {'status': status}
+            )
+        
+        if not self.update_if_version(order_id, expected_version, commit=commit, status=status):
+            if not self.exists(order_id):
+                return None
+            raise ConcurrentUpdateError('Order', order_id)
+        
+        order = self.find_by_id(order_id)
+        self.db_session.refresh(order)
+        return order
+    
+    def find_expired_pending_ids(self, cutoff: datetime, limit: int) -> List[str]:
+        """
+        Find IDs of pending orders created before the cutoff.
+        Walks the (status, created_at) index oldest-first and locks the
+        selected rows, skipping rows already locked by another reaper.
+        
+        Args:
+            cutoff: Orders created before this time are considered expired
+            limit: Maximum number of IDs to return
+            
+        Returns:
+            List[str]: IDs of expired pending orders
+        """
+        rows = self.db_session.query(Order.id).filter(
+            Order.status == OrderStatus.PENDING,
+            Order.created_at < cutoff
+        ).order_by(Order.created_at.asc()).limit(limit).with_for_update(
+            skip_locked=True
+        ).all()
+        
+        return [row.id for row in rows]
+    
+    def mark_expired(self, order_ids: List[str]) -> int:
+        """
+        Mark pending orders as expired with a single UPDATE.
+        Orders that left the pending status in the meantime are not touched.
+        Does not commit; the caller owns the transaction.
+        
+        Args:
+            order_ids: IDs of the orders to expire
+            
+        Returns:
+            int: Number of orders updated
+        """
+        if not order_ids:
+            return 0
+        
+        return self.db_session.query(Order).filter(
+            Order.id.in_(order_ids),
+            Order.status == OrderStatus.PENDING
+        ).update(
+            {
+                Order.status: OrderStatus.EXPIRED,
+                Order.version: Order.version + 1,
+                Order.updated_at: datetime.utcnow()
+            },
+            synchronize_session=False
+        )
+    
+    def find_total_amounts(self, order_ids: List[str]) -> Dict[str, int]:
         """
-        return self.update(order_id, status=status)
+        Get the total amounts of several orders with a single query.
+        
+        Args:
+            order_ids: IDs of the orders to look up
+            
+        Returns:
+            Dict[str, int]: Mapping of order ID to total amount (missing IDs omitted)
+        """
+        if not order_ids:
+            return {}
+        
+        rows = self.db_session.query(Order.id, Order.total_amount).filter(
+            Order.id.in_(order_ids)
+        ).all()
+        return {order_id: total_amount for order_id, total_amount in rows}
+    
+    def confirm_xrpl_payments(self, tx_hashes: Dict[str, str]) -> int:
+        """
+        Mark orders as paid on XRPL with a single UPDATE.
+        Only pending/processing orders whose XRPL payment is not yet completed
+        are touched, so replayed ledger messages are harmless.
+        Does not commit; the caller owns the transaction.
+        
+        Args:
+            tx_hashes: Mapping of order ID to the paying transaction hash
+            
+        Returns:
+            int: Number of orders updated
+        """
+        if not tx_hashes:
+            return 0
+        
+        return self.db_session.query(Order).filter(
+            Order.id.in_(list(tx_hashes.keys())),
+            Order.status.in_([OrderStatus.PENDING, OrderStatus.PROCESSING]),
+            or_(Order.payment_status.is_(None), Order.payment_status != 'completed')
+        ).update(
+            {
+                Order.status: OrderStatus.COMPLETED,
+                Order.payment_method: 'xrpl',
+                Order.payment_status: 'completed',
+                Order.payment_tx_hash: case(tx_hashes, value=Order.id),
+                Order.version: Order.version + 1,
+                Order.updated_at: datetime.utcnow()
+            },
+            synchronize_session=False
+        )
     
     def create_order_item(self, order_id: str, product_id: str, 
                          quantity: int, unit_price: int, subtotal: int) -> OrderItem:
@@ -197,6 +323,28 @@ class OrderItemRepository(BaseRepository[OrderItem]):
             OrderItem.order_id == order_id
         ).all()
     
+    def sum_quantities_by_product(self, order_ids: List[str]) -> Dict[str, int]:
+        """
+        Sum item quantities per product across several orders.
+        
+        Args:
+            order_ids: The order IDs to aggregate
+            
+        Returns:
+            Dict[str, int]: Mapping of product ID to total quantity
+        """
+        if not order_ids:
+            return {}
+        
+        rows = self.db_session.query(
+            OrderItem.product_id,
+            func.sum(OrderItem.quantity)
+        ).filter(
+            OrderItem.order_id.in_(order_ids)
+        ).group_by(OrderItem.product_id).all()
+        
+        return {product_id: int(quantity) for product_id, quantity in rows}
+    
     def find_by_product(self, product_id: str) -> List[OrderItem]:
         """
         Find all order items for a specific product.
@@ -7,6 +7,7 @@ Requirements: 5.5, 5.6
 from typing import Optional, List
 from sqlalchemy.orm import Session
 from repositories.base import BaseRepository
+from exceptions import ConcurrentUpdateError
 from models.payment import Payment, PaymentStatus
 
 
@@ -73,18 +74,42 @@ class PaymentRepository(BaseRepository[Payment]):
         
         return query.all()
     
-    def update_status(self, payment_id: str, status: PaymentStatus) -> Optional[Payment]:
+    def update_status(self, payment_id: str, status: PaymentStatus,
+                      expected_version: Optional[int] = None,
+                      commit: bool = True) -> Optional[Payment]:
         """
-        Update the status of a payment.
+        Update the status of a payment with a version-checked UPDATE.
+        Without expected_version the current version is read and the update is
+        retried on conflicts, so concurrent writers never overwrite each other
+        silently; with expected_version a single attempt is made.
         
         Args:
             payment_id: The payment ID to update
             status: The new status
+            expected_version: Version the caller based its decision on
+            commit: Commit after a version-checked update (ignored without
+                    expected_version, where every attempt commits)
             
         Returns:
             Optional[Payment]: Updated payment if found, None otherwise
+            
+        Raises:
+            ConcurrentUpdateError: If the payment was modified concurrently
         """
-        return self.update(payment_id, status=status)
+        if expected_version is None:
+            return self.update_with_retry(
+                payment_id,
+                lambda payment: None if payment.status == status else {'status': status}
+            )
+        
+        if not self.update_if_version(payment_id, expected_version, commit=commit, status=status):
+            if not self.exists(payment_id):
+                return None
+            raise ConcurrentUpdateError('Payment', payment_id)
+        
+        payment = self.find_by_id(payment_id)
+        self.db_session.refresh(payment)
+        return payment
     
     def update_status_by_stripe_intent(self, stripe_payment_intent_id: str, 
                                        status: PaymentStatus) -> Optional[Payment]:
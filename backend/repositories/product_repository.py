@@ -5,8 +5,9 @@ Provides specialized queries for product operations.
 Requirements: 3.4, 4.2, 4.3
 """
 from typing import List, Optional, Dict, Any
+from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, case
 from models.product import Product
 from repositories.base import BaseRepository
 
@@ -203,6 +204,32 @@ class ProductRepository(BaseRepository[Product]):
         
         return self.update(product_id, stock_quantity=new_quantity)
     
+    def restore_stock_bulk(self, quantities: Dict[str, int]) -> int:
+        """
+        Add stock back to several products with a single grouped UPDATE.
+        Does not commit; the caller owns the transaction.
+        
+        Args:
+            quantities: Mapping of product ID to quantity to add back
+            
+        Returns:
+            int: Number of product rows updated
+        """
+        if not quantities:
+            return 0
+        
+        increment = case(quantities, value=Product.id, else_=0)
+        
+        return self.db_session.query(Product).filter(
+            Product.id.in_(list(quantities.keys()))
+        ).update(
+            {
+                Product.stock_quantity: Product.stock_quantity + increment,
+                Product.updated_at: datetime.utcnow()
+            },
+            synchronize_session=False
+        )
+    
     def check_stock_availability(self, product_id: str, 
                                  required_quantity: int) -> bool:
         """
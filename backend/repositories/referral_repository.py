@@ -0,0 +1,47 @@
+"""
+ReferralRepository for managing referral data access.
+"""
+from typing import Dict
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from repositories.base import BaseRepository
+from models.referral import Referral, ReferralStatus
+
+
+class ReferralRepository(BaseRepository[Referral]):
+    """
+    Repository for Referral model.
+    Referral status transitions use the version-checked helpers of BaseRepository.
+    """
+    
+    def __init__(self, db_session: Session):
+        """
+        Initialize ReferralRepository.
+        
+        Args:
+            db_session: SQLAlchemy database session
+        """
+        super().__init__(Referral, db_session)
+    
+    def get_stats_by_status(self, referrer_id: str) -> Dict[ReferralStatus, Dict[str, int]]:
+        """
+        Count a referrer's referrals and sum their awarded coins per status
+        with one grouped query over idx_referrer_status.
+        
+        Args:
+            referrer_id: Referrer user ID
+            
+        Returns:
+            Dict[ReferralStatus, Dict[str, int]]: {'count', 'coins'} per status
+                                                  (statuses without referrals are omitted)
+        """
+        rows = self.db_session.execute(
+            select(
+                Referral.status,
+                func.count(),
+                func.coalesce(func.sum(Referral.coins_awarded), 0)
+            )
+            .where(Referral.referrer_id == referrer_id)
+            .group_by(Referral.status)
+        ).all()
+        return {status: {'count': count, 'coins': int(coins)} for status, count, coins in rows}
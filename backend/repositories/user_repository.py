@@ -5,6 +5,7 @@ Provides custom queries for finding users by Google ID and email.
 Requirements: 1.2, 1.3
 """
 from typing import Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from models.user import User
 from repositories.base import BaseRepository
@@ -110,3 +111,29 @@ class UserRepository(BaseRepository[User]):
                 User.google_id == google_id
             ).exists()
         ).scalar()
+    
+    def increment_coins(self, user_id: str, amount: int) -> Optional[int]:
+        """
+        Atomically add coins to a user's balance.
+        Uses ``coins = coins + :amount`` so concurrent awards never overwrite
+        each other. Does not commit; the caller owns the transaction.
+        
+        Args:
+            user_id: The user ID to credit
+            amount: Number of coins to add (negative to debit)
+            
+        Returns:
+            Optional[int]: Balance after the increment, None if user not found
+        """
+        updated = self.db_session.query(User).filter(
+            User.id == user_id
+        ).update(
+            {User.coins: func.coalesce(User.coins, 0) + amount},
+            synchronize_session=False
+        )
+        if not updated:
+            return None
+        
+        return self.db_session.query(User.coins).filter(
+            User.id == user_id
+        ).scalar()
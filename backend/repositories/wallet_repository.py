@@ -4,7 +4,7 @@ Provides custom queries for finding wallets by user and address.
 
 Requirements: 1.3
 """
-from typing import Optional, List
+from typing import Dict, Optional, List
 from sqlalchemy.orm import Session
 from models.wallet import Wallet
 from repositories.base import BaseRepository
@@ -42,6 +42,26 @@ class WalletRepository(BaseRepository[Wallet]):
             Wallet.user_id == user_id
         ).first()
     
+    def find_by_user_ids(self, user_ids: List[str]) -> Dict[str, Wallet]:
+        """
+        Find the wallets of several users with a single query.
+        
+        Args:
+            user_ids: Users' unique identifiers
+            
+        Returns:
+            Dict[str, Wallet]: Wallet per user ID (users without a wallet are absent)
+        """
+        if not user_ids:
+            return {}
+        
+        wallets = {}
+        for wallet in self.db_session.query(Wallet).filter(
+            Wallet.user_id.in_(user_ids)
+        ).order_by(Wallet.created_at.asc()):
+            wallets.setdefault(wallet.user_id, wallet)
+        return wallets
+    
     def find_by_address(self, address: str) -> Optional[Wallet]:
         """
         Find a wallet by its blockchain address.
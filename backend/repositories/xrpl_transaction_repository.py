@@ -0,0 +1,172 @@
+"""
+XRPLTransactionRepository for the locally indexed XRPL ledger history.
+Provides bulk ingestion of account_tx pages and indexed lookups that replace
+per-hash Tx requests against the ledger.
+"""
+from typing import Optional, List, Dict, Any, Set
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from repositories.base import BaseRepository
+from models.xrpl_transaction import XRPLTransaction, XRPLIndexCheckpoint
+
+
+class XRPLTransactionRepository(BaseRepository[XRPLTransaction]):
+    """
+    Repository for XRPLTransaction model.
+    """
+    
+    def __init__(self, db_session: Session):
+        """
+        Initialize XRPLTransactionRepository.
+        
+        Args:
+            db_session: SQLAlchemy database session
+        """
+        super().__init__(XRPLTransaction, db_session)
+    
+    def find_by_hash(self, tx_hash: str) -> Optional[XRPLTransaction]:
+        """
+        Find an indexed transaction by its hash.
+        
+        Args:
+            tx_hash: XRPL transaction hash
+            
+        Returns:
+            Optional[XRPLTransaction]: Transaction if indexed, None otherwise
+        """
+        return self.db_session.query(XRPLTransaction).filter(
+            XRPLTransaction.tx_hash == tx_hash.upper()
+        ).first()
+    
+    def find_existing_hashes(self, tx_hashes: List[str]) -> Set[str]:
+        """
+        Return which of the given hashes are already indexed.
+        
+        Args:
+            tx_hashes: Transaction hashes to check
+            
+        Returns:
+            Set[str]: Hashes already present
+        """
+        if not tx_hashes:
+            return set()
+        
+        rows = self.db_session.query(XRPLTransaction.tx_hash).filter(
+            XRPLTransaction.tx_hash.in_(tx_hashes)
+        ).all()
+        return {row[0] for row in rows}
+    
+    def bulk_insert(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Insert transactions that are not indexed yet.
+        Does not commit; the caller owns the transaction.
+        
+        Args:
+            records: Column values of each transaction
+            
+        Returns:
+            int: Number of transactions inserted
+        """
+        existing = self.find_existing_hashes([record['tx_hash'] for record in records])
+        
+        new_records = {}
+        for record in records:
+            if record['tx_hash'] not in existing:
+                new_records[record['tx_hash']] = record
+        
+        self.db_session.add_all(XRPLTransaction(**record) for record in new_records.values())
+        self.db_session.flush()
+        return len(new_records)
+    
+    def find_by_account(self, account: str, transaction_type: Optional[str] = None,
+                        min_ledger_index: Optional[int] = None,
+                        limit: Optional[int] = None) -> List[XRPLTransaction]:
+        """
+        Find transactions sent or received by an account, newest first.
+        
+        Args:
+            account: XRPL address
+            transaction_type: Optional transaction type filter (e.g. 'EscrowFinish')
+            min_ledger_index: Only transactions in this ledger or later
+            limit: Maximum number of records to return
+            
+        Returns:
+            List[XRPLTransaction]: Matching transactions
+        """
+        query = self.db_session.query(XRPLTransaction).filter(
+            or_(XRPLTransaction.account == account, XRPLTransaction.destination == account)
+        )
+        
+        if transaction_type is not None:
+            query = query.filter(XRPLTransaction.transaction_type == transaction_type)
+        if min_ledger_index is not None:
+            query = query.filter(XRPLTransaction.ledger_index >= min_ledger_index)
+        
+        query = query.order_by(XRPLTransaction.ledger_index.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        
+        return query.all()
+    
+    def find_by_memo(self, memo: str) -> List[XRPLTransaction]:
+        """
+        Find transactions carrying a memo (e.g. ``order:<id>``).
+        
+        Args:
+            memo: Decoded memo text
+            
+        Returns:
+            List[XRPLTransaction]: Matching transactions, oldest first
+        """
+        return self.db_session.query(XRPLTransaction).filter(
+            XRPLTransaction.memo == memo
+        ).order_by(XRPLTransaction.ledger_index.asc()).all()
+
+
+class XRPLIndexCheckpointRepository(BaseRepository[XRPLIndexCheckpoint]):
+    """
+    Repository for XRPLIndexCheckpoint model.
+    """
+    
+    def __init__(self, db_session: Session):
+        """
+        Initialize XRPLIndexCheckpointRepository.
+        
+        Args:
+            db_session: SQLAlchemy database session
+        """
+        super().__init__(XRPLIndexCheckpoint, db_session)
+    
+    def find_by_account(self, account: str) -> Optional[XRPLIndexCheckpoint]:
+        """
+        Find the checkpoint of an account.
+        
+        Args:
+            account: XRPL address
+            
+        Returns:
+            Optional[XRPLIndexCheckpoint]: Checkpoint if the account was indexed before
+        """
+        return self.db_session.query(XRPLIndexCheckpoint).filter(
+            XRPLIndexCheckpoint.account == account
+        ).first()
+    
+    def get_or_create(self, account: str, start_ledger_index: int = 0) -> XRPLIndexCheckpoint:
+        """
+        Get the checkpoint of an account, creating it on first use.
+        
+        Args:
+            account: XRPL address
+            start_ledger_index: First ledger to index for a new account (0 = earliest available)
+            
+        Returns:
+            XRPLIndexCheckpoint: Checkpoint of the account
+        """
+        checkpoint = self.find_by_account(account)
+        if checkpoint:
+            return checkpoint
+        
+        return self.create(
+            account=account,
+            last_ledger_index=max(start_ledger_index - 1, 0)
+        )
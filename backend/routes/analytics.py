@@ -0,0 +1,74 @@
+"""
+Analytics Blueprint for Airzone API.
+Serves DAU/MAU and download metrics from the activity rollup tables.
+"""
+from datetime import date, timedelta
+from flask import Blueprint, request, jsonify, g
+from middleware.auth import require_admin
+from services.activity_rollup_service import ActivityRollupService
+import logging
+
+logger = logging.getLogger(__name__)
+
+analytics_blueprint = Blueprint('analytics', __name__)
+
+
+@analytics_blueprint.route('/summary', methods=['GET'])
+@require_admin
+def get_summary(current_user):
+    """
+    Get DAU, MAU, engagement rate and download counts.
+    
+    Values come from the rollup tables maintained by scripts/roll_up_activities.py,
+    so they lag the raw activities by up to one rollup interval.
+    
+    Query Parameters:
+        days: Length of the daily trends (default: 7, max: 90)
+    
+    Response:
+        {
+            "status": "success",
+            "data": {
+                "dau": 120,
+                "mau": 1500,
+                "engagement_rate": 8.0,
+                "downloads_today": 42,
+                "downloads_in_period": 310,
+                "dau_trend": [{"date": "2024-01-01", "users": 110, "events": 180}, ...],
+                "download_trend": [{"date": "2024-01-01", "users": 30, "events": 45}, ...],
+                "downloads_by_product": {"<product_id>": 120, ...}
+            }
+        }
+    """
+    try:
+        days = min(max(request.args.get('days', 7, type=int), 1), 90)
+        today = date.today()
+        start_date = today - timedelta(days=days - 1)
+        
+        rollup_service = ActivityRollupService(g.db)
+        dau = rollup_service.get_active_users(today, today)
+        mau = rollup_service.get_monthly_active_users(today)
+        downloads_today = rollup_service.get_download_counts(today, today)
+        downloads_in_period = rollup_service.get_download_counts(start_date, today)
+        
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'dau': dau,
+                'mau': mau,
+                'engagement_rate': round(dau / mau * 100, 1) if mau else 0.0,
+                'downloads_today': downloads_today['total'],
+                'downloads_in_period': downloads_in_period['total'],
+                'dau_trend': rollup_service.get_daily_series(start_date, today),
+                'download_trend': rollup_service.get_daily_series(start_date, today, activity_type='download'),
+                'downloads_by_product': downloads_in_period['by_product'],
+            }
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error getting analytics summary: {str(e)}", exc_info=True)
+        return jsonify({
+            'status': 'error',
+            'error': 'Failed to get analytics summary',
+            'code': 500
+        }), 500
@@ -2,10 +2,11 @@
 Batch Transfer API Routes
 XRPLのBatch Transactions機能を使った一括送金API
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from services.batch_transfer_service import BatchTransferService
 from clients.xrpl_client import XRPLClient
 from middleware.auth import require_admin
+from models.user import IMPORTANCE_LEVEL_RANKS
 import os
 import logging
 
@@ -74,22 +75,27 @@ def send_batch_to_vip(current_user):
     
     Request Body:
         {
-            "min_importance_level": "Gold",
+            "min_importance_level": "gold",
             "amount_xrp": 10.0,
-            "reason": "VIP monthly reward"
+            "reason": "VIP monthly reward",
+            "run_id": "uuid"  // 任意: 失敗した実行の再開
         }
+    
+    min_importance_level は大文字小文字を区別しない（"Gold" も可）
+    run_id を指定すると、その実行の条件で送信済みのユーザーを飛ばして続きから送信する
     """
     try:
         data = request.get_json()
         
-        min_importance_level = data.get('min_importance_level', 'Bronze')
+        min_importance_level = str(data.get('min_importance_level', 'bronze')).lower()
         amount_xrp = data.get('amount_xrp')
         reason = data.get('reason', 'VIP reward')
+        run_id = data.get('run_id')
         
-        if not amount_xrp or amount_xrp <= 0:
+        if not run_id and (not amount_xrp or amount_xrp <= 0):
             return jsonify({'error': 'Valid amount_xrp is required'}), 400
         
-        valid_levels = ['Bronze', 'Silver', 'Gold', 'Platinum', 'Diamond']
+        valid_levels = list(IMPORTANCE_LEVEL_RANKS)
         if min_importance_level not in valid_levels:
             return jsonify({'error': f'Invalid importance level. Must be one of: {valid_levels}'}), 400
         
@@ -101,7 +107,8 @@ def send_batch_to_vip(current_user):
             sender_wallet_seed=xrpl_sponsor_seed,
             min_importance_level=min_importance_level,
             amount_xrp=amount_xrp,
-            reason=reason
+            reason=reason,
+            run_id=run_id
         )
         
         return jsonify(result), 200
@@ -145,7 +152,8 @@ def send_batch_to_top_referrers(current_user):
             sender_wallet_seed=xrpl_sponsor_seed,
             top_n=top_n,
             amount_xrp=amount_xrp,
-            reason=reason
+            reason=reason,
+            db_session=g.db
         )
         
         return jsonify(result), 200
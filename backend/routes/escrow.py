@@ -6,6 +6,7 @@ from sqlalchemy import text
 from middleware.auth import jwt_required, get_current_user
 from services.escrow_campaign_service import EscrowCampaignService
 from clients.xrpl_client import XRPLClient
+from tasks.task_manager import TaskManager
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,6 +19,8 @@ def get_campaigns():
     """
     アクティブなキャンペーン一覧を取得
     
+    一覧はプロセス内にキャッシュされ、ETag を返す。If-None-Match が一致すれば 304。
+    
     Response:
         {
             "status": "success",
@@ -27,38 +30,18 @@ def get_campaigns():
         }
     """
     try:
-        result = g.db.execute(
-            text("""
-            SELECT * FROM escrow_campaigns 
-            WHERE is_active = TRUE 
-            AND start_date <= NOW() 
-            AND end_date >= NOW()
-            ORDER BY created_at DESC
-            """)
-        )
-        campaigns = result.mappings().all()
+        campaigns, etag = EscrowCampaignService(g.db).get_active_campaigns()
         
-        return jsonify({
-            'status': 'success',
-            'campaigns': [
-                {
-                    'id': c['id'],
-                    'name': c['name'],
-                    'description': c['description'],
-                    'min_amount_drops': c['min_amount_drops'],
-                    'lock_days': c['lock_days'],
-                    'nft_reward_name': c['nft_reward_name'],
-                    'nft_reward_description': c['nft_reward_description'],
-                    'nft_reward_image_url': c['nft_reward_image_url'],
-                    'start_date': c['start_date'].isoformat(),
-                    'end_date': c['end_date'].isoformat(),
-                    'max_participants': c['max_participants'],
-                    'current_participants': c['current_participants'],
-                    'status': 'active',
-                }
-                for c in campaigns
-            ]
-        }), 200
+        if etag in request.if_none_match:
+            response = current_app.response_class(status=304)
+        else:
+            response = jsonify({
+                'status': 'success',
+                'campaigns': campaigns
+            })
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
         
     except Exception as e:
         logger.error(f"Error getting campaigns: {str(e)}")
@@ -73,7 +56,10 @@ def get_campaigns():
 @jwt_required
 def create_stake():
     """
-    Escrowステークを作成
+    Escrowステークを作成（非同期）
+    
+    EscrowCreate の送信はバックグラウンドで行われる。進捗は
+    GET /stakes/<escrow_id> の status（submitting → active / failed）で確認する。
     
     Request Body:
         {
@@ -81,12 +67,13 @@ def create_stake():
             "amount_xrp": 100
         }
     
-    Response:
+    Response (202):
         {
             "status": "success",
             "data": {
                 "escrow_id": "uuid",
-                "transaction_hash": "...",
+                "task_id": "uuid",
+                "status": "submitting",
                 "finish_after": 1234567890
             }
         }
@@ -143,7 +130,8 @@ def create_stake():
             sponsor_seed=Config.XRPL_SPONSOR_SEED
         )
         
-        escrow_service = EscrowCampaignService(g.db, xrpl_client)
+        # 参加枠はここで確保し、EscrowCreate の送信に失敗した場合はワーカーが返却する
+        escrow_service = EscrowCampaignService(g.db, xrpl_client, TaskManager(db_session=g.db))
         result = escrow_service.create_campaign_escrow(
             user_id=user_id,
             campaign_id=campaign_id,
@@ -151,17 +139,10 @@ def create_stake():
             lock_days=campaign['lock_days']
         )
         
-        # 参加者数を更新
-        g.db.execute(
-            text("UPDATE escrow_campaigns SET current_participants = current_participants + 1 WHERE id = :id"),
-            {'id': campaign_id}
-        )
-        g.db.commit()
-        
         return jsonify({
             'status': 'success',
             'data': result
-        }), 200
+        }), 202  # 202 Accepted for async operation
         
     except ValueError as e:
         return jsonify({
@@ -178,6 +159,62 @@ def create_stake():
         }), 500
 
 
+@escrow_blueprint.route('/stakes/<escrow_id>', methods=['GET'])
+@jwt_required
+def get_stake(escrow_id):
+    """
+    ステークの作成状況を取得
+    
+    Response:
+        {
+            "status": "success",
+            "data": {
+                "stake": {
+                    "id": "uuid",
+                    "status": "submitting" | "active" | "failed" | "completed",
+                    "transaction_hash": "..." | null,
+                    "error_message": "..." | null,
+                    ...
+                }
+            }
+        }
+    """
+    try:
+        current_user = get_current_user()
+        user_id = current_user['user_id']
+        
+        from config import Config
+        xrpl_client = XRPLClient(
+            network=Config.XRPL_NETWORK,
+            sponsor_seed=Config.XRPL_SPONSOR_SEED
+        )
+        
+        escrow_service = EscrowCampaignService(g.db, xrpl_client)
+        stake = escrow_service.get_stake(user_id, escrow_id)
+        
+        if not stake:
+            return jsonify({
+                'status': 'error',
+                'error': 'Stake not found',
+                'code': 404
+            }), 404
+        
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'stake': stake
+            }
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error getting stake: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'error': 'Failed to get stake',
+            'code': 500
+        }), 500
+
+
 @escrow_blueprint.route('/my-stakes', methods=['GET'])
 @jwt_required
 def get_my_stakes():
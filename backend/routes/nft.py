@@ -5,7 +5,7 @@ Handles NFT minting, retrieval, and status checking endpoints.
 Requirements: 3.1, 3.4, 8.2, 8.6, 8.7
 """
 from flask import Blueprint, request, jsonify, g, current_app
-from middleware.auth import jwt_required, get_current_user
+from middleware.auth import jwt_required, get_current_user, require_admin
 from services.nft_service import NFTService
 from clients.xrpl_client import XRPLClient
 from tasks.task_manager import TaskManager
@@ -269,6 +269,100 @@ def mint_nft():
         }), 500
 
 
+@nft_blueprint.route('/campaigns', methods=['POST'])
+@require_admin
+def mint_campaign(current_user):
+    """
+    Queue an NFT drop to many users (admin only).
+    
+    Headers:
+        Authorization: Bearer <access_token>
+    
+    Request Body:
+        {
+            "user_ids": ["string", ...],
+            "name": "string",
+            "description": "string",
+            "image_url": "string",
+            "metadata": {}  # Optional additional metadata
+        }
+    
+    Response:
+        {
+            "status": "success",
+            "data": {
+                "campaign_id": "string",
+                "task_id": "string",
+                "queued": 0,
+                "skipped_user_ids": []
+            }
+        }
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({
+                'status': 'error',
+                'error': 'Request body is required',
+                'code': 400
+            }), 400
+        
+        user_ids = data.get('user_ids')
+        if not isinstance(user_ids, list) or not user_ids:
+            return jsonify({
+                'status': 'error',
+                'error': 'user_ids must be a non-empty list',
+                'code': 400
+            }), 400
+        
+        for field in ('name', 'description', 'image_url'):
+            if not data.get(field):
+                return jsonify({
+                    'status': 'error',
+                    'error': f'{field} is required',
+                    'code': 400
+                }), 400
+        
+        nft_service = get_nft_service()
+        result = nft_service.mint_campaign(
+            user_ids=[str(user_id) for user_id in user_ids],
+            nft_name=data['name'],
+            nft_description=data['description'],
+            nft_image_url=data['image_url'],
+            metadata=data.get('metadata'),
+            chunk_size=current_app.config.get('NFT_CAMPAIGN_CHUNK_SIZE'),
+            max_workers=current_app.config.get('NFT_CAMPAIGN_MAX_WORKERS')
+        )
+        
+        logger.info(
+            f"NFT campaign queued by admin: {current_user['user_id']}",
+            extra={'campaign_id': result['campaign_id'], 'task_id': result['task_id']}
+        )
+        
+        return jsonify({
+            'status': 'success',
+            'data': result
+        }), 202
+        
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'error': str(e),
+            'code': 400
+        }), 400
+    except Exception as e:
+        logger.error(
+            f"Error queueing NFT campaign: {str(e)}",
+            extra={'error': str(e)},
+            exc_info=True
+        )
+        return jsonify({
+            'status': 'error',
+            'error': 'Failed to queue NFT campaign',
+            'code': 500
+        }), 500
+
+
 @nft_blueprint.route('/<nft_id>', methods=['GET'])
 @jwt_required
 def get_nft_details(nft_id: str):
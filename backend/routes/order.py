@@ -7,6 +7,7 @@ Requirements: 5.1, 5.2, 5.3, 5.4, 8.2, 8.6, 8.7
 import logging
 from flask import Blueprint, request, jsonify, g
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from middleware.idempotency import idempotent
 from middleware.security import validate_json_request, sanitize_query_params, InputValidator
 from services.order_service import OrderService
 from utils.activity_logger import activity_logger
@@ -24,6 +25,7 @@ order_blueprint = Blueprint('order', __name__)
 
 @order_blueprint.route('', methods=['POST'])
 @jwt_required()
+@idempotent()
 @validate_json_request(required_fields=['items'])
 def create_order():
     """
@@ -31,6 +33,9 @@ def create_order():
     
     POST /api/v1/orders
     
+    Headers:
+        Idempotency-Key (optional): Retries with the same key replay the first response
+    
     Request Body:
         {
             "items": [
@@ -7,6 +7,7 @@ Requirements: 5.5, 5.6, 8.2, 8.6, 8.7
 import logging
 from flask import Blueprint, request, jsonify, g, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from middleware.idempotency import idempotent
 from middleware.security import validate_json_request, InputValidator
 from services.payment_service import PaymentService
 from clients.stripe_client import StripeClient
@@ -24,6 +25,7 @@ payment_blueprint = Blueprint('payment', __name__)
 
 @payment_blueprint.route('/intent', methods=['POST'])
 @jwt_required()
+@idempotent()
 @validate_json_request(required_fields=['order_id'])
 def create_payment_intent():
     """
@@ -31,6 +33,9 @@ def create_payment_intent():
     
     POST /api/v1/payments/intent
     
+    Headers:
+        Idempotency-Key (optional): Retries with the same key replay the first response
+    
     Request Body:
         {
             "order_id": "uuid",
@@ -3,7 +3,9 @@ Referral Blueprint for referral system.
 """
 from flask import Blueprint, request, jsonify, g, current_app
 from middleware.auth import jwt_required, get_current_user
+from middleware.rate_limit import get_client_ip, rate_limit
 from services.referral_service import ReferralService
+from services.user_importance_service import UserImportanceService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -128,6 +130,63 @@ def apply_referral():
         }), 500
 
 
+@referral_blueprint.route('/track-click', methods=['POST'])
+@rate_limit(max_requests=30, window_seconds=60)
+def track_referral_click():
+    """
+    紹介リンクのクリックを記録（認証不要、IP ごとに 1 分 30 回まで）
+    
+    Request Body:
+        {
+            "referral_code": "ABC12345"
+        }
+    
+    Response:
+        {
+            "status": "success",
+            "data": {
+                "click_id": "uuid",
+                "referral_code": "ABC12345",
+                "referrer_id": "uuid",
+                "duplicate": false,
+                "dropped": false
+            }
+        }
+    
+    duplicate は同じ訪問者の再クリック、dropped は書き込み待ちのバッファが
+    満杯で記録できなかったクリック（どちらも click_id は null）
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not data or not data.get('referral_code'):
+            return jsonify({
+                'status': 'error',
+                'error': 'referral_code is required',
+                'code': 400
+            }), 400
+        
+        importance_service = UserImportanceService(g.db)
+        click = importance_service.track_referral_click(
+            str(data['referral_code']).strip().upper(),
+            get_client_ip(),
+            request.headers.get('User-Agent', '')
+        )
+        
+        # クリックはバッファ後にまとめて書き込まれる
+        return jsonify({
+            'status': 'success',
+            'data': click
+        }), 202
+        
+    except Exception as e:
+        logger.error(f"Error tracking referral click: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'error': 'Failed to track referral click',
+            'code': 500
+        }), 500
+
+
 @referral_blueprint.route('/stats', methods=['GET'])
 @jwt_required
 def get_referral_stats():
@@ -152,25 +211,9 @@ def get_referral_stats():
         
         referral_service = ReferralService(g.db)
         
-        # 紹介履歴を取得
-        referrals = referral_service.get_user_referrals(user_id)
-        
-        # 統計を計算
-        total = len(referrals)
-        completed = sum(1 for r in referrals if r['status'] == 'completed')
-        pending = sum(1 for r in referrals if r['status'] == 'pending')
-        total_coins_earned = sum(r['coins_awarded'] for r in referrals)
-        current_coins = referral_service.get_user_coins(user_id)
-        
         return jsonify({
             'status': 'success',
-            'data': {
-                'total_referrals': total,
-                'completed_referrals': completed,
-                'pending_referrals': pending,
-                'total_coins_earned': total_coins_earned,
-                'current_coins': current_coins,
-            }
+            'data': referral_service.get_referral_stats(user_id)
         }), 200
         
     except Exception as e:
@@ -7,6 +7,7 @@ Requirements: 5.5, 8.2, 8.6, 8.7
 import logging
 from flask import Blueprint, request, jsonify, g, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from middleware.idempotency import idempotent
 from middleware.security import validate_json_request, InputValidator
 from services.xrpl_payment_service import XRPLPaymentService
 from clients.xrpl_client import XRPLClient
@@ -21,6 +22,25 @@ logger = logging.getLogger(__name__)
 # Create blueprint
 xrpl_payment_blueprint = Blueprint('xrpl_payment', __name__)
 
+# XRPL client shared by all requests of this worker (created on first use)
+_xrpl_client = None
+
+
+def _get_xrpl_client() -> XRPLClient:
+    """
+    Get the worker-wide XRPL client instead of building one per request.
+    
+    Returns:
+        XRPLClient: Client for the configured network and sponsor
+    """
+    global _xrpl_client
+    if _xrpl_client is None:
+        _xrpl_client = XRPLClient(
+            network=current_app.config['XRPL_NETWORK'],
+            sponsor_seed=current_app.config['XRPL_SPONSOR_SEED']
+        )
+    return _xrpl_client
+
 
 @xrpl_payment_blueprint.route('/create', methods=['POST'])
 @jwt_required()
@@ -85,11 +105,7 @@ def create_xrpl_payment():
             raise AuthorizationError("You do not have permission to create payment for this order")
         
         # Create XRPL payment using service
-        xrpl_client = XRPLClient(
-            network=current_app.config['XRPL_NETWORK'],
-            sponsor_seed=current_app.config['XRPL_SPONSOR_SEED']
-        )
-        xrpl_payment_service = XRPLPaymentService(g.db, xrpl_client)
+        xrpl_payment_service = XRPLPaymentService(g.db, _get_xrpl_client())
         
         payment_request = xrpl_payment_service.create_payment_request(
             user_id=user_id,
@@ -141,6 +157,7 @@ def create_xrpl_payment():
 
 @xrpl_payment_blueprint.route('/execute', methods=['POST'])
 @jwt_required()
+@idempotent()
 @validate_json_request(required_fields=['order_id'])
 def execute_xrpl_payment():
     """
@@ -148,6 +165,9 @@ def execute_xrpl_payment():
     
     POST /api/v1/payments/xrpl/execute
     
+    Headers:
+        Idempotency-Key (optional): Retries with the same key replay the first response
+    
     Request Body:
         {
             "order_id": "uuid"
@@ -174,11 +194,7 @@ def execute_xrpl_payment():
             raise ValidationError("Invalid order ID format", field='order_id')
         
         # Execute payment using service
-        xrpl_client = XRPLClient(
-            network=current_app.config['XRPL_NETWORK'],
-            sponsor_seed=current_app.config['XRPL_SPONSOR_SEED']
-        )
-        xrpl_payment_service = XRPLPaymentService(g.db, xrpl_client)
+        xrpl_payment_service = XRPLPaymentService(g.db, _get_xrpl_client())
         
         result = xrpl_payment_service.execute_payment(
             user_id=user_id,
@@ -252,11 +268,7 @@ def check_xrpl_payment(order_id: str):
             raise ValidationError("Invalid order ID format", field='order_id')
         
         # Check payment status using service
-        xrpl_client = XRPLClient(
-            network=current_app.config['XRPL_NETWORK'],
-            sponsor_seed=current_app.config['XRPL_SPONSOR_SEED']
-        )
-        xrpl_payment_service = XRPLPaymentService(g.db, xrpl_client)
+        xrpl_payment_service = XRPLPaymentService(g.db, _get_xrpl_client())
         
         status = xrpl_payment_service.check_payment_status(
             user_id=user_id,
@@ -308,11 +320,7 @@ def verify_xrpl_transaction(transaction_hash: str):
         user_id = get_jwt_identity()
         
         # Verify transaction using service
-        xrpl_client = XRPLClient(
-            network=current_app.config['XRPL_NETWORK'],
-            sponsor_seed=current_app.config['XRPL_SPONSOR_SEED']
-        )
-        xrpl_payment_service = XRPLPaymentService(g.db, xrpl_client)
+        xrpl_payment_service = XRPLPaymentService(g.db, _get_xrpl_client())
         
         transaction = xrpl_payment_service.verify_transaction(transaction_hash)
         
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Finish matured escrow stakes and award their campaign NFTs.
+Escrows the ledger does not accept yet stay active for the next run.
+
+Intended to be run from cron, e.g. every 10 minutes:
+  */10 * * * * cd /var/www/airzone/backend && venv/bin/python scripts/complete_escrows.py
+"""
+import os
+import sys
+import argparse
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from tasks.escrow_tasks import complete_due_escrows
+
+
+def main():
+    """Run one sweep."""
+    parser = argparse.ArgumentParser(description='Finish matured escrow stakes')
+    parser.add_argument('--page-size', type=int, default=None,
+                        help='Escrows per ticket batch')
+    parser.add_argument('--max-pages', type=int, default=None,
+                        help='Maximum number of pages in this run')
+    args = parser.parse_args()
+    
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+    session = sessionmaker(bind=engine)()
+    
+    try:
+        result = complete_due_escrows(
+            session,
+            page_size=args.page_size,
+            max_pages=args.max_pages
+        )
+        print(
+            f"✓ Completed {result['completed_count']} of {result['total_checked']} escrows "
+            f"({result['pages']} pages, {result['error_count']} errors)"
+        )
+        return True
+    except Exception as e:
+        print(f"✗ Escrow sweep failed: {str(e)}")
+        return False
+    finally:
+        session.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Index the sponsor/merchant accounts' XRPL history into xrpl_transactions.
+Resumes from the stored checkpoint, so it is safe to interrupt.
+
+Intended to be run from cron, e.g. every minute:
+  * * * * * cd /var/www/airzone/backend && venv/bin/python scripts/index_ledger_history.py
+"""
+import os
+import sys
+import argparse
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from tasks.ledger_tasks import index_ledger_history
+
+
+def main():
+    """Run one indexing pass."""
+    parser = argparse.ArgumentParser(description='Index XRPL account history')
+    parser.add_argument('--account', action='append', default=None,
+                        help='Account to index (repeatable, defaults to sponsor/merchant)')
+    parser.add_argument('--page-size', type=int, default=None,
+                        help='Transactions per account_tx page')
+    parser.add_argument('--max-pages', type=int, default=None,
+                        help='Maximum pages per account in this run')
+    args = parser.parse_args()
+    
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+    session = sessionmaker(bind=engine)()
+    
+    try:
+        results = index_ledger_history(
+            session,
+            accounts=args.account,
+            page_size=args.page_size,
+            max_pages=args.max_pages
+        )
+        for account, result in results.items():
+            print(
+                f"✓ {account}: {result['inserted']} new transactions "
+                f"({result['pages']} pages, checkpoint ledger {result['last_ledger_index']}"
+                f"{'' if result['complete'] else ', more pending'})"
+            )
+        return True
+    except Exception as e:
+        print(f"✗ Indexing failed: {str(e)}")
+        return False
+    finally:
+        session.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Expire abandoned pending orders and release their reserved stock.
+Also purges expired Idempotency-Key records.
+
+Intended to be run from cron, e.g. every 5 minutes:
+  */5 * * * * cd /var/www/airzone/backend && venv/bin/python scripts/reap_abandoned_orders.py
+"""
+import os
+import sys
+import argparse
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from tasks.order_tasks import reap_abandoned_orders, purge_expired_idempotency_keys
+
+
+def main():
+    """Run one reaper pass."""
+    parser = argparse.ArgumentParser(description='Expire abandoned pending orders')
+    parser.add_argument('--ttl-minutes', type=int, default=None,
+                        help='Pending order TTL in minutes')
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='Orders per batch')
+    parser.add_argument('--max-batches', type=int, default=None,
+                        help='Maximum number of batches in this run')
+    args = parser.parse_args()
+    
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+    session = sessionmaker(bind=engine)()
+    
+    try:
+        result = reap_abandoned_orders(
+            session,
+            ttl_minutes=args.ttl_minutes,
+            batch_size=args.batch_size,
+            max_batches=args.max_batches
+        )
+        print(
+            f"✓ Expired {result['expired_count']} orders "
+            f"({result['restored_units']} units restored, "
+            f"{result['batches']} batches, {result['elapsed_ms']} ms)"
+        )
+        
+        purged = purge_expired_idempotency_keys(session)
+        print(f"✓ Purged {purged} expired idempotency keys")
+        return True
+    except Exception as e:
+        print(f"✗ Reaper failed: {str(e)}")
+        return False
+    finally:
+        session.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
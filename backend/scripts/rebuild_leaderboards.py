@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Rebuild the importance and referral leaderboard snapshots.
+Web processes keep the rankings in memory and sync changed snapshot rows,
+so this is only needed to correct drift.
+
+Intended to be run from cron, e.g. daily:
+  30 4 * * * cd /var/www/airzone/backend && venv/bin/python scripts/rebuild_leaderboards.py
+"""
+import os
+import sys
+import argparse
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from services.leaderboard_service import IMPORTANCE_BOARD, REFERRALS_BOARD
+from tasks.leaderboard_tasks import rebuild_leaderboards
+
+
+def main():
+    """Run one rebuild."""
+    parser = argparse.ArgumentParser(description='Rebuild leaderboard snapshots')
+    parser.add_argument('--board', choices=[IMPORTANCE_BOARD, REFERRALS_BOARD], action='append',
+                        help='Board to rebuild (repeatable; default: all)')
+    args = parser.parse_args()
+    
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+    session = sessionmaker(bind=engine)()
+    
+    try:
+        result = rebuild_leaderboards(session, boards=args.board)
+        for board, count in result.items():
+            print(f"✓ Rebuilt {board} leaderboard ({count} users)")
+        return True
+    except Exception as e:
+        print(f"✗ Leaderboard rebuild failed: {str(e)}")
+        return False
+    finally:
+        session.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
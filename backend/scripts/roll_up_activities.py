@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Roll user_activities up into the DAU/MAU and download aggregates.
+Each run continues where the previous one stopped.
+
+Intended to be run from cron, e.g. every 5 minutes:
+  */5 * * * * cd /var/www/airzone/backend && venv/bin/python scripts/roll_up_activities.py
+"""
+import os
+import sys
+import argparse
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from tasks.analytics_tasks import roll_up_user_activities
+
+
+def main():
+    """Run one rollup."""
+    parser = argparse.ArgumentParser(description='Roll up user activities')
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='Activities per transaction')
+    parser.add_argument('--max-batches', type=int, default=None,
+                        help='Maximum number of batches in this run')
+    args = parser.parse_args()
+    
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+    session = sessionmaker(bind=engine)()
+    
+    try:
+        result = roll_up_user_activities(
+            session,
+            batch_size=args.batch_size,
+            max_batches=args.max_batches
+        )
+        print(
+            f"✓ Rolled up {result['rolled_up']} activities "
+            f"({result['batches']} batches, last id {result['last_activity_id']})"
+        )
+        return True
+    except Exception as e:
+        print(f"✗ Activity rollup failed: {str(e)}")
+        return False
+    finally:
+        session.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Run the XRPL payment listener (push-based confirmation of XRPL order payments).
+
+Long-running process; run it under systemd/supervisor, e.g.:
+  cd /var/www/airzone/backend && venv/bin/python scripts/run_xrpl_payment_listener.py
+"""
+import os
+import sys
+import signal
+import logging
+import argparse
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from clients.xrpl_client import XRPLClient
+from services.xrpl_payment_listener import XRPLPaymentListener
+from tasks.ledger_tasks import watched_accounts
+
+
+def main():
+    """Run the listener until SIGINT/SIGTERM."""
+    parser = argparse.ArgumentParser(description='Confirm XRPL order payments from the ledger stream')
+    parser.add_argument('--url', default=None,
+                        help='WebSocket URL (defaults to XRPL_WEBSOCKET_URL or the network endpoint)')
+    parser.add_argument('--account', action='append', default=[],
+                        help='Additional account to watch (repeatable)')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    
+    accounts = watched_accounts() + args.account
+    
+    websocket_url = (
+        args.url or Config.XRPL_WEBSOCKET_URL or
+        XRPLClient.WEBSOCKET_URLS.get(Config.XRPL_NETWORK)
+    )
+    
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+    
+    try:
+        listener = XRPLPaymentListener(
+            sessionmaker(bind=engine),
+            websocket_url,
+            accounts,
+            batch_size=Config.XRPL_LISTENER_BATCH_SIZE,
+            flush_interval=Config.XRPL_LISTENER_FLUSH_INTERVAL
+        )
+        signal.signal(signal.SIGTERM, lambda signum, frame: listener.stop())
+        signal.signal(signal.SIGINT, lambda signum, frame: listener.stop())
+        
+        listener.run()
+        print(f"✓ Listener stopped: {listener.stats}")
+        return True
+    except Exception as e:
+        print(f"✗ Listener failed: {str(e)}")
+        return False
+    finally:
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
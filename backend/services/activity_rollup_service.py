@@ -0,0 +1,304 @@
+"""
+Activity Rollup Service for DAU/MAU and download metrics.
+user_activities を日次・月次の集計行に増分で畳み込む。
+ユニークユーザー数はマージ可能な HyperLogLog スケッチ、ダウンロード数は
+商品ごとの正確なカウンタで保持するため、DAU/MAU の取得コストは
+イベント数ではなく日数に比例する。
+"""
+from typing import Dict, List, Optional, Tuple
+import json
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from utils.hyperloglog import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityRollupService:
+    """Service for rolling up user activities into daily and monthly aggregates."""
+    
+    # 設定
+    HLL_PRECISION = 14  # 16KB/スケッチ、標準誤差 約0.8%
+    WATERMARK_NAME = 'user_activities'
+    
+    def __init__(self, db_session: Session):
+        """Initialize ActivityRollupService."""
+        self.db_session = db_session
+    
+    def roll_up(self, batch_size: int = 5000, lag_seconds: int = 60, max_batches: Optional[int] = None) -> Dict:
+        """
+        前回の続きから user_activities を集計行に反映
+        
+        id 順に読み進め、集計とウォーターマーク更新を同じトランザクションで
+        コミットするため、各アクティビティはちょうど1回だけ集計される。
+        書き込み途中の行を飛ばさないよう、lag_seconds より新しい行の手前で止まる。
+        
+        Args:
+            batch_size: 1トランザクションで集計するアクティビティ数
+            lag_seconds: 集計対象から外す直近の秒数
+            max_batches: 1回の実行で処理するバッチ数の上限
+        
+        Returns:
+            Dict: 実行結果（rolled_up, batches, last_activity_id）
+        """
+        cutoff = datetime.now() - timedelta(seconds=lag_seconds)
+        rolled_up = 0
+        batches = 0
+        last_id = self._get_watermark()
+        
+        while max_batches is None or batches < max_batches:
+            rows = self.db_session.execute(
+                text("""
+                    SELECT id, user_id, activity_type, metadata, created_at
+                    FROM user_activities
+                    WHERE id > :last_id
+                    ORDER BY id
+                    LIMIT :limit
+                """),
+                {'last_id': last_id, 'limit': batch_size}
+            ).all()
+            
+            fetched = len(rows)
+            # 直近の行は同時実行中のINSERTが確定するまで待つ
+            for index, row in enumerate(rows):
+                if row.created_at >= cutoff:
+                    rows = rows[:index]
+                    break
+            if not rows:
+                self.db_session.rollback()
+                break
+            
+            try:
+                if not self._advance_watermark(last_id, rows[-1].id):
+                    # 別プロセスが同じ範囲を集計済み
+                    self.db_session.rollback()
+                    logger.warning("Activity rollup watermark moved concurrently, stopping")
+                    break
+                self._apply(rows)
+                self.db_session.commit()
+            except Exception as e:
+                logger.error(f"Error rolling up user activities after id {last_id}: {str(e)}")
+                self.db_session.rollback()
+                raise
+            
+            last_id = rows[-1].id
+            rolled_up += len(rows)
+            batches += 1
+            if len(rows) < fetched or fetched < batch_size:
+                break
+        
+        logger.info(f"Rolled up {rolled_up} user activities in {batches} batches (last id {last_id})")
+        return {'rolled_up': rolled_up, 'batches': batches, 'last_activity_id': last_id}
+    
+    def get_active_users(self, start_date: date, end_date: date, activity_type: str = 'login') -> int:
+        """
+        期間内のユニークユーザー数（日次スケッチのマージ）
+        
+        Args:
+            start_date: 開始日
+            end_date: 終了日（含む）
+            activity_type: アクティビティタイプ
+        
+        Returns:
+            int: ユニークユーザー数（推定値）
+        """
+        sketches = self.db_session.execute(
+            text("""
+                SELECT user_sketch FROM activity_daily_rollups
+                WHERE activity_type = :activity_type
+                AND activity_date BETWEEN :start_date AND :end_date
+            """),
+            {'activity_type': activity_type, 'start_date': start_date, 'end_date': end_date}
+        ).scalars().all()
+        
+        merged = HyperLogLog(self.HLL_PRECISION)
+        for sketch in sketches:
+            merged.merge(HyperLogLog.from_bytes(sketch))
+        return merged.count()
+    
+    def get_monthly_active_users(self, month: date, activity_type: str = 'login') -> int:
+        """
+        月間ユニークユーザー数（MAU）
+        
+        Args:
+            month: 対象月の任意の日
+            activity_type: アクティビティタイプ
+        
+        Returns:
+            int: ユニークユーザー数（推定値）
+        """
+        sketch = self.db_session.execute(
+            text("""
+                SELECT user_sketch FROM activity_monthly_rollups
+                WHERE activity_month = :activity_month AND activity_type = :activity_type
+            """),
+            {'activity_month': month.replace(day=1), 'activity_type': activity_type}
+        ).scalar()
+        return HyperLogLog.from_bytes(sketch).count() if sketch else 0
+    
+    def get_daily_series(self, start_date: date, end_date: date, activity_type: str = 'login') -> List[Dict]:
+        """
+        日別のユニークユーザー数とイベント数
+        
+        Args:
+            start_date: 開始日
+            end_date: 終了日（含む）
+            activity_type: アクティビティタイプ
+        
+        Returns:
+            List[Dict]: 日付順の date, users, events（データのない日は0）
+        """
+        rows = self.db_session.execute(
+            text("""
+                SELECT activity_date, event_count, user_sketch FROM activity_daily_rollups
+                WHERE activity_type = :activity_type
+                AND activity_date BETWEEN :start_date AND :end_date
+            """),
+            {'activity_type': activity_type, 'start_date': start_date, 'end_date': end_date}
+        ).all()
+        by_date = {row.activity_date: row for row in rows}
+        
+        series = []
+        day = start_date
+        while day <= end_date:
+            row = by_date.get(day)
+            series.append({
+                'date': day.isoformat(),
+                'users': HyperLogLog.from_bytes(row.user_sketch).count() if row else 0,
+                'events': row.event_count if row else 0,
+            })
+            day += timedelta(days=1)
+        return series
+    
+    def get_download_counts(self, start_date: date, end_date: date) -> Dict:
+        """
+        期間内の商品別ダウンロード数
+        
+        Args:
+            start_date: 開始日
+            end_date: 終了日（含む）
+        
+        Returns:
+            Dict: total と商品IDごとの by_product
+        """
+        rows = self.db_session.execute(
+            text("""
+                SELECT product_id, SUM(download_count) AS downloads
+                FROM product_download_daily
+                WHERE activity_date BETWEEN :start_date AND :end_date
+                GROUP BY product_id
+            """),
+            {'start_date': start_date, 'end_date': end_date}
+        ).all()
+        by_product = {row.product_id: int(row.downloads) for row in rows}
+        return {'total': sum(by_product.values()), 'by_product': by_product}
+    
+    def _get_watermark(self) -> int:
+        """集計済みの最後のアクティビティID"""
+        last_id = self.db_session.execute(
+            text("SELECT last_activity_id FROM activity_rollup_state WHERE name = :name"),
+            {'name': self.WATERMARK_NAME}
+        ).scalar()
+        if last_id is None:
+            raise Exception(f"Rollup state '{self.WATERMARK_NAME}' is missing from activity_rollup_state")
+        return last_id
+    
+    def _advance_watermark(self, last_id: int, new_last_id: int) -> bool:
+        """
+        ウォーターマークを条件付きで進める（行ロックで同時実行を直列化）
+        
+        Returns:
+            bool: 進めた場合 True、別プロセスが先に進めていた場合 False
+        """
+        result = self.db_session.execute(
+            text("""
+                UPDATE activity_rollup_state
+                SET last_activity_id = :new_last_id
+                WHERE name = :name AND last_activity_id = :last_id
+            """),
+            {'name': self.WATERMARK_NAME, 'last_id': last_id, 'new_last_id': new_last_id}
+        )
+        return result.rowcount == 1
+    
+    def _apply(self, rows: List) -> None:
+        """
+        アクティビティのバッチをメモリ上で集計し、集計行にマージ
+        
+        Args:
+            rows: user_activities の行
+        """
+        daily: Dict[Tuple[date, str], List] = defaultdict(lambda: [0, HyperLogLog(self.HLL_PRECISION)])
+        monthly: Dict[Tuple[date, str], List] = defaultdict(lambda: [0, HyperLogLog(self.HLL_PRECISION)])
+        downloads: Dict[Tuple[date, str], int] = defaultdict(int)
+        
+        for row in rows:
+            day = row.created_at.date()
+            for aggregate in (daily[(day, row.activity_type)], monthly[(day.replace(day=1), row.activity_type)]):
+                aggregate[0] += 1
+                aggregate[1].add(row.user_id)
+            
+            if row.activity_type == 'download':
+                metadata = json.loads(row.metadata) if isinstance(row.metadata, str) else row.metadata
+                product_id = (metadata or {}).get('product_id')
+                if product_id:
+                    downloads[(day, product_id)] += 1
+        
+        self._merge_sketches('activity_daily_rollups', 'activity_date', daily)
+        self._merge_sketches('activity_monthly_rollups', 'activity_month', monthly)
+        for (day, product_id), count in downloads.items():
+            params = {'activity_date': day, 'product_id': product_id, 'count': count}
+            updated = self.db_session.execute(
+                text("""
+                    UPDATE product_download_daily SET download_count = download_count + :count
+                    WHERE activity_date = :activity_date AND product_id = :product_id
+                """),
+                params
+            ).rowcount
+            if not updated:
+                self.db_session.execute(
+                    text("""
+                        INSERT INTO product_download_daily (activity_date, product_id, download_count)
+                        VALUES (:activity_date, :product_id, :count)
+                    """),
+                    params
+                )
+    
+    def _merge_sketches(self, table: str, period_column: str, aggregates: Dict[Tuple[date, str], List]) -> None:
+        """
+        期間ごとのイベント数とスケッチを既存の集計行にマージ
+        
+        Args:
+            table: 集計テーブル名
+            period_column: 期間の列名
+            aggregates: (期間, アクティビティタイプ) -> [イベント数, スケッチ]
+        """
+        for (period, activity_type), (count, sketch) in aggregates.items():
+            params = {'period': period, 'activity_type': activity_type}
+            existing = self.db_session.execute(
+                text(f"""
+                    SELECT event_count, user_sketch FROM {table}
+                    WHERE {period_column} = :period AND activity_type = :activity_type
+                """),
+                params
+            ).first()
+            
+            if existing:
+                sketch.merge(HyperLogLog.from_bytes(existing.user_sketch))
+                self.db_session.execute(
+                    text(f"""
+                        UPDATE {table} SET event_count = event_count + :count, user_sketch = :sketch
+                        WHERE {period_column} = :period AND activity_type = :activity_type
+                    """),
+                    {**params, 'count': count, 'sketch': sketch.to_bytes()}
+                )
+            else:
+                self.db_session.execute(
+                    text(f"""
+                        INSERT INTO {table} ({period_column}, activity_type, event_count, user_sketch)
+                        VALUES (:period, :activity_type, :count, :sketch)
+                    """),
+                    {**params, 'count': count, 'sketch': sketch.to_bytes()}
+                )
@@ -3,10 +3,14 @@ Batch Transfer Service
 XRPLのBatch Transactions機能を使った一括送金サービス
 """
 import logging
-from typing import Dict, List
+import uuid
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from sqlalchemy.orm import Session
 from clients.xrpl_client import XRPLClient
 from database.connection import get_db_connection
+from models.user import IMPORTANCE_LEVEL_RANKS
+from services.leaderboard_service import LeaderboardService, REFERRALS_BOARD
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +18,8 @@ logger = logging.getLogger(__name__)
 class BatchTransferService:
     """バッチ送金サービス"""
     
+    VIP_FETCH_SIZE = 1000  # VIPユーザーを1回のクエリで読み出し・送信する単位
+    
     def __init__(self, xrpl_client: XRPLClient):
         self.xrpl_client = xrpl_client
     
@@ -38,15 +44,15 @@ class BatchTransferService:
         """
         try:
             conn = get_db_connection()
-            cursor = conn.cursor(dictionary=True)
+            cursor = conn.cursor()
             
             # ユーザーのウォレットアドレスを取得
             placeholders = ','.join(['%s'] * len(user_ids))
             query = f"""
-                SELECT id, wallet_address, email
-                FROM users
-                WHERE id IN ({placeholders})
-                AND wallet_address IS NOT NULL
+                SELECT u.id, w.address AS wallet_address, u.email
+                FROM users u
+                JOIN wallets w ON w.user_id = u.id
+                WHERE u.id IN ({placeholders})
             """
             cursor.execute(query, user_ids)
             users = cursor.fetchall()
@@ -56,53 +62,7 @@ class BatchTransferService:
             
             logger.info(f"Found {len(users)} users with wallet addresses")
             
-            # 受取人リストを作成
-            recipients = [
-                {
-                    'address': user['wallet_address'],
-                    'amount_xrp': amount_xrp,
-                    'user_id': user['id']
-                }
-                for user in users
-            ]
-            
-            # バッチ送信実行
-            result = self.xrpl_client.batch_send_xrp(
-                sender_wallet_seed=sender_wallet_seed,
-                recipients=recipients,
-                memo=reason
-            )
-            
-            # データベースに記録
-            for transaction in result['transactions']:
-                try:
-                    # ユーザーIDを取得
-                    user_id = next(
-                        (r['user_id'] for r in recipients if r['address'] == transaction['recipient']),
-                        None
-                    )
-                    
-                    if user_id:
-                        # トランザクション履歴を記録
-                        insert_query = """
-                            INSERT INTO batch_transfers
-                            (user_id, wallet_address, amount_xrp, transaction_hash, 
-                             ticket_sequence, reason, status, created_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                        """
-                        cursor.execute(insert_query, (
-                            user_id,
-                            transaction['recipient'],
-                            transaction['amount_xrp'],
-                            transaction['transaction_hash'],
-                            transaction.get('ticket_sequence'),
-                            reason,
-                            'success',
-                            datetime.now()
-                        ))
-                except Exception as e:
-                    logger.error(f"Failed to record transaction: {str(e)}")
-            
+            result = self._send_to_users(cursor, sender_wallet_seed, users, amount_xrp, reason)
             conn.commit()
             cursor.close()
             conn.close()
@@ -118,73 +78,115 @@ class BatchTransferService:
         sender_wallet_seed: str,
         min_importance_level: str,
         amount_xrp: float,
-        reason: str = "VIP reward"
+        reason: str = "VIP reward",
+        run_id: Optional[str] = None
     ) -> Dict:
         """
         VIPユーザーに一括でXRP報酬を送信
         
+        (importance_level_rank, importance_score, id) のキーセットで VIP_FETCH_SIZE 件ずつ
+        短いクエリで読み出し、ページごとに送信する（送信中に開いたままの結果セットはない）。
+        送信記録と進捗（最後に送ったユーザーの位置）はページごとに同じトランザクションで
+        batch_transfer_runs に保存するため、途中で失敗しても run_id を渡して再実行すれば
+        送信済みのユーザーを飛ばして続きから送信する
+        
         Args:
             sender_wallet_seed: 送信者のウォレットシード
-            min_importance_level: 最小重要度レベル（Bronze, Silver, Gold, Platinum, Diamond）
+            min_importance_level: 最小重要度レベル（bronze, silver, gold, platinum, diamond。大文字小文字は区別しない）
             amount_xrp: 各ユーザーへの送信量
             reason: 送信理由
+            run_id: 再開する実行のID（再開時のレベル・送信量・理由は最初の実行のもの）
             
         Returns:
-            Dict: 送信結果
+            Dict: 送信結果（run_id を含む）
         """
+        run = None
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor(dictionary=True)
-            
-            # レベル順序
-            level_order = {
-                'Bronze': 1,
-                'Silver': 2,
-                'Gold': 3,
-                'Platinum': 4,
-                'Diamond': 5
-            }
-            
-            min_level_value = level_order.get(min_importance_level, 1)
-            
-            # 指定レベル以上のユーザーを取得
-            query = """
-                SELECT u.id, u.wallet_address, u.email, u.importance_level
-                FROM users u
-                WHERE u.wallet_address IS NOT NULL
-                AND u.importance_level IN ('Bronze', 'Silver', 'Gold', 'Platinum', 'Diamond')
-                ORDER BY u.importance_score DESC
-            """
-            cursor.execute(query)
-            all_users = cursor.fetchall()
-            
-            # レベルでフィルタリング
-            users = [
-                user for user in all_users
-                if level_order.get(user['importance_level'], 0) >= min_level_value
-            ]
-            
-            if not users:
-                raise Exception(f"No VIP users found with level >= {min_importance_level}")
+            min_rank = IMPORTANCE_LEVEL_RANKS.get((min_importance_level or '').lower())
+            if min_rank is None:
+                raise ValueError(f"Unknown importance level: {min_importance_level}")
             
-            logger.info(f"Found {len(users)} VIP users (>= {min_importance_level})")
-            
-            # ユーザーIDリストを作成
-            user_ids = [user['id'] for user in users]
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            try:
+                run = self._start_vip_run(cursor, run_id, min_rank, amount_xrp, reason)
+                conn.commit()
+                
+                result = None
+                while True:
+                    after, params = self._vip_page_filter(run)
+                    cursor.execute(
+                        f"""
+                        SELECT u.id, u.importance_level_rank, u.importance_score,
+                               w.address AS wallet_address, u.email
+                        FROM users u
+                        JOIN wallets w ON w.user_id = u.id
+                        WHERE u.importance_level_rank >= %s
+                        {after}
+                        ORDER BY u.importance_level_rank DESC, u.importance_score DESC, u.id DESC
+                        LIMIT %s
+                        """,
+                        [run['min_importance_rank'], *params, self.VIP_FETCH_SIZE]
+                    )
+                    users = cursor.fetchall()
+                    if not users:
+                        break
+                    
+                    logger.info(f"Sending to {len(users)} VIP users (run {run['id']})")
+                    page_result = self._send_to_users(
+                        cursor, sender_wallet_seed, users, float(run['amount_xrp']), run['reason']
+                    )
+                    # 送信記録と進捗を一緒にコミット
+                    last = users[-1]
+                    run.update(
+                        last_rank=last['importance_level_rank'],
+                        last_score=last['importance_score'],
+                        last_user_id=last['id']
+                    )
+                    cursor.execute(
+                        """
+                        UPDATE batch_transfer_runs
+                        SET last_rank = %s, last_score = %s, last_user_id = %s,
+                            sent_count = sent_count + %s, updated_at = %s
+                        WHERE id = %s
+                        """,
+                        (run['last_rank'], run['last_score'], run['last_user_id'],
+                         len(users), datetime.now(), run['id'])
+                    )
+                    conn.commit()
+                    result = self._merge_results(result, page_result)
+                
+                self._finish_vip_run(cursor, run['id'], 'completed')
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                if run is not None:
+                    self._finish_vip_run(cursor, run['id'], 'failed')
+                    conn.commit()
+                raise
+            finally:
+                cursor.close()
+                conn.close()
+            
+            if result is None:
+                if run_id is None:
+                    raise Exception(f"No VIP users found with level >= {min_importance_level}")
+                result = {
+                    'success': True,
+                    'summary': {'total': 0, 'successful': 0, 'failed': 0, 'total_amount_xrp': 0},
+                    'transactions': [],
+                    'errors': []
+                }
             
-            cursor.close()
-            conn.close()
+            logger.info(f"Sent to {result['summary']['total']} VIP users (run {run['id']})")
             
-            # バッチ送信実行
-            return self.send_batch_rewards(
-                sender_wallet_seed=sender_wallet_seed,
-                user_ids=user_ids,
-                amount_xrp=amount_xrp,
-                reason=reason
-            )
+            result['run_id'] = run['id']
+            return result
             
         except Exception as e:
             logger.error(f"VIP batch transfer failed: {str(e)}")
+            if run is not None:
+                raise Exception(f"VIP batch transfer failed (resume with run_id {run['id']}): {str(e)}")
             raise Exception(f"VIP batch transfer failed: {str(e)}")
     
     def send_batch_to_top_referrers(
@@ -192,48 +194,59 @@ class BatchTransferService:
         sender_wallet_seed: str,
         top_n: int,
         amount_xrp: float,
-        reason: str = "Top referrer reward"
+        reason: str = "Top referrer reward",
+        *,
+        db_session: Session
     ) -> Dict:
         """
         トップ紹介者に一括でXRP報酬を送信
         
+        紹介数ランキング（メモリ上）を上位から順に読み、ウォレットを持つ
+        ユーザーが top_n 人集まるまで順位範囲ごとに確認する
+        
         Args:
             sender_wallet_seed: 送信者のウォレットシード
             top_n: 上位N人
             amount_xrp: 各ユーザーへの送信量
             reason: 送信理由
+            db_session: ランキングの読み込みに使うセッション
             
         Returns:
             Dict: 送信結果
         """
         try:
+            leaderboard = LeaderboardService(db_session)
             conn = get_db_connection()
-            cursor = conn.cursor(dictionary=True)
+            cursor = conn.cursor()
+            
+            # トップ紹介者を取得（ウォレット未登録のユーザーは飛ばす）
+            user_ids = []
+            start = 0
+            while len(user_ids) < top_n:
+                entries = leaderboard.range(REFERRALS_BOARD, start, start + top_n)
+                if not entries:
+                    break
+                candidate_ids = [entry['user_id'] for entry in entries]
+                placeholders = ','.join(['%s'] * len(candidate_ids))
+                cursor.execute(
+                    f"""
+                    SELECT DISTINCT user_id FROM wallets
+                    WHERE user_id IN ({placeholders})
+                    """,
+                    candidate_ids
+                )
+                with_wallet = {row['user_id'] for row in cursor.fetchall()}
+                user_ids.extend(user_id for user_id in candidate_ids if user_id in with_wallet)
+                start += top_n
+            user_ids = user_ids[:top_n]
             
-            # トップ紹介者を取得
-            query = """
-                SELECT u.id, u.wallet_address, u.email, COUNT(r.id) as referral_count
-                FROM users u
-                LEFT JOIN referrals r ON u.id = r.referrer_id
-                WHERE u.wallet_address IS NOT NULL
-                GROUP BY u.id
-                HAVING referral_count > 0
-                ORDER BY referral_count DESC
-                LIMIT %s
-            """
-            cursor.execute(query, (top_n,))
-            users = cursor.fetchall()
+            cursor.close()
+            conn.close()
             
-            if not users:
+            if not user_ids:
                 raise Exception("No top referrers found")
             
-            logger.info(f"Found {len(users)} top referrers")
-            
-            # ユーザーIDリストを作成
-            user_ids = [user['id'] for user in users]
-            
-            cursor.close()
-            conn.close()
+            logger.info(f"Found {len(user_ids)} top referrers")
             
             # バッチ送信実行
             return self.send_batch_rewards(
@@ -264,7 +277,7 @@ class BatchTransferService:
         """
         try:
             conn = get_db_connection()
-            cursor = conn.cursor(dictionary=True)
+            cursor = conn.cursor()
             
             # 履歴取得
             query = """
@@ -297,3 +310,203 @@ class BatchTransferService:
         except Exception as e:
             logger.error(f"Failed to get batch transfer history: {str(e)}")
             raise Exception(f"Failed to get batch transfer history: {str(e)}")
+    
+    def _send_to_users(
+        self,
+        cursor,
+        sender_wallet_seed: str,
+        users: List[Dict],
+        amount_xrp: float,
+        reason: str
+    ) -> Dict:
+        """
+        ウォレットを持つユーザーに一括送信し、送信結果を batch_transfers に記録
+        （コミットは呼び出し側で行う）
+        
+        Args:
+            cursor: 記録に使うカーソル
+            sender_wallet_seed: 送信者のウォレットシード
+            users: id, wallet_address を持つユーザー
+            amount_xrp: 各ユーザーへの送信量
+            reason: 送信理由
+        
+        Returns:
+            Dict: 送信結果
+        """
+        # 受取人リストを作成
+        recipients = [
+            {
+                'address': user['wallet_address'],
+                'amount_xrp': amount_xrp,
+                'user_id': user['id']
+            }
+            for user in users
+        ]
+        user_ids_by_address = {r['address']: r['user_id'] for r in recipients}
+        
+        # バッチ送信実行
+        result = self.xrpl_client.batch_send_xrp(
+            sender_wallet_seed=sender_wallet_seed,
+            recipients=recipients,
+            memo=reason
+        )
+        
+        # データベースに記録
+        for transaction in result['transactions']:
+            try:
+                user_id = user_ids_by_address.get(transaction['recipient'])
+                
+                if user_id:
+                    # トランザクション履歴を記録
+                    insert_query = """
+                        INSERT INTO batch_transfers
+                        (user_id, wallet_address, amount_xrp, transaction_hash, 
+                         ticket_sequence, reason, status, created_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                    """
+                    cursor.execute(insert_query, (
+                        user_id,
+                        transaction['recipient'],
+                        transaction['amount_xrp'],
+                        transaction['transaction_hash'],
+                        transaction.get('ticket_sequence'),
+                        reason,
+                        'success',
+                        datetime.now()
+                    ))
+            except Exception as e:
+                logger.error(f"Failed to record transaction: {str(e)}")
+        
+        return result
+    
+    @staticmethod
+    def _start_vip_run(
+        cursor,
+        run_id: Optional[str],
+        min_rank: int,
+        amount_xrp: float,
+        reason: str
+    ) -> Dict:
+        """
+        VIP送金の実行を開始（run_id 指定時は保存された実行を再開）
+        
+        Args:
+            cursor: カーソル
+            run_id: 再開する実行のID（新規はNone）
+            min_rank: 最小重要度レベル順位
+            amount_xrp: 各ユーザーへの送信量
+            reason: 送信理由
+        
+        Returns:
+            Dict: 実行（条件と進捗）
+        
+        Raises:
+            ValueError: 指定された実行が存在しない場合
+        """
+        if run_id is not None:
+            cursor.execute("SELECT * FROM batch_transfer_runs WHERE id = %s", (run_id,))
+            run = cursor.fetchone()
+            if not run:
+                raise ValueError(f"Batch transfer run not found: {run_id}")
+            cursor.execute(
+                "UPDATE batch_transfer_runs SET status = 'running', updated_at = %s WHERE id = %s",
+                (datetime.now(), run_id)
+            )
+            return dict(run)
+        
+        now = datetime.now()
+        run = {
+            'id': str(uuid.uuid4()),
+            'min_importance_rank': min_rank,
+            'amount_xrp': amount_xrp,
+            'reason': reason,
+            'last_rank': None,
+            'last_score': None,
+            'last_user_id': None,
+        }
+        cursor.execute(
+            """
+            INSERT INTO batch_transfer_runs
+            (id, min_importance_rank, amount_xrp, reason, sent_count, status, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, 0, 'running', %s, %s)
+            """,
+            (run['id'], min_rank, amount_xrp, reason, now, now)
+        )
+        return run
+    
+    @staticmethod
+    def _finish_vip_run(cursor, run_id: str, status: str) -> None:
+        """
+        VIP送金の実行の状態を更新
+        
+        Args:
+            cursor: カーソル
+            run_id: 実行ID
+            status: completed または failed
+        """
+        cursor.execute(
+            "UPDATE batch_transfer_runs SET status = %s, updated_at = %s WHERE id = %s",
+            (status, datetime.now(), run_id)
+        )
+    
+    @staticmethod
+    def _vip_page_filter(run: Dict) -> Tuple[str, List]:
+        """
+        前ページ最後のユーザーより後ろ（順位・スコア・IDの降順）を選ぶ条件
+        
+        importance_score がNULLの行は降順で各順位の最後に並ぶ
+        
+        Args:
+            run: 実行（last_rank, last_score, last_user_id）
+        
+        Returns:
+            Tuple[str, List]: WHERE に追加する条件とパラメータ（先頭ページは空）
+        """
+        if run['last_user_id'] is None:
+            return '', []
+        if run['last_score'] is None:
+            return (
+                """
+                AND (u.importance_level_rank < %s
+                     OR (u.importance_level_rank = %s AND u.importance_score IS NULL AND u.id < %s))
+                """,
+                [run['last_rank'], run['last_rank'], run['last_user_id']]
+            )
+        return (
+            """
+            AND (u.importance_level_rank < %s
+                 OR (u.importance_level_rank = %s
+                     AND (u.importance_score < %s OR u.importance_score IS NULL
+                          OR (u.importance_score = %s AND u.id < %s))))
+            """,
+            [run['last_rank'], run['last_rank'], run['last_score'], run['last_score'], run['last_user_id']]
+        )
+    
+    @staticmethod
+    def _merge_results(result, chunk_result: Dict) -> Dict:
+        """
+        分割して送信した結果を1つにまとめる
+        
+        Args:
+            result: これまでの結果（最初の分割ではNone）
+            chunk_result: 今回の分割の送信結果
+        
+        Returns:
+            Dict: まとめた送信結果
+        """
+        if result is None:
+            return chunk_result
+        summary = result['summary']
+        chunk_summary = chunk_result['summary']
+        return {
+            'success': result['success'] and chunk_result['success'],
+            'summary': {
+                'total': summary['total'] + chunk_summary['total'],
+                'successful': summary['successful'] + chunk_summary['successful'],
+                'failed': summary['failed'] + chunk_summary['failed'],
+                'total_amount_xrp': summary['total_amount_xrp'] + chunk_summary['total_amount_xrp'],
+                'ticket_sequence_range': f"{summary['ticket_sequence_range']}, {chunk_summary['ticket_sequence_range']}"
+            },
+            'transactions': result['transactions'] + chunk_result['transactions'],
+            'errors': result['errors'] + chunk_result['errors']
+        }
@@ -1,14 +1,19 @@
 """
 Escrow Campaign Service for XRP staking campaigns.
 """
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 import logging
+import random
 import uuid
 from datetime import datetime, timedelta
-from sqlalchemy import text
+from sqlalchemy import bindparam, column, select, table, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from repositories.user_repository import UserRepository
 from clients.xrpl_client import XRPLClient
+from utils.ttl_cache import TTLCache
+import hashlib
+import json
 import time
 
 logger = logging.getLogger(__name__)
@@ -17,12 +22,110 @@ logger = logging.getLogger(__name__)
 class EscrowCampaignService:
     """Service for managing XRP escrow staking campaigns."""
     
-    def __init__(self, db_session: Session, xrpl_client: XRPLClient):
-        """Initialize EscrowCampaignService."""
+    # 完了スイープの1ページ件数と並列送信数
+    SWEEP_PAGE_SIZE = 100
+    SWEEP_MAX_WORKERS = 10
+    
+    # 参加者数を分散して数えるスロット数
+    PARTICIPANT_SLOTS = 16
+    
+    # 開催中キャンペーン一覧のプロセス内キャッシュ
+    # 次の開始/終了時刻で失効し、参加者数の反映遅れは CAMPAIGN_CACHE_MAX_AGE 秒まで
+    CAMPAIGN_CACHE_MAX_AGE = 10
+    _campaign_cache = TTLCache(maxsize=1)
+    
+    def __init__(self, db_session: Session, xrpl_client: Optional[XRPLClient] = None, task_manager=None):
+        """Initialize EscrowCampaignService (xrpl_client is not needed for campaign listings)."""
         self.db_session = db_session
         self.xrpl_client = xrpl_client
+        self.task_manager = task_manager
         self.user_repo = UserRepository(db_session)
     
+    def get_active_campaigns(self) -> Tuple[List[Dict], str]:
+        """
+        開催中のキャンペーン一覧を取得（プロセス内キャッシュ）
+        
+        シリアライズ済みの一覧を、次にいずれかのキャンペーンが開始または終了する
+        時刻まで（最長 CAMPAIGN_CACHE_MAX_AGE 秒）保持する。
+        
+        Returns:
+            Tuple[List[Dict], str]: キャンペーン一覧とそのETag
+        """
+        cached = self._campaign_cache.get('active')
+        if cached is not None:
+            return cached
+        
+        now = datetime.utcnow()
+        result = self.db_session.execute(
+            text("""
+            SELECT c.*, COALESCE(
+                (SELECT SUM(s.participants) FROM escrow_campaign_participant_slots s WHERE s.campaign_id = c.id),
+                c.current_participants
+            ) AS participants
+            FROM escrow_campaigns c
+            WHERE c.is_active = TRUE 
+            AND c.start_date <= :now 
+            AND c.end_date >= :now
+            ORDER BY c.created_at DESC
+            """),
+            {'now': now}
+        )
+        rows = result.mappings().all()
+        campaigns = [self._serialize_campaign(row) for row in rows]
+        
+        # 次に一覧が変わる時刻: 開催中の最も早い終了、または未開始の最も早い開始
+        next_start = self.db_session.execute(
+            text("""
+            SELECT start_date FROM escrow_campaigns
+            WHERE is_active = TRUE AND start_date > :now
+            ORDER BY start_date LIMIT 1
+            """),
+            {'now': now}
+        ).scalar()
+        boundaries = [row['end_date'] for row in rows]
+        if next_start is not None:
+            boundaries.append(next_start)
+        ttl = self.CAMPAIGN_CACHE_MAX_AGE
+        if boundaries:
+            ttl = min(ttl, max((min(boundaries) - now).total_seconds(), 0))
+        
+        etag = hashlib.sha1(json.dumps(campaigns, sort_keys=True).encode()).hexdigest()
+        listing = (campaigns, etag)
+        self._campaign_cache.set('active', listing, ttl=ttl)
+        return listing
+    
+    @classmethod
+    def invalidate_campaign_cache(cls) -> None:
+        """キャンペーンを編集した後に一覧キャッシュを破棄"""
+        cls._campaign_cache.clear()
+    
+    @staticmethod
+    def _serialize_campaign(campaign) -> Dict:
+        """
+        キャンペーン行をAPIレスポンス形式に変換
+        
+        Args:
+            campaign: escrow_campaigns の行（participants 列付き）
+            
+        Returns:
+            Dict: キャンペーン情報
+        """
+        return {
+            'id': campaign['id'],
+            'name': campaign['name'],
+            'description': campaign['description'],
+            'min_amount_drops': campaign['min_amount_drops'],
+            'lock_days': campaign['lock_days'],
+            'nft_reward_name': campaign['nft_reward_name'],
+            'nft_reward_description': campaign['nft_reward_description'],
+            'nft_reward_image_url': campaign['nft_reward_image_url'],
+            'start_date': campaign['start_date'].isoformat(),
+            'end_date': campaign['end_date'].isoformat(),
+            'max_participants': campaign['max_participants'],
+            'current_participants': int(campaign['participants'] or 0),
+            'status': 'active',
+        }
+    
     def create_campaign_escrow(
         self,
         user_id: str,
@@ -31,7 +134,10 @@ class EscrowCampaignService:
         lock_days: int
     ) -> Dict:
         """
-        キャンペーン用のEscrowを作成
+        キャンペーン用のEscrowステークを受け付け、作成をバックグラウンドタスクに登録
+        
+        ステークは 'submitting' で記録され、EscrowCreate の検証後にワーカーが
+        'active'（失敗時は 'failed'）に更新する。
         
         Args:
             user_id: ユーザーID
@@ -40,8 +146,15 @@ class EscrowCampaignService:
             lock_days: ロック日数
             
         Returns:
-            Dict: Escrow情報
+            Dict: ステークIDとタスクID
+            
+        Raises:
+            ValueError: ウォレットがない場合、キャンペーンが定員に達している場合、
+                        またはタスクマネージャー未設定の場合
         """
+        if self.task_manager is None:
+            raise ValueError("Task manager is required to create escrow stakes")
+        
         try:
             # ユーザーのウォレットを取得
             from repositories.wallet_repository import WalletRepository
@@ -51,39 +164,23 @@ class EscrowCampaignService:
             if not wallet:
                 raise ValueError(f"User {user_id} has no wallet")
             
-            # ウォレットシードを復号化
-            from services.wallet_service import WalletService
-            from config import Config
-            wallet_service = WalletService(
-                self.db_session,
-                self.xrpl_client,
-                Config.ENCRYPTION_KEY
-            )
-            wallet_seed = wallet_service.get_decrypted_seed(user_id)
-            
             # ロック期間を計算
             finish_after = int(time.time()) + (lock_days * 24 * 60 * 60)
             amount_drops = int(amount_xrp * 1_000_000)
             
-            # Escrowを作成（自分自身に送る）
-            result = self.xrpl_client.create_escrow(
-                sender_wallet_seed=wallet_seed,
-                recipient_address=wallet.address,
-                amount_drops=amount_drops,
-                finish_after=finish_after
-            )
+            # 参加枠を確保（定員チェック）。ステークと同じトランザクションで確定する
+            slot = self._claim_participant_slot(campaign_id)
             
-            # データベースに記録
+            # 送信前のステークを記録
             escrow_id = str(uuid.uuid4())
             self.db_session.execute(
-                """
+                text("""
                 INSERT INTO escrow_stakes 
                 (id, user_id, campaign_id, wallet_address, amount_drops, 
-                 lock_days, finish_after, escrow_sequence, transaction_hash, 
-                 status, created_at)
+                 lock_days, finish_after, status, participant_slot, created_at)
                 VALUES (:id, :user_id, :campaign_id, :wallet, :amount, 
-                        :days, :finish, :sequence, :tx_hash, :status, :created)
-                """,
+                        :days, :finish, :status, :slot, :created)
+                """),
                 {
                     'id': escrow_id,
                     'user_id': user_id,
@@ -92,85 +189,443 @@ class EscrowCampaignService:
                     'amount': amount_drops,
                     'days': lock_days,
                     'finish': datetime.fromtimestamp(finish_after),
-                    'sequence': result['escrow_sequence'],
-                    'tx_hash': result['transaction_hash'],
-                    'status': 'active',
+                    'status': 'submitting',
+                    'slot': slot,
                     'created': datetime.utcnow()
                 }
             )
-            
             self.db_session.commit()
             
-            logger.info(f"Created escrow stake for user {user_id}: {amount_xrp} XRP for {lock_days} days")
+            task_id = self.task_manager.submit_task(
+                task_type='escrow_stake_create',
+                func=self._execute_campaign_escrow,
+                escrow_id=escrow_id,
+                user_id=user_id,
+                campaign_id=campaign_id,
+                recipient_address=wallet.address,
+                amount_drops=amount_drops,
+                finish_after=finish_after,
+                payload={
+                    'escrow_id': escrow_id,
+                    'user_id': user_id,
+                    'campaign_id': campaign_id,
+                    'amount_drops': amount_drops
+                }
+            )
+            
+            logger.info(f"Queued escrow stake {escrow_id} for user {user_id}: {amount_xrp} XRP for {lock_days} days")
             
             return {
                 'escrow_id': escrow_id,
+                'task_id': task_id,
+                'status': 'submitting',
                 'amount_xrp': amount_xrp,
                 'lock_days': lock_days,
                 'finish_after': finish_after,
-                'transaction_hash': result['transaction_hash'],
             }
             
+        except ValueError:
+            self.db_session.rollback()
+            raise
         except Exception as e:
             logger.error(f"Error creating campaign escrow: {str(e)}")
             self.db_session.rollback()
             raise
     
-    def check_and_complete_escrows(self) -> Dict:
+    def _execute_campaign_escrow(
+        self,
+        escrow_id: str,
+        user_id: str,
+        campaign_id: str,
+        recipient_address: str,
+        amount_drops: int,
+        finish_after: int
+    ) -> Dict:
         """
-        完了可能なEscrowをチェックして完了処理
+        EscrowCreate を送信してステークを確定（タスクマネージャーから呼ばれる）
         
+        Args:
+            escrow_id: ステークID
+            user_id: ユーザーID
+            campaign_id: キャンペーンID
+            recipient_address: 受取アドレス（ユーザー自身のウォレット）
+            amount_drops: ロック量（drops）
+            finish_after: ロック解除時刻（Unix時刻）
+            
         Returns:
-            Dict: 処理結果
+            Dict: トランザクション結果
         """
         try:
-            # 完了可能なEscrowを取得
-            now = datetime.utcnow()
+            # ウォレットシードを復号化
+            from services.wallet_service import WalletService
+            from config import Config
+            wallet_service = WalletService(
+                self.db_session,
+                self.xrpl_client,
+                Config.ENCRYPTION_KEY
+            )
+            wallet_seed = wallet_service.get_decrypted_seed(user_id)
             
-            result = self.db_session.execute(
+            # Escrowを作成（自分自身に送る）
+            result = self.xrpl_client.create_escrow(
+                sender_wallet_seed=wallet_seed,
+                recipient_address=recipient_address,
+                amount_drops=amount_drops,
+                finish_after=finish_after
+            )
+            
+            self.db_session.execute(
                 text("""
-                SELECT * FROM escrow_stakes 
-                WHERE status = 'active' 
-                AND finish_after <= :now
+                UPDATE escrow_stakes 
+                SET status = 'active', escrow_sequence = :sequence, transaction_hash = :tx_hash
+                WHERE id = :id
                 """),
-                {'now': now}
+                {
+                    'id': escrow_id,
+                    'sequence': result['escrow_sequence'],
+                    'tx_hash': result['transaction_hash']
+                }
             )
-            escrows = result.mappings().all()
+            self.db_session.commit()
             
-            completed_count = 0
-            errors = []
+            logger.info(f"Escrow stake {escrow_id} active: {result['transaction_hash']}")
             
-            for escrow in escrows:
-                try:
-                    # Escrowを完了
-                    # 注: 実際には受取人が実行する必要がある
-                    # ここではスポンサーウォレットで代行
-                    
-                    # ステータスを更新
-                    self.db_session.execute(
-                        """
-                        UPDATE escrow_stakes 
-                        SET status = 'completed', completed_at = :completed
-                        WHERE id = :id
-                        """,
-                        {'id': escrow['id'], 'completed': datetime.utcnow()}
+            return {
+                'escrow_id': escrow_id,
+                'transaction_hash': result['transaction_hash'],
+                'escrow_sequence': result['escrow_sequence'],
+            }
+            
+        except Exception as e:
+            logger.error(f"Escrow stake {escrow_id} failed: {str(e)}")
+            self.db_session.rollback()
+            self.db_session.execute(
+                text("UPDATE escrow_stakes SET status = 'failed', error_message = :error WHERE id = :id"),
+                {'id': escrow_id, 'error': str(e)}
+            )
+            self._release_participant_slot(escrow_id)
+            self.db_session.commit()
+            raise
+    
+    def _claim_participant_slot(self, campaign_id: str) -> int:
+        """
+        キャンペーンの参加枠を1つ確保
+        
+        参加者数は PARTICIPANT_SLOTS 個のスロット行に分散して数える。定員は各スロットに
+        容量として割り振られ、条件付きUPDATE（participants < capacity）で加算するため、
+        同時に参加する利用者が1行のロックに集中せず、合計が定員を超えることもない。
+        
+        Args:
+            campaign_id: キャンペーンID
+            
+        Returns:
+            int: 確保したスロット番号
+            
+        Raises:
+            ValueError: 定員に達している場合
+        """
+        slots = list(range(self.PARTICIPANT_SLOTS))
+        random.shuffle(slots)
+        
+        for _ in range(2):
+            for slot in slots:
+                result = self.db_session.execute(
+                    text("""
+                    UPDATE escrow_campaign_participant_slots
+                    SET participants = participants + 1
+                    WHERE campaign_id = :campaign_id AND slot = :slot
+                    AND (capacity IS NULL OR participants < capacity)
+                    """),
+                    {'campaign_id': campaign_id, 'slot': slot}
+                )
+                if result.rowcount:
+                    return slot
+            
+            # スロットが未作成なら作成して再試行
+            if not self._create_participant_slots(campaign_id):
+                break
+        
+        raise ValueError("Campaign has reached its maximum number of participants")
+    
+    def _create_participant_slots(self, campaign_id: str) -> bool:
+        """
+        キャンペーンの参加枠スロットを作成（初回の参加時）
+        
+        定員はスロットに均等に割り振る。既存の current_participants はスロット0に引き継ぐ。
+        
+        Args:
+            campaign_id: キャンペーンID
+            
+        Returns:
+            bool: スロットを作成した（または他のリクエストが作成済みだった）場合True
+        """
+        existing = self.db_session.execute(
+            text("SELECT COUNT(*) FROM escrow_campaign_participant_slots WHERE campaign_id = :id"),
+            {'id': campaign_id}
+        ).scalar()
+        if existing:
+            return False
+        
+        campaign = self.db_session.execute(
+            text("SELECT max_participants, current_participants FROM escrow_campaigns WHERE id = :id"),
+            {'id': campaign_id}
+        ).mappings().fetchone()
+        if not campaign:
+            raise ValueError(f"Campaign not found: {campaign_id}")
+        
+        current = campaign['current_participants'] or 0
+        participants = [current] + [0] * (self.PARTICIPANT_SLOTS - 1)
+        capacities = self._slot_capacities(participants, campaign['max_participants'])
+        rows = [
+            {'campaign_id': campaign_id, 'slot': slot, 'participants': participants[slot], 'capacity': capacities[slot]}
+            for slot in range(self.PARTICIPANT_SLOTS)
+        ]
+        
+        try:
+            with self.db_session.begin_nested():
+                self.db_session.execute(
+                    text("""
+                    INSERT INTO escrow_campaign_participant_slots (campaign_id, slot, participants, capacity)
+                    VALUES (:campaign_id, :slot, :participants, :capacity)
+                    """),
+                    rows
+                )
+        except IntegrityError:
+            # 同時に参加した別のリクエストが作成済み
+            pass
+        return True
+    
+    @staticmethod
+    def _slot_capacities(participants: List[int], maximum: Optional[int]) -> List[Optional[int]]:
+        """
+        定員の残りを各スロットの容量として均等に割り振る
+        
+        Args:
+            participants: スロットごとの現在の参加者数
+            maximum: 定員（Noneで無制限）
+        
+        Returns:
+            List[Optional[int]]: スロットごとの容量（無制限はNone）
+        """
+        if maximum is None:
+            return [None] * len(participants)
+        
+        remaining = max(maximum - sum(participants), 0)
+        share, extra = divmod(remaining, len(participants))
+        return [count + share + (1 if slot < extra else 0) for slot, count in enumerate(participants)]
+    
+    def update_max_participants(self, campaign_id: str, max_participants: Optional[int]) -> None:
+        """
+        キャンペーンの定員を変更
+        
+        参加受付はスロットの容量だけで判定するため、スロット作成後に
+        escrow_campaigns.max_participants を直接更新しても反映されない。
+        ここではスロット行をロックして参加者数を数え、残りの定員を割り振り直す。
+        
+        Args:
+            campaign_id: キャンペーンID
+            max_participants: 新しい定員（Noneで無制限）
+        
+        Raises:
+            ValueError: キャンペーンが存在しない、または定員が現在の参加者数を下回る場合
+        """
+        try:
+            updated = self.db_session.execute(
+                text("UPDATE escrow_campaigns SET max_participants = :maximum WHERE id = :id"),
+                {'id': campaign_id, 'maximum': max_participants}
+            )
+            if not updated.rowcount:
+                raise ValueError(f"Campaign not found: {campaign_id}")
+            
+            slots = table('escrow_campaign_participant_slots', column('campaign_id'), column('slot'), column('participants'))
+            rows = self.db_session.execute(
+                select(slots.c.slot, slots.c.participants)
+                .where(slots.c.campaign_id == campaign_id)
+                .order_by(slots.c.slot)
+                .with_for_update()
+            ).all()
+            
+            # スロット未作成なら最初の参加時に新しい定員で作成される
+            if rows:
+                participants = [count for _, count in rows]
+                if max_participants is not None and max_participants < sum(participants):
+                    raise ValueError(
+                        f"Campaign already has {sum(participants)} participants, more than {max_participants}"
                     )
-                    
-                    # NFTを発行
-                    self._award_campaign_nft(escrow['user_id'], escrow['campaign_id'])
-                    
-                    completed_count += 1
-                    
-                except Exception as e:
-                    errors.append({'escrow_id': escrow['id'], 'error': str(e)})
+                
+                capacities = self._slot_capacities(participants, max_participants)
+                self.db_session.execute(
+                    text("""
+                    UPDATE escrow_campaign_participant_slots SET capacity = :capacity
+                    WHERE campaign_id = :campaign_id AND slot = :slot
+                    """),
+                    [
+                        {'campaign_id': campaign_id, 'slot': slot, 'capacity': capacity}
+                        for (slot, _), capacity in zip(rows, capacities)
+                    ]
+                )
             
             self.db_session.commit()
+            logger.info(f"Campaign {campaign_id} max participants set to {max_participants}")
+        
+        except Exception:
+            self.db_session.rollback()
+            raise
+    
+    def _release_participant_slot(self, escrow_id: str) -> None:
+        """
+        失敗したステークの参加枠を返却
+        
+        Args:
+            escrow_id: ステークID
+        """
+        self.db_session.execute(
+            text("""
+            UPDATE escrow_campaign_participant_slots
+            SET participants = participants - 1
+            WHERE participants > 0
+            AND (campaign_id, slot) = (
+                SELECT campaign_id, participant_slot FROM escrow_stakes WHERE id = :id
+            )
+            """),
+            {'id': escrow_id}
+        )
+    
+    def get_stake(self, user_id: str, escrow_id: str) -> Optional[Dict]:
+        """
+        ユーザーのステークを1件取得（作成状況の確認用）
+        
+        Args:
+            user_id: ユーザーID
+            escrow_id: ステークID
+            
+        Returns:
+            Optional[Dict]: ステーク情報（見つからない場合はNone）
+        """
+        result = self.db_session.execute(
+            text("""
+            SELECT id, campaign_id, amount_drops, lock_days, finish_after, status,
+                   transaction_hash, escrow_sequence, error_message, created_at
+            FROM escrow_stakes
+            WHERE id = :id AND user_id = :user_id
+            """),
+            {'id': escrow_id, 'user_id': user_id}
+        )
+        stake = result.mappings().fetchone()
+        if not stake:
+            return None
+        
+        return {
+            'id': stake['id'],
+            'campaign_id': stake['campaign_id'],
+            'amount_drops': stake['amount_drops'],
+            'lock_days': stake['lock_days'],
+            'finish_after': stake['finish_after'].isoformat(),
+            'status': stake['status'],
+            'transaction_hash': stake['transaction_hash'],
+            'escrow_sequence': stake['escrow_sequence'],
+            'error_message': stake['error_message'],
+            'created_at': stake['created_at'].isoformat(),
+        }
+    
+    def check_and_complete_escrows(
+        self,
+        page_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        max_pages: Optional[int] = None
+    ) -> Dict:
+        """
+        完了可能なEscrowをまとめて完了処理
+        
+        (status, finish_after) インデックスに沿って期限到来分をページ単位で取得し、
+        ページごとにスポンサーウォレットのTicketで EscrowFinish を並列送信する。
+        ステータス更新とNFT報酬の発行はページ単位の一括処理で行う。
+        レジャー上でまだ完了できない分（tecNO_PERMISSION など）は active のまま残り、次回再試行される。
+        送信が取り込まれなかった分（tem/tef や通信エラー）のTicketはプールに戻す。
+        
+        Args:
+            page_size: 1ページの件数（デフォルト SWEEP_PAGE_SIZE、最大 200）
+            max_workers: 並列送信数（デフォルト SWEEP_MAX_WORKERS）
+            max_pages: 1回の実行で処理する最大ページ数（任意）
+        
+        Returns:
+            Dict: 処理結果
+        
+        Raises:
+            ValueError: スポンサーウォレットが未設定の場合
+        """
+        finisher_wallet = self.xrpl_client.sponsor_wallet
+        if not finisher_wallet:
+            raise ValueError("Sponsor wallet is not configured")
+        
+        # アカウントが保有できるTicketは250まで
+        page_size = min(page_size or self.SWEEP_PAGE_SIZE, 200)
+        max_workers = max_workers or self.SWEEP_MAX_WORKERS
+        now = datetime.utcnow()
+        
+        total_checked = 0
+        completed_count = 0
+        errors = []
+        pages = 0
+        cursor = None
+        
+        try:
+            while max_pages is None or pages < max_pages:
+                escrows = self._fetch_due_escrows(now, cursor, page_size)
+                if not escrows:
+                    break
+                pages += 1
+                total_checked += len(escrows)
+                cursor = (escrows[-1]['finish_after'], escrows[-1]['id'])
+                
+                try:
+                    tickets = self.xrpl_client.reserve_tickets(finisher_wallet, len(escrows))
+                except Exception as e:
+                    # Ticketがなければ以降のページも送信できない
+                    errors.extend({'escrow_id': escrow['id'], 'error': f"Ticket reservation failed: {str(e)}"} for escrow in escrows)
+                    logger.error(f"Escrow sweep stopped, ticket reservation failed: {str(e)}")
+                    break
+                
+                try:
+                    results = self.xrpl_client.finish_escrows_with_tickets(
+                        finisher_wallet,
+                        [
+                            {'owner': escrow['wallet_address'], 'offer_sequence': escrow['escrow_sequence'], 'ticket': ticket}
+                            for escrow, ticket in zip(escrows, tickets)
+                        ],
+                        max_workers=max_workers
+                    )
+                except Exception:
+                    # 署名前に失敗した場合、Ticketは1枚も使われていない
+                    self.xrpl_client.release_tickets(finisher_wallet, tickets)
+                    raise
+                
+                completed = []
+                unused_tickets = []
+                for escrow, ticket, result in zip(escrows, tickets, results):
+                    # tecNO_TARGET: Escrowはすでに完了済み（前回の実行でDB更新前に中断した場合など）
+                    if 'error' not in result or 'tecNO_TARGET' in result['error']:
+                        completed.append(escrow)
+                    else:
+                        errors.append({'escrow_id': escrow['id'], 'error': result['error']})
+                        if not result.get('ticket_used'):
+                            unused_tickets.append(ticket)
+                
+                # レジャーに取り込まれなかった分のTicketはプールに戻し、次のページ・次回の実行で使う
+                self.xrpl_client.release_tickets(finisher_wallet, unused_tickets)
+                
+                if completed:
+                    errors.extend(self._complete_escrows(completed))
+                    completed_count += len(completed)
+            
+            logger.info(f"Escrow sweep finished: {completed_count}/{total_checked} completed in {pages} pages")
             
             return {
-                'total_checked': len(escrows),
+                'total_checked': total_checked,
                 'completed_count': completed_count,
                 'error_count': len(errors),
                 'errors': errors,
+                'pages': pages,
             }
             
         except Exception as e:
@@ -178,6 +633,68 @@ class EscrowCampaignService:
             self.db_session.rollback()
             raise
     
+    def _fetch_due_escrows(self, now: datetime, cursor: Optional[Tuple], limit: int) -> List[Dict]:
+        """
+        期限到来済みのactiveなEscrowを1ページ取得（(finish_after, id) のキーセットページング）
+        
+        Args:
+            now: 基準時刻
+            cursor: 前ページ最後の (finish_after, id)（先頭ページはNone）
+            limit: 取得件数
+            
+        Returns:
+            List[Dict]: Escrow行
+        """
+        after_cursor = ""
+        params = {'now': now, 'limit': limit}
+        if cursor is not None:
+            after_cursor = "AND (finish_after > :cursor_finish OR (finish_after = :cursor_finish AND id > :cursor_id))"
+            params.update({'cursor_finish': cursor[0], 'cursor_id': cursor[1]})
+        
+        result = self.db_session.execute(
+            text(f"""
+            SELECT id, user_id, campaign_id, wallet_address, escrow_sequence, finish_after
+            FROM escrow_stakes
+            WHERE status = 'active'
+            AND finish_after <= :now
+            {after_cursor}
+            ORDER BY finish_after, id
+            LIMIT :limit
+            """),
+            params
+        )
+        return [dict(row) for row in result.mappings().all()]
+    
+    def _complete_escrows(self, escrows: List[Dict]) -> List[Dict]:
+        """
+        完了したEscrowのステータスを一括更新し、NFT報酬をキャンペーンごとにまとめて発行
+        
+        XRPはすでに返却されているため、ステータスはNFT発行より先に確定する。
+        NFT発行に失敗したステークは nft_awarded = FALSE のまま残る。
+        
+        Args:
+            escrows: 完了したEscrow行
+            
+        Returns:
+            List[Dict]: NFT発行のエラー
+        """
+        completed_at = datetime.utcnow()
+        self.db_session.execute(
+            text("UPDATE escrow_stakes SET status = 'completed', completed_at = :completed WHERE id = :id"),
+            [{'id': escrow['id'], 'completed': completed_at} for escrow in escrows]
+        )
+        self.db_session.commit()
+        
+        mint_ids, errors = self._award_campaign_nfts(escrows)
+        if mint_ids:
+            self.db_session.execute(
+                text("UPDATE escrow_stakes SET nft_awarded = TRUE, nft_mint_id = :mint_id WHERE id = :id"),
+                [{'id': escrow_id, 'mint_id': mint_id} for escrow_id, mint_id in mint_ids.items()]
+            )
+            self.db_session.commit()
+        
+        return errors
+    
     def get_user_escrows(self, user_id: str) -> List[Dict]:
         """
         ユーザーのEscrow一覧を取得
@@ -222,46 +739,74 @@ class EscrowCampaignService:
             logger.error(f"Error getting user escrows: {str(e)}")
             return []
     
-    def _award_campaign_nft(self, user_id: str, campaign_id: str):
+    def _award_campaign_nfts(self, escrows: List[Dict]) -> Tuple[Dict[str, str], List[Dict]]:
         """
-        キャンペーンNFTを付与
+        完了したEscrowのキャンペーンNFTをキャンペーンごとに一括発行キューへ登録
         
         Args:
-            user_id: ユーザーID
-            campaign_id: キャンペーンID
-        """
-        try:
-            # キャンペーン情報を取得
-            result = self.db_session.execute(
-                text("SELECT * FROM escrow_campaigns WHERE id = :id"),
-                {'id': campaign_id}
-            )
-            campaign = result.mappings().fetchone()
+            escrows: 完了したEscrow行
             
+        Returns:
+            Tuple: (EscrowID → NFT発行レコードID, エラーのリスト)
+        """
+        from services.nft_service import NFTService
+        from tasks.task_manager import TaskManager
+        
+        by_campaign: Dict[str, List[Dict]] = {}
+        for escrow in escrows:
+            by_campaign.setdefault(escrow['campaign_id'], []).append(escrow)
+        
+        result = self.db_session.execute(
+            text("""
+            SELECT id, nft_reward_name, nft_reward_description, nft_reward_image_url
+            FROM escrow_campaigns WHERE id IN :ids
+            """).bindparams(bindparam('ids', expanding=True)),
+            {'ids': list(by_campaign)}
+        )
+        campaigns = {campaign['id']: campaign for campaign in result.mappings().all()}
+        
+        nft_service = NFTService(
+            self.db_session,
+            self.xrpl_client,
+            self.task_manager or TaskManager(self.db_session)
+        )
+        
+        mint_ids = {}
+        errors = []
+        for campaign_id, campaign_escrows in by_campaign.items():
+            campaign = campaigns.get(campaign_id)
             if not campaign:
-                raise ValueError(f"Campaign not found: {campaign_id}")
-            
-            # NFT発行タスクを作成
-            from services.nft_service import NFTService
-            from tasks.task_manager import TaskManager
+                errors.extend({'escrow_id': escrow['id'], 'error': f"Campaign not found: {campaign_id}"} for escrow in campaign_escrows)
+                continue
             
-            task_manager = TaskManager(self.db_session)
-            nft_service = NFTService(
-                self.db_session,
-                self.xrpl_client,
-                task_manager
-            )
-            
-            nft_service.mint_nft(
-                user_id=user_id,
-                nft_name=campaign['nft_reward_name'],
-                nft_description=campaign['nft_reward_description'],
-                nft_image_url=campaign['nft_reward_image_url'],
-                metadata={'campaign_id': campaign_id, 'type': 'escrow_reward'}
-            )
+            # 一括発行は1ユーザー1件のため、同じユーザーの複数ステークは回を分ける
+            rounds: List[List[Dict]] = []
+            seen: Dict[str, int] = {}
+            for escrow in campaign_escrows:
+                round_index = seen.get(escrow['user_id'], 0)
+                seen[escrow['user_id']] = round_index + 1
+                if round_index == len(rounds):
+                    rounds.append([])
+                rounds[round_index].append(escrow)
             
-            logger.info(f"Awarded campaign NFT to user {user_id}")
+            for round_escrows in rounds:
+                try:
+                    queued = nft_service.mint_campaign(
+                        user_ids=[escrow['user_id'] for escrow in round_escrows],
+                        nft_name=campaign['nft_reward_name'],
+                        nft_description=campaign['nft_reward_description'],
+                        nft_image_url=campaign['nft_reward_image_url'],
+                        metadata={'campaign_id': campaign_id, 'type': 'escrow_reward'}
+                    )
+                except Exception as e:
+                    logger.error(f"Error awarding campaign NFTs for {campaign_id}: {str(e)}")
+                    errors.extend({'escrow_id': escrow['id'], 'error': str(e)} for escrow in round_escrows)
+                    continue
+                
+                for escrow in round_escrows:
+                    if escrow['user_id'] in queued['mint_ids']:
+                        mint_ids[escrow['id']] = queued['mint_ids'][escrow['user_id']]
             
-        except Exception as e:
-            logger.error(f"Error awarding campaign NFT: {str(e)}")
-            raise
+            logger.info(f"Awarded {len(campaign_escrows)} campaign NFTs for campaign {campaign_id}")
+        
+        return mint_ids, errors
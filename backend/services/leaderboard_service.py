@@ -0,0 +1,368 @@
+"""
+Leaderboard Service for importance-score and referral rankings.
+ランキングはプロセス内の Leaderboard（インデックス付きスキップリスト）で保持し、
+上位K件・ユーザーの順位・順位範囲の取得を O(log n) で行う。
+スコアの変更は leaderboard_entries（スナップショット）にも書き込み、
+各プロセスは初回にスナップショットを読み込んだ後、更新された行だけを定期的に取り込む。
+再構築のたびに leaderboard_generations の世代を進め、世代が変わったプロセスは全体を読み直す。
+"""
+from typing import Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from utils.leaderboard import Leaderboard
+
+logger = logging.getLogger(__name__)
+
+
+IMPORTANCE_BOARD = 'importance'
+REFERRALS_BOARD = 'referrals'
+
+# スナップショットが空のときの再構築クエリ（ボード名 -> user_id, score）
+_SOURCE_QUERIES = {
+    IMPORTANCE_BOARD: "SELECT id AS user_id, importance_score AS score FROM users WHERE importance_score > 0",
+    REFERRALS_BOARD: "SELECT referrer_id AS user_id, COUNT(*) AS score FROM referrals GROUP BY referrer_id",
+}
+
+
+class _BoardState:
+    """プロセス内のランキングと同期位置"""
+    
+    def __init__(self):
+        self.leaderboard = Leaderboard()
+        self.synced_until: Optional[datetime] = None
+        self.generation: Optional[int] = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+
+_boards: Dict[str, _BoardState] = {}
+_boards_lock = threading.Lock()
+
+
+class LeaderboardService:
+    """Service for ranked leaderboards backed by a persisted snapshot."""
+    
+    # 設定
+    SYNC_INTERVAL = 5.0  # 他プロセスの更新を取り込む間隔（秒）
+    SYNC_OVERLAP = timedelta(seconds=2)  # コミット遅延・時計ずれ分だけ同期範囲を重ねる
+    
+    def __init__(self, db_session: Session):
+        """Initialize LeaderboardService."""
+        self.db_session = db_session
+    
+    def set_score(self, board: str, user_id: str, score: int) -> None:
+        """
+        ユーザーのスコアを設定（0以下はランキングから外す）
+        
+        Args:
+            board: ボード名
+            user_id: ユーザーID
+            score: 新しいスコア
+        """
+        state = self._get_state(board)
+        params = {'board': board, 'user_id': user_id, 'score': score, 'updated_at': datetime.utcnow()}
+        try:
+            self._upsert(
+                "UPDATE leaderboard_entries SET score = :score, updated_at = :updated_at "
+                "WHERE board = :board AND user_id = :user_id",
+                params
+            )
+            self.db_session.commit()
+        except Exception as e:
+            logger.error(f"Error setting {board} leaderboard score for {user_id}: {str(e)}")
+            self.db_session.rollback()
+            raise
+        
+        self._apply(state, user_id, score)
+    
+    def increment_score(self, board: str, user_id: str, delta: int = 1) -> int:
+        """
+        ユーザーのスコアを加算（他プロセスと競合しないようDB上で加算）
+        元になる変更はコミット済みであること（スナップショットが空で再構築した場合は二重に加算しない）
+        
+        Args:
+            board: ボード名
+            user_id: ユーザーID
+            delta: 加算値
+        
+        Returns:
+            int: 加算後のスコア
+        """
+        state, seeded = self._sync_state(board)
+        if seeded:
+            # 元テーブルから作り直した直後なので、確定済みの変更は反映されている
+            return int(state.leaderboard.score(user_id) or 0)
+        params = {'board': board, 'user_id': user_id, 'score': delta, 'updated_at': datetime.utcnow()}
+        try:
+            self._upsert(
+                "UPDATE leaderboard_entries SET score = score + :score, updated_at = :updated_at "
+                "WHERE board = :board AND user_id = :user_id",
+                params
+            )
+            score = self.db_session.execute(
+                text("SELECT score FROM leaderboard_entries WHERE board = :board AND user_id = :user_id"),
+                params
+            ).scalar()
+            self.db_session.commit()
+        except Exception as e:
+            logger.error(f"Error incrementing {board} leaderboard score for {user_id}: {str(e)}")
+            self.db_session.rollback()
+            raise
+        
+        self._apply(state, user_id, score)
+        return score
+    
+    def top(self, board: str, limit: int) -> List[Dict]:
+        """
+        上位ユーザーを取得
+        
+        Args:
+            board: ボード名
+            limit: 取得件数
+        
+        Returns:
+            List[Dict]: 順位順の rank（1始まり）, user_id, score
+        """
+        return self.range(board, 0, limit)
+    
+    def range(self, board: str, start: int, stop: int) -> List[Dict]:
+        """
+        順位範囲のユーザーを取得
+        
+        Args:
+            board: ボード名
+            start: 開始位置（0始まり、含む）
+            stop: 終了位置（含まない）
+        
+        Returns:
+            List[Dict]: 順位順の rank（1始まり）, user_id, score
+        """
+        entries = self._get_state(board).leaderboard.range(start, stop)
+        return [
+            {'rank': max(start, 0) + index + 1, 'user_id': user_id, 'score': score}
+            for index, (user_id, score) in enumerate(entries)
+        ]
+    
+    def get_rank(self, board: str, user_id: str) -> Optional[Dict]:
+        """
+        ユーザーの順位を取得
+        
+        Args:
+            board: ボード名
+            user_id: ユーザーID
+        
+        Returns:
+            Optional[Dict]: rank（1始まり）, score, total。ランキング外なら None
+        """
+        leaderboard = self._get_state(board).leaderboard
+        rank = leaderboard.rank(user_id)
+        if rank is None:
+            return None
+        return {'rank': rank + 1, 'score': leaderboard.score(user_id), 'total': len(leaderboard)}
+    
+    def rebuild(self, board: str) -> int:
+        """
+        元テーブルからスナップショットとプロセス内ランキングを作り直す
+        
+        Args:
+            board: ボード名
+        
+        Returns:
+            int: ランキング対象のユーザー数
+        """
+        state = self._get_state(board, sync=False)
+        with state.lock:
+            count = self._rebuild_locked(board, state)
+        logger.info(f"Rebuilt {board} leaderboard with {count} users")
+        return count
+    
+    def _get_state(self, board: str, sync: bool = True) -> _BoardState:
+        """
+        ボードの状態を取得（sync=True なら読み込み・同期も行う）
+        
+        Args:
+            board: ボード名
+            sync: 読み込み・同期を行うか
+        
+        Returns:
+            _BoardState: ボードの状態
+        
+        Raises:
+            ValueError: 未知のボード名の場合
+        """
+        if board not in _SOURCE_QUERIES:
+            raise ValueError(f"Unknown leaderboard: {board}")
+        with _boards_lock:
+            state = _boards.setdefault(board, _BoardState())
+        if sync:
+            state, _ = self._sync_state(board)
+        return state
+    
+    def _sync_state(self, board: str) -> Tuple[_BoardState, bool]:
+        """
+        初回はスナップショットを読み込み、以後は SYNC_INTERVAL ごとに更新分を取り込む
+        
+        Args:
+            board: ボード名
+        
+        Returns:
+            Tuple[_BoardState, bool]: ボードの状態と、今回元テーブルから再構築したか
+        """
+        state = self._get_state(board, sync=False)
+        with state.lock:
+            if state.synced_until is None:
+                return state, self._load_locked(board, state)
+            if time.monotonic() - state.checked_at >= self.SYNC_INTERVAL:
+                self._sync_locked(board, state, state.synced_until)
+        return state, False
+    
+    def _load_locked(self, board: str, state: _BoardState) -> bool:
+        """スナップショット全体を読み込む（空なら元テーブルから再構築して True）"""
+        started = datetime.utcnow()
+        # 行より先に世代を読むので、間に挟まった再構築は次の同期で読み直される
+        generation = self._read_generation(board)
+        rows = self.db_session.execute(
+            text("SELECT user_id, score FROM leaderboard_entries WHERE board = :board"),
+            {'board': board}
+        ).all()
+        if not rows:
+            self._rebuild_locked(board, state)
+            return True
+        
+        state.leaderboard = Leaderboard()
+        for row in rows:
+            self._apply(state, row.user_id, row.score)
+        state.generation = generation
+        state.synced_until = started - self.SYNC_OVERLAP
+        state.checked_at = time.monotonic()
+        logger.info(f"Loaded {board} leaderboard snapshot with {len(rows)} users")
+        return False
+    
+    def _sync_locked(self, board: str, state: _BoardState, since: datetime) -> None:
+        """since 以降に更新された行だけを取り込む（他プロセスが再構築していれば全体を読み直す）"""
+        started = datetime.utcnow()
+        if self._read_generation(board) != state.generation:
+            # 再構築で消えた行は差分に現れないため、スナップショット全体を読み直す
+            self._load_locked(board, state)
+            return
+        rows = self.db_session.execute(
+            text("""
+                SELECT user_id, score FROM leaderboard_entries
+                WHERE board = :board AND updated_at >= :since
+            """),
+            {'board': board, 'since': since}
+        ).all()
+        for row in rows:
+            self._apply(state, row.user_id, row.score)
+        state.synced_until = started - self.SYNC_OVERLAP
+        state.checked_at = time.monotonic()
+    
+    def _rebuild_locked(self, board: str, state: _BoardState) -> int:
+        """元テーブルから集計してスナップショットを置き換える"""
+        started = datetime.utcnow()
+        try:
+            rows = self.db_session.execute(text(_SOURCE_QUERIES[board])).all()
+            self.db_session.execute(
+                text("DELETE FROM leaderboard_entries WHERE board = :board"),
+                {'board': board}
+            )
+            if rows:
+                self.db_session.execute(
+                    text("""
+                        INSERT INTO leaderboard_entries (board, user_id, score, updated_at)
+                        VALUES (:board, :user_id, :score, :updated_at)
+                    """),
+                    [
+                        {'board': board, 'user_id': row.user_id, 'score': row.score, 'updated_at': started}
+                        for row in rows
+                    ]
+                )
+            generation = self._bump_generation(board, started)
+            self.db_session.commit()
+        except Exception as e:
+            logger.error(f"Error rebuilding {board} leaderboard: {str(e)}")
+            self.db_session.rollback()
+            raise
+        
+        state.leaderboard = Leaderboard()
+        for row in rows:
+            self._apply(state, row.user_id, row.score)
+        state.generation = generation
+        state.synced_until = started - self.SYNC_OVERLAP
+        state.checked_at = time.monotonic()
+        return len(rows)
+    
+    def _read_generation(self, board: str) -> int:
+        """ボードのスナップショット世代を取得（未作成は0）"""
+        generation = self.db_session.execute(
+            text("SELECT generation FROM leaderboard_generations WHERE board = :board"),
+            {'board': board}
+        ).scalar()
+        return generation or 0
+    
+    def _bump_generation(self, board: str, rebuilt_at: datetime) -> int:
+        """
+        スナップショット世代を進める（再構築と同じトランザクションで呼ぶ）
+        
+        Args:
+            board: ボード名
+            rebuilt_at: 再構築時刻
+        
+        Returns:
+            int: 新しい世代
+        """
+        params = {'board': board, 'rebuilt_at': rebuilt_at}
+        update_sql = (
+            "UPDATE leaderboard_generations SET generation = generation + 1, rebuilt_at = :rebuilt_at "
+            "WHERE board = :board"
+        )
+        if not self.db_session.execute(text(update_sql), params).rowcount:
+            try:
+                with self.db_session.begin_nested():
+                    self.db_session.execute(
+                        text("""
+                            INSERT INTO leaderboard_generations (board, generation, rebuilt_at)
+                            VALUES (:board, 1, :rebuilt_at)
+                        """),
+                        params
+                    )
+            except IntegrityError:
+                # 別プロセスが同時に作成した
+                self.db_session.execute(text(update_sql), params)
+        return self._read_generation(board)
+    
+    def _upsert(self, update_sql: str, params: Dict) -> None:
+        """
+        スナップショット行を更新し、無ければ作成する
+        
+        Args:
+            update_sql: 既存行を更新するSQL
+            params: board, user_id, score, updated_at
+        """
+        if self.db_session.execute(text(update_sql), params).rowcount:
+            return
+        try:
+            with self.db_session.begin_nested():
+                self.db_session.execute(
+                    text("""
+                        INSERT INTO leaderboard_entries (board, user_id, score, updated_at)
+                        VALUES (:board, :user_id, :score, :updated_at)
+                    """),
+                    params
+                )
+        except IntegrityError:
+            # 別プロセスが同時に作成した
+            self.db_session.execute(text(update_sql), params)
+    
+    @staticmethod
+    def _apply(state: _BoardState, user_id: str, score: int) -> None:
+        """プロセス内ランキングに反映（0以下は除外）"""
+        if score and score > 0:
+            state.leaderboard.set(user_id, score)
+        else:
+            state.leaderboard.remove(user_id)
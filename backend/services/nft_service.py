@@ -4,8 +4,9 @@ Handles NFT minting task queuing, ownership verification, and NFT retrieval.
 
 Requirements: 3.1, 3.2, 3.4, 3.5
 """
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
+import uuid
 from sqlalchemy.orm import Session
 from repositories.nft_repository import NFTRepository
 from repositories.wallet_repository import WalletRepository
@@ -24,6 +25,11 @@ class NFTService:
     Handles NFT minting, ownership verification, and NFT retrieval.
     """
     
+    # Campaign mints: recipients per ticket batch (two tickets each, an account
+    # may own at most 250) and parallel XRPL submissions
+    CAMPAIGN_CHUNK_SIZE = 100
+    CAMPAIGN_MAX_WORKERS = 10
+    
     def __init__(
         self,
         db_session: Session,
@@ -185,7 +191,8 @@ class NFTService:
                 nft_mint_id,
                 NFTMintStatus.COMPLETED,
                 nft_object_id=result.get('nft_token_id'),
-                transaction_digest=result.get('transaction_hash')
+                transaction_digest=result.get('transaction_hash'),
+                offer_id=result.get('offer_id')
             )
             self.db_session.commit()
             
@@ -206,6 +213,216 @@ class NFTService:
             logger.error(f"NFT mint failed for {nft_mint_id}: {error_message}")
             raise
     
+    def mint_campaign(
+        self,
+        user_ids: List[str],
+        nft_name: str,
+        nft_description: str,
+        nft_image_url: str,
+        metadata: Optional[Dict] = None,
+        chunk_size: Optional[int] = None,
+        max_workers: Optional[int] = None
+    ) -> Dict:
+        """
+        Queue one NFT drop to many users (event campaigns).
+        Pending records for all recipients are inserted in one batch and a
+        single task mints them from the sponsor wallet in parallel using
+        Tickets, offering each NFT to its recipient in the same pipeline.
+        
+        Args:
+            user_ids: Recipient user IDs (duplicates are minted once)
+            nft_name: Name of the NFT
+            nft_description: Description of the NFT
+            nft_image_url: URL of the NFT image
+            metadata: Additional metadata for the NFT
+            chunk_size: Recipients per ticket batch (default CAMPAIGN_CHUNK_SIZE)
+            max_workers: Parallel submissions (default CAMPAIGN_MAX_WORKERS)
+            
+        Returns:
+            Dict: campaign_id, task_id, queued count, mint_ids (NFT mint
+                  record ID per user) and skipped_user_ids (unknown users or
+                  users without a wallet)
+            
+        Raises:
+            ValueError: If there are no recipients or no sponsor wallet
+        """
+        if not self.xrpl_client.sponsor_wallet:
+            raise ValueError("Sponsor wallet is not configured")
+        
+        recipients = list(dict.fromkeys(user_id for user_id in user_ids if user_id))
+        if not recipients:
+            raise ValueError("At least one recipient is required")
+        
+        chunk_size = min(chunk_size or self.CAMPAIGN_CHUNK_SIZE, 125)
+        
+        try:
+            wallets = self.wallet_repo.find_by_user_ids(recipients)
+            skipped = [user_id for user_id in recipients if user_id not in wallets]
+            
+            campaign_id = str(uuid.uuid4())
+            nft_metadata = {
+                'name': nft_name,
+                'description': nft_description,
+                'image_url': nft_image_url,
+                'campaign_id': campaign_id
+            }
+            if metadata:
+                nft_metadata.update(metadata)
+            
+            nft_mints = self.nft_repo.bulk_create([
+                {
+                    'user_id': user_id,
+                    'wallet_address': wallets[user_id].address,
+                    'status': NFTMintStatus.PENDING,
+                    'nft_metadata': nft_metadata
+                }
+                for user_id in recipients if user_id in wallets
+            ])
+            self.db_session.commit()
+            
+            if not nft_mints:
+                raise ValueError("None of the recipients has a wallet")
+            
+            mints = [(nft_mint.id, nft_mint.wallet_address) for nft_mint in nft_mints]
+            logger.info(f"Created {len(mints)} NFT mint records for campaign {campaign_id}")
+            
+            task_id = self.task_manager.submit_task(
+                task_type='nft_campaign_mint',
+                func=self._execute_campaign_mint,
+                mints=mints,
+                nft_uri=nft_image_url,  # In production, this should point to a metadata JSON file
+                chunk_size=chunk_size,
+                max_workers=max_workers or self.CAMPAIGN_MAX_WORKERS,
+                payload={
+                    'campaign_id': campaign_id,
+                    'recipients': len(mints),
+                    'nft_metadata': nft_metadata
+                }
+            )
+            
+            logger.info(f"Submitted NFT campaign task: {task_id} for campaign: {campaign_id}")
+            
+            return {
+                'campaign_id': campaign_id,
+                'task_id': task_id,
+                'queued': len(mints),
+                'mint_ids': {nft_mint.user_id: nft_mint.id for nft_mint in nft_mints},
+                'skipped_user_ids': skipped
+            }
+            
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error during NFT campaign: {str(e)}")
+            self.db_session.rollback()
+            raise Exception(f"Failed to queue NFT campaign: {str(e)}")
+    
+    def _execute_campaign_mint(
+        self,
+        mints: List[Tuple[str, str]],
+        nft_uri: str,
+        chunk_size: int,
+        max_workers: int
+    ) -> Dict:
+        """
+        Execute a campaign mint (called by task manager).
+        Per chunk: reserve two tickets per recipient, mint and create transfer
+        offers (signed in bulk, submitted in parallel), then write all results
+        with one bulk UPDATE.
+        
+        Args:
+            mints: (nft_mint_id, wallet_address) of each recipient
+            nft_uri: URI of the NFT
+            chunk_size: Recipients per ticket batch
+            max_workers: Parallel submissions
+            
+        Returns:
+            Dict: Counts of completed, failed and offers_failed mints
+        """
+        issuer_wallet = self.xrpl_client.sponsor_wallet
+        summary = {'completed': 0, 'failed': 0, 'offers_failed': 0}
+        
+        for start in range(0, len(mints), chunk_size):
+            chunk = mints[start:start + chunk_size]
+            chunk_ids = [nft_mint_id for nft_mint_id, _ in chunk]
+            
+            try:
+                tickets = self.xrpl_client.reserve_tickets(issuer_wallet, 2 * len(chunk))
+            except Exception as e:
+                # Without tickets nothing of this or later chunks can be minted
+                remaining_ids = [nft_mint_id for nft_mint_id, _ in mints[start:]]
+                self.nft_repo.bulk_update_results([
+                    {'id': nft_mint_id, 'status': NFTMintStatus.FAILED,
+                     'error_message': f"Ticket reservation failed: {str(e)}"}
+                    for nft_mint_id in remaining_ids
+                ])
+                self.db_session.commit()
+                summary['failed'] += len(remaining_ids)
+                logger.error(f"NFT campaign stopped, ticket reservation failed: {str(e)}")
+                break
+            
+            self.nft_repo.bulk_update_status(chunk_ids, NFTMintStatus.MINTING)
+            self.db_session.commit()
+            
+            mint_results = self.xrpl_client.mint_nfts_with_tickets(
+                issuer_wallet,
+                [
+                    {
+                        'recipient': wallet_address,
+                        'mint_ticket': tickets[2 * index],
+                        'offer_ticket': tickets[2 * index + 1]
+                    }
+                    for index, (_, wallet_address) in enumerate(chunk)
+                ],
+                nft_uri,
+                max_workers=max_workers
+            )
+            
+            results = []
+            unused_tickets = []
+            for index, ((nft_mint_id, _), result) in enumerate(zip(chunk, mint_results)):
+                # Tickets of transactions that never reached the ledger go back to the pool
+                if not result.get('mint_ticket_used'):
+                    unused_tickets.append(tickets[2 * index])
+                if not result.get('offer_ticket_used'):
+                    unused_tickets.append(tickets[2 * index + 1])
+                
+                if result.get('error'):
+                    summary['failed'] += 1
+                    results.append({
+                        'id': nft_mint_id,
+                        'status': NFTMintStatus.FAILED,
+                        'error_message': result['error']
+                    })
+                    continue
+                
+                summary['completed'] += 1
+                if result.get('offer_error'):
+                    summary['offers_failed'] += 1
+                results.append({
+                    'id': nft_mint_id,
+                    'status': NFTMintStatus.COMPLETED,
+                    'nft_object_id': result.get('nft_token_id'),
+                    'transaction_digest': result.get('transaction_hash'),
+                    'offer_id': result.get('offer_id'),
+                    'error_message': (
+                        f"Transfer offer failed: {result['offer_error']}"
+                        if result.get('offer_error') else None
+                    )
+                })
+            
+            self.xrpl_client.release_tickets(issuer_wallet, unused_tickets)
+            self.nft_repo.bulk_update_results(results)
+            self.db_session.commit()
+            
+            logger.info(
+                f"NFT campaign progress: {start + len(chunk)}/{len(mints)} "
+                f"({summary['completed']} completed, {summary['failed']} failed)"
+            )
+        
+        logger.info(f"NFT campaign finished: {summary}")
+        return summary
+    
     def get_user_nfts(
         self,
         user_id: str,
@@ -263,6 +480,7 @@ class NFTService:
             'status': nft.status.value,
             'nft_object_id': nft.nft_object_id,
             'transaction_digest': nft.transaction_digest,
+            'offer_id': nft.offer_id,
             'error_message': nft.error_message,
             'created_at': nft.created_at.isoformat() if nft.created_at else None,
             'updated_at': nft.updated_at.isoformat() if nft.updated_at else None
@@ -6,8 +6,10 @@ Requirements: 5.1, 5.2, 5.3, 5.4, 5.6, 5.7
 """
 from typing import List, Dict, Optional
 import logging
+import time
+from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from repositories.order_repository import OrderRepository
+from repositories.order_repository import OrderRepository, OrderItemRepository
 from repositories.product_repository import ProductRepository
 from repositories.user_repository import UserRepository
 from repositories.nft_repository import NFTRepository
@@ -33,6 +35,7 @@ class OrderService:
         """
         self.db_session = db_session
         self.order_repo = OrderRepository(db_session)
+        self.order_item_repo = OrderItemRepository(db_session)
         self.product_repo = ProductRepository(db_session)
         self.user_repo = UserRepository(db_session)
         self.nft_repo = NFTRepository(db_session)
@@ -325,6 +328,74 @@ class OrderService:
             self.db_session.rollback()
             raise Exception(f"Order cancellation failed: {str(e)}")
     
+    def expire_abandoned_orders(
+        self,
+        ttl_minutes: int = 30,
+        batch_size: int = 500,
+        max_batches: Optional[int] = None
+    ) -> Dict:
+        """
+        Expire pending orders older than the TTL and release their stock.
+        Each batch expires its orders with one UPDATE and restores stock with
+        one grouped UPDATE per batch, committed together.
+        
+        Args:
+            ttl_minutes: Age in minutes after which a pending order expires
+            batch_size: Maximum number of orders per batch
+            max_batches: Optional cap on the number of batches per run
+            
+        Returns:
+            Dict: Run summary with counts and elapsed time
+        """
+        started = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(minutes=ttl_minutes)
+        
+        batches = 0
+        expired_count = 0
+        restored_units = 0
+        products_restocked = 0
+        
+        while max_batches is None or batches < max_batches:
+            try:
+                order_ids = self.order_repo.find_expired_pending_ids(cutoff, batch_size)
+                if not order_ids:
+                    self.db_session.rollback()
+                    break
+                
+                quantities = self.order_item_repo.sum_quantities_by_product(order_ids)
+                expired = self.order_repo.mark_expired(order_ids)
+                restocked = self.product_repo.restore_stock_bulk(quantities)
+                
+                self.db_session.commit()
+            except Exception as e:
+                logger.error(f"Failed to expire abandoned orders: {str(e)}")
+                self.db_session.rollback()
+                raise Exception(f"Abandoned order expiry failed: {str(e)}")
+            
+            batches += 1
+            expired_count += expired
+            restored_units += sum(quantities.values())
+            products_restocked += restocked
+            
+            logger.info(
+                f"Expired {expired} abandoned orders in batch {batches}, "
+                f"restored stock for {restocked} products"
+            )
+            
+            if len(order_ids) < batch_size:
+                break
+        
+        elapsed_ms = int((time.monotonic() - started) * 1000)
+        
+        return {
+            'cutoff': cutoff.isoformat(),
+            'batches': batches,
+            'expired_count': expired_count,
+            'restored_units': restored_units,
+            'products_restocked': products_restocked,
+            'elapsed_ms': elapsed_ms
+        }
+    
     def _verify_user_nft_requirement(self, user_id: str, required_nft_id: str) -> bool:
         """
         Verify if user meets NFT requirement.
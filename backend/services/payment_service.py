@@ -8,10 +8,12 @@ from typing import Dict, Optional
 import logging
 from sqlalchemy.orm import Session
 from repositories.payment_repository import PaymentRepository
-from repositories.order_repository import OrderRepository
+from repositories.order_repository import OrderRepository, OrderItemRepository
+from repositories.product_repository import ProductRepository
 from clients.stripe_client import StripeClient
-from models.payment import PaymentStatus
+from models.payment import Payment, PaymentStatus
 from models.order import OrderStatus
+from exceptions import ConcurrentUpdateError
 
 
 logger = logging.getLogger(__name__)
@@ -23,6 +25,9 @@ class PaymentService:
     Handles payment intent creation, webhook processing, and order completion.
     """
     
+    # Payment statuses that no later event may overwrite
+    SETTLED_STATUSES = (PaymentStatus.SUCCEEDED, PaymentStatus.FAILED, PaymentStatus.CANCELLED)
+    
     def __init__(
         self,
         db_session: Session,
@@ -38,6 +43,8 @@ class PaymentService:
         self.db_session = db_session
         self.payment_repo = PaymentRepository(db_session)
         self.order_repo = OrderRepository(db_session)
+        self.order_item_repo = OrderItemRepository(db_session)
+        self.product_repo = ProductRepository(db_session)
         self.stripe_client = stripe_client
     
     def create_payment_intent(
@@ -47,6 +54,8 @@ class PaymentService:
     ) -> Dict:
         """
         Create a Stripe Payment Intent for an order.
+        The order is claimed with a version-checked update; when a concurrent
+        request changes it first the order is re-read and checked again.
         
         Args:
             order_id: Order ID
@@ -60,6 +69,21 @@ class PaymentService:
             
         Requirements: 5.5 - Stripe Payment Intent creation
         """
+        return self.order_repo.run_with_version_retry(
+            lambda: self._create_payment_intent_once(order_id, customer_email)
+        )
+    
+    def _create_payment_intent_once(
+        self,
+        order_id: str,
+        customer_email: Optional[str] = None
+    ) -> Dict:
+        """
+        Single attempt of create_payment_intent.
+        
+        Raises:
+            ConcurrentUpdateError: If the order changed after it was read
+        """
         try:
             # Get order
             order = self.order_repo.find_by_id(order_id)
@@ -86,32 +110,40 @@ class PaymentService:
                         'message': 'Payment already in progress'
                     }
             
+            # Claim the order before calling Stripe: a concurrent request that
+            # read the same version gets ConcurrentUpdateError, re-reads the
+            # order and is rejected by the status check above
+            claimed_version = self.order_repo.update_status(
+                order_id, OrderStatus.PROCESSING, expected_version=order.version
+            ).version
+            
             # Create Stripe Payment Intent
             metadata = {
                 'order_id': order_id,
                 'user_id': order.user_id
             }
             
-            payment_intent = self.stripe_client.create_payment_intent(
-                amount=order.total_amount,
-                currency='jpy',
-                metadata=metadata,
-                description=f"Order {order_id}",
-                customer_email=customer_email
-            )
-            
-            # Create payment record
-            payment = self.payment_repo.create_payment(
-                order_id=order_id,
-                stripe_payment_intent_id=payment_intent['id'],
-                amount=order.total_amount,
-                currency='jpy'
-            )
-            
-            # Update order status to processing
-            self.order_repo.update_status(order_id, OrderStatus.PROCESSING)
+            try:
+                payment_intent = self.stripe_client.create_payment_intent(
+                    amount=order.total_amount,
+                    currency='jpy',
+                    metadata=metadata,
+                    description=f"Order {order_id}",
+                    customer_email=customer_email
+                )
+                
+                # Create payment record
+                payment = self.payment_repo.create_payment(
+                    order_id=order_id,
+                    stripe_payment_intent_id=payment_intent['id'],
+                    amount=order.total_amount,
+                    currency='jpy'
+                )
+            except Exception:
+                self.db_session.rollback()
+                self._release_order_claim(order_id, claimed_version)
+                raise
             
-            self.db_session.commit()
             logger.info(
                 f"Created payment intent for order {order_id}: {payment.id}"
             )
@@ -127,11 +159,31 @@ class PaymentService:
         except ValueError as e:
             logger.error(f"Payment intent creation failed: {str(e)}")
             raise
+        except ConcurrentUpdateError:
+            raise
         except Exception as e:
             logger.error(f"Unexpected error creating payment intent: {str(e)}")
             self.db_session.rollback()
             raise Exception(f"Failed to create payment intent: {str(e)}")
     
+    def _release_order_claim(self, order_id: str, claimed_version: int) -> None:
+        """
+        Return a claimed order to pending after the Stripe call failed,
+        unless it has been changed since it was claimed.
+        
+        Args:
+            order_id: Order ID
+            claimed_version: Order version written by the claim
+        """
+        try:
+            self.order_repo.update_status(
+                order_id, OrderStatus.PENDING, expected_version=claimed_version
+            )
+        except ConcurrentUpdateError:
+            logger.warning(
+                f"Order {order_id} changed after it was claimed; leaving it as is"
+            )
+    
     def handle_webhook(self, payload: bytes, signature_header: str) -> Dict:
         """
         Handle Stripe webhook event.
@@ -188,28 +240,10 @@ class PaymentService:
         Requirements: 5.6 - Payment success handling and order completion
         """
         try:
-            payment_intent_id = event_data['payment_intent_id']
-            
-            # Find payment by Stripe Payment Intent ID
-            payment = self.payment_repo.find_by_stripe_payment_intent_id(
-                payment_intent_id
-            )
-            
-            if not payment:
-                logger.warning(
-                    f"Payment not found for intent: {payment_intent_id}"
-                )
-                return
-            
-            # Update payment status
-            self.payment_repo.update_status(payment.id, PaymentStatus.SUCCEEDED)
-            
-            # Update order status to completed
-            self.order_repo.update_status(payment.order_id, OrderStatus.COMPLETED)
-            
-            self.db_session.commit()
-            logger.info(
-                f"Payment succeeded for order {payment.order_id}: {payment.id}"
+            self._settle_payment(
+                event_data['payment_intent_id'],
+                PaymentStatus.SUCCEEDED,
+                OrderStatus.COMPLETED
             )
             
         except Exception as e:
@@ -228,41 +262,11 @@ class PaymentService:
         Requirements: 5.7 - Payment failure handling with stock restoration
         """
         try:
-            payment_intent_id = event_data['payment_intent_id']
-            
-            # Find payment by Stripe Payment Intent ID
-            payment = self.payment_repo.find_by_stripe_payment_intent_id(
-                payment_intent_id
-            )
-            
-            if not payment:
-                logger.warning(
-                    f"Payment not found for intent: {payment_intent_id}"
-                )
-                return
-            
-            # Update payment status
-            self.payment_repo.update_status(payment.id, PaymentStatus.FAILED)
-            
-            # Update order status to failed and restore stock
-            order = self.order_repo.find_by_id(payment.order_id)
-            if order:
-                # Restore stock for all items
-                from repositories.product_repository import ProductRepository
-                product_repo = ProductRepository(self.db_session)
-                
-                for item in order.order_items:
-                    product_repo.update_stock(item.product_id, item.quantity)
-                    logger.info(
-                        f"Restored {item.quantity} units of product {item.product_id}"
-                    )
-                
-                # Update order status
-                self.order_repo.update_status(payment.order_id, OrderStatus.FAILED)
-            
-            self.db_session.commit()
-            logger.info(
-                f"Payment failed for order {payment.order_id}: {payment.id}"
+            self._settle_payment(
+                event_data['payment_intent_id'],
+                PaymentStatus.FAILED,
+                OrderStatus.FAILED,
+                restore_stock=True
             )
             
         except Exception as e:
@@ -281,47 +285,113 @@ class PaymentService:
         Requirements: 5.7 - Payment cancellation handling with stock restoration
         """
         try:
-            payment_intent_id = event_data['payment_intent_id']
-            
-            # Find payment by Stripe Payment Intent ID
-            payment = self.payment_repo.find_by_stripe_payment_intent_id(
-                payment_intent_id
+            self._settle_payment(
+                event_data['payment_intent_id'],
+                PaymentStatus.CANCELLED,
+                OrderStatus.CANCELLED,
+                restore_stock=True
             )
             
-            if not payment:
-                logger.warning(
-                    f"Payment not found for intent: {payment_intent_id}"
-                )
-                return
-            
-            # Update payment status
-            self.payment_repo.update_status(payment.id, PaymentStatus.CANCELLED)
+        except Exception as e:
+            logger.error(f"Failed to handle payment cancellation: {str(e)}")
+            self.db_session.rollback()
+            raise
+    
+    def _settle_payment(
+        self,
+        payment_intent_id: str,
+        payment_status: PaymentStatus,
+        order_status: OrderStatus,
+        restore_stock: bool = False
+    ) -> Optional[Payment]:
+        """
+        Move a payment and its order to their final status.
+        Both transitions are version-checked and committed together; when a
+        concurrent webhook or cancellation wins the race the payment is
+        re-read, and a payment that is already settled is left untouched so
+        stock is restored at most once.
+        
+        Args:
+            payment_intent_id: Stripe Payment Intent ID
+            payment_status: Final payment status
+            order_status: Final order status
+            restore_stock: Add the order's items back to stock
             
-            # Update order status to cancelled and restore stock
-            order = self.order_repo.find_by_id(payment.order_id)
-            if order:
-                # Restore stock for all items
-                from repositories.product_repository import ProductRepository
-                product_repo = ProductRepository(self.db_session)
-                
-                for item in order.order_items:
-                    product_repo.update_stock(item.product_id, item.quantity)
-                    logger.info(
-                        f"Restored {item.quantity} units of product {item.product_id}"
-                    )
-                
-                # Update order status
-                self.order_repo.update_status(payment.order_id, OrderStatus.CANCELLED)
+        Returns:
+            Optional[Payment]: Current payment or None if not found
             
-            self.db_session.commit()
+        Raises:
+            ConcurrentUpdateError: If every attempt conflicted
+        """
+        return self.payment_repo.run_with_version_retry(
+            lambda: self._settle_payment_once(
+                payment_intent_id, payment_status, order_status, restore_stock
+            )
+        )
+    
+    def _settle_payment_once(
+        self,
+        payment_intent_id: str,
+        payment_status: PaymentStatus,
+        order_status: OrderStatus,
+        restore_stock: bool
+    ) -> Optional[Payment]:
+        """
+        Single attempt of _settle_payment.
+        
+        Raises:
+            ConcurrentUpdateError: If the payment or order changed after it was read
+        """
+        # Find payment by Stripe Payment Intent ID
+        payment = self.payment_repo.find_by_stripe_payment_intent_id(
+            payment_intent_id
+        )
+        
+        if not payment:
+            logger.warning(
+                f"Payment not found for intent: {payment_intent_id}"
+            )
+            return None
+        
+        if payment.status in self.SETTLED_STATUSES:
             logger.info(
-                f"Payment cancelled for order {payment.order_id}: {payment.id}"
+                f"Payment {payment.id} already {payment.status.value}; "
+                f"ignoring {payment_status.value}"
             )
+            return payment
+        
+        order = self.order_repo.find_by_id(payment.order_id)
+        
+        # Update payment status
+        payment = self.payment_repo.update_status(
+            payment.id, payment_status, expected_version=payment.version, commit=False
+        )
+        
+        # Only an open order is moved, so stock already restored by an order
+        # cancellation is not restored again
+        if order and order.status in (OrderStatus.PENDING, OrderStatus.PROCESSING):
+            if restore_stock:
+                quantities = self.order_item_repo.sum_quantities_by_product([order.id])
+                self.product_repo.restore_stock_bulk(quantities)
+                logger.info(
+                    f"Restored {sum(quantities.values())} units for order {order.id}"
+                )
             
-        except Exception as e:
-            logger.error(f"Failed to handle payment cancellation: {str(e)}")
-            self.db_session.rollback()
-            raise
+            self.order_repo.update_status(
+                order.id, order_status, expected_version=order.version, commit=False
+            )
+        elif order:
+            logger.warning(
+                f"Order {order.id} is already {order.status.value}; "
+                f"not moving it to {order_status.value}"
+            )
+        
+        self.db_session.commit()
+        logger.info(
+            f"Payment {payment_status.value} for order {payment.order_id}: {payment.id}"
+        )
+        
+        return payment
     
     def get_payment(self, payment_id: str) -> Optional[Dict]:
         """
@@ -402,21 +472,14 @@ class PaymentService:
                 payment.stripe_payment_intent_id
             )
             
-            # Update payment status
-            self.payment_repo.update_status(payment.id, PaymentStatus.CANCELLED)
-            
-            # Update order and restore stock
-            order = self.order_repo.find_by_id(payment.order_id)
-            if order:
-                from repositories.product_repository import ProductRepository
-                product_repo = ProductRepository(self.db_session)
-                
-                for item in order.order_items:
-                    product_repo.update_stock(item.product_id, item.quantity)
-                
-                self.order_repo.update_status(payment.order_id, OrderStatus.CANCELLED)
-            
-            self.db_session.commit()
+            # Update payment and order, restoring stock unless a concurrent
+            # cancellation webhook has already done so
+            payment = self._settle_payment(
+                payment.stripe_payment_intent_id,
+                PaymentStatus.CANCELLED,
+                OrderStatus.CANCELLED,
+                restore_stock=True
+            )
             logger.info(f"Cancelled payment: {payment_id}")
             
             return payment.to_dict()
@@ -0,0 +1,243 @@
+"""
+Buffered referral click ingestion.
+Clicks are deduplicated in memory on code+IP+UA with a rotating Bloom filter,
+resolved to their referrer through a per-process code cache, and written to
+referral_clicks in batched inserts by a background flusher. A click storm
+therefore costs hash lookups and list appends instead of one transaction per
+click; only the first click of a visitor per window is stored.
+"""
+import atexit
+import logging
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from utils.bloom_filter import RotatingBloomFilter
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+# Cached marker for codes that belong to no user
+_NO_REFERRER = ''
+
+_INSERT_CLICKS = text(
+    "INSERT INTO referral_clicks (id, referral_code, referrer_id, ip_address, user_agent, clicked_at) "
+    "VALUES (:id, :referral_code, :referrer_id, :ip_address, :user_agent, :clicked_at)"
+)
+
+
+class ReferralClickIngestor:
+    """
+    Deduplicates referral clicks and writes them in batches.
+    """
+    
+    def __init__(
+        self,
+        bind: Engine,
+        flush_size: int = 500,
+        flush_interval: float = 2.0,
+        dedup_window: float = 1800.0,
+        dedup_capacity: int = 1000000,
+        code_cache_ttl: float = 3600.0,
+        unknown_code_ttl: float = 60.0,
+        max_pending: int = 50000
+    ):
+        """
+        Initialize ReferralClickIngestor. The flusher thread starts on the first click.
+        
+        Args:
+            bind: Engine clicks are written with
+            flush_size: Buffered clicks that trigger an immediate flush
+            flush_interval: Seconds between background flushes
+            dedup_window: Seconds a visitor's repeated clicks on a code are ignored (at least)
+            dedup_capacity: Distinct clicks per window the dedup filter is sized for
+            code_cache_ttl: Seconds a code -> referrer mapping is cached
+            unknown_code_ttl: Seconds an unknown code is cached (it may be issued later)
+            max_pending: Buffered clicks kept while the database is unavailable
+        """
+        self.bind = bind
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.code_cache_ttl = code_cache_ttl
+        self.unknown_code_ttl = unknown_code_ttl
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._seen = RotatingBloomFilter(dedup_capacity, dedup_window)
+        self._referrers = TTLCache(maxsize=100000)
+        self._pending: List[Dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+    
+    def record(self, referral_code: str, ip_address: str, user_agent: str) -> Optional[Dict]:
+        """
+        Record a click unless the same visitor clicked the code within the window.
+        
+        Args:
+            referral_code: Referral code
+            ip_address: IP address
+            user_agent: User agent
+        
+        Returns:
+            Optional[Dict]: click_id, referral_code, referrer_id and dropped, or None
+                for a duplicate. A click that does not fit in the buffer has
+                dropped=True and no click_id; it is not remembered for dedup.
+        """
+        visitor = '\x00'.join((referral_code, ip_address or '', user_agent or ''))
+        if visitor in self._seen:
+            return None
+        
+        row = {
+            'id': str(uuid.uuid4()),
+            'referral_code': referral_code,
+            'referrer_id': self._resolve_referrer(referral_code),
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            'clicked_at': datetime.utcnow(),
+        }
+        
+        # Remember the visitor and buffer the click under one lock, so a visitor
+        # is never remembered for a click the buffer had no room for
+        with self._lock:
+            if visitor in self._seen:
+                return None
+            if len(self._pending) >= self.max_pending:
+                return self._drop(referral_code)
+            self._seen.add(visitor)
+            self._pending.append(row)
+            full = len(self._pending) >= self.flush_size
+            if self._flusher is None:
+                self._start_flusher()
+        if full:
+            self._wake.set()
+        
+        return {
+            'click_id': row['id'],
+            'referral_code': referral_code,
+            'referrer_id': row['referrer_id'],
+            'dropped': False,
+        }
+    
+    def flush(self) -> int:
+        """
+        Write the buffered clicks in one multi-row insert.
+        On a database error the clicks are put back for the next flush.
+        
+        Returns:
+            int: Clicks written
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            
+            try:
+                with self.bind.begin() as connection:
+                    connection.execute(_INSERT_CLICKS, rows)
+            except Exception as e:
+                with self._lock:
+                    kept = rows[:max(0, self.max_pending - len(self._pending))]
+                    self.dropped += len(rows) - len(kept)
+                    self._pending = kept + self._pending
+                logger.error(f"Error writing {len(rows)} referral clicks: {str(e)}")
+                return 0
+        
+        logger.debug(f"Wrote {len(rows)} referral clicks")
+        return len(rows)
+    
+    def invalidate_code(self, referral_code: str) -> None:
+        """
+        Forget a cached code -> referrer mapping.
+        
+        Args:
+            referral_code: Referral code
+        """
+        self._referrers.delete(referral_code)
+    
+    def _drop(self, referral_code: str) -> Dict:
+        """
+        Count a click that did not fit in the buffer (caller holds the lock).
+        
+        Args:
+            referral_code: Referral code
+        
+        Returns:
+            Dict: Result without a click_id, marked as dropped
+        """
+        self.dropped += 1
+        return {
+            'click_id': None,
+            'referral_code': referral_code,
+            'referrer_id': None,
+            'dropped': True,
+        }
+    
+    def _resolve_referrer(self, referral_code: str) -> Optional[str]:
+        """
+        Referrer of a code, from the cache or the users table.
+        
+        Args:
+            referral_code: Referral code
+        
+        Returns:
+            Optional[str]: Referrer user ID, or None for an unknown code
+        """
+        referrer_id = self._referrers.get(referral_code)
+        if referrer_id is None:
+            with self.bind.connect() as connection:
+                referrer_id = connection.execute(
+                    text("SELECT id FROM users WHERE referral_code = :code"),
+                    {'code': referral_code}
+                ).scalar() or _NO_REFERRER
+            self._referrers.set(
+                referral_code,
+                referrer_id,
+                ttl=self.code_cache_ttl if referrer_id else self.unknown_code_ttl
+            )
+        return referrer_id or None
+    
+    def _start_flusher(self) -> None:
+        """Start the background flusher (caller holds the lock)."""
+        self._flusher = threading.Thread(target=self._run_flusher, name='referral-click-flusher', daemon=True)
+        self._flusher.start()
+        atexit.register(self.flush)
+    
+    def _run_flusher(self) -> None:
+        """Flush every flush_interval, or as soon as the buffer is full."""
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+_ingestor: Optional[ReferralClickIngestor] = None
+_ingestor_lock = threading.Lock()
+
+
+def get_referral_click_ingestor(bind: Engine) -> ReferralClickIngestor:
+    """
+    Get the process-wide click ingestor.
+    
+    Args:
+        bind: Engine used when the ingestor is created
+    
+    Returns:
+        ReferralClickIngestor: Ingestor configured from Config
+    """
+    global _ingestor
+    with _ingestor_lock:
+        if _ingestor is None:
+            from config import Config
+            _ingestor = ReferralClickIngestor(
+                bind,
+                flush_size=Config.REFERRAL_CLICK_FLUSH_SIZE,
+                flush_interval=Config.REFERRAL_CLICK_FLUSH_INTERVAL,
+                dedup_window=Config.REFERRAL_CLICK_DEDUP_WINDOW,
+                dedup_capacity=Config.REFERRAL_CLICK_DEDUP_CAPACITY
+            )
+        return _ingestor
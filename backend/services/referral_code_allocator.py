@@ -0,0 +1,142 @@
+"""
+Collision-free referral code allocator.
+Codes are a keyed permutation of a counter: counter values are reserved from
+the id_sequences table in blocks, and each value is mapped through a Feistel
+network over [0, 36^8) and written in base 36. Distinct counter values give
+distinct codes, so allocation needs no existence checks, and the keyed
+permutation keeps consecutive codes from looking sequential.
+"""
+import hashlib
+import hmac
+import logging
+import string
+import threading
+from typing import Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+ALPHABET = string.ascii_uppercase + string.digits
+CODE_LENGTH = 8
+
+# The domain 36^8 is the square of 36^4, so a balanced Feistel network
+# over two base-36 halves permutes exactly the set of 8-character codes
+_HALF = len(ALPHABET) ** (CODE_LENGTH // 2)
+_ROUNDS = 4
+
+SEQUENCE_NAME = 'referral_code'
+
+
+class ReferralCodeAllocator:
+    """
+    Hands out unique referral codes from a keyed permutation of a counter.
+    """
+    
+    def __init__(self, key: str, block_size: int = 1000):
+        """
+        Initialize ReferralCodeAllocator.
+        
+        Args:
+            key: Permutation key; must stay the same for the lifetime of the codes
+            block_size: Counter values reserved per database round trip
+        """
+        self._key = key.encode()
+        self.block_size = block_size
+        self._next: Optional[int] = None
+        self._end = 0
+        self._lock = threading.Lock()
+    
+    def allocate(self, bind: Engine) -> str:
+        """
+        Allocate the next referral code.
+        
+        Args:
+            bind: Engine the counter block is reserved on (in its own transaction,
+                  so a rollback of the caller never hands a value out twice)
+        
+        Returns:
+            str: 8-character code
+        """
+        with self._lock:
+            if self._next is None or self._next >= self._end:
+                self._next, self._end = self._reserve_block(bind)
+            value = self._next
+            self._next += 1
+        return self.encode(value)
+    
+    def encode(self, value: int) -> str:
+        """
+        Map a counter value to its code.
+        
+        Args:
+            value: Counter value in [0, 36^8)
+        
+        Returns:
+            str: 8-character code
+        """
+        permuted = self._permute(value % (_HALF * _HALF))
+        chars = []
+        for _ in range(CODE_LENGTH):
+            permuted, digit = divmod(permuted, len(ALPHABET))
+            chars.append(ALPHABET[digit])
+        return ''.join(reversed(chars))
+    
+    def _permute(self, value: int) -> int:
+        """Feistel permutation of [0, 36^8)."""
+        left, right = divmod(value, _HALF)
+        for round_index in range(_ROUNDS):
+            left, right = right, (left + self._round(round_index, right)) % _HALF
+        return left * _HALF + right
+    
+    def _round(self, round_index: int, half: int) -> int:
+        """Keyed round function."""
+        digest = hmac.new(self._key, f'{round_index}:{half}'.encode(), hashlib.sha256).digest()
+        return int.from_bytes(digest[:8], 'big') % _HALF
+    
+    def _reserve_block(self, bind: Engine) -> Tuple[int, int]:
+        """
+        Reserve the next block of counter values.
+        
+        Args:
+            bind: Engine to run the reservation on
+        
+        Returns:
+            Tuple[int, int]: (first value, end value) of the block
+        
+        Raises:
+            Exception: If the sequence row is missing
+        """
+        with bind.begin() as connection:
+            connection.execute(
+                text("UPDATE id_sequences SET next_value = next_value + :count WHERE name = :name"),
+                {'count': self.block_size, 'name': SEQUENCE_NAME}
+            )
+            end = connection.execute(
+                text("SELECT next_value FROM id_sequences WHERE name = :name"),
+                {'name': SEQUENCE_NAME}
+            ).scalar()
+        if end is None:
+            raise Exception(f"Sequence '{SEQUENCE_NAME}' is missing from id_sequences")
+        logger.info(f"Reserved referral code block [{end - self.block_size}, {end})")
+        return end - self.block_size, end
+
+
+_allocator: Optional[ReferralCodeAllocator] = None
+_allocator_lock = threading.Lock()
+
+
+def get_referral_code_allocator() -> ReferralCodeAllocator:
+    """
+    Get the process-wide referral code allocator.
+    
+    Returns:
+        ReferralCodeAllocator: Allocator keyed with Config.REFERRAL_CODE_KEY
+    """
+    global _allocator
+    with _allocator_lock:
+        if _allocator is None:
+            from config import Config
+            _allocator = ReferralCodeAllocator(Config.REFERRAL_CODE_KEY, Config.REFERRAL_CODE_BLOCK_SIZE)
+        return _allocator
@@ -4,11 +4,15 @@ Referral Service for managing referral system.
 from typing import Optional, Dict, List
 import logging
 import uuid
-import random
-import string
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from models.user import User
 from models.referral import Referral, ReferralStatus, CoinTransaction
 from repositories.user_repository import UserRepository
+from repositories.referral_repository import ReferralRepository
+from services.referral_code_allocator import get_referral_code_allocator
+from services.leaderboard_service import LeaderboardService, REFERRALS_BOARD
+from exceptions import ConcurrentUpdateError
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -19,12 +23,12 @@ class ReferralService:
     
     # 設定
     REFERRAL_BONUS_COINS = 100  # 紹介成功時のコイン
-    REFERRAL_CODE_LENGTH = 8
     
     def __init__(self, db_session: Session):
         """Initialize ReferralService."""
         self.db_session = db_session
         self.user_repo = UserRepository(db_session)
+        self.referral_repo = ReferralRepository(db_session)
     
     def generate_referral_code(self, user_id: str) -> str:
         """
@@ -46,18 +50,26 @@ class ReferralService:
             if user.referral_code:
                 return user.referral_code
             
-            # 新しい紹介コードを生成（ユニークになるまで）
+            # 採番カウンタの鍵付き置換からコードを発行（存在チェック不要）
+            allocator = get_referral_code_allocator()
             while True:
-                code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=self.REFERRAL_CODE_LENGTH))
-                
-                # 既存チェック
-                existing = self.db_session.query(self.user_repo.model_class).filter_by(referral_code=code).first()
-                if not existing:
+                code = allocator.allocate(self.db_session.get_bind())
+                try:
+                    # 同時に発行した別リクエストのコードを上書きしない
+                    with self.db_session.begin_nested():
+                        updated = self.db_session.query(User).filter(
+                            User.id == user_id,
+                            User.referral_code.is_(None)
+                        ).update({'referral_code': code}, synchronize_session=False)
                     break
+                except IntegrityError:
+                    # 旧方式のランダムコードと一致した場合のみ。次のカウンタ値で再発行
+                    logger.warning(f"Referral code {code} is taken by a legacy code, allocating next")
             
-            # ユーザーに紹介コードを設定
-            user.referral_code = code
             self.db_session.commit()
+            if not updated:
+                self.db_session.refresh(user)
+                return user.referral_code
             
             logger.info(f"Generated referral code for user {user_id}: {code}")
             return code
@@ -128,6 +140,12 @@ class ReferralService:
             
             logger.info(f"Applied referral code {referral_code} for user {new_user_id}")
             
+            # 紹介数ランキングに反映（失敗しても紹介は確定済み。再構築で整合する）
+            try:
+                LeaderboardService(self.db_session).increment_score(REFERRALS_BOARD, referrer.id)
+            except Exception as e:
+                logger.warning(f"Failed to update referral leaderboard for {referrer.id}: {str(e)}")
+            
             return {
                 'referral_id': referral.id,
                 'referrer_id': referrer.id,
@@ -143,6 +161,9 @@ class ReferralService:
         """
         紹介を完了してコインを付与
         
+        紹介ステータスはバージョン付き条件更新で遷移させるため、Webhook等から
+        同時に呼ばれても二重付与されない（競合時は再読込してリトライ）
+        
         Args:
             referral_id: 紹介ID
             
@@ -150,58 +171,77 @@ class ReferralService:
             Dict: 完了情報
         """
         try:
-            # 紹介を取得
-            referral = self.db_session.query(Referral).filter_by(id=referral_id).first()
-            if not referral:
-                raise ValueError(f"Referral not found: {referral_id}")
-            
-            # 既に完了している場合はスキップ
-            if referral.status == ReferralStatus.COMPLETED:
-                return {'already_completed': True}
-            
-            # 紹介者を取得
-            referrer = self.user_repo.find_by_id(referral.referrer_id)
-            if not referrer:
-                raise ValueError(f"Referrer not found: {referral.referrer_id}")
-            
-            # コインを付与
-            coins_to_award = self.REFERRAL_BONUS_COINS
-            old_balance = referrer.coins or 0
-            new_balance = old_balance + coins_to_award
-            referrer.coins = new_balance
-            
-            # 紹介ステータスを更新
-            referral.status = ReferralStatus.COMPLETED
-            referral.coins_awarded = coins_to_award
-            referral.completed_at = datetime.utcnow()
-            
-            # コイン取引履歴を記録
-            transaction = CoinTransaction(
-                id=str(uuid.uuid4()),
-                user_id=referrer.id,
-                amount=coins_to_award,
-                transaction_type='referral_bonus',
-                description=f'紹介ボーナス（紹介ID: {referral_id}）',
-                balance_after=new_balance,
-                related_id=referral_id
+            return self.referral_repo.run_with_version_retry(
+                lambda: self._complete_referral_once(referral_id)
             )
-            self.db_session.add(transaction)
-            
-            self.db_session.commit()
-            
-            logger.info(f"Completed referral {referral_id}, awarded {coins_to_award} coins to user {referrer.id}")
-            
-            return {
-                'referral_id': referral_id,
-                'coins_awarded': coins_to_award,
-                'new_balance': new_balance,
-            }
             
         except Exception as e:
             logger.error(f"Error completing referral: {str(e)}")
             self.db_session.rollback()
             raise
     
+    def _complete_referral_once(self, referral_id: str) -> Dict:
+        """
+        紹介完了の1回分の試行（競合時は ConcurrentUpdateError）
+        
+        Args:
+            referral_id: 紹介ID
+            
+        Returns:
+            Dict: 完了情報
+        """
+        # 紹介を取得
+        referral = self.referral_repo.find_by_id(referral_id)
+        if not referral:
+            raise ValueError(f"Referral not found: {referral_id}")
+        
+        # 既に完了している場合はスキップ
+        if referral.status == ReferralStatus.COMPLETED:
+            return {'already_completed': True}
+        
+        # 紹介者を取得
+        referrer = self.user_repo.find_by_id(referral.referrer_id)
+        if not referrer:
+            raise ValueError(f"Referrer not found: {referral.referrer_id}")
+        
+        # 紹介ステータスを更新（読み取り時のバージョンと一致する場合のみ）
+        coins_to_award = self.REFERRAL_BONUS_COINS
+        completed = self.referral_repo.update_if_version(
+            referral_id,
+            referral.version,
+            commit=False,
+            status=ReferralStatus.COMPLETED,
+            coins_awarded=coins_to_award,
+            completed_at=datetime.utcnow()
+        )
+        if not completed:
+            raise ConcurrentUpdateError('Referral', referral_id)
+        
+        # コインを付与（加算はSQL側で行う）
+        new_balance = self.user_repo.increment_coins(referrer.id, coins_to_award)
+        
+        # コイン取引履歴を記録
+        transaction = CoinTransaction(
+            id=str(uuid.uuid4()),
+            user_id=referrer.id,
+            amount=coins_to_award,
+            transaction_type='referral_bonus',
+            description=f'紹介ボーナス（紹介ID: {referral_id}）',
+            balance_after=new_balance,
+            related_id=referral_id
+        )
+        self.db_session.add(transaction)
+        
+        self.db_session.commit()
+        
+        logger.info(f"Completed referral {referral_id}, awarded {coins_to_award} coins to user {referrer.id}")
+        
+        return {
+            'referral_id': referral_id,
+            'coins_awarded': coins_to_award,
+            'new_balance': new_balance,
+        }
+    
     def get_user_referrals(self, user_id: str) -> List[Dict]:
         """
         ユーザーの紹介履歴を取得
@@ -219,6 +259,27 @@ class ReferralService:
             logger.error(f"Error getting user referrals: {str(e)}")
             return []
     
+    def get_referral_stats(self, user_id: str) -> Dict:
+        """
+        ユーザーの紹介統計を取得（紹介履歴は読み込まずSQLで集計）
+        
+        Args:
+            user_id: ユーザーID
+            
+        Returns:
+            Dict: 紹介件数（合計・完了・保留中）、獲得コイン合計、現在のコイン残高
+        """
+        by_status = self.referral_repo.get_stats_by_status(user_id)
+        empty = {'count': 0, 'coins': 0}
+        
+        return {
+            'total_referrals': sum(stats['count'] for stats in by_status.values()),
+            'completed_referrals': by_status.get(ReferralStatus.COMPLETED, empty)['count'],
+            'pending_referrals': by_status.get(ReferralStatus.PENDING, empty)['count'],
+            'total_coins_earned': sum(stats['coins'] for stats in by_status.values()),
+            'current_coins': self.get_user_coins(user_id),
+        }
+    
     def get_user_coins(self, user_id: str) -> int:
         """
         ユーザーのコイン残高を取得
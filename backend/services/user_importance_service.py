@@ -5,9 +5,10 @@ from typing import Dict, Optional
 import logging
 import uuid
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, text
 from datetime import datetime, timedelta
 from repositories.user_repository import UserRepository
+from services.leaderboard_service import LeaderboardService, IMPORTANCE_BOARD
 
 logger = logging.getLogger(__name__)
 
@@ -72,23 +73,23 @@ class UserImportanceService:
             
             # リファラルクリック数
             referral_clicks = self.db_session.execute(
-                """
+                text("""
                 SELECT COUNT(*) FROM referral_clicks 
                 WHERE referrer_id = :user_id
-                """,
+                """),
                 {'user_id': user_id}
             ).scalar() or 0
             
             # ログイン数（過去90日）
             ninety_days_ago = datetime.utcnow() - timedelta(days=90)
             login_count = self.db_session.execute(
-                """
+                text("""
                 SELECT COUNT(DISTINCT DATE(created_at)) 
                 FROM user_activities 
                 WHERE user_id = :user_id 
                 AND activity_type = 'login'
                 AND created_at >= :since
-                """,
+                """),
                 {'user_id': user_id, 'since': ninety_days_ago}
             ).scalar() or 0
             
@@ -163,11 +164,11 @@ class UserImportanceService:
             
             # スコア履歴を記録
             self.db_session.execute(
-                """
+                text("""
                 INSERT INTO user_score_history 
                 (id, user_id, score_before, score_after, score_change, reason, details, created_at)
                 VALUES (:id, :user_id, :before, :after, :change, :reason, :details, :created_at)
-                """,
+                """),
                 {
                     'id': str(uuid.uuid4()),
                     'user_id': user_id,
@@ -184,6 +185,12 @@ class UserImportanceService:
             
             logger.info(f"Updated user score: {user_id}, {old_score} -> {new_score}")
             
+            # ランキングに反映（失敗してもスコア更新は確定済み。再構築で整合する）
+            try:
+                LeaderboardService(self.db_session).set_score(IMPORTANCE_BOARD, user_id, new_score)
+            except Exception as e:
+                logger.warning(f"Failed to update importance leaderboard for {user_id}: {str(e)}")
+            
             return {
                 'user_id': user_id,
                 'old_score': old_score,
@@ -241,7 +248,7 @@ class UserImportanceService:
     
     def get_top_users(self, limit: int = 100) -> list:
         """
-        重要度スコアトップユーザーを取得
+        重要度スコアトップユーザーを取得（メモリ上のランキングから）
         
         Args:
             limit: 取得件数
@@ -252,22 +259,30 @@ class UserImportanceService:
         try:
             from models.user import User
             
-            users = self.db_session.query(User)\
-                .filter(User.importance_score > 0)\
-                .order_by(User.importance_score.desc())\
-                .limit(limit)\
-                .all()
+            entries = LeaderboardService(self.db_session).top(IMPORTANCE_BOARD, limit)
+            if not entries:
+                return []
+            
+            users = {
+                user.id: user
+                for user in self.db_session.query(User).filter(User.id.in_([entry['user_id'] for entry in entries]))
+            }
             
             return [
                 {
-                    'user_id': user.id,
-                    'name': user.name,
-                    'email': user.email,
-                    'importance_score': user.importance_score,
-                    'importance_level': user.importance_level,
-                    'last_updated': user.last_score_updated.isoformat() if user.last_score_updated else None,
+                    'user_id': entry['user_id'],
+                    'rank': entry['rank'],
+                    'name': users[entry['user_id']].name,
+                    'email': users[entry['user_id']].email,
+                    'importance_score': entry['score'],
+                    'importance_level': users[entry['user_id']].importance_level,
+                    'last_updated': (
+                        users[entry['user_id']].last_score_updated.isoformat()
+                        if users[entry['user_id']].last_score_updated else None
+                    ),
                 }
-                for user in users
+                for entry in entries
+                if entry['user_id'] in users
             ]
             
         except Exception as e:
@@ -278,52 +293,33 @@ class UserImportanceService:
         """
         リファラルクリックを追跡
         
+        同じ訪問者（コード+IP+UA）の一定時間内の再クリックはメモリ上で除外し、
+        クリックはバッファしてまとめてINSERTする（クリック毎のトランザクションなし）
+        
         Args:
             referral_code: 紹介コード
             ip_address: IPアドレス
             user_agent: ユーザーエージェント
             
         Returns:
-            Dict: クリック情報
+            Dict: クリック情報（重複クリックは duplicate=True、バッファ満杯で
+                  記録できなかったクリックは dropped=True。どちらも click_id なし）
         """
-        try:
-            from models.user import User
-            
-            # 紹介者を検索
-            referrer = self.db_session.query(User).filter_by(referral_code=referral_code).first()
-            
-            click_id = str(uuid.uuid4())
-            
-            self.db_session.execute(
-                """
-                INSERT INTO referral_clicks 
-                (id, referral_code, referrer_id, ip_address, user_agent, clicked_at)
-                VALUES (:id, :code, :referrer_id, :ip, :ua, :clicked_at)
-                """,
-                {
-                    'id': click_id,
-                    'code': referral_code,
-                    'referrer_id': referrer.id if referrer else None,
-                    'ip': ip_address,
-                    'ua': user_agent,
-                    'clicked_at': datetime.utcnow()
-                }
-            )
-            
-            self.db_session.commit()
-            
-            logger.info(f"Tracked referral click: {referral_code}")
-            
+        from services.referral_click_ingestor import get_referral_click_ingestor
+        
+        ingestor = get_referral_click_ingestor(self.db_session.get_bind())
+        click = ingestor.record(referral_code, ip_address, user_agent)
+        if click is None:
             return {
-                'click_id': click_id,
+                'click_id': None,
                 'referral_code': referral_code,
-                'referrer_id': referrer.id if referrer else None,
+                'referrer_id': None,
+                'duplicate': True,
+                'dropped': False,
             }
-            
-        except Exception as e:
-            logger.error(f"Error tracking referral click: {str(e)}")
-            self.db_session.rollback()
-            raise
+        
+        click['duplicate'] = False
+        return click
     
     def _get_importance_level(self, score: int) -> str:
         """
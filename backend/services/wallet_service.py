@@ -136,12 +136,14 @@ class WalletService:
         
         return wallet.to_dict()
     
-    def get_wallet_balance(self, user_id: str) -> int:
+    def get_wallet_balance(self, user_id: str,
+                           max_age: float = XRPLClient.BALANCE_MAX_AGE_DISPLAY) -> int:
         """
         Get XRP balance for user's wallet.
         
         Args:
             user_id: User's unique identifier
+            max_age: Seconds of balance staleness accepted (served from the balance cache)
             
         Returns:
             int: Balance in drops (1 XRP = 1,000,000 drops)
@@ -153,7 +155,7 @@ class WalletService:
         if not wallet:
             raise ValueError(f"User {user_id} has no wallet")
         
-        balance = self.xrpl_client.get_wallet_balance(wallet.address)
+        balance = self.xrpl_client.get_wallet_balance(wallet.address, max_age)
         logger.info(f"Retrieved balance for user {user_id}: {balance} drops")
         
         return balance
@@ -0,0 +1,213 @@
+"""
+XRPL Indexer Service for copying our accounts' ledger history into the database.
+Pages account_tx with markers and keeps a per-account checkpoint (last fully
+indexed ledger plus the in-flight marker), so interrupted runs resume where
+they stopped and reconciliation can use indexed local queries instead of
+per-hash Tx requests.
+"""
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+from sqlalchemy.orm import Session
+from xrpl.models.requests import AccountTx
+from clients.xrpl_client import XRPLClient
+from repositories.xrpl_transaction_repository import (
+    XRPLTransactionRepository,
+    XRPLIndexCheckpointRepository
+)
+
+logger = logging.getLogger(__name__)
+
+
+# XRPL timestamps count seconds from 2000-01-01T00:00:00Z
+RIPPLE_EPOCH = datetime(2000, 1, 1)
+
+# account_tx errors meaning "no validated ledger in the requested range yet"
+NO_NEW_LEDGER_ERRORS = ('lgrIdxsInvalid', 'lgrIdxMalformed')
+
+
+class XRPLIndexerService:
+    """
+    Service for indexing XRPL account history.
+    """
+    
+    def __init__(self, db_session: Session, xrpl_client: XRPLClient):
+        """
+        Initialize XRPLIndexerService.
+        
+        Args:
+            db_session: SQLAlchemy database session
+            xrpl_client: XRPL blockchain client
+        """
+        self.db_session = db_session
+        self.xrpl_client = xrpl_client
+        self.tx_repo = XRPLTransactionRepository(db_session)
+        self.checkpoint_repo = XRPLIndexCheckpointRepository(db_session)
+    
+    def index_accounts(self, accounts: Iterable[str], page_size: int = 200,
+                       max_pages: Optional[int] = None,
+                       start_ledger_index: int = 0) -> Dict:
+        """
+        Index the history of several accounts.
+        
+        Args:
+            accounts: XRPL addresses to index
+            page_size: Transactions per account_tx page
+            max_pages: Optional cap on pages per account in this run
+            start_ledger_index: First ledger for accounts indexed for the first time
+        
+        Returns:
+            Dict: Per-account run summaries keyed by address
+        """
+        return {
+            account: self.index_account(
+                account,
+                page_size=page_size,
+                max_pages=max_pages,
+                start_ledger_index=start_ledger_index
+            )
+            for account in sorted({account for account in accounts if account})
+        }
+    
+    def index_account(self, account: str, page_size: int = 200,
+                      max_pages: Optional[int] = None,
+                      start_ledger_index: int = 0) -> Dict:
+        """
+        Index new validated transactions of one account.
+        Each page is stored together with the updated checkpoint in a single
+        commit, so a crash never loses or skips a page.
+        
+        Args:
+            account: XRPL address
+            page_size: Transactions per account_tx page
+            max_pages: Optional cap on pages in this run (the scan resumes next run)
+            start_ledger_index: First ledger if the account was never indexed
+        
+        Returns:
+            Dict: Run summary (pages, inserted, last_ledger_index, complete, elapsed_ms)
+        
+        Raises:
+            Exception: If the ledger request or the database write fails
+        """
+        started = time.monotonic()
+        checkpoint = self.checkpoint_repo.get_or_create(account, start_ledger_index)
+        pages = 0
+        inserted = 0
+        complete = False
+        
+        try:
+            while max_pages is None or pages < max_pages:
+                # Resuming keeps the upper bound of the interrupted scan, as
+                # account_tx markers are only valid for the same ledger range
+                ledger_index_min = checkpoint.last_ledger_index + 1 if checkpoint.last_ledger_index else -1
+                ledger_index_max = checkpoint.scan_ledger_max if checkpoint.marker else -1
+                marker = json.loads(checkpoint.marker) if checkpoint.marker else None
+                
+                response = self.xrpl_client.client.request(AccountTx(
+                    account=account,
+                    ledger_index_min=ledger_index_min,
+                    ledger_index_max=ledger_index_max,
+                    forward=True,
+                    limit=page_size,
+                    marker=marker
+                ))
+                
+                if not response.is_successful():
+                    error = response.result.get('error')
+                    if error in NO_NEW_LEDGER_ERRORS and not checkpoint.marker:
+                        complete = True
+                        break
+                    raise Exception(f"account_tx failed: {error or response.result}")
+                
+                result = response.result
+                records = [
+                    self.to_record(entry)
+                    for entry in result.get('transactions', [])
+                    if entry.get('validated', True)
+                ]
+                inserted += self.tx_repo.bulk_insert(records)
+                
+                next_marker = result.get('marker')
+                if next_marker is None:
+                    checkpoint.last_ledger_index = max(
+                        checkpoint.last_ledger_index,
+                        int(result.get('ledger_index_max', checkpoint.last_ledger_index))
+                    )
+                    checkpoint.scan_ledger_max = None
+                    checkpoint.marker = None
+                else:
+                    checkpoint.scan_ledger_max = int(result['ledger_index_max'])
+                    checkpoint.marker = json.dumps(next_marker)
+                
+                self.db_session.commit()
+                pages += 1
+                
+                if next_marker is None:
+                    complete = True
+                    break
+            
+            summary = {
+                'pages': pages,
+                'inserted': inserted,
+                'last_ledger_index': checkpoint.last_ledger_index,
+                'complete': complete,
+                'elapsed_ms': int((time.monotonic() - started) * 1000)
+            }
+            logger.info(f"Indexed XRPL history of {account}: {summary}")
+            return summary
+        
+        except Exception as e:
+            self.db_session.rollback()
+            logger.error(f"Failed to index XRPL history of {account}: {str(e)}")
+            raise Exception(f"Failed to index XRPL history: {str(e)}")
+    
+    @staticmethod
+    def to_record(entry: Dict) -> Dict:
+        """
+        Convert an account_tx entry or a Tx result (API v1 or v2) into column values.
+        
+        Args:
+            entry: One element of account_tx ``transactions``, or a Tx result
+        
+        Returns:
+            Dict: XRPLTransaction column values
+        """
+        # API v2 nests the transaction under tx_json, v1 account_tx under tx,
+        # v1 Tx returns the fields at the top level
+        tx = entry.get('tx_json') or entry.get('tx') or entry
+        meta = entry.get('meta') or {}
+        tx_hash = entry.get('hash') or tx.get('hash')
+        ledger_index = entry.get('ledger_index') or tx.get('ledger_index')
+        
+        delivered = meta.get('delivered_amount')
+        if delivered is None and tx.get('TransactionType') == 'Payment':
+            delivered = tx.get('Amount', tx.get('DeliverMax'))
+        fee = tx.get('Fee')
+        
+        memos = XRPLClient.decode_memos(tx.get('Memos') or [])
+        close_time = None
+        if tx.get('date') is not None:
+            close_time = RIPPLE_EPOCH + timedelta(seconds=int(tx['date']))
+        
+        return {
+            'tx_hash': tx_hash.upper(),
+            'ledger_index': int(ledger_index),
+            'transaction_type': tx.get('TransactionType', ''),
+            'account': tx.get('Account', ''),
+            'destination': tx.get('Destination'),
+            'amount_drops': int(delivered) if isinstance(delivered, str) and delivered.isdigit() else None,
+            'fee_drops': int(fee) if isinstance(fee, str) and fee.isdigit() else None,
+            'result': meta.get('TransactionResult', ''),
+            'validated': bool(entry.get('validated', True)),
+            'memo': memos[0][:255] if memos else None,
+            'close_time': close_time,
+            'raw_json': json.dumps({
+                'hash': tx_hash,
+                'ledger_index': ledger_index,
+                'validated': entry.get('validated', True),
+                'tx_json': {k: v for k, v in tx.items() if k not in ('meta', 'validated')},
+                'meta': meta
+            }),
+        }
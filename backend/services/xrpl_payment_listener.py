@@ -0,0 +1,258 @@
+"""
+XRPL Payment Listener for push-based confirmation of XRPL order payments.
+Subscribes to the merchant/sponsor account streams over WebSocket, matches
+validated incoming Payments to orders by their ``order:<id>`` memo and marks
+the orders as paid in batches.
+
+Payments validated while the listener is disconnected are not replayed by
+the subscription; they are picked up by ledger history reconciliation.
+"""
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session
+from websockets.exceptions import ConnectionClosed
+from websockets.sync.client import connect
+from repositories.order_repository import OrderRepository
+from clients.xrpl_client import XRPLClient
+from services.xrpl_payment_service import XRPLPaymentService
+
+logger = logging.getLogger(__name__)
+
+
+ORDER_MEMO_PREFIX = 'order:'
+
+
+class XRPLPaymentListener:
+    """
+    Long-running listener that confirms XRPL order payments as ledgers validate.
+    Matched payments are buffered and written with one UPDATE per batch, either
+    when batch_size payments are pending or every flush_interval seconds.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        websocket_url: str,
+        accounts: Iterable[str],
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0
+    ):
+        """
+        Initialize XRPLPaymentListener.
+        
+        Args:
+            session_factory: Callable returning a new SQLAlchemy session
+            websocket_url: rippled/clio WebSocket URL
+            accounts: XRPL addresses receiving order payments
+            batch_size: Maximum number of payments written per batch
+            flush_interval: Maximum seconds a matched payment waits before being written
+            reconnect_delay: Initial delay before reconnecting after a disconnect
+            max_reconnect_delay: Upper bound of the exponential reconnect delay
+        
+        Raises:
+            ValueError: If no account to watch is given
+        """
+        self.session_factory = session_factory
+        self.websocket_url = websocket_url
+        self.accounts = sorted({account for account in accounts if account})
+        if not self.accounts:
+            raise ValueError("At least one XRPL account to watch is required")
+        
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        
+        self.stats = {'received': 0, 'matched': 0, 'confirmed': 0, 'rejected': 0}
+        self._pending: Dict[str, Dict] = {}
+        self._last_flush = time.monotonic()
+        self._current_delay = reconnect_delay
+        self._stop_event = threading.Event()
+    
+    def run(self) -> None:
+        """
+        Listen until stop() is called, reconnecting with exponential backoff.
+        """
+        logger.info(f"Starting XRPL payment listener on {self.websocket_url} for {self.accounts}")
+        
+        while not self._stop_event.is_set():
+            try:
+                self._listen()
+            except (ConnectionClosed, OSError) as e:
+                logger.warning(f"XRPL payment listener disconnected: {str(e)}")
+            finally:
+                self.flush()
+            
+            if self._stop_event.wait(self._current_delay):
+                break
+            self._current_delay = min(self._current_delay * 2, self.max_reconnect_delay)
+        
+        logger.info(f"Stopped XRPL payment listener: {self.stats}")
+    
+    def stop(self) -> None:
+        """Ask the listener to flush pending payments and exit."""
+        self._stop_event.set()
+    
+    def _listen(self) -> None:
+        """
+        Open one WebSocket session, subscribe and process messages until
+        the connection drops or the listener is stopped.
+        """
+        with connect(self.websocket_url, open_timeout=10) as websocket:
+            websocket.send(json.dumps({
+                'id': 'order_payments',
+                'command': 'subscribe',
+                'accounts': self.accounts
+            }))
+            
+            while not self._stop_event.is_set():
+                try:
+                    raw = websocket.recv(timeout=self.flush_interval)
+                except TimeoutError:
+                    raw = None
+                
+                if raw is not None:
+                    try:
+                        message = json.loads(raw)
+                    except ValueError as e:
+                        logger.warning(f"Skipping malformed XRPL stream message: {str(e)}")
+                    else:
+                        self.handle_message(message)
+                
+                if (len(self._pending) >= self.batch_size or
+                        time.monotonic() - self._last_flush >= self.flush_interval):
+                    self.flush()
+    
+    def handle_message(self, message: Dict) -> None:
+        """
+        Process one message from the subscription stream.
+        
+        Args:
+            message: Decoded WebSocket message
+        
+        Raises:
+            ConnectionError: If the server rejected the subscription
+        """
+        if message.get('type') == 'response':
+            if message.get('status') != 'success':
+                raise ConnectionError(f"Subscribe failed: {message.get('error', message)}")
+            self._current_delay = self.reconnect_delay
+            logger.info(f"Subscribed to XRPL accounts: {self.accounts}")
+            return
+        
+        if message.get('type') != 'transaction':
+            return
+        
+        self.stats['received'] += 1
+        payment = self.parse_payment(message, self.accounts)
+        if payment:
+            self.stats['matched'] += 1
+            self._pending[payment['order_id']] = payment
+    
+    @staticmethod
+    def parse_payment(message: Dict, accounts: List[str]) -> Optional[Dict]:
+        """
+        Extract an order payment from a transaction stream message.
+        
+        Args:
+            message: ``transaction`` stream message
+            accounts: Addresses whose incoming payments settle orders
+        
+        Returns:
+            Optional[Dict]: order_id, tx_hash, delivered_drops and ledger_index,
+                            or None if the message is not a validated XRP order payment
+        """
+        if not message.get('validated') or message.get('engine_result') != 'tesSUCCESS':
+            return None
+        
+        # API v1 streams use 'transaction', API v2 uses 'tx_json'
+        tx = message.get('transaction') or message.get('tx_json') or {}
+        if tx.get('TransactionType') != 'Payment' or tx.get('Destination') not in accounts:
+            return None
+        
+        # Only XRP payments settle orders; issued currencies arrive as objects
+        delivered = (message.get('meta') or {}).get('delivered_amount', tx.get('Amount'))
+        if not isinstance(delivered, str) or not delivered.isdigit():
+            return None
+        
+        order_id = _order_id_from_memos(tx.get('Memos') or [])
+        if not order_id:
+            return None
+        
+        return {
+            'order_id': order_id,
+            'tx_hash': tx.get('hash') or message.get('hash'),
+            'delivered_drops': int(delivered),
+            'ledger_index': message.get('ledger_index'),
+        }
+    
+    def flush(self) -> int:
+        """
+        Write buffered payments: check amounts against order totals and mark
+        the matching orders paid with a single UPDATE. On database errors the
+        batch is kept and retried on the next flush.
+        
+        Returns:
+            int: Number of orders confirmed
+        """
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return 0
+        
+        batch, self._pending = self._pending, {}
+        session = self.session_factory()
+        try:
+            order_repo = OrderRepository(session)
+            totals = order_repo.find_total_amounts(list(batch.keys()))
+            
+            tx_hashes = {}
+            for order_id, payment in batch.items():
+                total_amount = totals.get(order_id)
+                if total_amount is None:
+                    logger.warning(f"XRPL payment {payment['tx_hash']} references unknown order {order_id}")
+                    self.stats['rejected'] += 1
+                elif payment['delivered_drops'] < XRPLPaymentService.expected_drops(total_amount):
+                    logger.warning(
+                        f"XRPL payment {payment['tx_hash']} underpays order {order_id}: "
+                        f"{payment['delivered_drops']} drops"
+                    )
+                    self.stats['rejected'] += 1
+                else:
+                    tx_hashes[order_id] = payment['tx_hash']
+            
+            confirmed = order_repo.confirm_xrpl_payments(tx_hashes)
+            session.commit()
+            
+            self.stats['confirmed'] += confirmed
+            logger.info(f"Confirmed {confirmed} XRPL order payments ({len(batch)} matched in batch)")
+            return confirmed
+        
+        except Exception as e:
+            logger.error(f"Failed to write XRPL payment batch: {str(e)}")
+            session.rollback()
+            for order_id, payment in batch.items():
+                self._pending.setdefault(order_id, payment)
+            return 0
+        finally:
+            session.close()
+
+
+def _order_id_from_memos(memos: List[Dict]) -> Optional[str]:
+    """
+    Find the order ID in a transaction's memos (``order:<id>``).
+    
+    Args:
+        memos: ``Memos`` field of the transaction
+        
+    Returns:
+        Optional[str]: Order ID if present
+    """
+    for memo in XRPLClient.decode_memos(memos):
+        if memo.startswith(ORDER_MEMO_PREFIX):
+            return memo[len(ORDER_MEMO_PREFIX):].strip() or None
+    return None
@@ -4,26 +4,44 @@ Handles payment creation, execution, and verification on XRPL blockchain.
 
 Requirements: 5.5, 8.2, 8.6, 8.7
 """
+import json
 import logging
 from typing import Dict, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
 from repositories.order_repository import OrderRepository
+from models.order import OrderStatus
 from repositories.wallet_repository import WalletRepository
+from repositories.xrpl_transaction_repository import XRPLTransactionRepository
 from clients.xrpl_client import XRPLClient
+from config import Config
 from services.wallet_service import WalletService
+from services.xrpl_indexer_service import XRPLIndexerService
 from exceptions import ResourceNotFoundError, ValidationError
+from utils.ttl_cache import TTLCache
 import uuid
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 
+# Negative cache marker for hashes the network does not know
+_TX_NOT_FOUND = object()
+
+
 class XRPLPaymentService:
     """
     Service for XRPL payment operations.
     Handles payment creation, execution, and verification on XRP Ledger.
     """
     
+    XRP_JPY_RATE = Config.XRP_JPY_RATE
+    
+    # Per-process cache of verify_transaction results (validated ones never expire)
+    TX_CACHE_SIZE = 4096
+    TX_NEGATIVE_CACHE_TTL = 5  # seconds, for unknown or not-yet-validated hashes
+    _tx_cache = TTLCache(maxsize=TX_CACHE_SIZE)
+    
     def __init__(self, db_session: Session, xrpl_client: XRPLClient):
         """
         Initialize XRPLPaymentService.
@@ -36,6 +54,7 @@ class XRPLPaymentService:
         self.xrpl_client = xrpl_client
         self.order_repo = OrderRepository(db_session)
         self.wallet_repo = WalletRepository(db_session)
+        self.xrpl_tx_repo = XRPLTransactionRepository(db_session)
     
     def create_payment_request(
         self,
@@ -74,8 +93,11 @@ class XRPLPaymentService:
             if not wallet:
                 raise ResourceNotFoundError("Wallet", f"user_id={user_id}")
             
-            # Check wallet balance
-            balance_drops = self.xrpl_client.get_wallet_balance(wallet.address)
+            # Check wallet balance (pre-check only; the ledger enforces it on submit)
+            balance_drops = self.xrpl_client.get_wallet_balance(
+                wallet.address,
+                XRPLClient.BALANCE_MAX_AGE_DISPLAY
+            )
             balance_xrp = balance_drops / 1_000_000
             
             if balance_xrp < amount_xrp:
@@ -167,8 +189,7 @@ class XRPLPaymentService:
             
             # Calculate amount in XRP
             # Assuming order.total_amount is in JPY
-            xrp_jpy_rate = 150  # TODO: Get from API
-            amount_xrp = order.total_amount / xrp_jpy_rate
+            amount_xrp = order.total_amount / self.XRP_JPY_RATE
             
             # Get destination address (sponsor address)
             from config import config
@@ -184,9 +205,10 @@ class XRPLPaymentService:
             )
             
             # Update order status
-            order.status = 'completed'
+            order.status = OrderStatus.COMPLETED
             order.payment_method = 'xrpl'
             order.payment_status = 'completed'
+            order.payment_tx_hash = result['transaction_hash']
             self.db_session.commit()
             
             logger.info(
@@ -267,6 +289,11 @@ class XRPLPaymentService:
     def verify_transaction(self, transaction_hash: str) -> Dict:
         """
         Verify XRPL transaction on blockchain.
+        Validated transactions never change, so they are served from an
+        in-process LRU, then from the xrpl_transactions table (filled by the
+        ledger history indexer and by earlier lookups). Only unseen or
+        not-yet-validated hashes reach the network, and those results are
+        cached for TX_NEGATIVE_CACHE_TTL seconds.
         
         Args:
             transaction_hash: XRPL transaction hash
@@ -277,7 +304,21 @@ class XRPLPaymentService:
         Raises:
             ResourceNotFoundError: If transaction not found
         """
+        cache_key = transaction_hash.upper()
+        
         try:
+            cached = self._tx_cache.get(cache_key)
+            if cached is _TX_NOT_FOUND:
+                raise ResourceNotFoundError("Transaction", transaction_hash)
+            if cached is not None:
+                return dict(cached)
+            
+            indexed = self.xrpl_tx_repo.find_by_hash(cache_key)
+            if indexed:
+                transaction = self._transaction_details(json.loads(indexed.raw_json), transaction_hash)
+                self._tx_cache.set(cache_key, transaction)
+                return dict(transaction)
+            
             # Get transaction details from XRPL
             from xrpl.models.requests import Tx
             
@@ -285,38 +326,90 @@ class XRPLPaymentService:
             response = self.xrpl_client.client.request(tx_request)
             
             if not response.is_successful():
+                self._tx_cache.set(cache_key, _TX_NOT_FOUND, ttl=self.TX_NEGATIVE_CACHE_TTL)
                 raise ResourceNotFoundError("Transaction", transaction_hash)
             
             tx_data = response.result
+            transaction = self._transaction_details(tx_data, transaction_hash)
             
-            # Extract relevant information
-            transaction = {
-                'hash': tx_data.get('hash'),
-                'ledger_index': tx_data.get('ledger_index'),
-                'date': tx_data.get('date'),
-                'account': tx_data.get('Account'),
-                'destination': tx_data.get('Destination'),
-                'amount': tx_data.get('Amount'),
-                'fee': tx_data.get('Fee'),
-                'validated': tx_data.get('validated', False),
-                'meta': tx_data.get('meta', {}),
-                'explorer_url': self._get_explorer_url(transaction_hash)
-            }
+            if transaction['validated']:
+                self._store_validated_transaction(tx_data)
+                self._tx_cache.set(cache_key, transaction)
+            else:
+                self._tx_cache.set(cache_key, transaction, ttl=self.TX_NEGATIVE_CACHE_TTL)
             
             logger.info(
-                f"Verified XRPL transaction",
+                "Verified XRPL transaction",
                 extra={
                     'transaction_hash': transaction_hash,
                     'validated': transaction['validated']
                 }
             )
             
-            return transaction
+            return dict(transaction)
             
         except Exception as e:
             logger.error(f"Failed to verify XRPL transaction: {str(e)}")
             raise
     
+    def _transaction_details(self, tx_data: Dict, transaction_hash: str) -> Dict:
+        """
+        Build the verify_transaction response from a Tx result or an indexed record.
+        
+        Args:
+            tx_data: Tx result (API v1 or v2) or stored raw_json
+            transaction_hash: XRPL transaction hash
+            
+        Returns:
+            Dict: Transaction details
+        """
+        # API v2 nests the transaction fields under tx_json
+        tx_fields = tx_data.get('tx_json') or tx_data
+        
+        return {
+            'hash': tx_data.get('hash'),
+            'ledger_index': tx_data.get('ledger_index'),
+            'date': tx_fields.get('date'),
+            'account': tx_fields.get('Account'),
+            'destination': tx_fields.get('Destination'),
+            'amount': tx_fields.get('Amount', tx_fields.get('DeliverMax')),
+            'fee': tx_fields.get('Fee'),
+            'validated': tx_data.get('validated', False),
+            'meta': tx_data.get('meta', {}),
+            'explorer_url': self._get_explorer_url(transaction_hash)
+        }
+    
+    def _store_validated_transaction(self, tx_data: Dict) -> None:
+        """
+        Persist a validated Tx result so other workers skip the network.
+        Failures (e.g. another worker inserting the same hash concurrently)
+        only cost a later network lookup, so they are logged and ignored.
+        
+        Args:
+            tx_data: Validated Tx result
+        """
+        try:
+            self.xrpl_tx_repo.bulk_insert([XRPLIndexerService.to_record(tx_data)])
+            self.db_session.commit()
+        except SQLAlchemyError as e:
+            self.db_session.rollback()
+            logger.warning(f"Could not store validated XRPL transaction: {str(e)}")
+    
+    @classmethod
+    def expected_drops(cls, total_amount: int) -> int:
+        """
+        Get the XRP amount (in drops) that settles an order total.
+        Uses the same conversion as execute_payment so both agree exactly.
+        
+        Args:
+            total_amount: Order total in JPY
+            
+        Returns:
+            int: Amount in drops
+        """
+        amount_xrp = total_amount / cls.XRP_JPY_RATE
+        return int(amount_xrp * 1_000_000)
+    
     def _get_explorer_url(self, transaction_hash: str) -> str:
         """
         Get XRPL explorer URL for a transaction.
@@ -8,6 +8,11 @@ from tasks.nft_tasks import (
     exponential_backoff_retry,
     retry_failed_task
 )
+from tasks.order_tasks import reap_abandoned_orders, purge_expired_idempotency_keys
+from tasks.ledger_tasks import index_ledger_history, watched_accounts
+from tasks.escrow_tasks import complete_due_escrows
+from tasks.analytics_tasks import roll_up_user_activities
+from tasks.leaderboard_tasks import rebuild_leaderboards
 
 
 __all__ = [
@@ -15,5 +20,12 @@ __all__ = [
     'mint_nft_task',
     'process_nft_mint_queue',
     'exponential_backoff_retry',
-    'retry_failed_task'
+    'retry_failed_task',
+    'reap_abandoned_orders',
+    'purge_expired_idempotency_keys',
+    'index_ledger_history',
+    'watched_accounts',
+    'complete_due_escrows',
+    'roll_up_user_activities',
+    'rebuild_leaderboards'
 ]
@@ -0,0 +1,49 @@
+"""
+Analytics tasks.
+Rolls user_activities up into the daily/monthly DAU, MAU and download
+aggregates read by the analytics endpoints.
+"""
+import logging
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from config import Config
+from services.activity_rollup_service import ActivityRollupService
+
+
+logger = logging.getLogger(__name__)
+
+
+def roll_up_user_activities(
+    db_session: Session,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None
+) -> Dict:
+    """
+    Fold new user activities into the rollup tables.
+    
+    This function is designed to be run on a schedule (cron or TaskManager).
+    Each run continues from the watermark of the previous one.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        batch_size: Activities per transaction (default: Config.ACTIVITY_ROLLUP_BATCH_SIZE)
+        max_batches: Optional cap on the number of batches per run
+        
+    Returns:
+        Dict: Run summary with the number of activities rolled up
+    """
+    if batch_size is None:
+        batch_size = Config.ACTIVITY_ROLLUP_BATCH_SIZE
+    
+    service = ActivityRollupService(db_session)
+    result = service.roll_up(
+        batch_size=batch_size,
+        lag_seconds=Config.ACTIVITY_ROLLUP_LAG_SECONDS,
+        max_batches=max_batches
+    )
+    
+    logger.info(
+        f"Activity rollup finished: {result['rolled_up']} activities in {result['batches']} batches",
+        extra=result
+    )
+    return result
@@ -0,0 +1,54 @@
+"""
+Escrow campaign tasks.
+Finishes staking escrows whose lock period has ended and awards their
+campaign NFTs.
+"""
+import logging
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from config import Config
+from clients.xrpl_client import XRPLClient
+from services.escrow_campaign_service import EscrowCampaignService
+
+
+logger = logging.getLogger(__name__)
+
+
+def complete_due_escrows(
+    db_session: Session,
+    xrpl_client: Optional[XRPLClient] = None,
+    page_size: Optional[int] = None,
+    max_pages: Optional[int] = None
+) -> Dict:
+    """
+    Finish all active escrows past their finish_after time.
+    
+    This function is designed to be run on a schedule (cron or TaskManager).
+    Escrows the ledger does not accept yet stay active for the next run.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        xrpl_client: XRPL client (default: sponsor client for Config.XRPL_NETWORK)
+        page_size: Escrows per ticket batch (default: Config.ESCROW_SWEEP_PAGE_SIZE)
+        max_pages: Optional cap on pages in this run
+        
+    Returns:
+        Dict: Run summary with counts and per-escrow errors
+    """
+    if xrpl_client is None:
+        xrpl_client = XRPLClient(network=Config.XRPL_NETWORK, sponsor_seed=Config.XRPL_SPONSOR_SEED)
+    if page_size is None:
+        page_size = Config.ESCROW_SWEEP_PAGE_SIZE
+    
+    service = EscrowCampaignService(db_session, xrpl_client)
+    result = service.check_and_complete_escrows(
+        page_size=page_size,
+        max_workers=Config.ESCROW_SWEEP_MAX_WORKERS,
+        max_pages=max_pages
+    )
+    
+    logger.info(
+        f"Escrow sweep finished: {result['completed_count']} of {result['total_checked']} escrows completed",
+        extra={'pages': result['pages'], 'error_count': result['error_count']}
+    )
+    return result
@@ -0,0 +1,36 @@
+"""
+Leaderboard tasks.
+Rebuilds the ranking snapshots from users and referrals so that drift
+(e.g. referrals removed outside the services) is corrected.
+"""
+import logging
+from typing import Dict, Iterable, Optional
+from sqlalchemy.orm import Session
+from services.leaderboard_service import LeaderboardService, IMPORTANCE_BOARD, REFERRALS_BOARD
+
+
+logger = logging.getLogger(__name__)
+
+
+def rebuild_leaderboards(db_session: Session, boards: Optional[Iterable[str]] = None) -> Dict:
+    """
+    Rebuild leaderboard snapshots from their source tables.
+    
+    This function is designed to be run on a schedule (cron or TaskManager).
+    Other processes pick up the rebuilt rows with their next incremental sync.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        boards: Boards to rebuild (default: all)
+        
+    Returns:
+        Dict: Ranked users per board
+    """
+    service = LeaderboardService(db_session)
+    result = {
+        board: service.rebuild(board)
+        for board in (boards or (IMPORTANCE_BOARD, REFERRALS_BOARD))
+    }
+    
+    logger.info(f"Leaderboards rebuilt: {result}", extra=result)
+    return result
@@ -0,0 +1,75 @@
+"""
+XRPL ledger tasks.
+Copies the sponsor and merchant accounts' ledger history into the local
+transactions index.
+"""
+import logging
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from xrpl.wallet import Wallet
+from config import Config
+from clients.xrpl_client import XRPLClient
+from services.xrpl_indexer_service import XRPLIndexerService
+
+
+logger = logging.getLogger(__name__)
+
+
+def watched_accounts() -> List[str]:
+    """
+    Get the XRPL accounts whose activity the backend tracks.
+    The sponsor address falls back to the address derived from its seed.
+    
+    Returns:
+        List[str]: Sponsor and merchant addresses (configured ones only)
+    """
+    sponsor_address = Config.XRPL_SPONSOR_ADDRESS
+    if not sponsor_address and Config.XRPL_SPONSOR_SEED:
+        sponsor_address = Wallet.from_seed(Config.XRPL_SPONSOR_SEED).classic_address
+    
+    return [account for account in (sponsor_address, Config.XRPL_MERCHANT_ADDRESS) if account]
+
+
+def index_ledger_history(
+    db_session: Session,
+    xrpl_client: Optional[XRPLClient] = None,
+    accounts: Optional[List[str]] = None,
+    page_size: Optional[int] = None,
+    max_pages: Optional[int] = None
+) -> Dict:
+    """
+    Index new validated transactions of the tracked accounts.
+    
+    This function is designed to be run on a schedule (cron or TaskManager).
+    Each run resumes from the stored checkpoint of every account.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        xrpl_client: XRPL client (default: client for Config.XRPL_NETWORK)
+        accounts: Accounts to index (default: watched_accounts())
+        page_size: Transactions per page (default: Config.XRPL_INDEXER_PAGE_SIZE)
+        max_pages: Optional cap on pages per account in this run
+        
+    Returns:
+        Dict: Per-account run summaries keyed by address
+    """
+    if xrpl_client is None:
+        xrpl_client = XRPLClient(network=Config.XRPL_NETWORK)
+    if accounts is None:
+        accounts = watched_accounts()
+    if page_size is None:
+        page_size = Config.XRPL_INDEXER_PAGE_SIZE
+    
+    service = XRPLIndexerService(db_session, xrpl_client)
+    results = service.index_accounts(
+        accounts,
+        page_size=page_size,
+        max_pages=max_pages,
+        start_ledger_index=Config.XRPL_INDEXER_START_LEDGER
+    )
+    
+    logger.info(
+        "Ledger history indexing finished",
+        extra={'accounts': len(results), 'inserted': sum(r['inserted'] for r in results.values())}
+    )
+    return results
@@ -0,0 +1,79 @@
+"""
+Order maintenance tasks.
+Releases stock held by orders that were never paid and purges expired
+Idempotency-Key records used by the order and payment endpoints.
+"""
+import logging
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from config import Config
+from services.order_service import OrderService
+from repositories.idempotency_repository import IdempotencyRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+def reap_abandoned_orders(
+    db_session: Session,
+    ttl_minutes: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None
+) -> Dict:
+    """
+    Expire pending orders past their TTL and restore their reserved stock.
+    
+    This function is designed to be run on a schedule (cron or TaskManager).
+    
+    Args:
+        db_session: SQLAlchemy database session
+        ttl_minutes: Pending order TTL (default: Config.ORDER_PENDING_TTL_MINUTES)
+        batch_size: Orders per batch (default: Config.ORDER_REAPER_BATCH_SIZE)
+        max_batches: Optional cap on the number of batches per run
+        
+    Returns:
+        Dict: Run summary with counts and elapsed time
+    """
+    if ttl_minutes is None:
+        ttl_minutes = Config.ORDER_PENDING_TTL_MINUTES
+    if batch_size is None:
+        batch_size = Config.ORDER_REAPER_BATCH_SIZE
+    
+    order_service = OrderService(db_session)
+    result = order_service.expire_abandoned_orders(
+        ttl_minutes=ttl_minutes,
+        batch_size=batch_size,
+        max_batches=max_batches
+    )
+    
+    logger.info(
+        f"Abandoned order reaper finished: {result['expired_count']} orders expired, "
+        f"{result['restored_units']} units restored in {result['elapsed_ms']} ms",
+        extra=result
+    )
+    
+    return result
+
+
+def purge_expired_idempotency_keys(db_session: Session, batch_size: int = 1000) -> int:
+    """
+    Delete expired Idempotency-Key records in batches.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        batch_size: Records deleted per statement
+        
+    Returns:
+        int: Number of records deleted
+    """
+    repo = IdempotencyRepository(db_session)
+    total = 0
+    
+    while True:
+        deleted = repo.delete_expired(limit=batch_size)
+        total += deleted
+        if deleted < batch_size:
+            break
+    
+    logger.info(f"Purged {total} expired idempotency keys")
+    return total
@@ -7,6 +7,7 @@ from typing import Callable, Any, Optional, Dict
 import uuid
 import logging
 from functools import wraps
+from prometheus_client import Counter, Gauge
 from sqlalchemy.orm import Session
 from repositories.task_repository import TaskRepository
 from models.task_queue import TaskStatus
@@ -14,6 +15,24 @@ from models.task_queue import TaskStatus
 
 logger = logging.getLogger(__name__)
 
+TASK_QUEUE_DEPTH = Gauge(
+    'airzone_task_queue_depth',
+    'Background tasks submitted and waiting for a worker thread',
+    ['task_type'],
+    multiprocess_mode='livesum'
+)
+TASKS_RUNNING = Gauge(
+    'airzone_tasks_running',
+    'Background tasks being executed',
+    ['task_type'],
+    multiprocess_mode='livesum'
+)
+TASKS_FINISHED = Counter(
+    'airzone_tasks_finished_total',
+    'Background tasks finished, by outcome',
+    ['task_type', 'outcome']
+)
+
 
 class TaskManager:
     """
@@ -74,9 +93,11 @@ class TaskManager:
         logger.info(f"Task {task_id} ({task_type}) submitted to queue")
         
         # Submit task to thread pool
+        TASK_QUEUE_DEPTH.labels(task_type).inc()
         future = self.executor.submit(
             self._execute_task,
             task_id,
+            task_type,
             func,
             *args,
             **kwargs
@@ -85,11 +106,18 @@ class TaskManager:
         # Store future for tracking
         self._futures[task_id] = future
         
+        # A task cancelled before it started leaves the queue without running
+        def release_cancelled(done: Future) -> None:
+            if done.cancelled():
+                TASK_QUEUE_DEPTH.labels(task_type).dec()
+        future.add_done_callback(release_cancelled)
+        
         return task_id
     
     def _execute_task(
         self,
         task_id: str,
+        task_type: str,
         func: Callable,
         *args,
         **kwargs
@@ -99,6 +127,7 @@ class TaskManager:
         
         Args:
             task_id: Task ID
+            task_type: Type of task
             func: Function to execute
             *args: Positional arguments for the function
             **kwargs: Keyword arguments for the function
@@ -109,6 +138,8 @@ class TaskManager:
         Raises:
             Exception: If task execution fails
         """
+        TASK_QUEUE_DEPTH.labels(task_type).dec()
+        TASKS_RUNNING.labels(task_type).inc()
         try:
             # Mark task as running
             self.task_repo.mark_as_running(task_id)
@@ -126,6 +157,7 @@ class TaskManager:
             if task_id in self._futures:
                 del self._futures[task_id]
             
+            TASKS_FINISHED.labels(task_type, 'completed').inc()
             return result
             
         except Exception as e:
@@ -138,7 +170,10 @@ class TaskManager:
             if task_id in self._futures:
                 del self._futures[task_id]
             
+            TASKS_FINISHED.labels(task_type, 'failed').inc()
             raise
+        finally:
+            TASKS_RUNNING.labels(task_type).dec()
     
     def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -0,0 +1,131 @@
+"""
+Tests for the per-request access log line and its sampling rules.
+"""
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from flask import Flask, g, jsonify
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required
+from sqlalchemy import create_engine, text
+
+from middleware.access_log import AccessLogSampler, parse_sample_rates, setup_access_logging
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    yield engine
+    engine.dispose()
+
+
+def _app(engine, **config):
+    app = Flask(__name__)
+    app.config.update(config)
+    
+    @app.before_request
+    def reject_blocked():
+        from flask import request
+        if request.path == '/blocked':
+            return jsonify({'error': 'Too many requests'}), 429
+    
+    setup_access_logging(app, engine)
+    
+    @app.route('/items/<item_id>')
+    def get_item(item_id):
+        g.current_user = {'user_id': 'user-1'}
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+        return jsonify({'id': item_id})
+    
+    @app.route('/health')
+    def health():
+        return jsonify({'status': 'ok'})
+    
+    @app.route('/fail')
+    def fail():
+        return jsonify({'error': 'failed'}), 500
+    
+    return app
+
+
+def _access_records(caplog):
+    return [record for record in caplog.records if record.name == 'airzone.access']
+
+
+def test_one_line_per_request_with_timing_user_and_query_count(engine, caplog):
+    caplog.set_level(logging.INFO, logger='airzone.access')
+    client = _app(engine).test_client()
+    
+    client.get('/items/42')
+    
+    records = _access_records(caplog)
+    assert len(records) == 1
+    record = records[0]
+    assert record.getMessage().startswith('GET /items/42 200 ')
+    assert record.request_method == 'GET'
+    assert record.status_code == 200
+    assert record.user_id == 'user-1'
+    assert record.db_queries == 2
+    assert record.duration_ms >= 0
+
+
+def test_user_id_comes_from_flask_jwt_extended_tokens(engine, caplog):
+    caplog.set_level(logging.INFO, logger='airzone.access')
+    app = _app(engine, JWT_SECRET_KEY='test-secret-key-with-at-least-32-bytes')
+    JWTManager(app)
+    
+    @app.route('/orders')
+    @jwt_required()
+    def list_orders():
+        return jsonify({'orders': []})
+    
+    with app.app_context():
+        token = create_access_token(identity='user-7')
+    client = app.test_client()
+    
+    client.get('/orders', headers={'Authorization': f'Bearer {token}'})
+    client.get('/orders', headers={'Authorization': 'Bearer not-a-token'})
+    client.get('/health')
+    
+    records = _access_records(caplog)
+    assert [(record.status_code, record.user_id) for record in records] == [
+        (200, 'user-7'), (422, None), (200, None)
+    ]
+
+
+def test_sampled_out_routes_still_log_errors_and_rejections(engine, caplog):
+    caplog.set_level(logging.INFO, logger='airzone.access')
+    client = _app(engine, ACCESS_LOG_SAMPLE_RATE=0.0, ACCESS_LOG_ROUTE_SAMPLE_RATES='/items=1').test_client()
+    
+    client.get('/health')
+    client.get('/items/1')
+    client.get('/fail')
+    client.get('/blocked')
+    
+    records = _access_records(caplog)
+    assert [(record.request_path, record.status_code) for record in records] == [
+        ('/items/1', 200), ('/fail', 500), ('/blocked', 429)
+    ]
+    assert records[1].levelno == logging.WARNING
+
+
+def test_sampler_uses_longest_prefix_and_always_logs_slow_requests():
+    sampler = AccessLogSampler(
+        default_rate=1.0,
+        route_rates=parse_sample_rates('/api/v1=0.5, /api/v1/products=0'),
+        slow_ms=500
+    )
+    
+    assert sampler.rate_for('/api/v1/products/<product_id>') == 0.0
+    assert sampler.rate_for('/api/v1/orders') == 0.5
+    assert sampler.rate_for('/health') == 1.0
+    assert not sampler.should_log('/api/v1/products', 200, 20.0)
+    assert sampler.should_log('/api/v1/products', 200, 750.0)
+    assert sampler.should_log('/api/v1/products', 404, 1.0)
+    with pytest.raises(ValueError):
+        parse_sample_rates('/api=2')
@@ -0,0 +1,141 @@
+"""
+Tests for incremental DAU/MAU and download rollups (SQLite).
+"""
+import json
+import os
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from services.activity_rollup_service import ActivityRollupService
+from utils.hyperloglog import HyperLogLog
+
+
+SCHEMA = [
+    """
+    CREATE TABLE user_activities (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id CHAR(36) NOT NULL,
+        activity_type VARCHAR(255) NOT NULL,
+        metadata TEXT NULL,
+        created_at TIMESTAMP NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE activity_daily_rollups (
+        activity_date DATE NOT NULL,
+        activity_type VARCHAR(100) NOT NULL,
+        event_count BIGINT NOT NULL DEFAULT 0,
+        user_sketch BLOB NOT NULL,
+        PRIMARY KEY (activity_date, activity_type)
+    )
+    """,
+    """
+    CREATE TABLE activity_monthly_rollups (
+        activity_month DATE NOT NULL,
+        activity_type VARCHAR(100) NOT NULL,
+        event_count BIGINT NOT NULL DEFAULT 0,
+        user_sketch BLOB NOT NULL,
+        PRIMARY KEY (activity_month, activity_type)
+    )
+    """,
+    """
+    CREATE TABLE product_download_daily (
+        activity_date DATE NOT NULL,
+        product_id CHAR(36) NOT NULL,
+        download_count BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (activity_date, product_id)
+    )
+    """,
+    "CREATE TABLE activity_rollup_state (name VARCHAR(50) PRIMARY KEY, last_activity_id BIGINT NOT NULL DEFAULT 0)",
+    "INSERT INTO activity_rollup_state (name, last_activity_id) VALUES ('user_activities', 0)",
+]
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={'detect_types': sqlite3.PARSE_DECLTYPES}
+    )
+    with engine.begin() as connection:
+        for statement in SCHEMA:
+            connection.execute(text(statement))
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _log(session, user_id, activity_type, created_at, product_id=None):
+    session.execute(
+        text("""
+            INSERT INTO user_activities (user_id, activity_type, metadata, created_at)
+            VALUES (:user_id, :activity_type, :metadata, :created_at)
+        """),
+        {
+            'user_id': user_id,
+            'activity_type': activity_type,
+            'metadata': json.dumps({'product_id': product_id}) if product_id else None,
+            'created_at': created_at,
+        }
+    )
+    session.commit()
+
+
+def test_sketches_estimate_and_merge_distinct_counts():
+    first, second = HyperLogLog(), HyperLogLog()
+    first.update(f'user-{index}' for index in range(30000))
+    second.update(f'user-{index}' for index in range(20000, 50000))
+    
+    assert abs(first.count() - 30000) < 30000 * 0.03
+    restored = HyperLogLog.from_bytes(first.to_bytes())
+    restored.merge(second)
+    assert abs(restored.count() - 50000) < 50000 * 0.03
+    
+    small = HyperLogLog()
+    small.update(['a', 'b', 'c', 'a'])
+    assert small.count() == 3
+
+
+def test_activities_are_rolled_up_incrementally_exactly_once(session):
+    jan_31 = datetime(2024, 1, 31, 10)
+    feb_1 = datetime(2024, 2, 1, 9)
+    for user_id in ('u1', 'u2', 'u3', 'u1'):
+        _log(session, user_id, 'login', jan_31)
+    _log(session, 'u1', 'download', jan_31, product_id='p1')
+    _log(session, 'u2', 'download', jan_31, product_id='p1')
+    _log(session, 'u1', 'login', feb_1)
+    
+    service = ActivityRollupService(session)
+    result = service.roll_up(batch_size=3, lag_seconds=0)
+    assert result == {'rolled_up': 7, 'batches': 3, 'last_activity_id': 7}
+    
+    # New activities (and one too recent to roll up yet) on the next run
+    _log(session, 'u4', 'login', feb_1 + timedelta(hours=1))
+    _log(session, 'u3', 'download', feb_1, product_id='p2')
+    _log(session, 'u1', 'download', feb_1, product_id='p1')
+    _log(session, 'u5', 'login', datetime.now())
+    result = service.roll_up(batch_size=100, lag_seconds=600)
+    assert result == {'rolled_up': 3, 'batches': 1, 'last_activity_id': 10}
+    assert service.roll_up(batch_size=100, lag_seconds=600)['rolled_up'] == 0
+    
+    assert service.get_active_users(date(2024, 1, 31), date(2024, 1, 31)) == 3
+    assert service.get_active_users(date(2024, 1, 31), date(2024, 2, 1)) == 4
+    assert service.get_monthly_active_users(date(2024, 1, 15)) == 3
+    assert service.get_monthly_active_users(date(2024, 2, 1)) == 2
+    assert service.get_daily_series(date(2024, 1, 30), date(2024, 2, 1)) == [
+        {'date': '2024-01-30', 'users': 0, 'events': 0},
+        {'date': '2024-01-31', 'users': 3, 'events': 4},
+        {'date': '2024-02-01', 'users': 2, 'events': 2},
+    ]
+    assert service.get_download_counts(date(2024, 1, 1), date(2024, 2, 29)) == {
+        'total': 4, 'by_product': {'p1': 3, 'p2': 1}
+    }
+    assert service.get_download_counts(date(2024, 2, 1), date(2024, 2, 1))['by_product'] == {'p1': 1, 'p2': 1}
@@ -0,0 +1,127 @@
+"""
+Tests for the cached active escrow campaign listing (SQLite).
+"""
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from flask import Flask, g
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from routes.escrow import escrow_blueprint
+from services.escrow_campaign_service import EscrowCampaignService
+
+
+@pytest.fixture
+def session(tmp_path):
+    # The escrow tables have no models; let SQLite return TIMESTAMP columns as datetimes like MySQL
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={'detect_types': sqlite3.PARSE_DECLTYPES}
+    )
+    with engine.begin() as connection:
+        connection.execute(text("""
+            CREATE TABLE escrow_campaigns (
+                id CHAR(36) PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                description TEXT,
+                min_amount_drops BIGINT NOT NULL,
+                lock_days INT NOT NULL,
+                nft_reward_name VARCHAR(255) NOT NULL,
+                nft_reward_description TEXT,
+                nft_reward_image_url VARCHAR(500),
+                start_date TIMESTAMP NOT NULL,
+                end_date TIMESTAMP NOT NULL,
+                max_participants INT DEFAULT NULL,
+                current_participants INT DEFAULT 0,
+                is_active BOOLEAN DEFAULT TRUE,
+                created_at TIMESTAMP
+            )
+        """))
+        connection.execute(text("""
+            CREATE TABLE escrow_campaign_participant_slots (
+                campaign_id CHAR(36) NOT NULL,
+                slot INT NOT NULL,
+                participants INT NOT NULL DEFAULT 0,
+                capacity INT NULL,
+                PRIMARY KEY (campaign_id, slot)
+            )
+        """))
+    session = sessionmaker(bind=engine)()
+    EscrowCampaignService.invalidate_campaign_cache()
+    yield session
+    EscrowCampaignService.invalidate_campaign_cache()
+    session.close()
+    engine.dispose()
+
+
+def _add_campaign(session, campaign_id, start_date, end_date, current_participants=0):
+    session.execute(
+        text("""
+        INSERT INTO escrow_campaigns
+        (id, name, min_amount_drops, lock_days, nft_reward_name, start_date, end_date,
+         current_participants, is_active, created_at)
+        VALUES (:id, :id, 100000000, 30, 'Staker NFT', :start, :end, :participants, TRUE, :created)
+        """),
+        {'id': campaign_id, 'start': start_date, 'end': end_date,
+         'participants': current_participants, 'created': start_date}
+    )
+    session.commit()
+
+
+def test_listing_is_cached_until_the_next_campaign_starts(session, monkeypatch):
+    monkeypatch.setattr(EscrowCampaignService, 'CAMPAIGN_CACHE_MAX_AGE', 3600)
+    now = datetime.utcnow()
+    _add_campaign(session, 'running', now - timedelta(days=1), now + timedelta(days=1), current_participants=4)
+    _add_campaign(session, 'upcoming', now + timedelta(seconds=1), now + timedelta(days=2))
+    service = EscrowCampaignService(session)
+    
+    campaigns, etag = service.get_active_campaigns()
+    assert [campaign['id'] for campaign in campaigns] == ['running']
+    assert campaigns[0]['current_participants'] == 4
+    
+    # Served from memory: a direct edit is not visible until invalidation or expiry
+    session.execute(text("UPDATE escrow_campaigns SET name = 'renamed' WHERE id = 'running'"))
+    session.commit()
+    assert service.get_active_campaigns() == (campaigns, etag)
+    
+    # The upcoming campaign's start is the cache expiry
+    time.sleep(1.1)
+    campaigns, new_etag = service.get_active_campaigns()
+    assert [campaign['id'] for campaign in campaigns] == ['upcoming', 'running']
+    assert campaigns[1]['name'] == 'renamed'
+    assert new_etag != etag
+    
+    session.execute(text("UPDATE escrow_campaigns SET is_active = FALSE WHERE id = 'upcoming'"))
+    session.commit()
+    EscrowCampaignService.invalidate_campaign_cache()
+    assert [campaign['id'] for campaign in service.get_active_campaigns()[0]] == ['running']
+
+
+def test_endpoint_serves_etag_and_not_modified(session):
+    now = datetime.utcnow()
+    _add_campaign(session, 'running', now - timedelta(days=1), now + timedelta(days=1))
+    
+    app = Flask(__name__)
+    app.register_blueprint(escrow_blueprint, url_prefix='/api/v1/escrow')
+    
+    @app.before_request
+    def bind_session():
+        g.db = session
+    
+    client = app.test_client()
+    response = client.get('/api/v1/escrow/campaigns')
+    assert response.status_code == 200
+    assert response.get_json()['campaigns'][0]['id'] == 'running'
+    etag = response.headers['ETag']
+    
+    response = client.get('/api/v1/escrow/campaigns', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert response.data == b''
@@ -0,0 +1,218 @@
+"""
+Tests for the batched escrow completion sweep (SQLite + stubbed XRPL submissions).
+"""
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+from xrpl.models.requests import AccountInfo, Fee
+from xrpl.models.response import Response, ResponseStatus
+from xrpl.models.transactions import Transaction
+from xrpl.transaction import XRPLReliableSubmissionException
+from xrpl.wallet import Wallet as XRPLWallet
+
+import clients.xrpl_client as xrpl_client_module
+from clients.xrpl_client import XRPLClient
+from clients.xrpl_fee_oracle import FeeOracle
+from clients.xrpl_sequence_allocator import get_sequence_allocator
+from models import Base, User, Wallet, NFTMint
+from services.escrow_campaign_service import EscrowCampaignService
+
+
+class StubNode:
+    def request(self, request):
+        if isinstance(request, Fee):
+            return Response(status=ResponseStatus.SUCCESS, result={
+                'drops': {'base_fee': '10', 'open_ledger_fee': '10'},
+                'ledger_current_index': 1000,
+            })
+        assert isinstance(request, AccountInfo)
+        return Response(status=ResponseStatus.SUCCESS, result={
+            'account_data': {'Account': request.account, 'Sequence': 10}
+        })
+
+
+class RecordingTaskManager:
+    def __init__(self):
+        self.calls = []
+    
+    def submit_task(self, task_type, func, payload=None, **kwargs):
+        self.calls.append((task_type, kwargs))
+        return f'task-{len(self.calls)}'
+
+
+class StubLedger:
+    """Answers TicketCreate and EscrowFinish; escrow results are keyed by OfferSequence."""
+    
+    def __init__(self, escrow_errors):
+        self.escrow_errors = escrow_errors
+        self.submitted = []
+        self._lock = threading.Lock()
+    
+    def submit_and_wait(self, transaction, client, wallet=None):
+        if isinstance(transaction, str):
+            transaction = Transaction.from_blob(transaction)
+        tx_type = transaction.transaction_type.value
+        with self._lock:
+            self.submitted.append((tx_type, transaction.ticket_sequence))
+        if tx_type == 'EscrowFinish' and transaction.offer_sequence in self.escrow_errors:
+            error = self.escrow_errors[transaction.offer_sequence]
+            if isinstance(error, Exception):
+                raise error
+            raise XRPLReliableSubmissionException(f"Transaction failed: {error}")
+        return Response(status=ResponseStatus.SUCCESS, result={
+            'hash': f'HASH{transaction.ticket_sequence or transaction.sequence}',
+            'ledger_index': 10,
+            'validated': True,
+            'meta': {'TransactionResult': 'tesSUCCESS'}
+        })
+
+
+@pytest.fixture
+def session(tmp_path):
+    # The escrow tables have no models; let SQLite return TIMESTAMP columns as datetimes like MySQL
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={'detect_types': sqlite3.PARSE_DECLTYPES}
+    )
+    Base.metadata.create_all(engine, tables=[User.__table__, NFTMint.__table__])
+    with engine.begin() as connection:
+        connection.execute(CreateTable(Wallet.__table__))
+        connection.execute(text("""
+            CREATE TABLE escrow_campaigns (
+                id CHAR(36) PRIMARY KEY,
+                nft_reward_name VARCHAR(255),
+                nft_reward_description TEXT,
+                nft_reward_image_url VARCHAR(500)
+            )
+        """))
+        connection.execute(text("""
+            CREATE TABLE escrow_stakes (
+                id CHAR(36) PRIMARY KEY,
+                user_id CHAR(36) NOT NULL,
+                campaign_id CHAR(36) NOT NULL,
+                wallet_address VARCHAR(255) NOT NULL,
+                finish_after TIMESTAMP NOT NULL,
+                escrow_sequence INT NULL,
+                status VARCHAR(20),
+                nft_awarded BOOLEAN DEFAULT FALSE,
+                nft_mint_id CHAR(36) NULL,
+                completed_at TIMESTAMP NULL
+            )
+        """))
+        connection.execute(text(
+            "INSERT INTO escrow_campaigns VALUES ('campaign-1', 'Staker NFT', 'Thanks', 'https://example.com/staker.png')"
+        ))
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _seed_stakes(session):
+    """Six stakes: five due (one user staked twice), one still locked."""
+    users = []
+    for index in range(4):
+        user = User(email=f'staker-{index}@example.com', google_id=f'g-staker-{index}', name='Staker')
+        session.add(user)
+        session.flush()
+        session.add(Wallet(user_id=user.id, address=XRPLWallet.create().classic_address, private_key_encrypted='x'))
+        users.append(user)
+    session.commit()
+    
+    wallets = {wallet.user_id: wallet.address for wallet in session.query(Wallet).all()}
+    now = datetime.utcnow()
+    stakes = [
+        ('stake-1', users[0], now - timedelta(days=3), 101),
+        ('stake-2', users[1], now - timedelta(days=2), 102),
+        ('stake-3', users[0], now - timedelta(days=2), 103),
+        ('stake-4', users[2], now - timedelta(days=1), 104),  # ledger says not yet
+        ('stake-5', users[3], now - timedelta(hours=1), 105),  # already finished on ledger
+        ('stake-6', users[3], now + timedelta(days=1), 106),
+    ]
+    for stake_id, user, finish_after, sequence in stakes:
+        session.execute(
+            text("""
+            INSERT INTO escrow_stakes (id, user_id, campaign_id, wallet_address, finish_after, escrow_sequence, status)
+            VALUES (:id, :user_id, 'campaign-1', :wallet, :finish, :sequence, 'active')
+            """),
+            {'id': stake_id, 'user_id': user.id, 'wallet': wallets[user.id], 'finish': finish_after, 'sequence': sequence}
+        )
+    session.commit()
+    return users
+
+
+def test_sweep_finishes_due_escrows_in_pages_and_awards_nfts(session, monkeypatch):
+    users = _seed_stakes(session)
+    xrpl_client = XRPLClient(network='testnet', sponsor_seed=XRPLWallet.create().seed)
+    xrpl_client.client = StubNode()
+    xrpl_client.fee_oracle = FeeOracle(xrpl_client.client, ttl=60)
+    ledger = StubLedger({104: 'tecNO_PERMISSION', 105: 'tecNO_TARGET'})
+    monkeypatch.setattr(xrpl_client_module, 'submit_and_wait', ledger.submit_and_wait)
+    task_manager = RecordingTaskManager()
+    
+    service = EscrowCampaignService(session, xrpl_client, task_manager)
+    result = service.check_and_complete_escrows(page_size=2)
+    
+    assert result['total_checked'] == 5
+    assert result['completed_count'] == 4
+    assert result['pages'] == 3
+    assert [error['escrow_id'] for error in result['errors']] == ['stake-4']
+    assert 'tecNO_PERMISSION' in result['errors'][0]['error']
+    
+    finishes = [ticket for tx_type, ticket in ledger.submitted if tx_type == 'EscrowFinish']
+    assert len(finishes) == 5 and all(finishes)
+    
+    rows = {
+        row['id']: row
+        for row in session.execute(text("SELECT * FROM escrow_stakes")).mappings().all()
+    }
+    assert {stake_id for stake_id, row in rows.items() if row['status'] == 'completed'} == {
+        'stake-1', 'stake-2', 'stake-3', 'stake-5'
+    }
+    assert rows['stake-4']['status'] == 'active' and rows['stake-6']['status'] == 'active'
+    
+    # One NFT per completed stake, including both stakes of the same user
+    mints = {mint.id: mint for mint in session.query(NFTMint).all()}
+    awarded = [row for row in rows.values() if row['nft_awarded']]
+    assert len(awarded) == 4 and len(mints) == 4
+    assert {row['nft_mint_id'] for row in awarded} == set(mints)
+    assert [mint.user_id for mint in mints.values()].count(users[0].id) == 2
+    assert all(mint.nft_metadata['type'] == 'escrow_reward' for mint in mints.values())
+    assert all(task_type == 'nft_campaign_mint' for task_type, _ in task_manager.calls)
+
+
+def test_sweep_returns_tickets_of_finishes_that_never_reached_the_ledger(session, monkeypatch):
+    _seed_stakes(session)
+    xrpl_client = XRPLClient(network='testnet', sponsor_seed=XRPLWallet.create().seed)
+    xrpl_client.client = StubNode()
+    xrpl_client.fee_oracle = FeeOracle(xrpl_client.client, ttl=60)
+    ledger = StubLedger({
+        102: 'temMALFORMED',
+        103: ConnectionError('connection reset'),
+        104: 'tecNO_PERMISSION',
+    })
+    monkeypatch.setattr(xrpl_client_module, 'submit_and_wait', ledger.submit_and_wait)
+    
+    service = EscrowCampaignService(session, xrpl_client, RecordingTaskManager())
+    result = service.check_and_complete_escrows(page_size=10)
+    
+    assert sorted(error['escrow_id'] for error in result['errors']) == ['stake-2', 'stake-3', 'stake-4']
+    # TicketCreate at sequence 10 -> tickets 11..15 in stake order; the tec
+    # failure used its ticket, the malformed and unsent finishes did not
+    allocator = get_sequence_allocator('testnet', xrpl_client.sponsor_wallet.classic_address, xrpl_client.client)
+    assert allocator.take_tickets(10) == [12, 13]
+
+
+def test_sweep_requires_sponsor_wallet(session):
+    service = EscrowCampaignService(session, XRPLClient(network='testnet'), RecordingTaskManager())
+    with pytest.raises(ValueError):
+        service.check_and_complete_escrows()
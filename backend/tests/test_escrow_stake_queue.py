@@ -0,0 +1,202 @@
+"""
+Tests for asynchronous escrow stake creation (SQLite + stubbed XRPL client).
+"""
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from cryptography.fernet import Fernet
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from config import Config
+from models import Base, User, Wallet
+from services.escrow_campaign_service import EscrowCampaignService
+
+
+ENCRYPTION_KEY = Fernet.generate_key().decode()
+
+
+class RecordingTaskManager:
+    def __init__(self):
+        self.calls = []
+    
+    def submit_task(self, task_type, func, payload=None, **kwargs):
+        self.calls.append((task_type, func, kwargs))
+        return 'task-1'
+
+
+class StubEscrowClient:
+    def __init__(self, error=None):
+        self.error = error
+        self.created = []
+    
+    def create_escrow(self, sender_wallet_seed, recipient_address, amount_drops, finish_after):
+        self.created.append((sender_wallet_seed, recipient_address, amount_drops))
+        if self.error:
+            raise Exception(self.error)
+        return {'transaction_hash': 'ESCROWHASH', 'escrow_sequence': 77}
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'ENCRYPTION_KEY', ENCRYPTION_KEY)
+    # The escrow tables have no models; let SQLite return TIMESTAMP columns as datetimes like MySQL
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={'detect_types': sqlite3.PARSE_DECLTYPES}
+    )
+    Base.metadata.create_all(engine, tables=[User.__table__])
+    with engine.begin() as connection:
+        connection.execute(CreateTable(Wallet.__table__))
+        connection.execute(text("""
+            CREATE TABLE escrow_campaigns (
+                id CHAR(36) PRIMARY KEY,
+                max_participants INT DEFAULT NULL,
+                current_participants INT DEFAULT 0
+            )
+        """))
+        connection.execute(text("""
+            CREATE TABLE escrow_campaign_participant_slots (
+                campaign_id CHAR(36) NOT NULL,
+                slot INT NOT NULL,
+                participants INT NOT NULL DEFAULT 0,
+                capacity INT NULL,
+                PRIMARY KEY (campaign_id, slot)
+            )
+        """))
+        connection.execute(text("""
+            CREATE TABLE escrow_stakes (
+                id CHAR(36) PRIMARY KEY,
+                user_id CHAR(36) NOT NULL,
+                campaign_id CHAR(36) NOT NULL,
+                wallet_address VARCHAR(255) NOT NULL,
+                amount_drops BIGINT NOT NULL,
+                lock_days INT NOT NULL,
+                finish_after TIMESTAMP NOT NULL,
+                escrow_sequence INT NULL,
+                transaction_hash VARCHAR(255) NULL,
+                status VARCHAR(20) DEFAULT 'submitting',
+                participant_slot INT NULL,
+                error_message TEXT NULL,
+                created_at TIMESTAMP
+            )
+        """))
+        connection.execute(text("INSERT INTO escrow_campaigns (id) VALUES ('campaign-1')"))
+        connection.execute(text(
+            "INSERT INTO escrow_campaigns (id, max_participants, current_participants) VALUES ('campaign-capped', 20, 3)"
+        ))
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _seed_user(session, index=0):
+    user = User(email=f'staker-{index}@example.com', google_id=f'g-staker-{index}', name='Staker')
+    session.add(user)
+    session.flush()
+    session.add(Wallet(
+        user_id=user.id,
+        address=f'rStaker{index:027d}',
+        private_key_encrypted=Fernet(ENCRYPTION_KEY.encode()).encrypt(b'sSeed').decode()
+    ))
+    session.commit()
+    return user.id
+
+
+def _participants(session, campaign_id='campaign-1'):
+    return session.execute(
+        text("SELECT COALESCE(SUM(participants), 0) FROM escrow_campaign_participant_slots WHERE campaign_id = :id"),
+        {'id': campaign_id}
+    ).scalar()
+
+
+def _stake(session, user_id, escrow_id):
+    return EscrowCampaignService(session, StubEscrowClient()).get_stake(user_id, escrow_id)
+
+
+def test_stake_is_queued_and_activated_by_worker(session):
+    user_id = _seed_user(session)
+    xrpl_client = StubEscrowClient()
+    task_manager = RecordingTaskManager()
+    service = EscrowCampaignService(session, xrpl_client, task_manager)
+    
+    queued = service.create_campaign_escrow(user_id, 'campaign-1', amount_xrp=100, lock_days=30)
+    
+    # Nothing was submitted while handling the request
+    assert queued['status'] == 'submitting' and queued['task_id'] == 'task-1'
+    assert xrpl_client.created == []
+    assert _stake(session, user_id, queued['escrow_id'])['status'] == 'submitting'
+    assert _participants(session) == 1
+    
+    task_type, func, kwargs = task_manager.calls[0]
+    assert task_type == 'escrow_stake_create'
+    func(**kwargs)
+    
+    stake = _stake(session, user_id, queued['escrow_id'])
+    assert stake['status'] == 'active'
+    assert stake['transaction_hash'] == 'ESCROWHASH' and stake['escrow_sequence'] == 77
+    assert xrpl_client.created == [('sSeed', f'rStaker{0:027d}', 100_000_000)]
+    assert _participants(session) == 1
+
+
+def test_failed_submission_marks_stake_failed(session):
+    user_id = _seed_user(session)
+    task_manager = RecordingTaskManager()
+    service = EscrowCampaignService(session, StubEscrowClient(error='tecUNFUNDED'), task_manager)
+    
+    queued = service.create_campaign_escrow(user_id, 'campaign-1', amount_xrp=100, lock_days=30)
+    _, func, kwargs = task_manager.calls[0]
+    with pytest.raises(Exception):
+        func(**kwargs)
+    
+    stake = _stake(session, user_id, queued['escrow_id'])
+    assert stake['status'] == 'failed'
+    assert 'tecUNFUNDED' in stake['error_message']
+    # The failed stake gave its participant slot back
+    assert _participants(session) == 0
+    assert _stake(session, 'someone-else', queued['escrow_id']) is None
+
+
+def test_participant_cap_is_enforced_across_slots(session):
+    service = EscrowCampaignService(session, StubEscrowClient(), RecordingTaskManager())
+    user_ids = [_seed_user(session, index) for index in range(18)]
+    
+    # 3 legacy participants + 17 new ones fill the cap of 20
+    for user_id in user_ids[:17]:
+        service.create_campaign_escrow(user_id, 'campaign-capped', amount_xrp=100, lock_days=30)
+    with pytest.raises(ValueError):
+        service.create_campaign_escrow(user_ids[17], 'campaign-capped', amount_xrp=100, lock_days=30)
+    
+    assert _participants(session, 'campaign-capped') == 20
+    slots = session.execute(text(
+        "SELECT COUNT(*) FROM escrow_campaign_participant_slots WHERE campaign_id = 'campaign-capped'"
+    )).scalar()
+    assert slots == EscrowCampaignService.PARTICIPANT_SLOTS
+    assert session.execute(text("SELECT COUNT(*) FROM escrow_stakes")).scalar() == 17
+
+
+def test_max_participants_change_rebalances_existing_slots(session):
+    service = EscrowCampaignService(session, StubEscrowClient(), RecordingTaskManager())
+    user_ids = [_seed_user(session, index) for index in range(4)]
+    
+    # 3 legacy participants + 1 new one, then the cap is lowered from 20 to 5
+    service.create_campaign_escrow(user_ids[0], 'campaign-capped', amount_xrp=100, lock_days=30)
+    with pytest.raises(ValueError):
+        service.update_max_participants('campaign-capped', 3)
+    service.update_max_participants('campaign-capped', 5)
+    
+    service.create_campaign_escrow(user_ids[1], 'campaign-capped', amount_xrp=100, lock_days=30)
+    with pytest.raises(ValueError):
+        service.create_campaign_escrow(user_ids[2], 'campaign-capped', amount_xrp=100, lock_days=30)
+    assert _participants(session, 'campaign-capped') == 5
+    
+    # Lifting the cap applies to the existing slots as well
+    service.update_max_participants('campaign-capped', None)
+    service.create_campaign_escrow(user_ids[3], 'campaign-capped', amount_xrp=100, lock_days=30)
+    assert _participants(session, 'campaign-capped') == 6
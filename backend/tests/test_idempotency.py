@@ -0,0 +1,101 @@
+"""
+Tests for the Idempotency-Key decorator (in-memory SQLite, no MySQL required).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from flask import Flask, g, jsonify, request
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from error_handlers import register_error_handlers
+from middleware.idempotency import idempotent
+from models import Base, IdempotencyKey
+
+
+@pytest.fixture
+def client():
+    engine = create_engine(
+        'sqlite://',
+        connect_args={'check_same_thread': False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine, tables=[IdempotencyKey.__table__])
+    Session = sessionmaker(bind=engine)
+    
+    app = Flask(__name__)
+    register_error_handlers(app)
+    calls = {'count': 0}
+    
+    @app.before_request
+    def setup_request():
+        g.db = Session()
+        g.current_user = {'user_id': request.headers.get('X-User', 'user-1')}
+    
+    @app.teardown_request
+    def teardown(exception=None):
+        db = g.pop('db', None)
+        if db is not None:
+            db.close()
+    
+    @app.route('/orders', methods=['POST'])
+    @idempotent()
+    def create_order():
+        calls['count'] += 1
+        if request.get_json().get('fail'):
+            return jsonify({'status': 'error'}), 409
+        return jsonify({'status': 'success', 'call': calls['count']}), 201
+    
+    app.calls = calls
+    with app.test_client() as test_client:
+        test_client.application = app
+        yield test_client
+    engine.dispose()
+
+
+def test_replays_stored_response(client):
+    headers = {'Idempotency-Key': 'abc'}
+    first = client.post('/orders', json={'items': [1]}, headers=headers)
+    second = client.post('/orders', json={'items': [1]}, headers=headers)
+    
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert second.get_json() == first.get_json()
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert client.application.calls['count'] == 1
+
+
+def test_rejects_key_reuse_with_different_body(client):
+    headers = {'Idempotency-Key': 'abc'}
+    client.post('/orders', json={'items': [1]}, headers=headers)
+    response = client.post('/orders', json={'items': [2]}, headers=headers)
+    
+    assert response.status_code == 400
+
+
+def test_keys_are_scoped_per_user(client):
+    client.post('/orders', json={'items': [1]}, headers={'Idempotency-Key': 'abc'})
+    client.post('/orders', json={'items': [1]}, headers={'Idempotency-Key': 'abc', 'X-User': 'user-2'})
+    
+    assert client.application.calls['count'] == 2
+
+
+def test_failed_requests_release_the_key(client):
+    headers = {'Idempotency-Key': 'abc'}
+    first = client.post('/orders', json={'fail': True}, headers=headers)
+    second = client.post('/orders', json={'fail': True}, headers=headers)
+    
+    assert first.status_code == 409
+    assert 'Idempotent-Replayed' not in second.headers
+    assert client.application.calls['count'] == 2
+
+
+def test_requests_without_key_always_execute(client):
+    client.post('/orders', json={'items': [1]})
+    client.post('/orders', json={'items': [1]})
+    
+    assert client.application.calls['count'] == 2
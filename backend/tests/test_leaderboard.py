@@ -0,0 +1,157 @@
+"""
+Tests for the in-memory ranked leaderboard and its persisted snapshot.
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+import services.leaderboard_service as leaderboard_service_module
+from models import Base, User
+from models.referral import Referral
+from services.leaderboard_service import LeaderboardService, IMPORTANCE_BOARD, REFERRALS_BOARD
+from services.referral_service import ReferralService
+from services.user_importance_service import UserImportanceService
+from utils.leaderboard import Leaderboard
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(leaderboard_service_module, '_boards', {})
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine, tables=[User.__table__, Referral.__table__])
+    with engine.begin() as connection:
+        connection.execute(text("""
+            CREATE TABLE leaderboard_entries (
+                board VARCHAR(50) NOT NULL,
+                user_id CHAR(36) NOT NULL,
+                score BIGINT NOT NULL DEFAULT 0,
+                updated_at DATETIME NOT NULL,
+                PRIMARY KEY (board, user_id)
+            )
+        """))
+        connection.execute(text("""
+            CREATE TABLE leaderboard_generations (
+                board VARCHAR(50) NOT NULL PRIMARY KEY,
+                generation BIGINT NOT NULL DEFAULT 0,
+                rebuilt_at DATETIME NOT NULL
+            )
+        """))
+    yield engine
+    engine.dispose()
+
+
+def _add_users(session, scores):
+    users = [
+        User(email=f'u{index}@example.com', google_id=f'g-{index}', name=f'User {index}',
+             importance_score=score, referral_code=f'CODE{index:04d}')
+        for index, score in enumerate(scores)
+    ]
+    session.add_all(users)
+    session.commit()
+    return [user.id for user in users]
+
+
+def test_ranks_ranges_and_updates_match_a_sorted_list():
+    leaderboard = Leaderboard()
+    expected = {}
+    rng = random.Random(7)
+    for step in range(2000):
+        member = f'user-{rng.randrange(300)}'
+        if rng.random() < 0.85:
+            expected[member] = rng.randrange(40)
+            leaderboard.set(member, expected[member])
+        else:
+            expected.pop(member, None)
+            leaderboard.remove(member)
+        
+        if step % 50 == 0:
+            ordered = sorted(expected.items(), key=lambda item: (-item[1], item[0]))
+            assert leaderboard.top(10) == ordered[:10]
+            assert leaderboard.range(25, 60) == ordered[25:60]
+            assert [leaderboard.rank(member) for member, _ in ordered] == list(range(len(ordered)))
+    
+    assert len(leaderboard) == len(expected)
+    assert leaderboard.rank('missing') is None
+
+
+def test_snapshot_seeds_serves_and_syncs_across_processes(engine, monkeypatch):
+    session = sessionmaker(bind=engine)()
+    user_ids = _add_users(session, [300, 0, 1200, 800])
+    
+    # First use seeds the snapshot from users
+    top_users = UserImportanceService(session).get_top_users(limit=2)
+    assert [(user['user_id'], user['rank'], user['importance_score']) for user in top_users] == [
+        (user_ids[2], 1, 1200), (user_ids[3], 2, 800)
+    ]
+    
+    service = LeaderboardService(session)
+    service.set_score(IMPORTANCE_BOARD, user_ids[0], 1500)
+    assert service.get_rank(IMPORTANCE_BOARD, user_ids[0]) == {'rank': 1, 'score': 1500, 'total': 3}
+    
+    # Another process loads the snapshot without touching users
+    monkeypatch.setattr(leaderboard_service_module, '_boards', {})
+    statements = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    other = LeaderboardService(sessionmaker(bind=engine)())
+    assert [entry['user_id'] for entry in other.top(IMPORTANCE_BOARD, 10)] == [user_ids[0], user_ids[2], user_ids[3]]
+    assert not [statement for statement in statements if 'FROM users' in statement]
+    
+    # ...and picks up later changes from the first one incrementally
+    service.set_score(IMPORTANCE_BOARD, user_ids[3], 0)
+    service.set_score(IMPORTANCE_BOARD, user_ids[1], 900)
+    monkeypatch.setattr(LeaderboardService, 'SYNC_INTERVAL', 0)
+    assert other.range(IMPORTANCE_BOARD, 1, 10) == [
+        {'rank': 2, 'user_id': user_ids[2], 'score': 1200},
+        {'rank': 3, 'user_id': user_ids[1], 'score': 900},
+    ]
+    assert other.get_rank(IMPORTANCE_BOARD, user_ids[3]) is None
+    session.close()
+
+
+def test_rebuild_in_another_process_triggers_a_full_reload(engine, monkeypatch):
+    session = sessionmaker(bind=engine)()
+    user_ids = _add_users(session, [300, 1200, 800])
+    service = LeaderboardService(session)
+    assert len(service.top(IMPORTANCE_BOARD, 10)) == 3
+    this_process = leaderboard_service_module._boards
+    
+    # Another process rebuilds after a user's score dropped to 0 in users, which
+    # deletes that user's snapshot row instead of updating it
+    session.query(User).filter(User.id == user_ids[0]).update({'importance_score': 0})
+    session.commit()
+    monkeypatch.setattr(leaderboard_service_module, '_boards', {})
+    assert LeaderboardService(sessionmaker(bind=engine)()).rebuild(IMPORTANCE_BOARD) == 2
+    
+    monkeypatch.setattr(leaderboard_service_module, '_boards', this_process)
+    monkeypatch.setattr(LeaderboardService, 'SYNC_INTERVAL', 0)
+    assert [entry['user_id'] for entry in service.top(IMPORTANCE_BOARD, 10)] == [user_ids[1], user_ids[2]]
+    assert service.get_rank(IMPORTANCE_BOARD, user_ids[0]) is None
+    session.close()
+
+
+def test_applied_referrals_update_the_referral_board(engine):
+    session = sessionmaker(bind=engine)()
+    referrer, second_referrer, *referred = _add_users(session, [0] * 6)
+    service = ReferralService(session)
+    
+    service.apply_referral_code(referred[0], 'CODE0001')
+    for user_id in referred[1:]:
+        service.apply_referral_code(user_id, 'CODE0000')
+    
+    leaderboard = LeaderboardService(session)
+    assert leaderboard.top(REFERRALS_BOARD, 5) == [
+        {'rank': 1, 'user_id': referrer, 'score': 3},
+        {'rank': 2, 'user_id': second_referrer, 'score': 1},
+    ]
+    
+    # The rebuilt snapshot agrees with the incremental one
+    assert leaderboard.rebuild(REFERRALS_BOARD) == 2
+    assert leaderboard.get_rank(REFERRALS_BOARD, referrer) == {'rank': 1, 'score': 3, 'total': 2}
+    session.close()
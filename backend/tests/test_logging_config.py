@@ -0,0 +1,94 @@
+"""
+Tests for the queued structured logging pipeline.
+"""
+import io
+import json
+import logging
+import os
+import sys
+import threading
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from logging_config import StructuredFormatter, start_log_listener, stop_log_listener
+
+
+class _Opaque:
+    def __str__(self):
+        return 'opaque'
+
+
+class _ThreadRecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+    
+    def emit(self, record):
+        self.threads.append(threading.current_thread().name)
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger('tests.logging_config')
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    yield logger
+    logger.handlers = []
+    stop_log_listener()
+
+
+def _record(message='hello', **extra):
+    record = logging.LogRecord('airzone.test', logging.WARNING, __file__, 10, message, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_structured_line_uses_record_time_and_known_extra_fields():
+    record = _record(request_path='/api/v1/products', request_method='GET', unrelated='skip')
+    record.created = datetime(2026, 3, 4, 5, 6, 7, 250000, tzinfo=timezone.utc).timestamp()
+    
+    data = json.loads(StructuredFormatter().format(record))
+    
+    assert data['timestamp'] == '2026-03-04T05:06:07.250000Z'
+    assert data['level'] == 'WARNING'
+    assert data['message'] == 'hello'
+    assert data['request_path'] == '/api/v1/products'
+    assert data['request_method'] == 'GET'
+    assert 'unrelated' not in data
+
+
+def test_structured_line_encodes_exceptions_and_unserializable_values():
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        record = _record('failed', error_details={'value': _Opaque()})
+        record.exc_info = sys.exc_info()
+    
+    data = json.loads(StructuredFormatter().format(record))
+    
+    assert 'ValueError: boom' in data['exception']
+    assert data['error_details'] == {'value': 'opaque'}
+
+
+def test_records_are_formatted_and_written_on_the_listener_thread(logger):
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(StructuredFormatter())
+    errors_only = _ThreadRecordingHandler()
+    errors_only.setLevel(logging.ERROR)
+    logger.addHandler(start_log_listener([output, errors_only]))
+    
+    items = ['a']
+    logger.info('items=%s', items, extra={'ip_address': '203.0.113.7'})
+    items.append('b')
+    logger.error('failed')
+    stop_log_listener()
+    
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line['message'] for line in lines] == ["items=['a']", 'failed']
+    assert lines[0]['ip_address'] == '203.0.113.7'
+    assert len(errors_only.threads) == 1
+    assert errors_only.threads[0] != threading.current_thread().name
@@ -0,0 +1,104 @@
+"""
+Tests for the Prometheus metrics, their multiprocess mode and the /metrics endpoint.
+"""
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import pytest
+from flask import Flask, jsonify
+from prometheus_client import REGISTRY
+
+from clients.instrumentation import timed_call
+from middleware.metrics import setup_metrics
+
+
+def _run(tmp_path, code):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    process = subprocess.run(
+        [sys.executable, '-c', f'import sys; sys.path.insert(0, {BACKEND_DIR!r})\n{code}'],
+        env=env, capture_output=True, text=True, check=True
+    )
+    return process
+
+
+def _worker(tmp_path, completed):
+    process = subprocess.Popen(
+        [sys.executable, '-c', (
+            f'import sys; sys.path.insert(0, {BACKEND_DIR!r})\n'
+            'from tasks.task_manager import TASKS_FINISHED, TASKS_RUNNING\n'
+            f'TASKS_FINISHED.labels("mint", "completed").inc({completed})\n'
+            'TASKS_RUNNING.labels("mint").inc()\n'
+        )],
+        env=dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    )
+    assert process.wait() == 0
+    return process.pid
+
+
+def test_scrape_merges_workers_and_keeps_counters_of_exited_ones(tmp_path):
+    exited_pid = _worker(tmp_path, completed=2)
+    _worker(tmp_path, completed=3)
+
+    # Gunicorn's child_exit hook marks the first worker dead; the second is still "live"
+    lines = _run(tmp_path, (
+        'from prometheus_client import multiprocess\n'
+        f'multiprocess.mark_process_dead({exited_pid})\n'
+        'from middleware.metrics import collect_metrics\n'
+        'sys.stdout.write(collect_metrics().decode())\n'
+    )).stdout.splitlines()
+
+    # Values were written as they changed, nothing was lost when the workers exited
+    assert 'airzone_tasks_finished_total{outcome="completed",task_type="mint"} 5.0' in lines
+    assert 'airzone_tasks_running{task_type="mint"} 1.0' in lines
+
+
+def test_timed_call_records_failures_separately():
+    with timed_call('stripe', 'timed_call_test'):
+        pass
+    with pytest.raises(RuntimeError):
+        with timed_call('stripe', 'timed_call_test'):
+            raise RuntimeError('down')
+    
+    for outcome in ('success', 'error'):
+        assert REGISTRY.get_sample_value(
+            'airzone_external_call_duration_seconds_count',
+            {'service': 'stripe', 'operation': 'timed_call_test', 'outcome': outcome}
+        ) == 1
+
+
+def test_metrics_endpoint_reports_request_histograms():
+    app = Flask(__name__)
+    app.config['METRICS_TOKEN'] = 'scrape-token'
+    setup_metrics(app)
+    
+    @app.route('/metrics-test/items')
+    def metrics_test_items():
+        return jsonify({'items': []})
+    
+    client = app.test_client()
+    client.get('/metrics-test/items')
+    
+    assert client.get('/metrics').status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-token'})
+    lines = response.get_data(as_text=True).splitlines()
+    assert response.content_type.startswith('text/plain; version=')
+    assert (
+        'airzone_http_request_duration_seconds_count'
+        '{blueprint="",endpoint="metrics_test_items",method="GET",status="200"} 1.0'
+    ) in lines
+    assert 'airzone_http_requests_in_progress{blueprint=""} 1.0' in lines  # the scrape itself
+
+
+def test_metrics_endpoint_needs_a_token_outside_development():
+    production = Flask(__name__)
+    setup_metrics(production)
+    assert production.test_client().get('/metrics').status_code == 404
+    
+    testing = Flask(__name__)
+    testing.testing = True
+    setup_metrics(testing)
+    assert testing.test_client().get('/metrics').status_code == 200
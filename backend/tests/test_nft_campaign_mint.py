@@ -0,0 +1,210 @@
+"""
+Tests for ticket-based NFT campaign mints (SQLite + stubbed XRPL submissions).
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+from xrpl.models.requests import AccountInfo, Fee
+from xrpl.models.response import Response, ResponseStatus
+from xrpl.models.transactions import Transaction
+from xrpl.transaction import XRPLReliableSubmissionException
+from xrpl.wallet import Wallet as XRPLWallet
+
+import clients.xrpl_client as xrpl_client_module
+from clients.xrpl_client import XRPLClient
+from clients.xrpl_fee_oracle import FeeOracle
+from clients.xrpl_sequence_allocator import get_sequence_allocator
+from models import Base, User, Wallet, NFTMint
+from models.nft_mint import NFTMintStatus
+from services.nft_service import NFTService
+
+
+class StubAccountInfoNode:
+    def __init__(self, sequence):
+        self.sequence = sequence
+        self.fee_requests = 0
+    
+    def request(self, request):
+        if isinstance(request, Fee):
+            self.fee_requests += 1
+            return Response(status=ResponseStatus.SUCCESS, result={
+                'drops': {'base_fee': '10', 'open_ledger_fee': '12'},
+                'levels': {'reference_level': '256', 'open_ledger_level': '307'},
+                'ledger_current_index': 1000,
+            })
+        assert isinstance(request, AccountInfo)
+        return Response(status=ResponseStatus.SUCCESS, result={
+            'account_data': {'Account': request.account, 'Sequence': self.sequence}
+        })
+
+
+class RecordingTaskManager:
+    def __init__(self):
+        self.calls = []
+    
+    def submit_task(self, task_type, func, payload=None, **kwargs):
+        self.calls.append((task_type, func, kwargs))
+        return 'task-1'
+
+
+class StubLedger:
+    """Answers submit_and_wait for TicketCreate, NFTokenMint and NFTokenCreateOffer."""
+    
+    def __init__(self, failing_mint_tickets=(), failing_offer_tickets=(), error='tecMAX_SEQUENCE_REACHED'):
+        self.failing_mint_tickets = set(failing_mint_tickets)
+        self.failing_offer_tickets = set(failing_offer_tickets)
+        self.error = error
+        self.submitted = []
+        self._lock = threading.Lock()
+    
+    def submit_and_wait(self, transaction, client, wallet=None):
+        # Transactions arrive filled and signed locally (bulk-signed ones as blobs)
+        if isinstance(transaction, str):
+            transaction = Transaction.from_blob(transaction)
+        assert wallet is None and transaction.is_signed()
+        assert transaction.fee == '12' and transaction.last_ledger_sequence == 1020
+        tx_type = transaction.transaction_type.value
+        with self._lock:
+            self.submitted.append((tx_type, transaction.sequence, transaction.ticket_sequence))
+        
+        failing = self.failing_mint_tickets if tx_type == 'NFTokenMint' else self.failing_offer_tickets
+        if transaction.ticket_sequence in failing:
+            raise XRPLReliableSubmissionException(f"Transaction failed: {self.error}")
+        
+        ticket = transaction.ticket_sequence or transaction.sequence
+        meta = {'TransactionResult': 'tesSUCCESS'}
+        if tx_type == 'NFTokenMint':
+            meta['nftoken_id'] = f'{ticket:064X}'
+        elif tx_type == 'NFTokenCreateOffer':
+            meta['offer_id'] = f'{ticket:063X}F'
+        return Response(status=ResponseStatus.SUCCESS, result={
+            'hash': f'HASH{ticket}', 'ledger_index': 10, 'validated': True, 'meta': meta
+        })
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    # SQLite index names are database-wide and wallets/nft_mints share
+    # idx_user_id, so the wallets table is created without its indexes
+    Base.metadata.create_all(engine, tables=[User.__table__, NFTMint.__table__])
+    with engine.begin() as connection:
+        connection.execute(CreateTable(Wallet.__table__))
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _seed_users(session, count, with_wallet=True):
+    user_ids = []
+    for index in range(count):
+        user = User(email=f'{with_wallet}-{index}@example.com', google_id=f'g-{with_wallet}-{index}', name='User')
+        session.add(user)
+        session.flush()
+        if with_wallet:
+            session.add(Wallet(
+                user_id=user.id,
+                address=XRPLWallet.create().classic_address,
+                private_key_encrypted='encrypted'
+            ))
+        user_ids.append(user.id)
+    session.commit()
+    return user_ids
+
+
+def test_campaign_mints_with_tickets_and_writes_results_in_bulk(session, monkeypatch):
+    recipients = _seed_users(session, 3)
+    walletless = _seed_users(session, 1, with_wallet=False)
+    
+    xrpl_client = XRPLClient(network='testnet', sponsor_seed=XRPLWallet.create().seed)
+    xrpl_client.client = StubAccountInfoNode(sequence=50)
+    xrpl_client.fee_oracle = FeeOracle(xrpl_client.client, ttl=60)
+    # The first recipient's mint (ticket 51) fails, its offer ticket 52 stays unused
+    ledger = StubLedger(failing_mint_tickets={51})
+    monkeypatch.setattr(xrpl_client_module, 'submit_and_wait', ledger.submit_and_wait)
+    
+    task_manager = RecordingTaskManager()
+    service = NFTService(session, xrpl_client, task_manager)
+    
+    queued = service.mint_campaign(
+        user_ids=recipients + walletless + recipients[:1],
+        nft_name='Event NFT',
+        nft_description='Thanks for joining',
+        nft_image_url='https://example.com/nft.png'
+    )
+    
+    assert queued['queued'] == 3
+    assert queued['skipped_user_ids'] == walletless
+    assert session.query(NFTMint).filter(NFTMint.status == NFTMintStatus.PENDING).count() == 3
+    
+    task_type, func, kwargs = task_manager.calls[0]
+    assert task_type == 'nft_campaign_mint'
+    kwargs['chunk_size'] = 2
+    summary = func(**kwargs)
+    
+    assert summary == {'completed': 2, 'failed': 1, 'offers_failed': 0}
+    
+    # Chunk 1: TicketCreate at 50 -> tickets 51..54; chunk 2 reuses ticket 52
+    # and creates one more ticket (TicketCreate at 55 -> ticket 56)
+    ticket_creates = [sequence for tx_type, sequence, _ in ledger.submitted if tx_type == 'TicketCreate']
+    assert ticket_creates == [50, 55]
+    offers = sorted(ticket for tx_type, _, ticket in ledger.submitted if tx_type == 'NFTokenCreateOffer')
+    assert offers == [54, 56]
+    
+    session.expire_all()
+    mints = {mint.user_id: mint for mint in session.query(NFTMint).all()}
+    assert mints[recipients[0]].status == NFTMintStatus.FAILED
+    assert 'tecMAX_SEQUENCE_REACHED' in mints[recipients[0]].error_message
+    for user_id in recipients[1:]:
+        assert mints[user_id].status == NFTMintStatus.COMPLETED
+        assert mints[user_id].offer_id.endswith('F')
+        assert mints[user_id].nft_metadata['campaign_id'] == queued['campaign_id']
+    
+    allocator = get_sequence_allocator('testnet', xrpl_client.sponsor_wallet.classic_address, xrpl_client.client)
+    assert allocator.take_tickets(10) == []
+    
+    # Fee and LastLedgerSequence of all 9 transactions came from one fee request
+    assert xrpl_client.client.fee_requests == 1
+
+
+def test_campaign_returns_tickets_of_transactions_that_missed_the_ledger(session, monkeypatch):
+    recipients = _seed_users(session, 3)
+    
+    xrpl_client = XRPLClient(network='testnet', sponsor_seed=XRPLWallet.create().seed)
+    xrpl_client.client = StubAccountInfoNode(sequence=50)
+    xrpl_client.fee_oracle = FeeOracle(xrpl_client.client, ttl=60)
+    # Tickets 51..56: the first mint (51) and the second offer (54) are
+    # rejected before reaching the ledger, so neither consumes its ticket
+    ledger = StubLedger(failing_mint_tickets={51}, failing_offer_tickets={54}, error='telCAN_NOT_QUEUE')
+    monkeypatch.setattr(xrpl_client_module, 'submit_and_wait', ledger.submit_and_wait)
+    
+    task_manager = RecordingTaskManager()
+    service = NFTService(session, xrpl_client, task_manager)
+    service.mint_campaign(recipients, 'Event NFT', 'desc', 'https://example.com/nft.png')
+    
+    _, func, kwargs = task_manager.calls[0]
+    summary = func(**kwargs)
+    
+    assert summary == {'completed': 2, 'failed': 1, 'offers_failed': 1}
+    allocator = get_sequence_allocator('testnet', xrpl_client.sponsor_wallet.classic_address, xrpl_client.client)
+    # Both tickets of the failed mint and the ticket of the failed offer
+    assert allocator.take_tickets(10) == [51, 52, 54]
+
+
+def test_campaign_requires_recipients_with_wallets(session):
+    walletless = _seed_users(session, 2, with_wallet=False)
+    xrpl_client = XRPLClient(network='testnet', sponsor_seed=XRPLWallet.create().seed)
+    service = NFTService(session, xrpl_client, RecordingTaskManager())
+    
+    with pytest.raises(ValueError):
+        service.mint_campaign(walletless, 'Event NFT', 'desc', 'https://example.com/nft.png')
+    with pytest.raises(ValueError):
+        service.mint_campaign([], 'Event NFT', 'desc', 'https://example.com/nft.png')
@@ -0,0 +1,166 @@
+"""
+Tests for version-checked (optimistic) status updates (SQLite, no MySQL required).
+"""
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from exceptions import ConcurrentUpdateError
+from models import (
+    Base, User, Product, Order, OrderItem, OrderStatus, Payment, PaymentStatus
+)
+from models.referral import Referral, ReferralStatus, CoinTransaction
+from repositories import OrderRepository
+from services.payment_service import PaymentService
+from services.referral_service import ReferralService
+
+
+@pytest.fixture
+def make_session(tmp_path):
+    # File-backed so that two sessions behave like two concurrent workers
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    # SQLite index names are database-wide, so only create the tables under test
+    Base.metadata.create_all(engine, tables=[
+        User.__table__, Product.__table__, Order.__table__, OrderItem.__table__,
+        Referral.__table__, CoinTransaction.__table__
+    ])
+    # payments reuses the index name idx_order_id, so create it without indexes
+    with engine.begin() as connection:
+        connection.execute(CreateTable(Payment.__table__))
+    factory = sessionmaker(bind=engine)
+    sessions = []
+    
+    def make():
+        session = factory()
+        sessions.append(session)
+        return session
+    
+    yield make
+    for session in sessions:
+        session.close()
+    engine.dispose()
+
+
+def _seed_order(session):
+    user = User(email='buyer@example.com', google_id='g-1', name='Buyer')
+    session.add(user)
+    session.flush()
+    order = Order(user_id=user.id, total_amount=5000)
+    session.add(order)
+    session.commit()
+    return order.id
+
+
+def test_stale_version_is_rejected(make_session):
+    session = make_session()
+    order_id = _seed_order(session)
+    repo = OrderRepository(session)
+    
+    assert repo.update_if_version(order_id, 0, status=OrderStatus.PROCESSING)
+    assert not repo.update_if_version(order_id, 0, status=OrderStatus.CANCELLED)
+    
+    order = repo.find_by_id(order_id)
+    assert order.status == OrderStatus.PROCESSING
+    assert order.version == 1
+    
+    with pytest.raises(ConcurrentUpdateError):
+        repo.update_status(order_id, OrderStatus.CANCELLED, expected_version=0)
+
+
+def test_update_with_retry_reevaluates_after_conflict(make_session):
+    session = make_session()
+    order_id = _seed_order(session)
+    repo = OrderRepository(session)
+    other_repo = OrderRepository(make_session())
+    seen = []
+    
+    def mutator(order):
+        seen.append(order.status)
+        if len(seen) == 1:
+            # A concurrent worker completes the order between our read and write
+            other_repo.update_status(order_id, OrderStatus.COMPLETED)
+        if order.status == OrderStatus.COMPLETED:
+            return None
+        return {'status': OrderStatus.FAILED}
+    
+    order = repo.update_with_retry(order_id, mutator)
+    
+    assert seen == [OrderStatus.PENDING, OrderStatus.COMPLETED]
+    assert order.status == OrderStatus.COMPLETED
+    assert order.version == 1
+
+
+def test_complete_referral_awards_coins_once(make_session):
+    session = make_session()
+    referrer = User(email='a@example.com', google_id='g-a', name='A', coins=10)
+    referred = User(email='b@example.com', google_id='g-b', name='B')
+    session.add_all([referrer, referred])
+    session.flush()
+    referral = Referral(
+        id=str(uuid.uuid4()),
+        referrer_id=referrer.id,
+        referred_id=referred.id,
+        status=ReferralStatus.PENDING
+    )
+    session.add(referral)
+    session.commit()
+    
+    service = ReferralService(session)
+    result = service.complete_referral(referral.id)
+    
+    assert result['new_balance'] == 10 + ReferralService.REFERRAL_BONUS_COINS
+    assert service.complete_referral(referral.id) == {'already_completed': True}
+    assert session.query(CoinTransaction).count() == 1
+    assert session.get(Referral, referral.id).version == 1
+
+
+class _FakeStripeClient:
+    def cancel_payment_intent(self, payment_intent_id):
+        return {'id': payment_intent_id, 'status': 'canceled'}
+
+
+def test_racing_payment_transitions_restore_stock_once(make_session):
+    session = make_session()
+    user = User(email='buyer@example.com', google_id='g-1', name='Buyer')
+    tee = Product(name='Tee', price=3000, stock_quantity=5)
+    session.add_all([user, tee])
+    session.flush()
+    order = Order(user_id=user.id, total_amount=6000, status=OrderStatus.PROCESSING)
+    session.add(order)
+    session.flush()
+    session.add(OrderItem(order_id=order.id, product_id=tee.id, quantity=2, unit_price=3000, subtotal=6000))
+    payment = Payment(order_id=order.id, stripe_payment_intent_id='pi_1', amount=6000, currency='jpy')
+    session.add(payment)
+    session.commit()
+    order_id, payment_id, tee_id = order.id, payment.id, tee.id
+    
+    canceller = PaymentService(session, _FakeStripeClient())
+    webhook_worker = PaymentService(make_session(), _FakeStripeClient())
+    find_order = canceller.order_repo.find_by_id
+    calls = []
+    
+    def find_order_after_webhook(record_id):
+        calls.append(record_id)
+        if len(calls) == 1:
+            # The failure webhook settles the payment after the canceller read it
+            webhook_worker._handle_payment_failure({'payment_intent_id': 'pi_1'})
+        return find_order(record_id)
+    
+    canceller.order_repo.find_by_id = find_order_after_webhook
+    
+    result = canceller.cancel_payment(payment_id)
+    
+    # The canceller lost the race, re-read the payment and left it as settled
+    assert result['status'] == PaymentStatus.FAILED.value
+    assert len(calls) == 1
+    session.expire_all()
+    assert session.get(Payment, payment_id).version == 1
+    assert session.get(Order, order_id).status == OrderStatus.FAILED
+    assert session.get(Product, tee_id).stock_quantity == 7
@@ -0,0 +1,87 @@
+"""
+Tests for the abandoned-order reaper (in-memory SQLite, no MySQL required).
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, User, Product, Order, OrderItem, OrderStatus
+from services.order_service import OrderService
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine('sqlite:///:memory:')
+    # SQLite index names are database-wide, so only create the tables under test
+    Base.metadata.create_all(engine, tables=[
+        User.__table__, Product.__table__, Order.__table__, OrderItem.__table__
+    ])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _seed(session):
+    user = User(email='buyer@example.com', google_id='g-1', name='Buyer')
+    tee = Product(name='Tee', price=3000, stock_quantity=5)
+    cap = Product(name='Cap', price=2000, stock_quantity=1)
+    session.add_all([user, tee, cap])
+    session.flush()
+    
+    old = datetime.utcnow() - timedelta(hours=2)
+    orders = []
+    for status, created_at in [
+        (OrderStatus.PENDING, old),
+        (OrderStatus.PENDING, old),
+        (OrderStatus.PENDING, datetime.utcnow()),
+        (OrderStatus.PROCESSING, old),
+    ]:
+        order = Order(user_id=user.id, total_amount=5000, status=status, created_at=created_at)
+        session.add(order)
+        session.flush()
+        session.add_all([
+            OrderItem(order_id=order.id, product_id=tee.id, quantity=2, unit_price=3000, subtotal=6000),
+            OrderItem(order_id=order.id, product_id=cap.id, quantity=1, unit_price=2000, subtotal=2000),
+        ])
+        orders.append(order)
+    session.commit()
+    return tee, cap, orders
+
+
+def test_expires_old_pending_orders_and_restores_stock(db_session):
+    tee, cap, orders = _seed(db_session)
+    
+    result = OrderService(db_session).expire_abandoned_orders(ttl_minutes=30, batch_size=1)
+    
+    assert result['expired_count'] == 2
+    assert result['restored_units'] == 6
+    assert result['batches'] == 2
+    
+    db_session.expire_all()
+    statuses = [db_session.get(Order, order.id).status for order in orders]
+    assert statuses == [
+        OrderStatus.EXPIRED,
+        OrderStatus.EXPIRED,
+        OrderStatus.PENDING,
+        OrderStatus.PROCESSING,
+    ]
+    assert db_session.get(Product, tee.id).stock_quantity == 9
+    assert db_session.get(Product, cap.id).stock_quantity == 3
+
+
+def test_respects_max_batches(db_session):
+    _seed(db_session)
+    
+    result = OrderService(db_session).expire_abandoned_orders(
+        ttl_minutes=30, batch_size=1, max_batches=1
+    )
+    
+    assert result['expired_count'] == 1
+    assert result['batches'] == 1
@@ -0,0 +1,175 @@
+"""
+Tests for deduplicated, batched referral click ingestion.
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from middleware.rate_limit import get_client_ip
+from models import Base, User
+from services.referral_click_ingestor import ReferralClickIngestor
+from utils.bloom_filter import RotatingBloomFilter
+
+
+CLICKS_DDL = """
+CREATE TABLE referral_clicks (
+    id CHAR(36) PRIMARY KEY,
+    referral_code VARCHAR(20) NOT NULL,
+    referrer_id CHAR(36) NULL,
+    ip_address VARCHAR(45),
+    user_agent TEXT,
+    clicked_at TIMESTAMP,
+    converted BOOLEAN DEFAULT 0,
+    converted_user_id CHAR(36) NULL
+)
+"""
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine, tables=[User.__table__])
+    session = sessionmaker(bind=engine)()
+    session.add(User(email='affiliate@example.com', google_id='g-affiliate', name='Affiliate', referral_code='ABCD1234'))
+    session.commit()
+    session.close()
+    yield engine
+    engine.dispose()
+
+
+def _clicks(engine):
+    with engine.connect() as connection:
+        return connection.execute(text(
+            "SELECT referral_code, referrer_id, ip_address FROM referral_clicks ORDER BY ip_address"
+        )).all()
+
+
+def test_click_storm_is_deduplicated_and_written_in_one_batch(engine):
+    with engine.begin() as connection:
+        connection.execute(text(CLICKS_DDL))
+    referrer_id = sessionmaker(bind=engine)().query(User.id).scalar()
+    ingestor = ReferralClickIngestor(engine, flush_size=1000, flush_interval=3600)
+    
+    statements = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    
+    results = [
+        ingestor.record(code, f'10.0.0.{index % 3}', 'Mozilla/5.0')
+        for index in range(30)
+        for code in ('ABCD1234', 'UNKNOWN1')
+    ]
+    
+    accepted = [result for result in results if result is not None]
+    assert len(accepted) == 6
+    assert {result['referrer_id'] for result in accepted if result['referral_code'] == 'ABCD1234'} == {referrer_id}
+    assert {result['referrer_id'] for result in accepted if result['referral_code'] == 'UNKNOWN1'} == {None}
+    # One lookup per code, nothing written yet
+    assert len(statements) == 2 and all(statement.startswith('SELECT') for statement in statements)
+    
+    assert ingestor.flush() == 6
+    assert [statement for statement in statements if statement.startswith('INSERT')] == [statements[-1]]
+    assert len(_clicks(engine)) == 6
+    
+    # Another user agent from the same IP is a new visitor
+    assert ingestor.record('ABCD1234', '10.0.0.0', 'curl/8.0') is not None
+
+
+def test_failed_flush_keeps_clicks_for_the_next_one(engine):
+    ingestor = ReferralClickIngestor(engine, flush_size=1000, flush_interval=3600)
+    ingestor.record('ABCD1234', '10.0.0.1', 'Mozilla/5.0')
+    ingestor.record('ABCD1234', '10.0.0.2', 'Mozilla/5.0')
+    
+    # referral_clicks does not exist yet
+    assert ingestor.flush() == 0
+    
+    with engine.begin() as connection:
+        connection.execute(text(CLICKS_DDL))
+    assert ingestor.flush() == 2
+    assert [row.ip_address for row in _clicks(engine)] == ['10.0.0.1', '10.0.0.2']
+
+
+def test_clicks_over_the_buffer_limit_are_dropped_not_deduplicated(engine):
+    with engine.begin() as connection:
+        connection.execute(text(CLICKS_DDL))
+    ingestor = ReferralClickIngestor(engine, flush_size=1000, flush_interval=3600, max_pending=2)
+    
+    assert ingestor.record('ABCD1234', '10.0.0.1', 'Mozilla/5.0')['dropped'] is False
+    assert ingestor.record('ABCD1234', '10.0.0.2', 'Mozilla/5.0')['dropped'] is False
+    shed = ingestor.record('ABCD1234', '10.0.0.3', 'Mozilla/5.0')
+    
+    assert shed['dropped'] is True and shed['click_id'] is None
+    assert ingestor.dropped == 1
+    # A duplicate is still reported as None, not as dropped
+    assert ingestor.record('ABCD1234', '10.0.0.1', 'Mozilla/5.0') is None
+    
+    # The shed visitor was not remembered, so its retry is recorded once there is room
+    assert ingestor.flush() == 2
+    assert ingestor.record('ABCD1234', '10.0.0.3', 'Mozilla/5.0')['click_id'] is not None
+
+
+
+def test_concurrent_clicks_shed_by_a_full_buffer_are_not_remembered(engine):
+    with engine.begin() as connection:
+        connection.execute(text(CLICKS_DDL))
+    ingestor = ReferralClickIngestor(engine, flush_size=1000, flush_interval=3600, max_pending=5)
+    ips = [f'10.0.1.{index}' for index in range(40)]
+    results = {}
+    start = threading.Barrier(len(ips))
+    
+    def click(ip):
+        start.wait()
+        results[ip] = ingestor.record('ABCD1234', ip, 'Mozilla/5.0')
+    
+    threads = [threading.Thread(target=click, args=(ip,)) for ip in ips]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    shed = [ip for ip in ips if results[ip]['dropped']]
+    assert len(shed) == len(ips) - 5 == ingestor.dropped
+    assert ingestor.flush() == 5
+    # Every shed visitor is recorded on retry instead of being taken for a duplicate
+    for ip in shed[:5]:
+        assert ingestor.record('ABCD1234', ip, 'Mozilla/5.0')['click_id'] is not None
+
+
+def test_client_ip_is_read_behind_the_trusted_proxies():
+    app = Flask(__name__)
+    
+    def client_ip(trusted_proxies):
+        app.config['TRUSTED_PROXY_COUNT'] = trusted_proxies
+        with app.test_request_context(
+            headers={'X-Forwarded-For': '203.0.113.9, 198.51.100.7'},
+            environ_base={'REMOTE_ADDR': '127.0.0.1'}
+        ):
+            return get_client_ip()
+    
+    # nginx appended the address it saw; the client-supplied entry before it is ignored
+    assert client_ip(1) == '198.51.100.7'
+    assert client_ip(2) == '203.0.113.9'
+    assert client_ip(5) == '203.0.113.9'
+    assert client_ip(0) == '127.0.0.1'
+
+def test_rotating_filter_forgets_keys_after_two_windows():
+    now = [0.0]
+    seen = RotatingBloomFilter(capacity=100, window_seconds=10, clock=lambda: now[0])
+    
+    assert seen.add('visitor')
+    now[0] = 15
+    # Rotated once: still remembered through the previous generation
+    assert not seen.add('visitor')
+    now[0] = 40
+    assert seen.add('visitor')
+    
+    # A generation that fills up rotates early instead of degrading
+    assert all(seen.add(f'key-{index}') for index in range(250))
+    assert not seen.add('key-249')
@@ -0,0 +1,83 @@
+"""
+Tests for the Feistel-permuted referral code allocator.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+import services.referral_service as referral_service_module
+from models import Base, User
+from services.referral_code_allocator import ALPHABET, CODE_LENGTH, ReferralCodeAllocator
+from services.referral_service import ReferralService
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine, tables=[User.__table__])
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE id_sequences (name VARCHAR(50) PRIMARY KEY, next_value BIGINT NOT NULL DEFAULT 0)"
+        ))
+        connection.execute(text("INSERT INTO id_sequences (name, next_value) VALUES ('referral_code', 0)"))
+    yield engine
+    engine.dispose()
+
+
+def _add_user(session, index, referral_code=None):
+    user = User(email=f'u{index}@example.com', google_id=f'g-{index}', name='User', referral_code=referral_code)
+    session.add(user)
+    session.commit()
+    return user.id
+
+
+def test_encoding_is_a_keyed_bijection():
+    allocator = ReferralCodeAllocator('key-a')
+    codes = [allocator.encode(value) for value in range(20000)]
+    
+    assert len(set(codes)) == len(codes)
+    assert all(len(code) == CODE_LENGTH and set(code) <= set(ALPHABET) for code in codes)
+    assert ReferralCodeAllocator('key-b').encode(0) != codes[0]
+
+
+def test_blocks_are_reserved_once_per_block(engine):
+    allocator = ReferralCodeAllocator('key', block_size=5)
+    codes = [allocator.allocate(engine) for _ in range(12)]
+    
+    assert codes == [allocator.encode(value) for value in range(12)]
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT next_value FROM id_sequences")).scalar() == 15
+    
+    # A second process continues after the blocks already handed out
+    assert ReferralCodeAllocator('key', block_size=5).allocate(engine) == allocator.encode(15)
+
+
+def test_service_assigns_codes_without_probe_queries(engine, monkeypatch):
+    allocator = ReferralCodeAllocator('key', block_size=10)
+    monkeypatch.setattr(referral_service_module, 'get_referral_code_allocator', lambda: allocator)
+    session = sessionmaker(bind=engine)()
+    # A legacy random code that happens to equal the first allocated code
+    _add_user(session, 0, referral_code=allocator.encode(0))
+    user_ids = [_add_user(session, index) for index in range(1, 4)]
+    
+    statements = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    service = ReferralService(session)
+    codes = [service.generate_referral_code(user_id) for user_id in user_ids]
+    
+    assert codes == [allocator.encode(value) for value in range(1, 4)]
+    assert not [s for s in statements if s.startswith('SELECT') and 'referral_code =' in s]
+    
+    # Existing codes are returned as is
+    assert service.generate_referral_code(user_ids[0]) == codes[0]
+    
+    session.expire_all()
+    stored = {user.id: user.referral_code for user in session.query(User).filter(User.id.in_(user_ids))}
+    assert stored == dict(zip(user_ids, codes))
+    session.close()
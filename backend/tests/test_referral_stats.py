@@ -0,0 +1,66 @@
+"""
+Tests for SQL-aggregated referral statistics.
+"""
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, User
+from models.referral import Referral, ReferralStatus
+from services.referral_service import ReferralService
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine, tables=[User.__table__, Referral.__table__])
+    yield engine
+    engine.dispose()
+
+
+def test_stats_are_aggregated_in_one_grouped_query(engine):
+    session = sessionmaker(bind=engine)()
+    referrer = User(email='affiliate@example.com', google_id='g-affiliate', name='Affiliate', coins=250)
+    other = User(email='other@example.com', google_id='g-other', name='Other')
+    session.add_all([referrer, other])
+    session.flush()
+    
+    statuses = [ReferralStatus.COMPLETED] * 3 + [ReferralStatus.PENDING] * 2 + [ReferralStatus.CANCELLED]
+    for index, status in enumerate(statuses):
+        referred = User(email=f'r{index}@example.com', google_id=f'g-r{index}', name='Referred')
+        session.add(referred)
+        session.flush()
+        session.add(Referral(
+            id=str(uuid.uuid4()),
+            referrer_id=referrer.id,
+            referred_id=referred.id,
+            status=status,
+            coins_awarded=100 if status == ReferralStatus.COMPLETED else 0
+        ))
+    session.add(Referral(id=str(uuid.uuid4()), referrer_id=other.id, referred_id=referrer.id,
+                         status=ReferralStatus.COMPLETED, coins_awarded=100))
+    session.commit()
+    session.expire_all()
+    
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    stats = ReferralService(session).get_referral_stats(referrer.id)
+    
+    assert stats == {
+        'total_referrals': 6,
+        'completed_referrals': 3,
+        'pending_referrals': 2,
+        'total_coins_earned': 300,
+        'current_coins': 250,
+    }
+    referral_statements = [statement for statement in statements if 'referrals' in statement]
+    assert len(referral_statements) == 1 and 'GROUP BY' in referral_statements[0]
+    
+    assert ReferralService(session).get_referral_stats(str(uuid.uuid4()))['total_referrals'] == 0
+    session.close()
@@ -0,0 +1,282 @@
+"""
+Tests for batch transfer recipients: VIP levels by the generated importance level rank
+and top referrers from the leaderboard.
+"""
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import services.batch_transfer_service as batch_transfer_module
+import services.leaderboard_service as leaderboard_service_module
+from models import Base, User, Wallet
+from models.referral import Referral
+from services.batch_transfer_service import BatchTransferService
+from services.leaderboard_service import LeaderboardService, REFERRALS_BOARD
+
+
+class _Cursor:
+    """DB-API cursor over sqlite3 that accepts pymysql-style %s parameters."""
+    
+    def __init__(self, connection):
+        self._cursor = connection.cursor()
+    
+    def execute(self, query, params=()):
+        self._cursor.execute(query.replace('%s', '?'), params)
+    
+    def fetchmany(self, size):
+        columns = [column[0] for column in self._cursor.description]
+        return [dict(zip(columns, row)) for row in self._cursor.fetchmany(size)]
+    
+    def fetchall(self):
+        columns = [column[0] for column in self._cursor.description]
+        return [dict(zip(columns, row)) for row in self._cursor.fetchall()]
+    
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+    
+    def close(self):
+        self._cursor.close()
+
+
+class _Connection:
+    def __init__(self, path):
+        self._connection = sqlite3.connect(path)
+    
+    def cursor(self, cursor_class=None):
+        # pymysql signature: the only argument is the cursor class
+        return _Cursor(self._connection)
+    
+    def commit(self):
+        self._connection.commit()
+    
+    def rollback(self):
+        self._connection.rollback()
+    
+    def close(self):
+        self._connection.close()
+
+
+class _FakeXRPLClient:
+    def __init__(self, fail_on_batch=None):
+        self.batches = []
+        self.fail_on_batch = fail_on_batch
+    
+    def batch_send_xrp(self, sender_wallet_seed, recipients, memo):
+        if len(self.batches) + 1 == self.fail_on_batch:
+            self.fail_on_batch = None
+            raise Exception("Ticket creation failed")
+        self.batches.append(recipients)
+        return {
+            'success': True,
+            'summary': {
+                'total': len(recipients),
+                'successful': len(recipients),
+                'failed': 0,
+                'total_amount_xrp': sum(r['amount_xrp'] for r in recipients),
+                'ticket_sequence_range': f"{len(self.batches)}"
+            },
+            'transactions': [
+                {'recipient': r['address'], 'amount_xrp': r['amount_xrp'], 'transaction_hash': f"HASH-{r['user_id']}"}
+                for r in recipients
+            ],
+            'errors': []
+        }
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    path = str(tmp_path / 'test.db')
+    engine = create_engine(f"sqlite:///{path}")
+    monkeypatch.setattr(leaderboard_service_module, '_boards', {})
+    Base.metadata.create_all(engine, tables=[User.__table__, Wallet.__table__, Referral.__table__])
+    with engine.begin() as connection:
+        connection.execute(text("""
+            CREATE TABLE leaderboard_entries (
+                board VARCHAR(50) NOT NULL,
+                user_id CHAR(36) NOT NULL,
+                score BIGINT NOT NULL DEFAULT 0,
+                updated_at DATETIME NOT NULL,
+                PRIMARY KEY (board, user_id)
+            )
+        """))
+        connection.execute(text("""
+            CREATE TABLE leaderboard_generations (
+                board VARCHAR(50) NOT NULL PRIMARY KEY,
+                generation BIGINT NOT NULL DEFAULT 0,
+                rebuilt_at DATETIME NOT NULL
+            )
+        """))
+        connection.execute(text("""
+            CREATE TABLE batch_transfers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id VARCHAR(36) NOT NULL,
+                wallet_address VARCHAR(255) NOT NULL,
+                amount_xrp DECIMAL(20, 6) NOT NULL,
+                transaction_hash VARCHAR(255),
+                ticket_sequence INTEGER,
+                reason VARCHAR(500),
+                status VARCHAR(20),
+                created_at DATETIME
+            )
+        """))
+        connection.execute(text("""
+            CREATE TABLE batch_transfer_runs (
+                id CHAR(36) PRIMARY KEY,
+                min_importance_rank INTEGER NOT NULL,
+                amount_xrp DECIMAL(20, 6) NOT NULL,
+                reason VARCHAR(500),
+                last_rank INTEGER NULL,
+                last_score INTEGER NULL,
+                last_user_id CHAR(36) NULL,
+                sent_count INTEGER NOT NULL DEFAULT 0,
+                status VARCHAR(20) NOT NULL,
+                created_at DATETIME,
+                updated_at DATETIME
+            )
+        """))
+    monkeypatch.setattr(batch_transfer_module, 'get_db_connection', lambda: _Connection(path))
+    yield engine, sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _add_user(session, index, level, score, wallet=True):
+    user = User(email=f'u{index}@example.com', google_id=f'g-{index}', name=f'User {index}',
+                importance_level=level, importance_score=score)
+    session.add(user)
+    session.commit()
+    if wallet:
+        session.add(Wallet(user_id=user.id, address=f'rWallet{index}', private_key_encrypted='encrypted'))
+        session.commit()
+    return user.id
+
+
+def test_level_rank_is_derived_from_the_level_regardless_of_case(database):
+    engine, Session = database
+    session = Session()
+    ids = [
+        _add_user(session, 0, 'bronze', 10),
+        _add_user(session, 1, 'Gold', 2000),
+        _add_user(session, 2, 'DIAMOND', 6000),
+        _add_user(session, 3, 'unknown', 0),
+    ]
+    
+    ranks = [session.get(User, user_id).importance_level_rank for user_id in ids]
+    
+    assert ranks == [1, 3, 5, 0]
+    session.close()
+
+
+def test_vip_transfer_sends_each_page_in_rank_and_score_order(database, monkeypatch):
+    engine, Session = database
+    session = Session()
+    _add_user(session, 0, 'bronze', 10)
+    silver = _add_user(session, 1, 'silver', 800)
+    gold = _add_user(session, 2, 'Gold', 2000)
+    diamond = _add_user(session, 3, 'diamond', 6000)
+    platinum = _add_user(session, 4, 'platinum', 3500, wallet=False)
+    gold_high = _add_user(session, 5, 'gold', 2500)
+    session.close()
+    monkeypatch.setattr(BatchTransferService, 'VIP_FETCH_SIZE', 2)
+    xrpl_client = _FakeXRPLClient()
+    service = BatchTransferService(xrpl_client)
+    
+    result = service.send_batch_to_vip_users('sEED', 'SILVER', 5.0)
+    
+    assert [[(r['user_id'], r['address']) for r in batch] for batch in xrpl_client.batches] == [
+        [(diamond, 'rWallet3'), (gold_high, 'rWallet5')],
+        [(gold, 'rWallet2'), (silver, 'rWallet1')],
+    ]
+    assert platinum not in {r['user_id'] for batch in xrpl_client.batches for r in batch}
+    assert result['summary']['total'] == 4
+    assert result['summary']['total_amount_xrp'] == 20.0
+    with engine.connect() as connection:
+        recorded = connection.execute(text("SELECT user_id, wallet_address FROM batch_transfers")).all()
+        run = connection.execute(text("SELECT status, sent_count FROM batch_transfer_runs")).one()
+    assert sorted(recorded) == sorted([
+        (diamond, 'rWallet3'), (gold_high, 'rWallet5'), (gold, 'rWallet2'), (silver, 'rWallet1')
+    ])
+    assert tuple(run) == ('completed', 4)
+
+
+def test_failed_vip_run_resumes_after_the_users_already_paid(database, monkeypatch):
+    engine, Session = database
+    session = Session()
+    # Equal scores within a level are ordered by id, and a NULL score sorts last
+    ids = [_add_user(session, index, 'gold', 2000) for index in range(3)]
+    no_score = _add_user(session, 3, 'gold', None)
+    diamond = _add_user(session, 4, 'diamond', 6000)
+    session.close()
+    monkeypatch.setattr(BatchTransferService, 'VIP_FETCH_SIZE', 2)
+    xrpl_client = _FakeXRPLClient(fail_on_batch=2)
+    service = BatchTransferService(xrpl_client)
+    
+    with pytest.raises(Exception) as failure:
+        service.send_batch_to_vip_users('sEED', 'gold', 5.0)
+    with engine.connect() as connection:
+        run_id, status = connection.execute(text("SELECT id, status FROM batch_transfer_runs")).one()
+    assert status == 'failed' and run_id in str(failure.value)
+    
+    result = service.send_batch_to_vip_users('sEED', 'gold', 5.0, run_id=run_id)
+    
+    expected = [diamond] + sorted(ids, reverse=True) + [no_score]
+    paid = [r['user_id'] for batch in xrpl_client.batches for r in batch]
+    assert paid == expected
+    assert result['run_id'] == run_id and result['summary']['total'] == 3
+    with engine.connect() as connection:
+        recorded = connection.execute(text("SELECT user_id FROM batch_transfers")).scalars().all()
+    assert sorted(recorded) == sorted(expected)
+
+
+def test_top_referrer_transfer_skips_referrers_without_a_wallet(database):
+    engine, Session = database
+    session = Session()
+    first = _add_user(session, 0, 'bronze', 0)
+    no_wallet = _add_user(session, 1, 'bronze', 0, wallet=False)
+    second = _add_user(session, 2, 'bronze', 0)
+    third = _add_user(session, 3, 'bronze', 0)
+    leaderboard = LeaderboardService(session)
+    for user_id, referrals in [(first, 30), (no_wallet, 20), (second, 10), (third, 5)]:
+        leaderboard.set_score(REFERRALS_BOARD, user_id, referrals)
+    xrpl_client = _FakeXRPLClient()
+    service = BatchTransferService(xrpl_client)
+    
+    result = service.send_batch_to_top_referrers('sEED', 2, 50.0, db_session=session)
+    
+    assert sorted((r['user_id'], r['address']) for r in xrpl_client.batches[0]) == sorted([
+        (first, 'rWallet0'), (second, 'rWallet2')
+    ])
+    assert result['summary']['total'] == 2
+    with engine.connect() as connection:
+        recorded = connection.execute(text("SELECT user_id FROM batch_transfers")).scalars().all()
+    assert sorted(recorded) == sorted([first, second])
+    session.close()
+
+
+def test_vip_query_uses_the_level_rank_index(database):
+    engine, Session = database
+    with engine.connect() as connection:
+        plan = ' '.join(
+            str(row[-1]) for row in connection.execute(text("""
+                EXPLAIN QUERY PLAN
+                SELECT u.id, w.address AS wallet_address, u.email
+                FROM users u
+                JOIN wallets w ON w.user_id = u.id
+                WHERE u.importance_level_rank >= 3
+                AND (u.importance_level_rank < 5
+                     OR (u.importance_level_rank = 5
+                         AND (u.importance_score < 6000 OR u.importance_score IS NULL
+                              OR (u.importance_score = 6000 AND u.id < 'x'))))
+                ORDER BY u.importance_level_rank DESC, u.importance_score DESC, u.id DESC
+                LIMIT 1000
+            """))
+        )
+    
+    assert 'idx_importance_level_rank' in plan
+    assert 'TEMP B-TREE' not in plan
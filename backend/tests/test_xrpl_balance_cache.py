@@ -0,0 +1,78 @@
+"""
+Tests for the ledger-aware XRP balance cache.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xrpl.models.requests import AccountInfo
+from xrpl.models.response import Response, ResponseStatus
+
+from clients.xrpl_balance_cache import LedgerBalanceCache
+from clients.xrpl_client import XRPLClient
+
+
+ADDRESS = 'rUserXXXXXXXXXXXXXXXXXXXXXXXXXXXXX'
+
+
+class StubAccountInfoNode:
+    def __init__(self):
+        self.balance = 50_000_000
+        self.ledger_index = 100
+        self.requests = 0
+    
+    def request(self, request):
+        assert isinstance(request, AccountInfo)
+        assert request.ledger_index == 'validated'
+        self.requests += 1
+        return Response(status=ResponseStatus.SUCCESS, result={
+            'account_data': {'Account': request.account, 'Balance': str(self.balance)},
+            'ledger_index': self.ledger_index,
+            'validated': True,
+        })
+
+
+def test_entries_expire_on_newer_ledger_unless_caller_tolerates_staleness():
+    cache = LedgerBalanceCache()
+    cache.put(ADDRESS, 1000, 10, time.monotonic())
+    
+    assert cache.get(ADDRESS) == 1000
+    
+    cache.observe_ledger(11)
+    assert cache.get(ADDRESS) is None
+    assert cache.get(ADDRESS, max_age=60) == 1000
+    
+    cache.invalidate(ADDRESS)
+    assert cache.get(ADDRESS, max_age=60) is None
+
+
+def test_read_started_before_invalidation_is_not_cached():
+    cache = LedgerBalanceCache()
+    fetch_started = time.monotonic()
+    cache.invalidate(ADDRESS)
+    cache.put(ADDRESS, 1000, 10, fetch_started)
+    
+    assert cache.get(ADDRESS, max_age=60) is None
+
+
+def test_client_serves_balances_from_cache_until_own_submission():
+    client = XRPLClient(network='testnet')
+    client.client = StubAccountInfoNode()
+    client.balance_cache = LedgerBalanceCache()
+    
+    assert client.get_wallet_balance(ADDRESS) == 50_000_000
+    assert client.get_wallet_balance(ADDRESS, XRPLClient.BALANCE_MAX_AGE_DISPLAY) == 50_000_000
+    assert client.client.requests == 1
+    
+    # Our own payment from this account validated in ledger 101
+    client.client.balance = 40_000_000
+    client.client.ledger_index = 101
+    client._record_submission(
+        Response(status=ResponseStatus.SUCCESS, result={'ledger_index': 101}),
+        ADDRESS
+    )
+    
+    assert client.get_wallet_balance(ADDRESS, XRPLClient.BALANCE_MAX_AGE_DISPLAY) == 40_000_000
+    assert client.client.requests == 2
@@ -0,0 +1,59 @@
+"""
+Tests for the cached XRPL network fee oracle.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xrpl.models.requests import Fee
+from xrpl.models.response import Response, ResponseStatus
+
+from clients.xrpl_fee_oracle import FeeOracle
+
+
+class StubFeeNode:
+    def __init__(self, open_ledger_fee='10', open_ledger_level='256'):
+        self.open_ledger_fee = open_ledger_fee
+        self.open_ledger_level = open_ledger_level
+        self.ledger_current_index = 500
+        self.requests = 0
+    
+    def request(self, request):
+        assert isinstance(request, Fee)
+        self.requests += 1
+        return Response(status=ResponseStatus.SUCCESS, result={
+            'drops': {'base_fee': '10', 'open_ledger_fee': self.open_ledger_fee},
+            'levels': {'reference_level': '256', 'open_ledger_level': self.open_ledger_level},
+            'ledger_current_index': self.ledger_current_index,
+        })
+
+
+def test_reading_is_reused_within_ttl():
+    node = StubFeeNode()
+    oracle = FeeOracle(node, ttl=60)
+    
+    assert oracle.fee_drops() == 10
+    assert oracle.load_factor() == 1.0
+    assert oracle.last_ledger_sequence() == 520
+    assert node.requests == 1
+    
+    # Load rises: the cached reading is kept until invalidated or expired
+    node.open_ledger_fee = '25'
+    node.open_ledger_level = '640'
+    node.ledger_current_index = 501
+    assert oracle.fee_drops() == 10
+    
+    oracle.invalidate()
+    assert oracle.fee_drops() == 25
+    assert oracle.load_factor() == 2.5
+    assert oracle.last_ledger_sequence(offset=5) == 506
+    assert node.requests == 2
+
+
+def test_fee_is_capped_under_extreme_load():
+    node = StubFeeNode(open_ledger_fee='5000000', open_ledger_level='131072000')
+    oracle = FeeOracle(node, ttl=0, max_fee_drops=100_000)
+    
+    assert oracle.fee_drops() == 100_000
+    assert oracle.load_factor() == 512000.0
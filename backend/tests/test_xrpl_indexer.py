@@ -0,0 +1,141 @@
+"""
+Tests for the XRPL ledger history indexer (stub account_tx server, SQLite).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from xrpl.models.requests import AccountTx
+from xrpl.models.response import Response, ResponseStatus
+
+from models import Base, XRPLTransaction, XRPLIndexCheckpoint
+from repositories import XRPLTransactionRepository
+from services.xrpl_indexer_service import XRPLIndexerService
+from services.xrpl_payment_service import XRPLPaymentService
+
+
+ACCOUNT = 'rSponsorXXXXXXXXXXXXXXXXXXXXXXXXX'
+
+
+class StubLedger:
+    """Answers account_tx like rippled (API v2), paging with opaque markers."""
+    
+    def __init__(self):
+        self.entries = []
+        self.validated_ledger = 100
+        self.requests = []
+    
+    def add_payment(self, ledger_index, memo='order:o-1'):
+        tx_hash = f'{len(self.entries):064X}'
+        self.entries.append({
+            'hash': tx_hash,
+            'ledger_index': ledger_index,
+            'validated': True,
+            'tx_json': {
+                'TransactionType': 'Payment',
+                'Account': 'rPayerXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+                'Destination': ACCOUNT,
+                'DeliverMax': '1000000',
+                'Fee': '12',
+                'date': 800000000,
+                'Memos': [{'Memo': {'MemoData': memo.encode().hex().upper()}}],
+            },
+            'meta': {'TransactionResult': 'tesSUCCESS', 'delivered_amount': '1000000'},
+        })
+        self.validated_ledger = max(self.validated_ledger, ledger_index)
+        return tx_hash
+    
+    def request(self, request):
+        self.requests.append(request)
+        assert isinstance(request, AccountTx), 'only account_tx may hit the ledger'
+        
+        low = 1 if request.ledger_index_min == -1 else request.ledger_index_min
+        high = self.validated_ledger if request.ledger_index_max == -1 else request.ledger_index_max
+        if low > self.validated_ledger:
+            return Response(status=ResponseStatus.ERROR, result={'error': 'lgrIdxsInvalid'})
+        
+        in_range = [e for e in self.entries if low <= e['ledger_index'] <= high]
+        start = request.marker['seq'] if request.marker else 0
+        page = in_range[start:start + request.limit]
+        result = {
+            'account': request.account,
+            'ledger_index_min': low,
+            'ledger_index_max': high,
+            'transactions': page,
+        }
+        if start + request.limit < len(in_range):
+            result['marker'] = {'ledger': page[-1]['ledger_index'], 'seq': start + request.limit}
+        return Response(status=ResponseStatus.SUCCESS, result=result)
+
+
+class StubXRPLClient:
+    network = 'testnet'
+    
+    def __init__(self, ledger):
+        self.client = ledger
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine('sqlite:///:memory:')
+    # SQLite index names are database-wide, so only create the tables under test
+    Base.metadata.create_all(engine, tables=[XRPLTransaction.__table__, XRPLIndexCheckpoint.__table__])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_pages_with_markers_and_resumes_from_checkpoint(db_session):
+    ledger = StubLedger()
+    for ledger_index in (10, 11, 12, 13, 14):
+        ledger.add_payment(ledger_index)
+    service = XRPLIndexerService(db_session, StubXRPLClient(ledger))
+    
+    first = service.index_account(ACCOUNT, page_size=2, max_pages=2)
+    assert first == {**first, 'pages': 2, 'inserted': 4, 'complete': False, 'last_ledger_index': 0}
+    
+    checkpoint = db_session.query(XRPLIndexCheckpoint).one()
+    assert checkpoint.marker is not None
+    assert checkpoint.scan_ledger_max == 100
+    
+    # Resumes mid-scan with the stored marker and the original ledger range
+    second = service.index_account(ACCOUNT, page_size=2)
+    assert second['inserted'] == 1
+    assert second['complete'] is True
+    assert second['last_ledger_index'] == 100
+    assert ledger.requests[2].marker == {'ledger': 13, 'seq': 4}
+    assert ledger.requests[2].ledger_index_max == 100
+    
+    # Later runs only ask for ledgers after the checkpoint
+    new_hash = ledger.add_payment(105, memo='order:o-2')
+    third = service.index_account(ACCOUNT, page_size=2)
+    assert third['inserted'] == 1
+    assert ledger.requests[-1].ledger_index_min == 101
+    
+    assert db_session.query(XRPLTransaction).count() == 6
+    assert [tx.tx_hash for tx in XRPLTransactionRepository(db_session).find_by_memo('order:o-2')] == [new_hash]
+    
+    # Nothing new: rippled rejects the empty range, which is not an error
+    assert service.index_account(ACCOUNT)['inserted'] == 0
+
+
+def test_verify_transaction_uses_local_index(db_session):
+    ledger = StubLedger()
+    tx_hash = ledger.add_payment(10)
+    client = StubXRPLClient(ledger)
+    XRPLIndexerService(db_session, client).index_account(ACCOUNT)
+    requests_before = len(ledger.requests)
+    
+    result = XRPLPaymentService(db_session, client).verify_transaction(tx_hash)
+    
+    assert len(ledger.requests) == requests_before
+    assert result['hash'] == tx_hash
+    assert result['ledger_index'] == 10
+    assert result['destination'] == ACCOUNT
+    assert result['amount'] == '1000000'
+    assert result['validated'] is True
@@ -0,0 +1,131 @@
+"""
+Tests for the XRPL payment listener against a local WebSocket stand-in.
+"""
+import os
+import sys
+import json
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from websockets.sync.server import serve
+
+from models import Base, User, Order, OrderStatus
+from services.xrpl_payment_listener import XRPLPaymentListener
+from services.xrpl_payment_service import XRPLPaymentService
+
+
+MERCHANT = 'rMerchantXXXXXXXXXXXXXXXXXXXXXXXX'
+
+
+def _payment_message(order_id, drops, destination=MERCHANT, validated=True, tx_hash='AB' * 32):
+    return {
+        'type': 'transaction',
+        'validated': validated,
+        'engine_result': 'tesSUCCESS',
+        'ledger_index': 1000,
+        'transaction': {
+            'TransactionType': 'Payment',
+            'Account': 'rPayerXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            'Destination': destination,
+            'Amount': str(drops),
+            'hash': tx_hash,
+            'Memos': [{'Memo': {'MemoData': f'order:{order_id}'.encode().hex().upper()}}],
+        },
+        'meta': {'TransactionResult': 'tesSUCCESS', 'delivered_amount': str(drops)},
+    }
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    # SQLite index names are database-wide, so only create the tables under test
+    Base.metadata.create_all(engine, tables=[User.__table__, Order.__table__])
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _seed_orders(session_factory, count):
+    session = session_factory()
+    user = User(email='buyer@example.com', google_id='g-1', name='Buyer')
+    session.add(user)
+    session.flush()
+    orders = [Order(user_id=user.id, total_amount=3000) for _ in range(count)]
+    session.add_all(orders)
+    session.commit()
+    ids = [order.id for order in orders]
+    session.close()
+    return ids
+
+
+def test_parse_payment_ignores_non_order_traffic():
+    accounts = [MERCHANT]
+    
+    assert XRPLPaymentListener.parse_payment(_payment_message('o-1', 10), accounts)['order_id'] == 'o-1'
+    assert XRPLPaymentListener.parse_payment(_payment_message('o-1', 10, validated=False), accounts) is None
+    assert XRPLPaymentListener.parse_payment(_payment_message('o-1', 10, destination='rOther'), accounts) is None
+    
+    issued = _payment_message('o-1', 10)
+    issued['meta']['delivered_amount'] = {'currency': 'USD', 'issuer': 'rIssuer', 'value': '10'}
+    assert XRPLPaymentListener.parse_payment(issued, accounts) is None
+
+
+def test_confirms_payments_pushed_over_websocket(session_factory):
+    paid_id, underpaid_id, untouched_id = _seed_orders(session_factory, 3)
+    expected = XRPLPaymentService.expected_drops(3000)
+    subscriptions = []
+    
+    def handler(websocket):
+        request = json.loads(websocket.recv())
+        subscriptions.append(request)
+        websocket.send(json.dumps({'id': request['id'], 'type': 'response', 'status': 'success', 'result': {}}))
+        websocket.send(json.dumps({'type': 'ledgerClosed', 'ledger_index': 1000}))
+        # A malformed frame is skipped without dropping the connection
+        websocket.send('{"type": "transaction"')
+        websocket.send(json.dumps(_payment_message(paid_id, expected, tx_hash='AA' * 32)))
+        websocket.send(json.dumps(_payment_message(underpaid_id, expected - 1, tx_hash='BB' * 32)))
+        # Replayed message must not count twice
+        websocket.send(json.dumps(_payment_message(paid_id, expected, tx_hash='AA' * 32)))
+        try:
+            websocket.recv()
+        except Exception:
+            pass
+    
+    with serve(handler, 'localhost', 0) as server:
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        port = server.socket.getsockname()[1]
+        
+        listener = XRPLPaymentListener(
+            session_factory, f'ws://localhost:{port}', [MERCHANT], flush_interval=0.05
+        )
+        listener_thread = threading.Thread(target=listener.run, daemon=True)
+        listener_thread.start()
+        
+        deadline = time.monotonic() + 5
+        while listener.stats['confirmed'] < 1 or listener.stats['rejected'] < 1:
+            assert time.monotonic() < deadline, listener.stats
+            time.sleep(0.02)
+        
+        listener.stop()
+        listener_thread.join(timeout=5)
+        server.shutdown()
+    
+    assert subscriptions[0]['command'] == 'subscribe'
+    assert subscriptions[0]['accounts'] == [MERCHANT]
+    
+    session = session_factory()
+    orders = {order.id: order for order in session.query(Order).all()}
+    assert orders[paid_id].status == OrderStatus.COMPLETED
+    assert orders[paid_id].payment_status == 'completed'
+    assert orders[paid_id].payment_method == 'xrpl'
+    assert orders[paid_id].payment_tx_hash == 'AA' * 32
+    assert orders[underpaid_id].status == OrderStatus.PENDING
+    assert orders[underpaid_id].payment_status is None
+    assert orders[untouched_id].status == OrderStatus.PENDING
+    assert listener.stats['confirmed'] == 1
+    session.close()
@@ -0,0 +1,146 @@
+"""
+Tests for the hedged multi-endpoint XRPL RPC transport (local stub rippled servers).
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from xrpl.models.requests import ServerInfo, SubmitOnly
+
+from clients.xrpl_rpc_transport import HedgedJsonRpcClient
+
+
+class StubRippled:
+    """Local JSON-RPC server answering every method with a fixed result."""
+    
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.methods = []
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                stub.methods.append(body['method'])
+                time.sleep(stub.delay)
+                if stub.fail:
+                    payload, status = b'upstream unavailable', 503
+                else:
+                    payload = json.dumps({'result': {'status': 'success', 'served_by': stub.name}}).encode()
+                    status = 200
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def servers():
+    started = []
+    
+    def start(name, **kwargs):
+        server = StubRippled(name, **kwargs)
+        started.append(server)
+        return server
+    
+    yield start
+    for server in started:
+        server.close()
+
+
+def test_slow_reads_are_hedged_to_the_next_endpoint(servers):
+    slow = servers('slow', delay=1.0)
+    fast = servers('fast')
+    client = HedgedJsonRpcClient([slow.url, fast.url], initial_hedge_delay=0.05)
+    
+    started = time.monotonic()
+    response = client.request(ServerInfo())
+    
+    assert response.result['served_by'] == 'fast'
+    assert time.monotonic() - started < 0.8
+    assert slow.methods == ['server_info'] and fast.methods == ['server_info']
+    
+    # The cancelled slow attempt counts as a slow sample, so the fast endpoint leads now
+    assert client.request(ServerInfo()).result['served_by'] == 'fast'
+    assert len(slow.methods) == 1
+
+
+def test_submissions_are_not_hedged(servers):
+    slow = servers('slow', delay=0.3)
+    other = servers('other')
+    client = HedgedJsonRpcClient([slow.url, other.url], initial_hedge_delay=0.05)
+    
+    response = client.request(SubmitOnly(tx_blob='00'))
+    
+    assert response.result['served_by'] == 'slow'
+    assert other.methods == []
+
+
+def test_failing_endpoint_is_circuit_broken_until_cooldown(servers):
+    broken = servers('broken', fail=True)
+    healthy = servers('healthy')
+    client = HedgedJsonRpcClient([broken.url, healthy.url], failure_threshold=2, cooldown=0.3)
+    
+    for _ in range(4):
+        assert client.request(ServerInfo()).result['served_by'] == 'healthy'
+    
+    # Two failures opened the circuit; later requests skipped the endpoint
+    assert len(broken.methods) == 2
+    assert client.endpoint_stats()[0]['circuit_open'] is True
+    
+    # After the cooldown the recovered endpoint gets a trial request and closes again
+    time.sleep(0.35)
+    broken.fail = False
+    healthy.delay = 0.2
+    assert client.request(ServerInfo()).result['served_by'] == 'broken'
+    assert client.endpoint_stats()[0]['consecutive_failures'] == 0
+
+
+def test_only_one_trial_request_reaches_a_half_open_endpoint(servers):
+    broken = servers('broken', fail=True)
+    healthy = servers('healthy')
+    client = HedgedJsonRpcClient(
+        [broken.url, healthy.url], failure_threshold=2, cooldown=0.2, initial_hedge_delay=5.0
+    )
+    for _ in range(2):
+        client.request(ServerInfo())
+    
+    time.sleep(0.25)
+    broken.fail = False
+    broken.delay = 0.3
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(client.request(ServerInfo()).result['served_by']))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    
+    # The other concurrent requests skipped the endpoint while its trial was in flight
+    assert len(broken.methods) == 3
+    assert sorted(results) == ['broken'] + ['healthy'] * 4
+    assert client.endpoint_stats()[0]['consecutive_failures'] == 0
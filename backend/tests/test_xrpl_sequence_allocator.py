@@ -0,0 +1,155 @@
+"""
+Tests for the per-account XRPL sequence allocator.
+"""
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xrpl.models.requests import AccountInfo, Fee
+from xrpl.models.response import Response, ResponseStatus
+from xrpl.models.transactions import NFTokenMint
+from xrpl.transaction import XRPLReliableSubmissionException
+from xrpl.wallet import Wallet
+
+import clients.xrpl_client as xrpl_client_module
+from clients.xrpl_client import XRPLClient
+from clients.xrpl_fee_oracle import FeeOracle
+from clients.xrpl_sequence_allocator import SequenceAllocator
+
+
+ADDRESS = 'rSponsorXXXXXXXXXXXXXXXXXXXXXXXXXX'
+
+
+class StubAccountInfoNode:
+    def __init__(self, sequence=100, highest_queued=None):
+        self.sequence = sequence
+        self.highest_queued = highest_queued
+        self.requests = 0
+        self.fee_requests = 0
+    
+    def request(self, request):
+        if isinstance(request, Fee):
+            self.fee_requests += 1
+            return Response(status=ResponseStatus.SUCCESS, result={
+                'drops': {'base_fee': '10', 'open_ledger_fee': '12'},
+                'levels': {'reference_level': '256', 'open_ledger_level': '307'},
+                'ledger_current_index': 1000,
+            })
+        assert isinstance(request, AccountInfo)
+        assert request.ledger_index == 'current'
+        self.requests += 1
+        result = {'account_data': {'Account': request.account, 'Sequence': self.sequence}}
+        if self.highest_queued is not None:
+            result['queue_data'] = {'txn_count': 1, 'highest_sequence': self.highest_queued}
+        return Response(status=ResponseStatus.SUCCESS, result=result)
+
+
+def test_concurrent_allocations_are_distinct_and_contiguous():
+    node = StubAccountInfoNode(sequence=100)
+    allocator = SequenceAllocator(node, ADDRESS)
+    allocated = []
+    lock = threading.Lock()
+    
+    def allocate():
+        for _ in range(50):
+            sequence = allocator.next_sequence()
+            with lock:
+                allocated.append(sequence)
+    
+    threads = [threading.Thread(target=allocate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert sorted(allocated) == list(range(100, 500))
+    assert node.requests == 1
+
+
+def test_reserve_blocks_and_resync_skips_queued_transactions():
+    node = StubAccountInfoNode(sequence=10)
+    allocator = SequenceAllocator(node, ADDRESS)
+    
+    assert allocator.reserve(4) == 10
+    assert allocator.next_sequence() == 14
+    
+    # Sequence 15 failed without being applied; 12 and 13 are still queued
+    node.sequence = 12
+    node.highest_queued = 14
+    allocator.resync()
+    
+    assert allocator.next_sequence() == 15
+    assert node.requests == 2
+
+
+def test_submission_retries_on_sequence_conflict(monkeypatch):
+    wallet = Wallet.create()
+    client = XRPLClient(network='testnet')
+    client.client = StubAccountInfoNode(sequence=7)
+    client.fee_oracle = FeeOracle(client.client)
+    
+    submitted = []
+    
+    def fake_submit_and_wait(transaction, xrpl_client, signing_wallet=None):
+        submitted.append(transaction.sequence)
+        if len(submitted) == 1:
+            # Another process used sequence 7 meanwhile
+            client.client.sequence = 8
+            raise XRPLReliableSubmissionException(
+                "The latest validated ledger sequence 120 is greater than LastLedgerSequence 119 "
+                "in the transaction. Prelim result: tefPAST_SEQ"
+            )
+        return Response(status=ResponseStatus.SUCCESS, result={'hash': 'ABC', 'ledger_index': 120})
+    
+    monkeypatch.setattr(xrpl_client_module, 'submit_and_wait', fake_submit_and_wait)
+    
+    response, sequence = client._submit_with_sequence(
+        lambda sequence: NFTokenMint(account=wallet.classic_address, nftoken_taxon=0, sequence=sequence),
+        wallet
+    )
+    
+    assert submitted == [7, 8]
+    assert sequence == 8
+    assert response.result['hash'] == 'ABC'
+
+
+def test_consumed_sequence_keeps_counter_and_failed_ticket_block_resyncs(monkeypatch):
+    wallet = Wallet.create()
+    client = XRPLClient(network='testnet')
+    client.client = StubAccountInfoNode(sequence=30)
+    client.fee_oracle = FeeOracle(client.client)
+    
+    def fail_with(result):
+        def fake_submit_and_wait(transaction, xrpl_client, signing_wallet=None):
+            raise XRPLReliableSubmissionException(f"Transaction failed: {result}")
+        return fake_submit_and_wait
+    
+    def build_mint(sequence):
+        return NFTokenMint(account=wallet.classic_address, nftoken_taxon=0, sequence=sequence)
+    
+    # A tec mint consumed sequence 30: the counter stays local
+    monkeypatch.setattr(xrpl_client_module, 'submit_and_wait', fail_with('tecNO_ENTRY'))
+    with pytest.raises(XRPLReliableSubmissionException):
+        client._submit_with_sequence(build_mint, wallet)
+    client.client.sequence = 31
+    
+    # A tec TicketCreate consumed 31 only, not its ticket sequences 32..36
+    monkeypatch.setattr(xrpl_client_module, 'submit_and_wait', fail_with('tecINSUFFICIENT_RESERVE'))
+    with pytest.raises(XRPLReliableSubmissionException):
+        client.create_tickets(wallet, 5)
+    client.client.sequence = 32
+    assert client.client.requests == 1
+    
+    monkeypatch.setattr(
+        xrpl_client_module,
+        'submit_and_wait',
+        lambda transaction, xrpl_client, signing_wallet=None: Response(
+            status=ResponseStatus.SUCCESS, result={'hash': 'DEF', 'ledger_index': 5}
+        )
+    )
+    assert client.create_tickets(wallet, 2) == [33, 34]
+    assert client.client.requests == 2
@@ -0,0 +1,57 @@
+"""
+Tests for process-pool XRPL transaction signing.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from xrpl.models.transactions import Payment, Transaction
+from xrpl.transaction import sign
+from xrpl.wallet import Wallet
+
+from clients.xrpl_signing_pool import XRPLSigningPool
+
+
+def _payments(wallet, count):
+    return [
+        Payment(
+            account=wallet.classic_address,
+            destination='rPT1Sjq2YGrBMTttX4GZHjKu9dyfzbpAYe',
+            amount=str(1_000_000 + index),
+            sequence=0,
+            ticket_sequence=100 + index,
+            fee='12',
+            last_ledger_sequence=5000
+        ).to_dict()
+        for index in range(count)
+    ]
+
+
+def test_pool_signs_in_worker_processes_like_inline_signing():
+    wallet = Wallet.create()
+    transactions = _payments(wallet, 7)
+    pool = XRPLSigningPool(max_workers=2, chunk_size=3, inline_threshold=1)
+    try:
+        handle = pool.register_key(wallet.seed)
+        blobs = pool.sign_many(handle, transactions)
+    finally:
+        pool.shutdown()
+    
+    assert handle == wallet.classic_address
+    assert blobs == [sign(Transaction.from_dict(transaction), wallet).blob() for transaction in transactions]
+    assert [Transaction.from_blob(blob).ticket_sequence for blob in blobs] == list(range(100, 107))
+
+
+def test_small_batches_are_signed_inline_and_unknown_keys_rejected():
+    wallet = Wallet.create()
+    pool = XRPLSigningPool(inline_threshold=16)
+    handle = pool.register_key(wallet.seed)
+    
+    blobs = pool.sign_many(handle, _payments(wallet, 2))
+    
+    assert len(blobs) == 2
+    assert pool._executor is None
+    with pytest.raises(KeyError):
+        pool.sign_many(Wallet.create().classic_address, _payments(wallet, 1))
@@ -0,0 +1,110 @@
+"""
+Tests for the verify_transaction cache (in-process LRU + xrpl_transactions table).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from xrpl.models.requests import Tx
+from xrpl.models.response import Response, ResponseStatus
+
+from exceptions import ResourceNotFoundError
+from models import Base, XRPLTransaction
+from services.xrpl_payment_service import XRPLPaymentService
+
+
+TX_HASH = 'C' * 64
+
+
+class StubTxNode:
+    """Answers Tx requests (API v2) from a dict of known transactions."""
+    
+    def __init__(self):
+        self.transactions = {}
+        self.requests = 0
+    
+    def request(self, request):
+        assert isinstance(request, Tx)
+        self.requests += 1
+        tx = self.transactions.get(request.transaction)
+        if tx is None:
+            return Response(status=ResponseStatus.ERROR, result={'error': 'txnNotFound'})
+        return Response(status=ResponseStatus.SUCCESS, result=tx)
+
+
+class StubXRPLClient:
+    network = 'testnet'
+    
+    def __init__(self):
+        self.client = StubTxNode()
+
+
+def _tx_result(validated):
+    return {
+        'hash': TX_HASH,
+        'ledger_index': 42 if validated else None,
+        'validated': validated,
+        'tx_json': {
+            'TransactionType': 'Payment',
+            'Account': 'rPayerXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            'Destination': 'rSponsorXXXXXXXXXXXXXXXXXXXXXXXXX',
+            'DeliverMax': '5000000',
+            'Fee': '12',
+        },
+        'meta': {'TransactionResult': 'tesSUCCESS', 'delivered_amount': '5000000'} if validated else {},
+    }
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False})
+    # SQLite index names are database-wide, so only create the tables under test
+    Base.metadata.create_all(engine, tables=[XRPLTransaction.__table__])
+    XRPLPaymentService._tx_cache.clear()
+    yield sessionmaker(bind=engine)
+    XRPLPaymentService._tx_cache.clear()
+    engine.dispose()
+
+
+def test_unknown_hash_is_negatively_cached(session_factory, monkeypatch):
+    client = StubXRPLClient()
+    service = XRPLPaymentService(session_factory(), client)
+    
+    for _ in range(3):
+        with pytest.raises(ResourceNotFoundError):
+            service.verify_transaction(TX_HASH)
+    assert client.client.requests == 1
+    
+    # Once the negative entry expires the network is asked again
+    monkeypatch.setattr(XRPLPaymentService, 'TX_NEGATIVE_CACHE_TTL', 0)
+    XRPLPaymentService._tx_cache.clear()
+    client.client.transactions[TX_HASH] = _tx_result(validated=False)
+    assert service.verify_transaction(TX_HASH)['validated'] is False
+    assert client.client.requests == 2
+    
+    client.client.transactions[TX_HASH] = _tx_result(validated=True)
+    assert service.verify_transaction(TX_HASH)['validated'] is True
+    assert client.client.requests == 3
+
+
+def test_validated_transactions_are_served_without_network(session_factory):
+    client = StubXRPLClient()
+    client.client.transactions[TX_HASH] = _tx_result(validated=True)
+    
+    first = XRPLPaymentService(session_factory(), client).verify_transaction(TX_HASH)
+    again = XRPLPaymentService(session_factory(), client).verify_transaction(TX_HASH.lower())
+    assert client.client.requests == 1
+    assert again == {**first, 'explorer_url': again['explorer_url']}
+    
+    # Another worker (empty LRU) is answered from the database
+    XRPLPaymentService._tx_cache.clear()
+    session = session_factory()
+    from_db = XRPLPaymentService(session, client).verify_transaction(TX_HASH)
+    assert client.client.requests == 1
+    assert from_db['amount'] == '5000000'
+    assert from_db['ledger_index'] == 42
+    assert session.query(XRPLTransaction).one().amount_drops == 5000000
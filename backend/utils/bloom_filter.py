@@ -0,0 +1,132 @@
+"""
+Thread-safe in-process Bloom filters.
+Used for cheap "seen recently?" checks in front of the database, where an
+occasional false positive is acceptable and exact sets would grow unbounded.
+"""
+import hashlib
+import math
+import threading
+import time
+from typing import Callable, Iterator
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter (no false negatives, bounded false-positive rate).
+    """
+    
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Initialize BloomFilter.
+        
+        Args:
+            capacity: Number of items the filter is sized for
+            error_rate: False-positive rate at capacity
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+    
+    def add(self, key: str) -> bool:
+        """
+        Add a key.
+        
+        Args:
+            key: Item to add
+        
+        Returns:
+            bool: True if the key was not (probably) present before
+        """
+        added = False
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                added = True
+        if added:
+            self.count += 1
+        return added
+    
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position // 8] & (1 << (position % 8)) for position in self._positions(key))
+    
+    def _positions(self, key: str) -> Iterator[int]:
+        """Bit positions of a key (double hashing over one 128-bit digest)."""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + index * second) % self.size for index in range(self.hash_count))
+
+
+class RotatingBloomFilter:
+    """
+    Time-windowed Bloom filter made of two generations.
+    Keys are added to the current generation and looked up in both; every
+    window the previous generation is dropped, so a key is remembered for at
+    least one window and at most two.
+    """
+    
+    def __init__(
+        self,
+        capacity: int,
+        window_seconds: float,
+        error_rate: float = 0.001,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize RotatingBloomFilter.
+        
+        Args:
+            capacity: Keys per window each generation is sized for
+            window_seconds: Seconds between rotations
+            error_rate: False-positive rate of each generation at capacity
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.capacity = capacity
+        self.window_seconds = window_seconds
+        self.error_rate = error_rate
+        self._clock = clock
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous = BloomFilter(capacity, error_rate)
+        self._rotated_at = clock()
+        self._lock = threading.Lock()
+    
+    def add(self, key: str) -> bool:
+        """
+        Add a key unless it was seen within the window.
+        
+        Args:
+            key: Item to add
+        
+        Returns:
+            bool: True if the key is new, False if it was (probably) seen recently
+        """
+        with self._lock:
+            self._rotate()
+            # A full generation rotates early so the error rate stays bounded
+            if self._current.count >= self.capacity:
+                self._previous, self._current = self._current, BloomFilter(self.capacity, self.error_rate)
+                self._rotated_at = self._clock()
+            if key in self._previous:
+                return False
+            return self._current.add(key)
+    
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._rotate()
+            return key in self._current or key in self._previous
+    
+    def _rotate(self) -> None:
+        """Drop expired generations (caller holds the lock)."""
+        elapsed = self._clock() - self._rotated_at
+        if elapsed < self.window_seconds:
+            return
+        if elapsed >= 2 * self.window_seconds:
+            self._previous = BloomFilter(self.capacity, self.error_rate)
+        else:
+            self._previous = self._current
+        self._current = BloomFilter(self.capacity, self.error_rate)
+        self._rotated_at = self._clock()
@@ -0,0 +1,207 @@
+"""
+In-process ranked leaderboard.
+Members are kept ordered by score (highest first, ties by member) in an
+indexable skip list, so updates, rank lookups, top-K and rank-range queries
+are O(log n) (+ the number of entries returned) instead of a sort or an
+ORDER BY over the whole table.
+"""
+import math
+import random
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+_MAX_LEVELS = 32
+
+
+class _Node:
+    """Skip list node; width[level] counts level-0 steps to next[level]."""
+    
+    __slots__ = ('value', 'next', 'width')
+    
+    def __init__(self, value, levels: int):
+        self.value = value
+        self.next: List[Optional['_Node']] = [None] * levels
+        self.width = [1] * levels
+
+
+class _IndexableSkipList:
+    """Sorted sequence of unique values with positional access."""
+    
+    def __init__(self):
+        self.size = 0
+        self._head = _Node(None, _MAX_LEVELS)
+    
+    def insert(self, value) -> None:
+        chain = [None] * _MAX_LEVELS
+        steps_at_level = [0] * _MAX_LEVELS
+        node = self._head
+        for level in reversed(range(_MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].value < value:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        
+        levels = min(_MAX_LEVELS, 1 - int(math.log(1.0 - random.random(), 2.0)))
+        new_node = _Node(value, levels)
+        steps = 0
+        for level in range(levels):
+            previous = chain[level]
+            new_node.next[level] = previous.next[level]
+            previous.next[level] = new_node
+            new_node.width[level] = previous.width[level] - steps
+            previous.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, _MAX_LEVELS):
+            chain[level].width[level] += 1
+        self.size += 1
+    
+    def remove(self, value) -> None:
+        chain = [None] * _MAX_LEVELS
+        node = self._head
+        for level in reversed(range(_MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].value < value:
+                node = node.next[level]
+            chain[level] = node
+        
+        target = chain[0].next[0]
+        if target is None or target.value != value:
+            raise KeyError(value)
+        for level in range(len(target.next)):
+            previous = chain[level]
+            previous.width[level] += target.width[level] - 1
+            previous.next[level] = target.next[level]
+        for level in range(len(target.next), _MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self.size -= 1
+    
+    def index(self, value) -> int:
+        position = 0
+        node = self._head
+        for level in reversed(range(_MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].value < value:
+                position += node.width[level]
+                node = node.next[level]
+        if node.next[0] is None or node.next[0].value != value:
+            raise KeyError(value)
+        return position
+    
+    def slice(self, start: int, stop: int) -> List:
+        if start >= min(stop, self.size):
+            return []
+        remaining = start + 1
+        node = self._head
+        for level in reversed(range(_MAX_LEVELS)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        values = []
+        while node is not None and len(values) < stop - start:
+            values.append(node.value)
+            node = node.next[0]
+        return values
+
+
+class Leaderboard:
+    """
+    Thread-safe mapping of members to scores ordered by score.
+    Ranks are 0-based with the highest score at rank 0.
+    """
+    
+    def __init__(self):
+        """Initialize an empty Leaderboard."""
+        self._scores: Dict[Hashable, float] = {}
+        self._ordered = _IndexableSkipList()
+        self._lock = threading.Lock()
+    
+    def set(self, member: Hashable, score: float) -> None:
+        """
+        Set the score of a member, adding it if needed.
+        
+        Args:
+            member: Member key
+            score: New score
+        """
+        with self._lock:
+            old_score = self._scores.get(member)
+            if old_score == score:
+                return
+            if old_score is not None:
+                self._ordered.remove((-old_score, member))
+            self._ordered.insert((-score, member))
+            self._scores[member] = score
+    
+    def remove(self, member: Hashable) -> None:
+        """
+        Remove a member if present.
+        
+        Args:
+            member: Member key
+        """
+        with self._lock:
+            old_score = self._scores.pop(member, None)
+            if old_score is not None:
+                self._ordered.remove((-old_score, member))
+    
+    def score(self, member: Hashable) -> Optional[float]:
+        """
+        Score of a member.
+        
+        Args:
+            member: Member key
+        
+        Returns:
+            Optional[float]: Score, or None if the member is not ranked
+        """
+        with self._lock:
+            return self._scores.get(member)
+    
+    def rank(self, member: Hashable) -> Optional[int]:
+        """
+        Rank of a member.
+        
+        Args:
+            member: Member key
+        
+        Returns:
+            Optional[int]: 0-based rank, or None if the member is not ranked
+        """
+        with self._lock:
+            score = self._scores.get(member)
+            if score is None:
+                return None
+            return self._ordered.index((-score, member))
+    
+    def range(self, start: int, stop: int) -> List[Tuple[Hashable, float]]:
+        """
+        Members ranked start (inclusive) to stop (exclusive).
+        
+        Args:
+            start: First rank
+            stop: Rank after the last one
+        
+        Returns:
+            List[Tuple[Hashable, float]]: (member, score) pairs, best first
+        """
+        with self._lock:
+            return [(member, -negated) for negated, member in self._ordered.slice(max(start, 0), stop)]
+    
+    def top(self, count: int) -> List[Tuple[Hashable, float]]:
+        """
+        Highest ranked members.
+        
+        Args:
+            count: Number of members
+        
+        Returns:
+            List[Tuple[Hashable, float]]: (member, score) pairs, best first
+        """
+        return self.range(0, count)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._scores)
+    
+    def __contains__(self, member: Hashable) -> bool:
+        with self._lock:
+            return member in self._scores